@@ -0,0 +1,109 @@
+#! /usr/bin/env python3
+## @package bench_flux_csv
+#  Benchmark of the memory used to read the result of a Flux query.
+#
+#  Serves the CSV of a pivoted query of --rows events, as InfluxDB answers
+#  the queries of update_influx_entries_bulk.py and update_runs_from_slurm.py,
+#  and reports the peak memory traced and the rows per second of reading it
+#  as the utilities did before, from the whole response, and streamed with
+#  flux_csv.read_flux_csv. The peak of the streamed read does not depend on
+#  --rows.
+#
+#  Usage (with the harness on PYTHONPATH):
+#      python3 bench_flux_csv.py --rows 200000
+
+# System imports
+import argparse
+import csv
+import http.server
+import threading
+import time
+import tracemalloc
+
+import requests
+
+# Local imports
+from libraries.flux_csv import ITER_LINES_CHUNK_SIZE
+from libraries.flux_csv import read_flux_csv
+
+def parse_arguments():
+    my_parser = argparse.ArgumentParser(description="Benchmark the memory used to read the result of a Flux query.")
+    my_parser.add_argument("--rows", type=int, default=200000,
+                           help="The number of events in the result of the query.")
+    return my_parser.parse_args()
+
+def make_body(rows):
+    """Returns the CSV of a pivoted query of rows events, in tables of 1000 rows."""
+    header = ",result,table,_start,_stop,_time,_measurement,machine,test_id,event_name,event_value,job_id,user,app,test,runtag\r\n"
+    lines = []
+    for index in range(rows):
+        if index % 1000 == 0:
+            lines.append(("\r\n" if index else "") + header)
+        lines.append(",_result,{0},2023-01-01T00:00:00Z,2023-02-01T00:00:00Z,2023-01-{1:02d}T12:00:00.123456Z,"
+                     "events,frontier,1700000000.{2:06d},check_end,0,{3},user,HelloWorld,Test_16cores,notag\r\n".format(
+                     index // 1000, 1 + index % 28, index, 1000000 + index))
+    return "".join(lines).encode()
+
+class CSVHandler(http.server.BaseHTTPRequestHandler):
+    body = b""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv; charset=utf-8")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        view = memoryview(self.body)
+        for offset in range(0, len(view), 1 << 16):
+            self.wfile.write(view[offset:offset + (1 << 16)])
+
+    def log_message(self, format, *args):
+        pass
+
+def read_whole(url):
+    """Reads the records as the utilities did before, from the whole response."""
+    r = requests.post(url, data="query")
+    resp = list(csv.reader(r.content.decode('utf-8').splitlines(), delimiter=','))
+    col_names = resp[0]
+    count = 0
+    for entry_index in range(1, len(resp)):
+        if len(resp[entry_index]) < len(col_names):
+            continue
+        data_tmp = {}
+        for c_index in range(1, len(col_names)):
+            data_tmp[col_names[c_index]] = resp[entry_index][c_index]
+        count += 1
+    return count
+
+def read_streamed(url):
+    """Reads the records as they are streamed."""
+    r = requests.post(url, data="query", stream=True)
+    count = 0
+    for record in read_flux_csv(r.iter_lines(chunk_size=ITER_LINES_CHUNK_SIZE)):
+        count += 1
+    r.close()
+    return count
+
+def main():
+    args = parse_arguments()
+    CSVHandler.body = make_body(args.rows)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), CSVHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = "http://127.0.0.1:{0}/api/v2/query".format(server.server_address[1])
+    try:
+        print("{0:>10s} {1:>10s} {2:>10s} {3:>12s} {4:>10s}".format("method", "records", "seconds", "records/s", "peak MB"))
+        for (name, reader) in (("whole", read_whole), ("streamed", read_streamed)):
+            tracemalloc.start()
+            start = time.perf_counter()
+            count = reader(url)
+            seconds = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print("{0:>10s} {1:10d} {2:10.2f} {3:12.0f} {4:10.1f}".format(name, count, seconds, count / seconds,
+                                                                       peak / (1 << 20)))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
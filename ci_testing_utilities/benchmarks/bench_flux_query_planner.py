@@ -0,0 +1,101 @@
+#! /usr/bin/env python3
+## @package bench_flux_query_planner
+#  Benchmark of the time-chunked queries of update_runs_from_slurm.py.
+#
+#  Writes the events of --tests tests spread over --days days to an
+#  InfluxStandIn that answers each request after --latency-ms milliseconds,
+#  then finds the running tests with the query of update_runs_from_slurm.py
+#  over the whole window in one query, and with flux_query_planner over
+#  chunks of --chunk-hours hours, --jobs at a time, and reports the seconds
+#  each took and the running tests found, which must be the same.
+#
+#  Usage (with the harness and ci_testing_utilities on PYTHONPATH):
+#      python3 bench_flux_query_planner.py --tests 1000 --days 30 --chunk-hours 24 --jobs 1 4 8
+
+# System imports
+import argparse
+import datetime
+import time
+
+import requests
+
+# Local imports
+from influx_stand_in import InfluxStandIn
+from libraries import line_protocol
+from libraries.flux_csv import read_flux_csv
+from libraries.flux_query_planner import flux_range
+from libraries.flux_query_planner import plan_time_chunks
+from libraries.flux_query_planner import query_time_chunks
+
+EVENTS = ("logging_start", "build_start", "build_end", "submit_start", "submit_end", "job_queued",
+          "binary_execute_start", "binary_execute_end", "check_start", "check_end")
+
+def parse_arguments():
+    my_parser = argparse.ArgumentParser(description="Benchmark the time-chunked queries of update_runs_from_slurm.py.")
+    my_parser.add_argument("--tests", type=int, default=1000,
+                           help="The number of tests whose events are written.")
+    my_parser.add_argument("--days", type=int, default=30,
+                           help="The number of days the tests are spread over.")
+    my_parser.add_argument("--chunk-hours", type=int, default=24,
+                           help="The length in hours of the time chunks.")
+    my_parser.add_argument("--jobs", type=int, nargs="+", default=[1, 4, 8],
+                           help="The numbers of chunks queried at the same time.")
+    my_parser.add_argument("--latency-ms", type=float, default=50.0,
+                           help="The time in milliseconds the stand-in takes to answer a request.")
+    return my_parser.parse_args()
+
+def make_lines(tests, start, days):
+    """Returns the events of tests tests; one in ten stops before check_end, and their events span up to a day."""
+    lines = []
+    for index in range(tests):
+        test_start = start + datetime.timedelta(seconds=index * days * 86400 // tests)
+        last_event = len(EVENTS) if index % 10 else 1 + index % len(EVENTS) // 2
+        for (number, event_name) in enumerate(EVENTS[:last_event]):
+            event_time = test_start + datetime.timedelta(hours=2 * number)
+            tags = {"test_id" : "1700000000.{0:06d}".format(index), "machine" : "bench", "app" : "HelloWorld",
+                    "test" : "Test_16cores", "runtag" : "notag"}
+            fields = {"event_name" : event_name, "event_value" : "0", "job_id" : str(100000 + index), "user" : "bench"}
+            lines.append(line_protocol.encode("events", tags, fields, line_protocol.timestamp_ns(event_time)))
+    return lines
+
+def make_query(flux_time_str):
+    """Returns the query of update_runs_from_slurm.py of the last event of each test."""
+    return (f'from(bucket: "accept") {flux_time_str} '
+            '|> filter(fn: (r) => r._measurement == "events" and r.machine == "bench" and r._field != "output_txt") '
+            '|> last() '
+            '|> pivot(rowKey: ["test_id", "machine", "_time"], columnKey: ["_field"], valueColumn: "_value")')
+
+def is_running(entry):
+    if entry.get("event_name") == "job_queued":
+        return True
+    return entry.get("event_name") != "check_end" and entry.get("event_value") in ["0", "[NO_VALUE]"]
+
+def main():
+    args = parse_arguments()
+    stop = datetime.datetime(2023, 2, 1, tzinfo=datetime.timezone.utc)
+    start = stop - datetime.timedelta(days=args.days)
+    with InfluxStandIn() as stand_in:
+        lines = make_lines(args.tests, start, args.days)
+        for offset in range(0, len(lines), 5000):
+            requests.post(stand_in.write_url, data="\n".join(lines[offset:offset + 5000]))
+        stand_in.latency = args.latency_ms / 1000
+
+        def query(chunk_start, chunk_stop):
+            r = requests.post(stand_in.query_url, data=make_query(flux_range(chunk_start, chunk_stop)), stream=True)
+            for record in read_flux_csv(r.iter_lines()):
+                record["time"] = record["_time"]
+                yield record
+
+        print("{0:>10s} {1:>8s} {2:>6s} {3:>10s} {4:>8s}".format("method", "chunks", "jobs", "seconds", "running"))
+        runs = [("whole", [(start, stop)], 1)]
+        runs.extend(("chunked", plan_time_chunks(start, stop, datetime.timedelta(hours=args.chunk_hours)), jobs)
+                    for jobs in args.jobs)
+        for (name, chunks, jobs) in runs:
+            begin = time.perf_counter()
+            running = [record["test_id"] for record in query_time_chunks(query, chunks, lambda record : record["test_id"], jobs=jobs)
+                       if is_running(record)]
+            seconds = time.perf_counter() - begin
+            print("{0:>10s} {1:8d} {2:6d} {3:10.2f} {4:8d}".format(name, len(chunks), jobs, seconds, len(running)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#! /usr/bin/env python3
+## @package bench_influx_backfill
+#  Benchmark of the backfill of --mode influx_log.
+#
+#  Creates a subtest with --instances test instances, each with its event
+#  files and a metrics.txt, and logs them with InfluxBackfill to a local
+#  HTTP/1.1 stand-in for InfluxDB that answers each write after --latency-ms
+#  milliseconds, as a remote server would, with 1 job and with --jobs jobs.
+#  Reports the instances logged per second and the number of writes, and
+#  the time to build the worklist of the next run, when every instance is
+#  logged, from the InfluxDB index and from the marker and event files.
+#
+#  Usage (with the harness on PYTHONPATH):
+#      python3 bench_influx_backfill.py --instances 200 --jobs 8 --latency-ms 5
+
+# System imports
+import argparse
+import http.server
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+# Local imports
+from libraries.apptest import subtest
+from libraries.influx_backfill import InfluxBackfill
+from libraries.layout_of_apps_directory import apptest_layout
+from libraries.rgt_loggers import rgt_logger_factory
+from libraries.status_file import StatusFile
+
+def parse_arguments():
+    my_parser = argparse.ArgumentParser(description="Benchmark the backfill of --mode influx_log.")
+    my_parser.add_argument("--instances", type=int, default=200,
+                           help="The number of test instances logged.")
+    my_parser.add_argument("--jobs", type=int, default=8,
+                           help="The number of jobs of the concurrent backfill.")
+    my_parser.add_argument("--latency-ms", type=float, default=5.0,
+                           help="The time in milliseconds the stand-in server takes to answer a write.")
+    return my_parser.parse_args()
+
+class WriteHandler(http.server.BaseHTTPRequestHandler):
+    """Accepts writes like InfluxDB, as a stand-in for the server."""
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        time.sleep(self.server.latency)
+        with self.server.lock:
+            self.server.writes += 1
+        self.send_response(204)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+class WriteServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, latency):
+        self.lock = threading.Lock()
+        self.writes = 0
+        self.latency = latency
+        super().__init__(("127.0.0.1", 0), WriteHandler)
+
+def make_instances(work_dir, logger, instances):
+    """Creates the test instances of a subtest under work_dir and returns their IDs."""
+    test_dir = os.path.join(work_dir, "Applications", "HelloWorld", "Test_16cores")
+    scripts_dir = os.path.join(test_dir, apptest_layout.test_scripts_dirname)
+    status_dir = os.path.join(test_dir, apptest_layout.test_status_dirname)
+    run_archive_dir = os.path.join(test_dir, apptest_layout.test_run_archive_dirname)
+    os.makedirs(scripts_dir)
+    os.makedirs(status_dir)
+    # The events are written relative to the Scripts directory.
+    os.chdir(scripts_dir)
+    status_file = StatusFile(logger, os.path.join(status_dir, StatusFile.FILENAME))
+    test_ids = []
+    for index in range(instances):
+        test_id = "1700000000.{0:06d}".format(index)
+        os.makedirs(os.path.join(status_dir, test_id))
+        os.makedirs(os.path.join(run_archive_dir, test_id))
+        with open(os.path.join(run_archive_dir, test_id, "metrics.txt"), "w") as file_obj:
+            file_obj.write("runtime = {0}\nfom = {1}\n".format(index, 2 * index))
+        status_file.initialize_subtest("notag/bench@2023-01-01T00:00:00.00", test_id)
+        for (event_id, event_value) in ((StatusFile.EVENT_BUILD_START, "0"), (StatusFile.EVENT_BUILD_END, 0),
+                                        (StatusFile.EVENT_SUBMIT_START, "1/1"), (StatusFile.EVENT_SUBMIT_END, 0),
+                                        (StatusFile.EVENT_BINARY_EXECUTE_START, "0"),
+                                        (StatusFile.EVENT_BINARY_EXECUTE_END, 0), (StatusFile.EVENT_CHECK_END, 0)):
+            status_file.log_event(event_id, event_value)
+        test_ids.append(test_id)
+    return (run_archive_dir, test_ids)
+
+def unmark(run_archive_dir, test_ids):
+    for test_id in test_ids:
+        os.remove(os.path.join(run_archive_dir, test_id, InfluxBackfill.INFLUX_LOGGED_FILENAME))
+
+def main():
+    args = parse_arguments()
+    starting_dir = os.getcwd()
+    work_dir = tempfile.mkdtemp(prefix="bench_influx_backfill_")
+    server = WriteServer(args.latency_ms / 1000)
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+    try:
+        os.environ.setdefault("USER", "bench")
+        os.environ["RGT_PATH_TO_SSPACE"] = os.path.join(work_dir, "scratch")
+        os.environ["RGT_MACHINE_NAME"] = "bench"
+        os.environ["RGT_INFLUX_URI"] = "http://127.0.0.1:{0}/api/v2/write".format(server.server_address[1])
+        os.environ["RGT_INFLUX_TOKEN"] = "bench"
+        for var in ("RGT_INFLUX_OUTBOX", "RGT_INFLUX_NO_SEND", "RGT_DISABLE_INFLUX"):
+            os.environ.pop(var, None)
+        # The instances are logged again after their markers are removed.
+        os.environ["RGT_INFLUX_INDEX"] = "0"
+        logger = rgt_logger_factory.create_rgt_logger(logger_name="bench_influx_backfill",
+                                                      fh_filepath=os.path.join(work_dir, "bench.log"),
+                                                      logger_threshold_log_level="WARNING",
+                                                      fh_threshold_log_level="WARNING",
+                                                      ch_threshold_log_level="CRITICAL")
+        (run_archive_dir, test_ids) = make_instances(work_dir, logger, args.instances)
+        a_subtest = subtest(name_of_application="HelloWorld", name_of_subtest="Test_16cores",
+                            local_path_to_tests=os.path.join(work_dir, "Applications"),
+                            logger=logger, tag=test_ids[0])
+
+        print("{0:>6s} {1:>10s} {2:>8s} {3:>10s} {4:>14s} {5:>8s}".format(
+              "jobs", "instances", "logged", "seconds", "instances/s", "writes"))
+        for jobs in (1, args.jobs):
+            if jobs != 1:
+                unmark(run_archive_dir, test_ids)
+            writes_before = server.writes
+            metrics = InfluxBackfill(a_subtest, jobs=jobs).run()
+            print("{0:6d} {1:10d} {2:8d} {3:10.2f} {4:14.1f} {5:8d}".format(
+                  jobs, metrics["instances"], metrics["logged"], metrics["seconds"],
+                  metrics["instances_per_second"], server.writes - writes_before))
+
+        for (name, index_setting) in (("index", "1"), ("marker scan", "0")):
+            os.environ["RGT_INFLUX_INDEX"] = index_setting
+            backfill = InfluxBackfill(a_subtest)
+            # The first worklist from the index migrates the markers.
+            backfill.worklist()
+            start = time.perf_counter()
+            for repeat in range(10):
+                backfill.worklist()
+            print("worklist of {0} logged instances from the {1}: {2:.2f} ms".format(
+                  len(test_ids), name, 100 * (time.perf_counter() - start)))
+    finally:
+        os.chdir(starting_dir)
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
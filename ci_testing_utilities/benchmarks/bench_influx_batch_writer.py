@@ -0,0 +1,70 @@
+#! /usr/bin/env python3
+## @package bench_influx_batch_writer
+#  Benchmark of the writes of the records rewritten by the InfluxDB utilities.
+#
+#  Rewrites --records event records to an InfluxStandIn that answers each
+#  request after --latency-ms milliseconds, one POST per record as the
+#  utilities did before, and with an InfluxBatchWriter of --batch-lines
+#  lines per POST, and reports the records per second of each.
+#
+#  Usage (with the harness and ci_testing_utilities on PYTHONPATH):
+#      python3 bench_influx_batch_writer.py --records 2000 --latency-ms 5 --batch-lines 5000
+
+# System imports
+import argparse
+import time
+
+# Local imports
+from influx_stand_in import InfluxStandIn
+from libraries import line_protocol
+from libraries.influx_batch_writer import InfluxBatchWriter
+from libraries.influx_client import influx_client
+from libraries.status_file import StatusFile
+
+def parse_arguments():
+    my_parser = argparse.ArgumentParser(description="Benchmark the writes of the records rewritten by the InfluxDB utilities.")
+    my_parser.add_argument("--records", type=int, default=2000,
+                           help="The number of records rewritten.")
+    my_parser.add_argument("--latency-ms", type=float, default=5.0,
+                           help="The time in milliseconds the stand-in takes to answer a request.")
+    my_parser.add_argument("--batch-lines", type=int, default=InfluxBatchWriter.DEFAULT_MAX_LINES,
+                           help="The maximum number of records per POST of the batch writer.")
+    return my_parser.parse_args()
+
+def make_lines(count):
+    """Returns the lines of count check_end records, with a comment, as update_influx_entries_bulk.py writes them."""
+    lines = []
+    for index in range(count):
+        tags = {"test_id" : "1700000000.{0:06d}".format(index), "app" : "HelloWorld",
+                "test" : "Test_16cores", "runtag" : "notag", "machine" : "frontier"}
+        fields = dict((field_name, "value of {0}".format(field_name)) for field_name in StatusFile.INFLUX_FIELDS)
+        fields.update({"event_name" : "check_end", "event_value" : "4",
+                       "comment" : "[2023-01-01T00:00:00] user: Updated using the update_influx_entries_bulk.py utility script."})
+        lines.append(line_protocol.encode("events", tags, fields, 1672531200000000000 + index * 1000))
+    return lines
+
+def write_each(url, lines):
+    for line in lines:
+        influx_client().write(url, line)
+
+def write_batched(url, lines, batch_lines):
+    with InfluxBatchWriter(url, max_lines=batch_lines, progress=None) as writer:
+        for line in lines:
+            writer.add(line)
+
+def main():
+    args = parse_arguments()
+    lines = make_lines(args.records)
+    print("{0:>10s} {1:>8s} {2:>8s} {3:>10s} {4:>12s}".format("method", "records", "writes", "seconds", "records/s"))
+    for (name, writer) in (("each", write_each),
+                           ("batched", lambda url, lines : write_batched(url, lines, args.batch_lines))):
+        with InfluxStandIn(latency=args.latency_ms / 1000) as stand_in:
+            start = time.perf_counter()
+            writer(stand_in.write_url, lines)
+            seconds = time.perf_counter() - start
+            metrics = stand_in.metrics()
+        print("{0:>10s} {1:8d} {2:8d} {3:10.2f} {4:12.0f}".format(name, metrics["points"], metrics["writes"],
+                                                               seconds, metrics["points"] / seconds))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#! /usr/bin/env python3
+## @package bench_influx_client
+#  Benchmark of the InfluxDB writes of the harness.
+#
+#  Measures the latency of writes of an event record posted to a local
+#  HTTP/1.1 stand-in for InfluxDB with requests.post, which opens a new
+#  connection per write, and with the kept-alive connections of
+#  InfluxClient, from one thread and from several threads.
+#
+#  Usage (with the harness on PYTHONPATH):
+#      python3 bench_influx_client.py --writes 2000 --threads 8
+
+# System imports
+import argparse
+import http.server
+import statistics
+import threading
+import time
+
+import requests
+
+# Local imports
+from libraries.influx_client import InfluxClient
+
+EVENT_RECORD = ('events,app=HelloWorld,test=Test_16cores,runtag=notag,machine=frontier,test_id=1700000000.123456 ' +
+                ",".join('{0}="{1}"'.format("field_{0:02d}".format(field), "x" * 40) for field in range(30)) +
+                ' 1700000000123456000')
+
+HEADERS = {'Authorization': "Token bench", 'Content-Type': "text/plain; charset=utf-8", 'Accept': "application/json"}
+
+def parse_arguments():
+    my_parser = argparse.ArgumentParser(description="Benchmark the InfluxDB writes of the harness.")
+    my_parser.add_argument("--writes", type=int, default=2000,
+                           help="The number of writes posted by each method.")
+    my_parser.add_argument("--threads", type=int, default=8,
+                           help="The number of threads posting writes in the concurrent runs.")
+    return my_parser.parse_args()
+
+class WriteHandler(http.server.BaseHTTPRequestHandler):
+    """Accepts writes like InfluxDB, as a stand-in for the server."""
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(204)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+class WriteServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connections = 0
+        super().__init__(("127.0.0.1", 0), WriteHandler)
+
+def post_writes(post, url, writes, latencies):
+    for write in range(writes):
+        start = time.perf_counter()
+        r = post(url, data=EVENT_RECORD, headers=HEADERS)
+        latencies.append(time.perf_counter() - start)
+        if r.status_code != 204:
+            raise RuntimeError("Write failed: {0}".format(r.status_code))
+
+def bench(server, url, post, writes, threads):
+    """Returns (writes/s, median latency, 99th percentile latency, connections opened)."""
+    connections_before = server.connections
+    latencies = []
+    workers = [threading.Thread(target=post_writes, args=(post, url, writes // threads, latencies))
+               for thread in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    seconds = time.perf_counter() - start
+    latencies.sort()
+    return (len(latencies) / seconds, statistics.median(latencies),
+            latencies[int(0.99 * (len(latencies) - 1))], server.connections - connections_before)
+
+def main():
+    args = parse_arguments()
+    server = WriteServer()
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+    url = "http://127.0.0.1:{0}/api/v2/write".format(server.server_address[1])
+
+    client = InfluxClient(pool_size=args.threads)
+    results = []
+    for threads in (1, args.threads):
+        results.append(("requests.post", threads) + bench(server, url, requests.post, args.writes, threads))
+        results.append(("InfluxClient", threads) + bench(server, url, client.post, args.writes, threads))
+    client.close()
+    server.shutdown()
+    server.server_close()
+
+    print("{0:>14s} {1:>8s} {2:>10s} {3:>12s} {4:>12s} {5:>12s}".format(
+          "method", "threads", "writes/s", "median (ms)", "p99 (ms)", "connections"))
+    for (name, threads, writes_per_second, median, p99, connections) in results:
+        print("{0:>14s} {1:8d} {2:10.0f} {3:12.3f} {4:12.3f} {5:12d}".format(
+              name, threads, writes_per_second, 1000 * median, 1000 * p99, connections))
+
+if __name__ == "__main__":
+    main()
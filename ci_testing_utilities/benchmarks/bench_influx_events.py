@@ -0,0 +1,124 @@
+#! /usr/bin/env python3
+## @package bench_influx_events
+#  Load test of the InfluxDB events of the harness against the stand-in.
+#
+#  Starts an InfluxStandIn that answers each request after --latency-ms
+#  milliseconds and fails a fraction --error-rate of them, then logs the
+#  events of --instances test instances with StatusFile.log_event from
+#  --processes processes, as concurrent harness processes would. Reports
+#  the events logged per second, the writes and points the stand-in
+#  recorded and the errors it injected, and checks the events recorded with
+#  a Flux query, as the utilities read them back. With --outbox, the events
+#  still queued at the end are flushed, as the next harness process would.
+#
+#  Usage (with the harness and ci_testing_utilities on PYTHONPATH):
+#      python3 bench_influx_events.py --instances 200 --processes 8 --latency-ms 5 --error-rate 0.01 [--outbox]
+
+# System imports
+import argparse
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+
+import requests
+
+# Local imports
+from influx_stand_in import InfluxStandIn
+from libraries.influx_outbox import InfluxOutbox
+from libraries.influx_outbox import influx_outbox
+from libraries.layout_of_apps_directory import apptest_layout
+from libraries.rgt_loggers import rgt_logger_factory
+from libraries.status_file import StatusFile
+
+EVENTS = ((StatusFile.EVENT_BUILD_START, "0"), (StatusFile.EVENT_BUILD_END, 0),
+          (StatusFile.EVENT_SUBMIT_START, "1/1"), (StatusFile.EVENT_SUBMIT_END, 0),
+          (StatusFile.EVENT_BINARY_EXECUTE_START, "0"), (StatusFile.EVENT_BINARY_EXECUTE_END, 0),
+          (StatusFile.EVENT_CHECK_START, "0"), (StatusFile.EVENT_CHECK_END, 0))
+
+def parse_arguments():
+    my_parser = argparse.ArgumentParser(description="Load test of the InfluxDB events of the harness.")
+    my_parser.add_argument("--instances", type=int, default=200,
+                           help="The number of test instances whose events are logged.")
+    my_parser.add_argument("--processes", type=int, default=8,
+                           help="The number of processes logging events at the same time.")
+    my_parser.add_argument("--latency-ms", type=float, default=5.0,
+                           help="The time in milliseconds the stand-in takes to answer a request.")
+    my_parser.add_argument("--error-rate", type=float, default=0.0,
+                           help="The fraction of the requests the stand-in fails with 503.")
+    my_parser.add_argument("--outbox", action="store_true",
+                           help="Queue the events in an InfluxDB outbox (RGT_INFLUX_OUTBOX).")
+    return my_parser.parse_args()
+
+def log_events(arguments):
+    """Logs the events of test instances, in a process of the pool, and returns the number logged."""
+    (work_dir, test_ids) = arguments
+    logger = rgt_logger_factory.create_rgt_logger(logger_name="bench_influx_events_{0}".format(os.getpid()),
+                                                  fh_filepath=os.path.join(work_dir, "bench_{0}.log".format(os.getpid())),
+                                                  logger_threshold_log_level="WARNING",
+                                                  fh_threshold_log_level="WARNING",
+                                                  ch_threshold_log_level="CRITICAL")
+    status_dir = os.path.join(work_dir, "Applications", "HelloWorld", "Test_16cores", apptest_layout.test_status_dirname)
+    events = 0
+    for test_id in test_ids:
+        os.makedirs(os.path.join(status_dir, test_id))
+        status_file = StatusFile(logger, os.path.join(status_dir, StatusFile.FILENAME))
+        status_file.initialize_subtest("notag/bench@2023-01-01T00:00:00.00", test_id)
+        events += 1
+        for (event_id, event_value) in EVENTS:
+            status_file.log_event(event_id, event_value)
+            events += 1
+    return events
+
+def count_logged_events(stand_in):
+    """Returns the number of events recorded by the stand-in, from the CSV of a Flux query."""
+    flux = ('from(bucket: "accept") |> range(start: -1d) '
+            '|> filter(fn: (r) => r._measurement == "events" and r._field == "event_name")')
+    r = requests.post(stand_in.query_url, data=flux, headers={"Content-type" : "application/vnd.flux"})
+    return len([line for line in r.text.splitlines() if line.startswith(",_result,")])
+
+def main():
+    args = parse_arguments()
+    starting_dir = os.getcwd()
+    work_dir = tempfile.mkdtemp(prefix="bench_influx_events_")
+    stand_in = InfluxStandIn(latency=args.latency_ms / 1000, error_rate=args.error_rate, seed=0)
+    try:
+        os.environ.setdefault("USER", "bench")
+        os.environ["RGT_PATH_TO_SSPACE"] = os.path.join(work_dir, "scratch")
+        os.environ["RGT_MACHINE_NAME"] = "bench"
+        os.environ["RGT_INFLUX_URI"] = stand_in.write_url
+        os.environ["RGT_INFLUX_TOKEN"] = "bench"
+        for var in ("RGT_INFLUX_NO_SEND", "RGT_DISABLE_INFLUX", "RGT_INFLUX_OUTBOX"):
+            os.environ.pop(var, None)
+        if args.outbox:
+            os.environ["RGT_INFLUX_OUTBOX"] = os.path.join(work_dir, "outbox")
+        scripts_dir = os.path.join(work_dir, "Applications", "HelloWorld", "Test_16cores",
+                                   apptest_layout.test_scripts_dirname)
+        os.makedirs(scripts_dir)
+        # The events are written relative to the Scripts directory.
+        os.chdir(scripts_dir)
+
+        test_ids = ["1700000000.{0:06d}".format(index) for index in range(args.instances)]
+        chunks = [(work_dir, test_ids[process::args.processes]) for process in range(args.processes)]
+        start = time.perf_counter()
+        with multiprocessing.get_context("fork").Pool(args.processes) as pool:
+            events = sum(pool.map(log_events, chunks))
+        if args.outbox:
+            influx_outbox().flush(stand_in.write_url, {"Authorization" : "Token bench"},
+                                  retries=InfluxOutbox.FLUSH_RETRIES)
+        seconds = time.perf_counter() - start
+
+        metrics = stand_in.metrics()
+        print("{0:>10s} {1:>8s} {2:>10s} {3:>10s} {4:>8s} {5:>8s} {6:>8s} {7:>8s}".format(
+              "processes", "events", "seconds", "events/s", "writes", "points", "errors", "queried"))
+        print("{0:10d} {1:8d} {2:10.2f} {3:10.1f} {4:8d} {5:8d} {6:8d} {7:8d}".format(
+              args.processes, events, seconds, events / seconds, metrics["writes"], metrics["points"],
+              metrics["errors_injected"], count_logged_events(stand_in)))
+    finally:
+        os.chdir(starting_dir)
+        stand_in.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
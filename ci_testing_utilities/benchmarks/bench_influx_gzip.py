@@ -0,0 +1,95 @@
+#! /usr/bin/env python3
+## @package bench_influx_gzip
+#  Benchmark of the gzip compression of the InfluxDB writes of the harness.
+#
+#  Builds build_end and check_end event records the way
+#  StatusFile.post_event_to_influx does, with the last 64 kB of synthetic
+#  compiler and check output as output_txt, and measures the bytes on the
+#  wire and the CPU time per event of InfluxClient.encode_write,
+#  uncompressed and at several gzip levels.
+#
+#  Usage (with the harness on PYTHONPATH):
+#      python3 bench_influx_gzip.py --events 200
+
+# System imports
+import argparse
+import random
+import time
+
+# Local imports
+from libraries.influx_client import InfluxClient
+
+SOURCES = ["src/solver/{0}.F90".format(name) for name in
+           ("mesh", "stencil", "halo_exchange", "io_hdf5", "timers", "boundary", "linear_algebra", "setup")]
+
+def parse_arguments():
+    my_parser = argparse.ArgumentParser(description="Benchmark the gzip compression of the InfluxDB writes.")
+    my_parser.add_argument("--events", type=int, default=200,
+                           help="The number of event records encoded at each compression setting.")
+    return my_parser.parse_args()
+
+def build_output(rng, size):
+    """Returns synthetic output of a build: compile lines, warnings and a link line."""
+    lines = []
+    while sum(len(line) + 1 for line in lines) < size:
+        source = rng.choice(SOURCES)
+        obj = source.replace("src/", "obj/").replace(".F90", ".o")
+        lines.append("ftn -O3 -hfp3 -homp -I/opt/cray/pe/include -Iinclude -DUSE_MPI -c {0} -o {1}".format(source, obj))
+        if rng.random() < 0.3:
+            lines.append("ftn-7212 ftn: WARNING {0}, File = {1}, Line = {2}".format(
+                         rng.choice(["SOLVE", "EXCHANGE", "INIT"]), source, rng.randint(1, 4000)))
+            lines.append("  Variable \"tmp_{0}\" is used before it is defined.".format(rng.randint(0, 99)))
+    lines.append("ftn -o solver.x obj/*.o -L/opt/cray/pe/lib64 -lhdf5 -lsci_cray")
+    return "\n".join(lines)[-65534:]
+
+def check_output(rng, size):
+    """Returns synthetic output of a check script: per-step residuals and a verdict."""
+    lines = []
+    step = 0
+    while sum(len(line) + 1 for line in lines) < size:
+        lines.append("step {0:6d} residual {1:.12e} energy {2:.12e} dt {3:.6e} elapsed {4:10.3f} s".format(
+                     step, rng.random() * 10 ** -rng.randint(3, 12), 1.0 + rng.random() * 1e-6,
+                     1e-4, step * 0.137))
+        step += 1
+    lines.append("Reference comparison: max relative difference 3.2e-11 <= tolerance 1.0e-8: PASS")
+    return "\n".join(lines)[-65534:]
+
+def event_record(event_name, output, index):
+    record = ('events,app=HelloWorld,test=Test_16cores,runtag=notag,machine=frontier,test_id=1700000000.{0:06d} '
+              'event_name="{1}",event_value="0",job_id="12345",job_account_id="abc123",'
+              'run_archive="/lustre/orion/abc123/Run_Archive/1700000000.{0:06d}",'.format(index, event_name))
+    record += 'output_txt="' + output.replace('"', '\\"') + '"'
+    return (record + ' {0}'.format(1700000000000000000 + index)).encode()
+
+def main():
+    args = parse_arguments()
+    rng = random.Random(0)
+    records = []
+    for index in range(args.events):
+        if index % 2 == 0:
+            records.append(event_record("build_end", build_output(rng, 70000), index))
+        else:
+            records.append(event_record("check_end", check_output(rng, 70000), index))
+
+    print("{0:>12s} {1:>14s} {2:>14s} {3:>8s} {4:>16s}".format(
+          "encoding", "bytes/event", "sent/event", "ratio", "CPU us/event"))
+    for level in (None, 1, 6, 9):
+        if level is None:
+            client = InfluxClient(gzip_writes=False)
+        else:
+            InfluxClient.GZIP_LEVEL = level
+            client = InfluxClient(gzip_writes=True)
+        raw_bytes = 0
+        sent_bytes = 0
+        start = time.process_time()
+        for record in records:
+            raw_bytes += len(record)
+            sent_bytes += len(client.encode_write(record))
+        cpu_seconds = time.process_time() - start
+        client.close()
+        print("{0:>12s} {1:14.0f} {2:14.0f} {3:8.2f} {4:16.1f}".format(
+              "identity" if level is None else "gzip -{0}".format(level), raw_bytes / len(records),
+              sent_bytes / len(records), raw_bytes / sent_bytes, 1e6 * cpu_seconds / len(records)))
+
+if __name__ == "__main__":
+    main()
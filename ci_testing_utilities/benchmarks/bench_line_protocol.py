@@ -0,0 +1,102 @@
+#! /usr/bin/env python3
+## @package bench_line_protocol
+#  Benchmark of the encoding of the event records of InfluxDB.
+#
+#  Makes --events synthetic events with the tags and fields of
+#  StatusFile.INFLUX_TAGS and StatusFile.INFLUX_FIELDS and reports the lines
+#  per second of line_protocol.encode_many, of line_protocol.encode one
+#  event at a time, and, if dateutil is installed, of the string
+#  concatenation and dateutil parse per event the harness did before.
+#
+#  Usage (with the harness on PYTHONPATH):
+#      python3 bench_line_protocol.py --events 100000
+
+# System imports
+import argparse
+import datetime
+import time
+
+# Local imports
+from libraries import line_protocol
+from libraries.status_file import StatusFile
+
+def parse_arguments():
+    my_parser = argparse.ArgumentParser(description="Benchmark the encoding of the event records of InfluxDB.")
+    my_parser.add_argument("--events", type=int, default=100000,
+                           help="The number of synthetic events encoded.")
+    my_parser.add_argument("--repeat", type=int, default=3,
+                           help="The number of times each method is timed; the best time is reported.")
+    return my_parser.parse_args()
+
+def make_events(count):
+    """Returns count events as (tags, fields, event_time) tuples."""
+    start = datetime.datetime(2023, 1, 1)
+    events = []
+    for index in range(count):
+        event_time = (start + datetime.timedelta(seconds=index, microseconds=index)).isoformat()
+        tags = {"test_id" : "1700000000.{0:06d}".format(index),
+                "app" : "HelloWorld",
+                "test" : "Test_16cores",
+                "runtag" : "nightly run" if index % 2 else "notag",
+                "machine" : "frontier"}
+        fields = dict((field_name, "value of {0}".format(field_name)) for field_name in StatusFile.INFLUX_FIELDS)
+        fields["event_time"] = event_time
+        fields["output_txt"] = 'error: "x" in C:\\tmp' if index % 10 == 0 else StatusFile.NO_VALUE
+        events.append((tags, fields, event_time))
+    return events
+
+def encode_many(events):
+    return line_protocol.encode_many([("events", tags, fields, line_protocol.timestamp_ns(event_time))
+                                      for (tags, fields, event_time) in events])
+
+def encode_each(events):
+    return "\n".join([line_protocol.encode("events", tags, fields, line_protocol.timestamp_ns(event_time))
+                      for (tags, fields, event_time) in events])
+
+def concatenate(events):
+    """Builds the records as StatusFile.post_event_to_influx did before line_protocol."""
+    import dateutil.parser
+    lines = []
+    for (tags, fields, event_time) in events:
+        record = "events"
+        for (tag_name, value) in tags.items():
+            record += f",{tag_name}={value}"
+        nkeys = 0
+        for (field_name, value) in fields.items():
+            if field_name == "output_txt":
+                continue
+            record += "," if nkeys > 0 else " "
+            record += f'{field_name}="{value}"'
+            nkeys += 1
+        record += ",output_txt=\"" + fields["output_txt"].replace('"', '\\"') + "\""
+        record += " " + dateutil.parser.parse(event_time).strftime("%s%f") + "000"
+        lines.append(record)
+    return "\n".join(lines)
+
+def bench(encoder, events, repeat):
+    best = None
+    for count in range(repeat):
+        start = time.perf_counter()
+        encoder(events)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+def main():
+    args = parse_arguments()
+    events = make_events(args.events)
+
+    methods = [("encode_many", encode_many), ("encode", encode_each)]
+    try:
+        import dateutil.parser
+        methods.append(("concatenation + dateutil", concatenate))
+    except ImportError:
+        print("dateutil is not installed; the encoding of the harness before line_protocol is not timed.")
+
+    print("{0:>26s} {1:>10s} {2:>14s}".format("method", "seconds", "lines/s"))
+    for (name, encoder) in methods:
+        seconds = bench(encoder, events, args.repeat)
+        print("{0:>26s} {1:10.3f} {2:14.0f}".format(name, seconds, len(events) / seconds))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#! /usr/bin/env python3
+## @package bench_output_capture
+#  Benchmark of the capture of the output_txt field of the events.
+#
+#  Writes a synthetic build log of --size-gb GB, sparse except for its
+#  first and last megabytes, and measures the time and the peak memory of
+#  read_output_tail, of its head-plus-tail excerpt, and optionally of
+#  reading the whole file and slicing its last 64 kB as the harness did
+#  before. The whole-file read needs more memory than the size of the log.
+#
+#  Usage (with the harness on PYTHONPATH):
+#      python3 bench_output_capture.py --size-gb 2 [--full-read]
+
+# System imports
+import argparse
+import os
+import resource
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+# Local imports
+from libraries.output_capture import read_output_tail
+
+MAX_BYTES = 65534
+LOG_LINE = "ftn -O3 -homp -Iinclude -c src/solver/stencil_élément.F90 -o obj/stencil.o  # ✓ compiled\n"
+
+def parse_arguments():
+    my_parser = argparse.ArgumentParser(description="Benchmark the capture of the output_txt field.")
+    my_parser.add_argument("--size-gb", type=float, default=2.0,
+                           help="The size in GB of the synthetic build log.")
+    my_parser.add_argument("--repeat", type=int, default=20,
+                           help="The number of captures timed for each method.")
+    my_parser.add_argument("--full-read", action="store_true",
+                           help="Also time reading the whole log, as the harness did before.")
+    return my_parser.parse_args()
+
+def write_log(path, size):
+    """Writes a sparse log of size bytes whose first and last megabytes are build output."""
+    chunk = (LOG_LINE * ((1 << 20) // len(LOG_LINE.encode()) + 1)).encode()[:1 << 20]
+    with open(path, "wb") as file_obj:
+        file_obj.write(chunk)
+        file_obj.truncate(size - len(chunk))
+        file_obj.seek(size - len(chunk))
+        file_obj.write(chunk)
+
+def capture_full_read(path):
+    with open(path, "r", errors="replace") as file_obj:
+        output = file_obj.read()
+    return output[-MAX_BYTES:]
+
+def bench(name, capture, repeat):
+    tracemalloc.start()
+    start = time.perf_counter()
+    for count in range(repeat):
+        output = capture()
+    seconds = (time.perf_counter() - start) / repeat
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return (name, seconds, peak, len(output.encode()))
+
+def main():
+    args = parse_arguments()
+    work_dir = tempfile.mkdtemp(prefix="bench_output_capture_")
+    try:
+        path = os.path.join(work_dir, "output_build.txt")
+        write_log(path, int(args.size_gb * (1 << 30)))
+
+        results = [bench("tail", lambda : read_output_tail(path, MAX_BYTES), args.repeat),
+                   bench("head + tail", lambda : read_output_tail(path, MAX_BYTES, head_bytes=16384), args.repeat)]
+        if args.full_read:
+            results.append(bench("full read", lambda : capture_full_read(path), 1))
+
+        print("log size: {0} bytes".format(os.path.getsize(path)))
+        print("{0:>12s} {1:>14s} {2:>16s} {3:>14s}".format("method", "ms/capture", "peak memory (MB)", "excerpt bytes"))
+        for (name, seconds, peak, excerpt_bytes) in results:
+            print("{0:>12s} {1:14.3f} {2:16.1f} {3:14d}".format(name, 1000 * seconds, peak / (1 << 20), excerpt_bytes))
+        print("max RSS of the process: {0:.1f} MB".format(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
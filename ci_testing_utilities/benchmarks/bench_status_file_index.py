@@ -0,0 +1,66 @@
+#! /usr/bin/env python3
+## @package bench_status_file_index
+#  Benchmark of the unique id lookups of StatusFile.
+#
+#  Compares the lookups through the sidecar index rgt_status.txt.index
+#  with searching the status file, for synthetic status files of
+#  increasing sizes.
+#
+#  Usage (with the harness on PYTHONPATH):
+#      python3 bench_status_file_index.py --rows 10000 100000 1000000
+
+# System imports
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+# Local imports
+from libraries.status_file import StatusFile
+from synthetic_status_file import write_synthetic_status_file
+
+def parse_arguments():
+    my_parser = argparse.ArgumentParser(description="Benchmark the unique id lookups of a synthetic rgt_status.txt.")
+    my_parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 1000000],
+                           help="The numbers of records of the synthetic status files.")
+    my_parser.add_argument("--lookups", type=int, default=200,
+                           help="The number of lookups timed for each status file.")
+    return my_parser.parse_args()
+
+def time_lookups(status_file, unique_ids):
+    """Returns the mean seconds per lookup of the unique ids."""
+    start = time.perf_counter()
+    for unique_id in unique_ids:
+        assert status_file.isTestFinished(unique_id)
+    return (time.perf_counter() - start) / len(unique_ids)
+
+def main():
+    args = parse_arguments()
+
+    print("{0:>10s} {1:>14s} {2:>14s} {3:>14s}".format("rows", "build (s)", "index (ms)", "search (ms)"))
+    for rows in args.rows:
+        work_dir = tempfile.mkdtemp(prefix="bench_status_file_index_")
+        try:
+            path_to_status_file = os.path.join(work_dir, StatusFile.FILENAME)
+            unique_ids = write_synthetic_status_file(path_to_status_file, rows)
+            targets = random.sample(unique_ids, min(args.lookups, rows))
+
+            os.environ["RGT_STATUS_INDEX"] = "0"
+            search_time = time_lookups(StatusFile(None, path_to_status_file), targets)
+
+            os.environ["RGT_STATUS_INDEX"] = "1"
+            status_file = StatusFile(None, path_to_status_file)
+            start = time.perf_counter()
+            status_file.isTestFinished(unique_ids[0])
+            build_time = time.perf_counter() - start
+            index_time = time_lookups(status_file, targets)
+
+            print("{0:10d} {1:14.3f} {2:14.3f} {3:14.3f}".format(rows, build_time,
+                                                                 index_time * 1000.0, search_time * 1000.0))
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#! /usr/bin/env python3
+## @package bench_status_file_tail
+#  Benchmark of StatusFile.getLastHarnessID.
+#
+#  Compares reading the last record backwards from the end of the status
+#  file with reading all of its lines, for synthetic status files of
+#  increasing sizes.
+#
+#  Usage (with the harness on PYTHONPATH):
+#      python3 bench_status_file_tail.py --rows 10000 100000 1000000
+
+# System imports
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+# Local imports
+from libraries.status_file import StatusFile
+from libraries.status_file import read_status_file_lines
+from synthetic_status_file import write_synthetic_status_file
+
+def parse_arguments():
+    my_parser = argparse.ArgumentParser(description="Benchmark reading the last record of a synthetic rgt_status.txt.")
+    my_parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 1000000],
+                           help="The numbers of records of the synthetic status files.")
+    my_parser.add_argument("--repeat", type=int, default=50,
+                           help="The number of times each read is timed.")
+    return my_parser.parse_args()
+
+def time_call(function, repeat):
+    """Returns the mean seconds per call of function."""
+    start = time.perf_counter()
+    for count in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+def main():
+    args = parse_arguments()
+
+    print("{0:>10s} {1:>16s} {2:>16s}".format("rows", "tail (ms)", "all lines (ms)"))
+    for rows in args.rows:
+        work_dir = tempfile.mkdtemp(prefix="bench_status_file_tail_")
+        try:
+            path_to_status_file = os.path.join(work_dir, StatusFile.FILENAME)
+            unique_ids = write_synthetic_status_file(path_to_status_file, rows)
+            status_file = StatusFile(None, path_to_status_file)
+            assert status_file.getLastHarnessID() == unique_ids[-1]
+
+            tail_time = time_call(status_file.getLastHarnessID, args.repeat)
+            all_lines_time = time_call(lambda: read_status_file_lines(path_to_status_file)[-1], args.repeat)
+
+            print("{0:10d} {1:16.3f} {2:16.3f}".format(rows, tail_time * 1000.0, all_lines_time * 1000.0))
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
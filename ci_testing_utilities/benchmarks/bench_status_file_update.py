@@ -0,0 +1,63 @@
+#! /usr/bin/env python3
+## @package bench_status_file_update
+#  Micro-benchmark of the rgt_status.txt record updates.
+#
+#  Compares overwriting a column of a record in place with rewriting
+#  the whole status file, over a synthetic status file.
+#
+#  Usage (with the harness on PYTHONPATH):
+#      python3 bench_status_file_update.py --rows 100000 --updates 200
+
+# System imports
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+# Local imports
+from libraries.status_file import StatusFile
+from synthetic_status_file import write_synthetic_status_file
+
+check_col = StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_CHECK]
+
+def parse_arguments():
+    my_parser = argparse.ArgumentParser(description="Benchmark the updates of a synthetic rgt_status.txt.")
+    my_parser.add_argument("--rows", type=int, default=100000,
+                           help="The number of records of the synthetic status file.")
+    my_parser.add_argument("--updates", type=int, default=200,
+                           help="The number of updates timed for each update path.")
+    return my_parser.parse_args()
+
+def time_updates(update, unique_ids, updates):
+    """Returns the mean seconds per call of update over records spread through the file."""
+    stride = max(1, len(unique_ids) // updates)
+    targets = unique_ids[::stride][:updates]
+    start = time.perf_counter()
+    for (count, unique_id) in enumerate(targets):
+        update(unique_id, {check_col : str(count % 2)})
+    return (time.perf_counter() - start) / len(targets)
+
+def main():
+    args = parse_arguments()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_status_file_")
+    try:
+        path_to_status_file = os.path.join(work_dir, StatusFile.FILENAME)
+        unique_ids = write_synthetic_status_file(path_to_status_file, args.rows)
+        status_file = StatusFile(None, path_to_status_file)
+
+        # Build the sidecar index before timing the updates.
+        status_file._find_record_offset(unique_ids[0])
+
+        print("Status file: {0:d} records, {1:d} bytes".format(args.rows, os.path.getsize(path_to_status_file)))
+        results = (("in place", time_updates(status_file._update_record_in_place, unique_ids, args.updates)),
+                   ("rewrite", time_updates(status_file._rewrite_record, unique_ids, args.updates)))
+        for (name, seconds) in results:
+            print("{0:>10s}: {1:10.3f} ms/update".format(name, seconds * 1000.0))
+        print("   speedup: {0:10.1f}x".format(results[1][1] / results[0][1]))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#! /usr/bin/env python3
+## @package bench_system_log_transport
+#  Benchmark of the transports of write_system_log.
+#
+#  Measures the system log entries per second sent to a local Unix datagram
+#  listener through SyslogTransport and through the logger command it
+#  replaces, and appended to a file through BufferedFileTransport and by
+#  opening, appending to and closing the file for every entry.
+#
+#  Usage (with the harness on PYTHONPATH):
+#      python3 bench_system_log_transport.py --events 10000
+
+# System imports
+import argparse
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+
+# Local imports
+from libraries.system_log_transport import SyslogTransport
+from libraries.system_log_transport import BufferedFileTransport
+
+LOG_STRING = " ".join('{0}="{1}"'.format("field_{0:02d}".format(field), "x" * 40) for field in range(30))
+
+def parse_arguments():
+    my_parser = argparse.ArgumentParser(description="Benchmark the system log transports of the status file.")
+    my_parser.add_argument("--events", type=int, default=10000,
+                           help="The number of system log entries sent through each transport.")
+    my_parser.add_argument("--command-events", type=int, default=200,
+                           help="The number of system log entries sent through the logger command.")
+    return my_parser.parse_args()
+
+class DatagramListener:
+    """Counts the datagrams received on a Unix socket, as a stand-in for the syslog daemon."""
+
+    def __init__(self, path):
+        self.__socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.__socket.bind(path)
+        self.__socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 22)
+        self.received = 0
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def wait_for(self, count, timeout=60.0):
+        deadline = time.monotonic() + timeout
+        while self.received < count and time.monotonic() < deadline:
+            time.sleep(0.001)
+
+    def close(self):
+        self.__socket.close()
+
+    def __run(self):
+        while True:
+            try:
+                self.__socket.recv(1 << 16)
+            except OSError:
+                return
+            self.received += 1
+
+def rate(events, seconds):
+    return events / seconds if seconds > 0 else float("inf")
+
+def bench_syslog_transport(listener, address, events):
+    transport = SyslogTransport(address=address)
+    expected = listener.received + events
+    start = time.perf_counter()
+    for event in range(events):
+        transport.send(LOG_STRING)
+    listener.wait_for(expected)
+    seconds = time.perf_counter() - start
+    transport.close()
+    return rate(events, seconds)
+
+def bench_logger_command(listener, address, events):
+    if shutil.which("logger") is None:
+        return None
+    expected = listener.received + events
+    start = time.perf_counter()
+    for event in range(events):
+        os.system('logger -u ' + address + ' -p local0.notice "' + LOG_STRING.replace('"', '\\"') + '"')
+    listener.wait_for(expected, timeout=10.0)
+    seconds = time.perf_counter() - start
+    return rate(events, seconds)
+
+def bench_buffered_file(path, events):
+    transport = BufferedFileTransport()
+    start = time.perf_counter()
+    for event in range(events):
+        transport.write(path, LOG_STRING)
+    transport.close()
+    return rate(events, time.perf_counter() - start)
+
+def bench_append_per_event(path, events):
+    start = time.perf_counter()
+    for event in range(events):
+        file_ = open(path, "a")
+        file_.write(LOG_STRING + "\n")
+        file_.close()
+    return rate(events, time.perf_counter() - start)
+
+def main():
+    args = parse_arguments()
+    work_dir = tempfile.mkdtemp(prefix="bench_system_log_transport_")
+    try:
+        address = os.path.join(work_dir, "log.sock")
+        listener = DatagramListener(address)
+
+        results = [("syslog socket", bench_syslog_transport(listener, address, args.events)),
+                   ("logger command", bench_logger_command(listener, address, args.command_events)),
+                   ("buffered file", bench_buffered_file(os.path.join(work_dir, "buffered.txt"), args.events)),
+                   ("append per event", bench_append_per_event(os.path.join(work_dir, "append.txt"), args.events))]
+        listener.close()
+
+        print("{0:>18s} {1:>16s}".format("transport", "events/s"))
+        for (name, events_per_second) in results:
+            if events_per_second is None:
+                print("{0:>18s} {1:>16s}".format(name, "unavailable"))
+            else:
+                print("{0:>18s} {1:16.0f}".format(name, events_per_second))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+#! /usr/bin/env python3
+## @package synthetic_status_file
+#  Writes synthetic rgt_status.txt files for the status file benchmarks.
+
+# Local imports
+from libraries.status_file import StatusFile
+
+def make_unique_id(row):
+    return "{0:d}.{1:06d}".format(1600000000 + row, row)
+
+def write_synthetic_status_file(path_to_status_file, rows):
+    """Writes a status file with rows finished records and returns their unique ids."""
+    unique_ids = []
+    with open(path_to_status_file, "w") as file_obj:
+        file_obj.write(StatusFile.header)
+        for row in range(rows):
+            unique_id = make_unique_id(row)
+            unique_ids.append(unique_id)
+            file_obj.write(StatusFile.format_record(("2023-01-01T00:00:00.000000",
+                                                     "notag/bench@2023-01-01T00:00:00.00",
+                                                     unique_id, "1/1", str(100000 + row),
+                                                     "0", "0", "0")))
+    return unique_ids
@@ -12,6 +12,18 @@ from collections import OrderedDict
 
 # Local imports
 import harness_unit_tests.test_runtests
+import harness_unit_tests.test_status_file
+import harness_unit_tests.test_line_protocol
+import harness_unit_tests.test_influx_stand_in
+import harness_unit_tests.test_flux_csv
+import harness_unit_tests.test_influx_batch_writer
+import harness_unit_tests.test_flux_query_planner
+import harness_unit_tests.test_system_log_transport
+import harness_unit_tests.test_influx_client
+import harness_unit_tests.test_influx_outbox
+import harness_unit_tests.test_output_capture
+import harness_unit_tests.test_influx_backfill
+import harness_unit_tests.test_influx_index
 from harness_unit_tests.harness_unittests_logging import create_logger_description
 from harness_unit_tests.harness_unittests_logging import create_logger
 
@@ -55,6 +67,54 @@ def _do_generic_tests():
     my_unittests["runtests.py"] = "python3 -m unittest -v harness_unit_tests.test_runtests"
     my_unittests_return_code["runtests.py"] = 0
 
+    # Add test for status_file.py module.
+    my_unittests["status_file.py"] = "python3 -m unittest -v harness_unit_tests.test_status_file"
+    my_unittests_return_code["status_file.py"] = 0
+
+    # Add test for line_protocol.py module.
+    my_unittests["line_protocol.py"] = "python3 -m unittest -v harness_unit_tests.test_line_protocol"
+    my_unittests_return_code["line_protocol.py"] = 0
+
+    # Add test for the InfluxDB stand-in influx_stand_in.py.
+    my_unittests["influx_stand_in.py"] = "python3 -m unittest -v harness_unit_tests.test_influx_stand_in"
+    my_unittests_return_code["influx_stand_in.py"] = 0
+
+    # Add test for flux_csv.py module.
+    my_unittests["flux_csv.py"] = "python3 -m unittest -v harness_unit_tests.test_flux_csv"
+    my_unittests_return_code["flux_csv.py"] = 0
+
+    # Add test for influx_batch_writer.py module.
+    my_unittests["influx_batch_writer.py"] = "python3 -m unittest -v harness_unit_tests.test_influx_batch_writer"
+    my_unittests_return_code["influx_batch_writer.py"] = 0
+
+    # Add test for flux_query_planner.py module.
+    my_unittests["flux_query_planner.py"] = "python3 -m unittest -v harness_unit_tests.test_flux_query_planner"
+    my_unittests_return_code["flux_query_planner.py"] = 0
+
+    # Add test for system_log_transport.py module.
+    my_unittests["system_log_transport.py"] = "python3 -m unittest -v harness_unit_tests.test_system_log_transport"
+    my_unittests_return_code["system_log_transport.py"] = 0
+
+    # Add test for influx_client.py module.
+    my_unittests["influx_client.py"] = "python3 -m unittest -v harness_unit_tests.test_influx_client"
+    my_unittests_return_code["influx_client.py"] = 0
+
+    # Add test for influx_outbox.py module.
+    my_unittests["influx_outbox.py"] = "python3 -m unittest -v harness_unit_tests.test_influx_outbox"
+    my_unittests_return_code["influx_outbox.py"] = 0
+
+    # Add test for output_capture.py module.
+    my_unittests["output_capture.py"] = "python3 -m unittest -v harness_unit_tests.test_output_capture"
+    my_unittests_return_code["output_capture.py"] = 0
+
+    # Add test for influx_backfill.py module.
+    my_unittests["influx_backfill.py"] = "python3 -m unittest -v harness_unit_tests.test_influx_backfill"
+    my_unittests_return_code["influx_backfill.py"] = 0
+
+    # Add test for influx_index.py module.
+    my_unittests["influx_index.py"] = "python3 -m unittest -v harness_unit_tests.test_influx_index"
+    my_unittests_return_code["influx_index.py"] = 0
+
     for module_name,test_command_line in my_unittests.items():
         args = shlex.split(test_command_line)
         my_test_process = subprocess.run(args)
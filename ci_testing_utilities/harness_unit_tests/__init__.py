@@ -2,6 +2,18 @@ __all__ = [
             "harness_unittests_exceptions",
             "harness_unittests_logging",
             "test_runtests",
+            "test_status_file",
+            "test_line_protocol",
+            "test_influx_stand_in",
+            "test_flux_csv",
+            "test_influx_batch_writer",
+            "test_flux_query_planner",
+            "test_system_log_transport",
+            "test_influx_client",
+            "test_influx_outbox",
+            "test_output_capture",
+            "test_influx_backfill",
+            "test_influx_index",
             "test_machine_specific_tests",
             "Ascent"
           ]
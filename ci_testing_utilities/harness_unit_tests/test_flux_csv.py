@@ -0,0 +1,56 @@
+#! /usr/bin/env python3
+""" Test class module for the flux_csv module. """
+
+# System imports
+import unittest
+
+import requests
+
+# Local imports
+from libraries.influx_client import InfluxClient
+from libraries.flux_csv import read_flux_csv
+from libraries.flux_csv import FluxQueryError
+try:
+    from influx_stand_in import InfluxStandIn
+except ImportError:
+    # Run from the top directory of the repository, e.g. by pytest.
+    from ci_testing_utilities.influx_stand_in import InfluxStandIn
+
+class Test_flux_csv(unittest.TestCase):
+    """ Tests for the reading of the CSV results of Flux queries. """
+
+    def test_flux_csv_is_read_as_streamed(self):
+        """Tests the records of a streamed Flux query, split in tables, with annotations, quoted newlines and errors."""
+        with InfluxStandIn(annotations=["datatype", "group", "default"]) as stand_in:
+            requests.post(stand_in.write_url, data="\n".join([
+                'events,test_id=1,machine=unittest event_name="build_end",event_value="0",output_txt="a,\n\\"b\\"" 1700000000000000000',
+                'events,test_id=2,machine=unittest event_name="check_end",event_value="1",output_txt="c" 1700000001000000000',
+                'metrics,test_id=2 runtime=12.5 1700000001000000000']))
+            flux = ('from(bucket: "accept") |> range(start: 0) '
+                    '|> filter(fn: (r) => r._measurement == "events") '
+                    '|> pivot(rowKey: ["test_id", "machine", "_time"], columnKey: ["_field"], valueColumn: "_value")')
+            r = InfluxClient().post(stand_in.query_url, data=flux, stream=True)
+            # A small chunk size splits the lines and the quoted newline across chunks.
+            records = list(read_flux_csv(r.iter_lines(chunk_size=7)))
+            r = InfluxClient().post(stand_in.query_url, stream=True,
+                                    data='from(bucket: "accept") |> range(start: 0) |> filter(fn: (r) => r._field == "runtime")')
+            metrics = list(read_flux_csv(r.iter_lines()))
+
+        # One table for each test.
+        self.assertEqual([(record["table"], record["test_id"], record["event_name"], record["output_txt"]) for record in records],
+                         [(0, "1", "build_end", 'a,\n"b"'), (1, "2", "check_end", "c")])
+        self.assertEqual((metrics[0]["_value"], metrics[0]["_field"]), (12.5, "runtime"))
+
+        # Without annotations the values are strings; the empty line after the
+        # first row is a line ending split by requests, not a new table.
+        lines = [b",result,table,_time,test_id", b",_result,0,2023-01-01T00:00:00Z,1", b"",
+                 b",_result,0,2023-01-01T00:00:01Z,2", b"", b",result,table,test_id,event_name",
+                 b',_result,1,3,"multi', b'line"', b",_result,1,4"]
+        self.assertEqual([record["test_id"] for record in read_flux_csv(lines)], ["1", "2", "3"])
+        self.assertEqual(list(read_flux_csv(lines))[2]["event_name"], "multi\nline")
+        with self.assertRaises(FluxQueryError) as context:
+            list(read_flux_csv(["#datatype,string,long", ",error,reference", ",type error: bad query,"]))
+        self.assertEqual(context.exception.message, "InfluxDB query failed: type error: bad query")
+
+if __name__ == "__main__":
+    unittest.main()
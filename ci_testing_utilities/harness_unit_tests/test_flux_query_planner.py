@@ -0,0 +1,53 @@
+#! /usr/bin/env python3
+""" Test class module for the flux_query_planner module. """
+
+# System imports
+import datetime
+import threading
+import unittest
+
+# Local imports
+from libraries import flux_query_planner
+
+class Test_flux_query_planner(unittest.TestCase):
+    """ Tests for the time-chunked Flux queries of update_runs_from_slurm.py. """
+
+    def test_flux_query_planner_merges_time_chunks(self):
+        """Tests that the last record of each test over time chunks queried concurrently is yielded once its chunk is final."""
+        start = datetime.datetime(2023, 1, 1, tzinfo=datetime.timezone.utc)
+        chunks = flux_query_planner.plan_time_chunks(start, start + datetime.timedelta(hours=60), datetime.timedelta(days=1))
+        self.assertEqual([(chunk_start.hour, chunk_stop - chunk_start) for (chunk_start, chunk_stop) in chunks],
+                         [(12, datetime.timedelta(days=1)), (12, datetime.timedelta(days=1)), (0, datetime.timedelta(hours=12))])
+        self.assertEqual(flux_query_planner.flux_range(*chunks[2]),
+                         "|> range(start: 2023-01-01T00:00:00.000000Z, stop: 2023-01-01T12:00:00.000000Z)")
+
+        # Test 1 finished in the newest chunk, test 2 is running since the
+        # second, and test 3 only has an event in the oldest.
+        records = {0 : [{"test_id" : "1", "time" : "2023-01-03T01:00:00Z", "event_name" : "check_end"}],
+                   1 : [{"test_id" : "1", "time" : "2023-01-02T01:00:00.5Z", "event_name" : "build_start"},
+                        {"test_id" : "2", "time" : "2023-01-02T01:00:00.25Z", "event_name" : "job_queued"},
+                        {"test_id" : "2", "time" : "2023-01-02T01:00:00.123456789Z", "event_name" : "submit_end"}],
+                   2 : [{"test_id" : "3", "time" : "2023-01-01T01:00:00Z", "event_name" : "build_end"}]}
+        newest_may_finish = threading.Event()
+        finished = []
+
+        def query(chunk_start, chunk_stop):
+            index = chunks.index((chunk_start, chunk_stop))
+            if index == 0:
+                newest_may_finish.wait(5)
+            return records[index]
+
+        def on_chunk(chunk, count, seconds):
+            finished.append(chunks.index(chunk))
+            if len(finished) == 2:
+                newest_may_finish.set()
+
+        merged = list(flux_query_planner.query_time_chunks(query, chunks, lambda record : record["test_id"],
+                                                           jobs=3, on_chunk=on_chunk))
+        # The older chunks finished first, but the newest is yielded first.
+        self.assertEqual(sorted(finished[:2]), [1, 2])
+        self.assertEqual([(record["test_id"], record["event_name"]) for record in merged],
+                         [("1", "check_end"), ("2", "job_queued"), ("3", "build_end")])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+#! /usr/bin/env python3
+""" Test class module for the InfluxBackfill class. """
+
+# System imports
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+# Local imports
+from libraries.status_file import StatusFile
+from libraries.status_file_factory import StatusFileFactory
+from libraries.influx_backfill import InfluxBackfill
+from libraries.apptest import subtest
+from libraries.layout_of_apps_directory import apptest_layout
+try:
+    from influx_stand_in import InfluxStandIn
+except ImportError:
+    # Run from the top directory of the repository, e.g. by pytest.
+    from ci_testing_utilities.influx_stand_in import InfluxStandIn
+from .test_status_file import make_status_file_sandbox
+from .test_status_file import make_status_file_logger
+
+class Test_influx_backfill(unittest.TestCase):
+    """ Tests for the backfill of the test instances by --mode influx_log. """
+
+    def setUp(self):
+        """ Creates a sandbox app/test layout and changes to its Scripts directory. """
+        self.__startingDirectory = os.getcwd()
+        self.__sandbox = tempfile.mkdtemp(prefix="influx_backfill_unit_test_")
+        self.__test_id = "1700000000.123456"
+
+        (self.__scripts_dir, self.__status_dir) = make_status_file_sandbox(self.__sandbox, self.__test_id)
+        os.chdir(self.__scripts_dir)
+
+        self.__environment = mock.patch.dict(os.environ,
+                                             {"USER" : "unittest",
+                                              "RGT_PATH_TO_SSPACE" : os.path.join(self.__sandbox, "scratch")})
+        self.__environment.start()
+        for var in ("RGT_INFLUX_URI", "RGT_SYSTEM_LOG_TAG", "RGT_SYSTEM_LOG_DIR", "RGT_EVENT_DISPATCH",
+                    "RGT_INFLUX_TOKEN", "RGT_INFLUX_NO_SEND", "RGT_DISABLE_INFLUX",
+                    "RGT_INFLUX_OUTBOX", "RGT_MACHINE_NAME"):
+            os.environ.pop(var, None)
+
+        self.__logger = make_status_file_logger(self.__sandbox, self.id())
+        self.__path_to_status_file = os.path.join(self.__status_dir, StatusFile.FILENAME)
+        return
+
+    def tearDown(self):
+        """ Removes the sandbox. """
+        os.chdir(self.__startingDirectory)
+        self.__environment.stop()
+        shutil.rmtree(self.__sandbox, ignore_errors=True)
+        return
+
+    def test_influx_backfill_logs_test_instances(self):
+        """Tests that the backfill of --mode influx_log logs each pending test instance in one write, without chdir."""
+        os.environ["RGT_INFLUX_TOKEN"] = "unittest_token"
+        run_archive_dir = os.path.join(os.path.dirname(self.__scripts_dir), apptest_layout.test_run_archive_dirname)
+        test_ids = ["1700000000.{0:06d}".format(index) for index in range(5)]
+        for (index, test_id) in enumerate(test_ids):
+            os.environ["RGT_MACHINE_NAME"] = "othermachine" if index == 3 else "unittest"
+            os.makedirs(os.path.join(self.__status_dir, test_id), exist_ok=True)
+            os.makedirs(os.path.join(run_archive_dir, test_id))
+            with open(os.path.join(run_archive_dir, test_id, "metrics.txt"), "w") as file_obj:
+                file_obj.write("runtime = {0}\n".format(index))
+            status_file = StatusFile(self.__logger, self.__path_to_status_file)
+            status_file.initialize_subtest("notag/unittest@2023-01-01T00:00:00.00", test_id)
+            for (event_id, event_value) in ((StatusFile.EVENT_BUILD_START, "0"), (StatusFile.EVENT_BUILD_END, 0),
+                                            (StatusFile.EVENT_BINARY_EXECUTE_START, "0"),
+                                            (StatusFile.EVENT_BINARY_EXECUTE_END, 0), (StatusFile.EVENT_CHECK_END, 0)):
+                status_file.log_event(event_id, event_value)
+        os.mknod(os.path.join(run_archive_dir, test_ids[4], InfluxBackfill.INFLUX_LOGGED_FILENAME))
+        os.symlink(test_ids[0], os.path.join(run_archive_dir, "latest"))
+
+        a_subtest = subtest(name_of_application="HelloWorld", name_of_subtest="Test_16cores",
+                            local_path_to_tests=os.path.join(self.__sandbox, "Applications"),
+                            logger=self.__logger, tag=test_ids[0])
+        with InfluxStandIn() as stand_in:
+            os.environ["RGT_INFLUX_URI"] = stand_in.write_url
+            # One status file object makes the event records of every test instance.
+            with mock.patch.object(StatusFileFactory, "create", side_effect=StatusFileFactory.create) as create:
+                backfill = InfluxBackfill(a_subtest, jobs=2)
+                self.assertEqual(backfill.worklist(), test_ids[:3])
+                metrics = backfill.run()
+            self.assertEqual(create.call_count, 1)
+            writes = stand_in.metrics()["writes"]
+            points = stand_in.points()
+
+        self.assertEqual(os.getcwd(), self.__scripts_dir)
+        self.assertEqual((metrics["instances"], metrics["logged"], metrics["failed"]), (3, 3, 0))
+        # The index knows every test instance now, and no event file is read again.
+        with mock.patch.object(subtest, "_machine_of_test_instance") as machine_of_test_instance:
+            self.assertEqual(InfluxBackfill(a_subtest).worklist(), [])
+        machine_of_test_instance.assert_not_called()
+        self.assertGreater(metrics["instances_per_second"], 0)
+        self.assertEqual(writes, 3)
+        for (index, test_id) in enumerate(test_ids[:3]):
+            self.assertTrue(os.path.exists(os.path.join(run_archive_dir, test_id, InfluxBackfill.INFLUX_LOGGED_FILENAME)))
+            instance_points = [(measurement, fields) for (measurement, tags, fields, timestamp) in points
+                               if tags["test_id"] == test_id]
+            self.assertEqual([measurement for (measurement, fields) in instance_points], ["metrics"] + ["events"] * 6)
+            self.assertEqual(instance_points[0][1]["HelloWorld-Test_16cores-runtime"], index)
+
+    def test_influx_log_mode_marks_disabled_test_instances(self):
+        """Tests that --mode influx_log with RGT_DISABLE_INFLUX=1 marks the pending test instances .influx_disabled."""
+        os.environ["RGT_MACHINE_NAME"] = "unittest"
+        os.environ["RGT_DISABLE_INFLUX"] = "1"
+        run_archive_dir = os.path.join(os.path.dirname(self.__scripts_dir), apptest_layout.test_run_archive_dirname)
+        test_ids = ["1700000000.{0:06d}".format(index) for index in range(3)]
+        for test_id in test_ids:
+            os.makedirs(os.path.join(self.__status_dir, test_id), exist_ok=True)
+            os.makedirs(os.path.join(run_archive_dir, test_id))
+            status_file = StatusFile(self.__logger, self.__path_to_status_file)
+            status_file.initialize_subtest("notag/unittest@2023-01-01T00:00:00.00", test_id)
+        os.mknod(os.path.join(run_archive_dir, test_ids[2], InfluxBackfill.INFLUX_LOGGED_FILENAME))
+
+        a_subtest = subtest(name_of_application="HelloWorld", name_of_subtest="Test_16cores",
+                            local_path_to_tests=os.path.join(self.__sandbox, "Applications"),
+                            logger=self.__logger, tag=test_ids[0])
+        a_subtest._influx_log_mode(jobs=2)
+
+        for test_id in test_ids:
+            self.assertEqual(os.path.exists(os.path.join(run_archive_dir, test_id, InfluxBackfill.INFLUX_DISABLED_FILENAME)),
+                             test_id != test_ids[2])
+        self.assertEqual(InfluxBackfill(a_subtest).worklist(), [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+#! /usr/bin/env python3
+""" Test class module for the InfluxBatchWriter class. """
+
+# System imports
+import unittest
+
+# Local imports
+from libraries import line_protocol
+from libraries.influx_batch_writer import InfluxBatchWriter
+try:
+    from influx_stand_in import InfluxStandIn
+except ImportError:
+    # Run from the top directory of the repository, e.g. by pytest.
+    from ci_testing_utilities.influx_stand_in import InfluxStandIn
+
+class Test_influx_batch_writer(unittest.TestCase):
+    """ Tests for the batched writes of the InfluxDB utilities. """
+
+    def test_influx_batch_writer(self):
+        """Tests the batches, retries, rejections and dry run of the batch writer of the utilities."""
+        lines = [line_protocol.encode("events", {"test_id" : str(index)}, {"comment" : "x" * index}, index)
+                 for index in range(5)]
+        with InfluxStandIn() as stand_in:
+            messages = []
+            stand_in.fail_next(503)
+            with InfluxBatchWriter(stand_in.write_url, max_lines=2, backoff=0, progress=messages.append) as writer:
+                for line in lines:
+                    writer.add(line)
+            # The batches of 2, 2 and 1 lines, the first failed once.
+            metrics = stand_in.metrics()
+            self.assertEqual((metrics["writes"], metrics["errors_injected"], metrics["points"]), (3, 1, 5))
+            self.assertEqual((writer.metrics()["records"], writer.metrics()["batches"], writer.metrics()["retries"]), (5, 3, 1))
+            self.assertTrue(messages[-1].startswith("Done: 5 records written, 0 failed."))
+            self.assertIn("records/s", messages[0])
+
+            # The second line would make the batch more than 60 bytes.
+            writer = InfluxBatchWriter(stand_in.write_url, max_bytes=60, retries=2, backoff=0, progress=None)
+            stand_in.fail_next(400)
+            for line in lines[3:]:
+                writer.add(line)
+            self.assertFalse(writer.close())
+            self.assertEqual((writer.metrics()["records"], writer.metrics()["failed_records"], writer.metrics()["retries"]), (1, 1, 0))
+
+            messages = []
+            writes = stand_in.metrics()["writes"]
+            writer = InfluxBatchWriter(stand_in.write_url, max_lines=4, dry_run=True, progress=messages.append)
+            for line in lines:
+                writer.add(line)
+            self.assertTrue(writer.close())
+            self.assertEqual(stand_in.metrics()["writes"], writes)
+        self.assertEqual([message.split(",")[0] for message in messages],
+                         ["Dry run: batch 1 of 4 records", "Dry run: batch 2 of 1 records",
+                          "Dry run: 5 records in 2 batches of at most 4 lines and 1048576 bytes"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+#! /usr/bin/env python3
+""" Test class module for the InfluxClient class. """
+
+# System imports
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import requests
+
+# Local imports
+from libraries.status_file import StatusFile
+from libraries.influx_client import InfluxClient
+from libraries.influx_client import InfluxCircuitOpenError
+try:
+    from influx_stand_in import InfluxStandIn
+except ImportError:
+    # Run from the top directory of the repository, e.g. by pytest.
+    from ci_testing_utilities.influx_stand_in import InfluxStandIn
+from .test_status_file import make_status_file_sandbox
+from .test_status_file import make_status_file_logger
+
+class Test_influx_client(unittest.TestCase):
+    """ Tests for the HTTP client of the writes and queries to InfluxDB. """
+
+    def setUp(self):
+        """ Creates a sandbox app/test layout and changes to its Scripts directory. """
+        self.__startingDirectory = os.getcwd()
+        self.__sandbox = tempfile.mkdtemp(prefix="influx_client_unit_test_")
+        self.__test_id = "1700000000.123456"
+
+        (scripts_dir, status_dir) = make_status_file_sandbox(self.__sandbox, self.__test_id)
+        os.chdir(scripts_dir)
+
+        self.__environment = mock.patch.dict(os.environ,
+                                             {"USER" : "unittest",
+                                              "RGT_PATH_TO_SSPACE" : os.path.join(self.__sandbox, "scratch")})
+        self.__environment.start()
+        for var in ("RGT_INFLUX_URI", "RGT_SYSTEM_LOG_TAG", "RGT_SYSTEM_LOG_DIR", "RGT_EVENT_DISPATCH",
+                    "RGT_INFLUX_TOKEN", "RGT_INFLUX_NO_SEND", "RGT_DISABLE_INFLUX",
+                    "RGT_INFLUX_OUTBOX", "RGT_MACHINE_NAME"):
+            os.environ.pop(var, None)
+
+        self.__logger = make_status_file_logger(self.__sandbox, self.id())
+        self.__path_to_status_file = os.path.join(status_dir, StatusFile.FILENAME)
+        return
+
+    def tearDown(self):
+        """ Removes the sandbox. """
+        os.chdir(self.__startingDirectory)
+        self.__environment.stop()
+        shutil.rmtree(self.__sandbox, ignore_errors=True)
+        return
+
+    def _new_status_file(self):
+        status_file = StatusFile(self.__logger, self.__path_to_status_file)
+        status_file.initialize_subtest("notag/unittest@2023-01-01T00:00:00.00", self.__test_id)
+        return status_file
+
+    def _log_complete_test(self, status_file):
+        status_file.log_event(StatusFile.EVENT_BUILD_END, 0)
+        status_file.log_event(StatusFile.EVENT_SUBMIT_START, "1/1")
+        status_file.log_event(StatusFile.EVENT_SUBMIT_END, 0)
+        status_file.log_event(StatusFile.EVENT_JOB_QUEUED, "12345")
+        status_file.log_event(StatusFile.EVENT_CHECK_END, 0)
+
+    def test_influx_posts_reuse_connection(self):
+        """Tests that the events posted to InfluxDB share one kept-alive connection."""
+        with InfluxStandIn() as stand_in:
+            os.environ["RGT_INFLUX_URI"] = stand_in.write_url
+            os.environ["RGT_INFLUX_TOKEN"] = "unittest_token"
+            status_file = self._new_status_file()
+            self._log_complete_test(status_file)
+
+            client = InfluxClient(pool_size=2)
+            client.post(stand_in.write_url, data="events,test_id=0 value=1")
+            client.post(stand_in.write_url, data="events,test_id=0 value=2")
+            client.close()
+            metrics = stand_in.metrics()
+            points = stand_in.points()
+
+        self.assertEqual(metrics["writes"], 6 + 2)
+        self.assertEqual([measurement for (measurement, tags, fields, timestamp) in points], ["events"] * (6 + 2))
+        self.assertEqual(metrics["connections"], 2)
+
+    def test_influx_writes_are_compressed(self):
+        """Tests that writes from the size threshold on are sent compressed with gzip."""
+        small_record = "events,test_id=0 value=0"
+        large_record = 'events,test_id=0 output_txt="' + "ftn -O3 -c src/solver.F90\n" * 100 + '"'
+        with InfluxStandIn() as stand_in:
+            client = InfluxClient(gzip_writes=True, gzip_min_bytes=1024)
+            client.write(stand_in.write_url, small_record)
+            client.write(stand_in.write_url, large_record)
+            metrics = client.metrics()
+            client.close()
+            points = stand_in.points()
+
+        # The stand-in decompressed the large write.
+        self.assertEqual([fields for (measurement, tags, fields, timestamp) in points],
+                         [{"value" : 0.0}, {"output_txt" : "ftn -O3 -c src/solver.F90\n" * 100}])
+        self.assertEqual(metrics["write_bytes"], len(small_record) + len(large_record))
+        self.assertLess(metrics["write_bytes_sent"], len(small_record) + len(large_record) // 10)
+
+    def test_influx_circuit_breaker(self):
+        """Tests that the client times out, and skips requests for a cooldown after consecutive failures."""
+        with InfluxStandIn(latency=0.5) as stand_in:
+            stand_in.fail_next(503, count=3)
+            client = InfluxClient(read_timeout=0.1, breaker_failures=3, breaker_cooldown=0.5)
+            with self.assertRaises(requests.exceptions.Timeout):
+                client.post(stand_in.write_url, data="events,test_id=0 value=0")
+            stand_in.latency = 0.0
+            self.assertEqual(client.post(stand_in.write_url, data="events,test_id=0 value=1").status_code, 503)
+            self.assertEqual(client.breaker_state(), InfluxClient.BREAKER_CLOSED)
+            self.assertEqual(client.post(stand_in.write_url, data="events,test_id=0 value=2").status_code, 503)
+            self.assertEqual(client.breaker_state(), InfluxClient.BREAKER_OPEN)
+            with self.assertRaises(InfluxCircuitOpenError):
+                client.post(stand_in.write_url, data="events,test_id=0 value=3")
+
+            time.sleep(0.5)
+            self.assertEqual(client.breaker_state(), InfluxClient.BREAKER_HALF_OPEN)
+            self.assertEqual(client.post(stand_in.write_url, data="events,test_id=0 value=4").status_code, 204)
+            metrics = client.metrics()
+            self.assertEqual(dict((key, metrics[key]) for key in ("requests", "failures", "skipped", "breaker_opened",
+                                                                  "breaker_state")),
+                             {"requests" : 4, "failures" : 3, "skipped" : 1, "breaker_opened" : 1,
+                              "breaker_state" : InfluxClient.BREAKER_CLOSED})
+            client.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+#! /usr/bin/env python3
+""" Test class module for the InfluxIndex class. """
+
+# System imports
+import os
+import shutil
+import tempfile
+import unittest
+
+# Local imports
+from libraries.influx_index import InfluxIndex
+from libraries.layout_of_apps_directory import apptest_layout
+from .test_status_file import make_status_file_sandbox
+
+class Test_influx_index(unittest.TestCase):
+    """ Tests for the index of the test instances logged to InfluxDB. """
+
+    def setUp(self):
+        """ Creates a sandbox app/test layout. """
+        self.__sandbox = tempfile.mkdtemp(prefix="influx_index_unit_test_")
+        (self.__scripts_dir, _) = make_status_file_sandbox(self.__sandbox, "1700000000.123456")
+        return
+
+    def tearDown(self):
+        """ Removes the sandbox. """
+        shutil.rmtree(self.__sandbox, ignore_errors=True)
+        return
+
+    def test_influx_index_replaces_marker_scan(self):
+        """Tests that the index records the existing markers once, then the machines and the logged test instances."""
+        run_archive_dir = os.path.join(os.path.dirname(self.__scripts_dir), apptest_layout.test_run_archive_dirname)
+        test_ids = ["1700000000.{0:06d}".format(index) for index in range(3)]
+        for test_id in test_ids:
+            os.makedirs(os.path.join(run_archive_dir, test_id))
+        os.mknod(os.path.join(run_archive_dir, test_ids[0], ".influx_logged"))
+        os.mknod(os.path.join(run_archive_dir, test_ids[1], ".influx_disabled"))
+
+        index = InfluxIndex(os.path.join(self.__sandbox, "Applications", apptest_layout.influx_index_filename))
+        self.assertEqual(index.migrate("HelloWorld", "Test_16cores", run_archive_dir), 1)
+        self.assertIsNone(index.migrate("HelloWorld", "Test_16cores", run_archive_dir))
+        index.set_machines("HelloWorld", "Test_16cores", {test_ids[1] : "unittest", test_ids[2] : "unittest"})
+        instances = index.instances("HelloWorld", "Test_16cores")
+        self.assertEqual(sorted(instances), test_ids)
+        self.assertIsNotNone(instances[test_ids[0]][1])
+        self.assertEqual(instances[test_ids[1]], ("unittest", None))
+
+        index.set_logged("HelloWorld", "Test_16cores", test_ids[2],
+                         ["metrics,test_id={0} runtime=1 1700000000000000000".format(test_ids[2]),
+                          'events,test_id={0} event_name="build_end" 1700000002000000000'.format(test_ids[2]),
+                          'events,test_id={0} event_name="check_end" 1700000001000000000'.format(test_ids[2])])
+        (machine, logged) = index.instances("HelloWorld", "Test_16cores")[test_ids[2]]
+        self.assertEqual(machine, "unittest")
+        self.assertIsNotNone(logged)
+        self.assertEqual(index.measurements("HelloWorld", "Test_16cores", test_ids[2]),
+                         {"metrics" : (1, 1700000000000000000, 1700000000000000000),
+                          "events" : (2, 1700000001000000000, 1700000002000000000)})
+        self.assertEqual(index.instances("HelloWorld", "Other_test"), {})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+#! /usr/bin/env python3
+""" Test class module for the InfluxOutbox class. """
+
+# System imports
+import os
+import fcntl
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+# Local imports
+from libraries.status_file import StatusFile
+from libraries.influx_outbox import InfluxOutbox
+try:
+    from influx_stand_in import InfluxStandIn
+except ImportError:
+    # Run from the top directory of the repository, e.g. by pytest.
+    from ci_testing_utilities.influx_stand_in import InfluxStandIn
+from .test_status_file import make_status_file_sandbox
+from .test_status_file import make_status_file_logger
+
+class Test_influx_outbox(unittest.TestCase):
+    """ Tests for the outbox of the events not yet sent to InfluxDB. """
+
+    def setUp(self):
+        """ Creates a sandbox app/test layout and changes to its Scripts directory. """
+        self.__startingDirectory = os.getcwd()
+        self.__sandbox = tempfile.mkdtemp(prefix="influx_outbox_unit_test_")
+        self.__test_id = "1700000000.123456"
+
+        (scripts_dir, status_dir) = make_status_file_sandbox(self.__sandbox, self.__test_id)
+        os.chdir(scripts_dir)
+
+        self.__environment = mock.patch.dict(os.environ,
+                                             {"USER" : "unittest",
+                                              "RGT_PATH_TO_SSPACE" : os.path.join(self.__sandbox, "scratch")})
+        self.__environment.start()
+        for var in ("RGT_INFLUX_URI", "RGT_SYSTEM_LOG_TAG", "RGT_SYSTEM_LOG_DIR", "RGT_EVENT_DISPATCH",
+                    "RGT_INFLUX_TOKEN", "RGT_INFLUX_NO_SEND", "RGT_DISABLE_INFLUX",
+                    "RGT_INFLUX_OUTBOX", "RGT_INFLUX_OUTBOX_BACKOFF", "RGT_MACHINE_NAME"):
+            os.environ.pop(var, None)
+
+        self.__logger = make_status_file_logger(self.__sandbox, self.id())
+        self.__path_to_status_file = os.path.join(status_dir, StatusFile.FILENAME)
+        return
+
+    def tearDown(self):
+        """ Removes the sandbox. """
+        os.chdir(self.__startingDirectory)
+        self.__environment.stop()
+        shutil.rmtree(self.__sandbox, ignore_errors=True)
+        return
+
+    def _new_status_file(self):
+        status_file = StatusFile(self.__logger, self.__path_to_status_file)
+        status_file.initialize_subtest("notag/unittest@2023-01-01T00:00:00.00", self.__test_id)
+        return status_file
+
+    def test_influx_outbox_sends_batches(self):
+        """Tests that the outbox keeps its entries until InfluxDB accepts them, in batches of bounded size."""
+        outbox = InfluxOutbox(os.path.join(self.__sandbox, "outbox"), max_batch_bytes=60, backoff=0.0)
+        # The last line is not valid line protocol.
+        lines = ["events,test_id=0 value=0", "events,test_id=1 value=1", "events,test_id=2 value="]
+        for line in lines:
+            outbox.put(line)
+
+        with InfluxStandIn() as stand_in:
+            stand_in.fail_next(503)
+            self.assertFalse(outbox.flush(stand_in.write_url, {}))
+            self.assertEqual(len(outbox.entries()), 3)
+
+            # The second batch is rejected, then its entry alone; it is moved aside.
+            self.assertTrue(outbox.flush(stand_in.write_url, {}))
+            metrics = stand_in.metrics()
+            points = stand_in.points()
+
+        self.assertEqual(outbox.entries(), [])
+        self.assertEqual((metrics["points"], metrics["rejected"]), (2, 2))
+        self.assertEqual([tags["test_id"] for (measurement, tags, fields, timestamp) in points], ["0", "1"])
+        self.assertEqual(len(os.listdir(os.path.join(outbox.path, InfluxOutbox.REJECTED_DIRNAME))), 1)
+
+    def test_influx_outbox_keeps_entries_on_auth_errors(self):
+        """Tests that entries are kept in the outbox, not rejected, when InfluxDB refuses the token, permission or bucket."""
+        outbox = InfluxOutbox(os.path.join(self.__sandbox, "outbox"), backoff=0.0)
+        lines = ["events,test_id={0} value={0}".format(index) for index in range(3)]
+        for line in lines:
+            outbox.put(line)
+
+        with InfluxStandIn() as stand_in:
+            for status in (401, 403, 404):
+                stand_in.fail_next(status)
+                self.assertFalse(outbox.flush(stand_in.write_url, {}))
+            # One POST per flush: the batch was not resent entry by entry.
+            self.assertEqual((stand_in.metrics()["errors_injected"], stand_in.metrics()["writes"]), (3, 0))
+            self.assertEqual(len(outbox.entries()), 3)
+            self.assertTrue(outbox.flush(stand_in.write_url, {}))
+            metrics = stand_in.metrics()
+            points = stand_in.points()
+
+        self.assertEqual((metrics["writes"], metrics["points"]), (1, 3))
+        self.assertEqual([tags["test_id"] for (measurement, tags, fields, timestamp) in points], ["0", "1", "2"])
+        self.assertFalse(os.path.exists(os.path.join(outbox.path, InfluxOutbox.REJECTED_DIRNAME)))
+
+    def test_events_are_posted_through_influx_outbox(self):
+        """Tests that the events of a test are queued in the outbox and sent by a flush, unless another process is flushing."""
+        outbox_dir = os.path.join(self.__sandbox, "outbox")
+        os.environ["RGT_INFLUX_OUTBOX"] = outbox_dir
+        os.environ["RGT_INFLUX_OUTBOX_BACKOFF"] = "0"
+        os.environ["RGT_INFLUX_TOKEN"] = "unittest_token"
+        with InfluxStandIn() as stand_in:
+            os.environ["RGT_INFLUX_URI"] = stand_in.write_url
+            status_file = self._new_status_file()
+            status_file.log_event(StatusFile.EVENT_BUILD_END, 0)
+            status_file.log_event(StatusFile.EVENT_SUBMIT_START, "1/1")
+            # The events are only queued; they are sent when the process exits.
+            self.assertEqual(stand_in.metrics()["writes"], 0)
+            outbox = InfluxOutbox(outbox_dir)
+            self.assertEqual(len(outbox.entries()), 3)
+
+            with open(os.path.join(outbox_dir, InfluxOutbox.FLUSH_LOCK_FILENAME), "a") as lock_obj:
+                fcntl.flock(lock_obj.fileno(), fcntl.LOCK_EX)
+                self.assertIsNone(outbox.flush(stand_in.write_url, {}))
+            self.assertTrue(outbox.flush(stand_in.write_url, {}))
+            metrics = stand_in.metrics()
+            points = stand_in.points()
+
+        self.assertEqual(metrics["writes"], 1)
+        self.assertEqual([measurement for (measurement, tags, fields, timestamp) in points], ["events"] * 3)
+        self.assertEqual(outbox.entries(), [])
+
+if __name__ == "__main__":
+    unittest.main()
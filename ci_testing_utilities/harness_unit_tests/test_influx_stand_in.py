@@ -0,0 +1,98 @@
+#! /usr/bin/env python3
+""" Test class module for the InfluxDB stand-in influx_stand_in.py. """
+
+# System imports
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import requests
+
+# Local imports
+from libraries.status_file import StatusFile
+try:
+    from influx_stand_in import InfluxStandIn
+except ImportError:
+    # Run from the top directory of the repository, e.g. by pytest.
+    from ci_testing_utilities.influx_stand_in import InfluxStandIn
+from .test_status_file import make_status_file_sandbox
+from .test_status_file import make_status_file_logger
+
+class Test_influx_stand_in(unittest.TestCase):
+    """ Tests for the InfluxDB stand-in, with the events of a test written to it. """
+
+    def setUp(self):
+        """ Creates a sandbox app/test layout and changes to its Scripts directory. """
+        self.__startingDirectory = os.getcwd()
+        self.__sandbox = tempfile.mkdtemp(prefix="influx_stand_in_unit_test_")
+        self.__test_id = "1700000000.123456"
+
+        (scripts_dir, status_dir) = make_status_file_sandbox(self.__sandbox, self.__test_id)
+        os.chdir(scripts_dir)
+
+        self.__environment = mock.patch.dict(os.environ,
+                                             {"USER" : "unittest",
+                                              "RGT_PATH_TO_SSPACE" : os.path.join(self.__sandbox, "scratch")})
+        self.__environment.start()
+        for var in ("RGT_INFLUX_URI", "RGT_SYSTEM_LOG_TAG", "RGT_SYSTEM_LOG_DIR", "RGT_EVENT_DISPATCH",
+                    "RGT_INFLUX_TOKEN", "RGT_INFLUX_NO_SEND", "RGT_DISABLE_INFLUX",
+                    "RGT_INFLUX_OUTBOX", "RGT_MACHINE_NAME"):
+            os.environ.pop(var, None)
+
+        self.__logger = make_status_file_logger(self.__sandbox, self.id())
+        self.__path_to_status_file = os.path.join(status_dir, StatusFile.FILENAME)
+        return
+
+    def tearDown(self):
+        """ Removes the sandbox. """
+        os.chdir(self.__startingDirectory)
+        self.__environment.stop()
+        shutil.rmtree(self.__sandbox, ignore_errors=True)
+        return
+
+    def _new_status_file(self):
+        status_file = StatusFile(self.__logger, self.__path_to_status_file)
+        status_file.initialize_subtest("notag/unittest@2023-01-01T00:00:00.00", self.__test_id)
+        return status_file
+
+    def test_influx_stand_in_records_events_and_answers_queries(self):
+        """Tests the events of a test written to the InfluxDB stand-in, queried back as by the utilities, and its errors."""
+        os.environ["RGT_INFLUX_TOKEN"] = "unittest_token"
+        os.environ["RGT_MACHINE_NAME"] = "unittest"
+        with InfluxStandIn(token="unittest_token", annotations=["datatype", "group", "default"]) as stand_in:
+            os.environ["RGT_INFLUX_URI"] = stand_in.write_url
+            status_file = self._new_status_file()
+            status_file.log_event(StatusFile.EVENT_BUILD_START, "0")
+            status_file.log_event(StatusFile.EVENT_BUILD_END, 0)
+            stand_in.fail_next(503)
+            status_file.log_event(StatusFile.EVENT_SUBMIT_START, "1/1")
+
+            flux = ('from(bucket: "accept") |> range(start: -1d) '
+                    '|> filter(fn: (r) => r._measurement == "events" and r.machine == "unittest" and r._field != "output_txt") '
+                    '|> last() '
+                    '|> pivot(rowKey: ["test_id", "machine", "_time"], columnKey: ["_field"], valueColumn: "_value") '
+                    '|> filter(fn: (r) => r.event_name != "check_end" and r.event_value == "0") '
+                    '|> group()')
+            r = requests.post(stand_in.query_url, data=flux,
+                              headers={"Authorization" : "Token unittest_token", "Content-type" : "application/vnd.flux"})
+            unauthorized = requests.post(stand_in.query_url, data=flux)
+            metrics = stand_in.metrics()
+            points = stand_in.points("events")
+
+        self.assertEqual(unauthorized.status_code, 401)
+        self.assertEqual(r.status_code, 200)
+        lines = r.text.splitlines()
+        self.assertEqual([line.split(",")[0] for line in lines[:3]], ["#datatype", "#group", "#default"])
+        rows = [dict(zip(lines[3].split(","), line.split(","))) for line in lines[4:] if line]
+        self.assertEqual([(row["test_id"], row["event_name"], row["event_value"]) for row in rows],
+                         [(self.__test_id, "build_end", "0")])
+        # The logging start, build start and build end; the submit start failed.
+        self.assertEqual([fields["event_name"] for (measurement, tags, fields, timestamp) in points],
+                         ["logging_start", "build_start", "build_end"])
+        self.assertEqual(points[2][1]["machine"], "unittest")
+        self.assertEqual((metrics["writes"], metrics["errors_injected"], metrics["rejected"]), (3, 1, 1))
+
+if __name__ == "__main__":
+    unittest.main()
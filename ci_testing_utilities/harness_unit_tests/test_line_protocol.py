@@ -0,0 +1,85 @@
+#! /usr/bin/env python3
+""" Test class module for the line_protocol module. """
+
+# System imports
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+# Local imports
+from libraries.status_file import StatusFile
+from libraries import line_protocol
+from libraries.layout_of_apps_directory import apptest_layout
+from .test_status_file import make_status_file_sandbox
+from .test_status_file import make_status_file_logger
+
+class Test_line_protocol(unittest.TestCase):
+    """ Tests for the InfluxDB line protocol of the harness events. """
+
+    def setUp(self):
+        """ Creates a sandbox app/test layout and changes to its Scripts directory. """
+        self.__startingDirectory = os.getcwd()
+        self.__sandbox = tempfile.mkdtemp(prefix="line_protocol_unit_test_")
+        self.__test_id = "1700000000.123456"
+
+        (self.__scripts_dir, status_dir) = make_status_file_sandbox(self.__sandbox, self.__test_id)
+        os.chdir(self.__scripts_dir)
+
+        self.__environment = mock.patch.dict(os.environ,
+                                             {"USER" : "unittest",
+                                              "RGT_PATH_TO_SSPACE" : os.path.join(self.__sandbox, "scratch")})
+        self.__environment.start()
+        for var in ("RGT_INFLUX_URI", "RGT_SYSTEM_LOG_TAG", "RGT_SYSTEM_LOG_DIR", "RGT_EVENT_DISPATCH",
+                    "RGT_INFLUX_OUTBOX", "RGT_MACHINE_NAME"):
+            os.environ.pop(var, None)
+
+        self.__logger = make_status_file_logger(self.__sandbox, self.id())
+        self.__path_to_status_file = os.path.join(status_dir, StatusFile.FILENAME)
+        return
+
+    def tearDown(self):
+        """ Removes the sandbox. """
+        os.chdir(self.__startingDirectory)
+        self.__environment.stop()
+        shutil.rmtree(self.__sandbox, ignore_errors=True)
+        return
+
+    def _new_status_file(self):
+        status_file = StatusFile(self.__logger, self.__path_to_status_file)
+        status_file.initialize_subtest("notag/unittest@2023-01-01T00:00:00.00", self.__test_id)
+        return status_file
+
+    def test_line_protocol_escapes_records(self):
+        """Tests the escaping and the timestamps of the line protocol, and the event records made with it."""
+        self.assertEqual(line_protocol.encode("node health", {"machine" : "a,b", "node name" : "x=1"},
+                                              {"message" : 'say "hi" \\ bye', "runtime" : 3, "fom" : 1.5, "ok" : True},
+                                              1700000000000000000),
+                         'node\\ health,machine=a\\,b,node\\ name=x\\=1 '
+                         'message="say \\"hi\\" \\\\ bye",runtime=3,fom=1.5,ok=true 1700000000000000000')
+        self.assertEqual(line_protocol.encode_many([("m", {}, {"v" : "1"}), ("m", {"t" : 1}, {"v" : 2}, 5)]),
+                         'm v="1"\nm,t=1 v=2 5')
+        # Times without an offset are local times, as in the event files.
+        self.assertEqual(line_protocol.timestamp_ns("2023-06-01T12:30:45.123456"),
+                         int(time.mktime((2023, 6, 1, 12, 30, 45, 0, 0, -1))) * 1000000000 + 123456000)
+        self.assertEqual(line_protocol.timestamp_ns("2023-06-01T12:30:45Z"), 1685622645000000000)
+
+        os.environ["RGT_MACHINE_NAME"] = "unittest"
+        os.environ["RGT_SYSTEM_LOG_TAG"] = "nightly run,1"
+        status_file = self._new_status_file()
+        event_time = status_file.log_event(StatusFile.EVENT_BUILD_END, 0)
+        build_dir = os.path.join(os.path.dirname(self.__scripts_dir), apptest_layout.test_run_archive_dirname,
+                                 self.__test_id, "build_directory")
+        os.makedirs(build_dir)
+        with open(os.path.join(build_dir, "output_build.txt"), "w") as file_obj:
+            file_obj.write('error: "x" in C:\\tmp\n')
+
+        record = status_file.influx_event_record(StatusFile.EVENT_BUILD_END)
+        self.assertIn(",runtag=nightly\\ run\\,1,", record)
+        self.assertTrue(record.endswith(',output_txt="error: \\"x\\" in C:\\\\tmp\n" {0}'.format(
+                        line_protocol.timestamp_ns(event_time))))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+#! /usr/bin/env python3
+""" Test class module for the output_capture module. """
+
+# System imports
+import os
+import shutil
+import tempfile
+import unittest
+
+# Local imports
+from libraries.output_capture import read_output_tail
+from libraries.output_capture import OMITTED_MARKER
+
+class Test_output_capture(unittest.TestCase):
+    """ Tests for the excerpts of the output files sent with the events. """
+
+    def setUp(self):
+        """ Creates a temporary directory for the output files. """
+        self.__tmp_dir = tempfile.mkdtemp(prefix="output_capture_unit_test_")
+        return
+
+    def tearDown(self):
+        """ Removes the temporary directory. """
+        shutil.rmtree(self.__tmp_dir, ignore_errors=True)
+        return
+
+    def test_read_output_tail(self):
+        """Tests that output excerpts are cut at UTF-8 character boundaries."""
+        path = os.path.join(self.__tmp_dir, "output_build.txt")
+        with open(path, "wb") as file_obj:
+            file_obj.write("héad\r\n".encode() + b"x" * 100 + "line \u2713\r\nend\n".encode())
+
+        self.assertEqual(read_output_tail(path, 1000), "héad\n" + "x" * 100 + "line \u2713\nend\n")
+        # The last 7 bytes start in the middle of the 3 bytes of the check mark.
+        self.assertEqual(read_output_tail(path, 7), "\nend\n")
+        # The first 2 bytes end in the middle of the 2 bytes of the e acute;
+        # 116 of the 121 bytes of the file are left out.
+        self.assertEqual(read_output_tail(path, 6, head_bytes=2), "h" + OMITTED_MARKER.format(116) + "end\n")
+
+if __name__ == "__main__":
+    unittest.main()
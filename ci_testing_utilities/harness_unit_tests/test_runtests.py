@@ -217,6 +217,17 @@ class Test_command_line_arguments(unittest.TestCase):
         argv = shlex.split(command_line_arguments)
         self.assertRaises(SystemExit,runtests.parse_commandline_argv,argv)
 
+    def test_jobs_option_incorrect_value(self):
+        """Tests for a number of jobs below 1."""
+
+        for jobs in ("0", "-2", "two"):
+            command_line_arguments="--jobs {}".format(jobs)
+            argv = shlex.split(command_line_arguments)
+            self.assertRaises(SystemExit,runtests.parse_commandline_argv,argv)
+
+        parser = runtests.create_parser()
+        self.assertEqual(parser.parse_args(shlex.split("--jobs 1")).jobs,1)
+
     def tearDown(self):
         """ Stud doc for tear down """
         return
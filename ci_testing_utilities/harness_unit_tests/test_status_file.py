@@ -0,0 +1,670 @@
+#! /usr/bin/env python3
+""" Test class module for the StatusFile class. """
+
+# System imports
+import os
+import shutil
+import tempfile
+import threading
+import time
+import multiprocessing
+import unittest
+from unittest import mock
+
+# Local imports
+from libraries.status_file import StatusFile
+from libraries.status_journal import StatusJournal
+from libraries.status_file_index import StatusFileIndex
+from libraries.status_file_archive import StatusFileArchive
+from libraries.status_file_backup import StatusFileBackupManager
+from libraries.event_ledger import EventLedger
+from libraries.event_ledger import read_event_record
+from libraries.event_ledger import read_event_records
+from libraries.status_file import InvalidStatusFileBackendError
+from libraries.status_file import parse_status_file2
+from libraries.status_file import iter_status_file_history
+from libraries.status_file import get_status_info
+from libraries.status_file import _STATUS_INFO_CACHE
+from libraries.status_file import _reverse_lines
+from libraries.sqlite_status_file import SQLiteStatusFile
+from libraries.status_file_factory import StatusFileFactory
+from libraries.status_file_lock import StatusFileLock
+from libraries.status_file_lock import StatusFileLockTimeoutError
+from libraries.layout_of_apps_directory import apptest_layout
+from libraries.rgt_loggers import rgt_logger_factory
+
+def make_status_file_sandbox(root_dir, test_id):
+    """Creates an app/test layout under root_dir and returns the Scripts and Status directories."""
+    test_dir = os.path.join(root_dir, "Applications", "HelloWorld", "Test_16cores")
+    scripts_dir = os.path.join(test_dir, apptest_layout.test_scripts_dirname)
+    status_dir = os.path.join(test_dir, apptest_layout.test_status_dirname)
+    os.makedirs(scripts_dir, exist_ok=True)
+    os.makedirs(os.path.join(status_dir, test_id), exist_ok=True)
+    return (scripts_dir, status_dir)
+
+def make_status_file_logger(root_dir, name):
+    """Returns a rgt_logger that writes to a file under root_dir."""
+    return rgt_logger_factory.create_rgt_logger(logger_name=name,
+                                                fh_filepath=os.path.join(root_dir, "logs", name + ".txt"),
+                                                logger_threshold_log_level="INFO",
+                                                fh_threshold_log_level="INFO",
+                                                ch_threshold_log_level="CRITICAL")
+
+def update_status_file_records(path_to_status_file, unique_ids, rounds):
+    """Updates the records of unique_ids, as a status file writer process of the stress test.
+
+    The batch job ids are too wide for their column, so their updates rewrite
+    the whole status file.
+    """
+    status_file = StatusFile(None, path_to_status_file)
+    batch_col = StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_BATCH]
+    check_col = StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_CHECK]
+    for count in range(rounds):
+        for unique_id in unique_ids:
+            status_file._update_record(unique_id, {check_col : str(count)})
+            status_file._update_record(unique_id, {batch_col : "batch_job_{0}_{1:020d}".format(unique_id, count)})
+
+class Test_status_file(unittest.TestCase):
+    """ Tests for the updates of the status file rgt_status.txt. """
+
+    def setUp(self):
+        """ Creates a sandbox app/test layout and changes to its Scripts directory. """
+        self.__startingDirectory = os.getcwd()
+        self.__sandbox = tempfile.mkdtemp(prefix="status_file_unit_test_")
+        self.__test_id = "1700000000.123456"
+
+        (self.__scripts_dir, self.__status_dir) = make_status_file_sandbox(self.__sandbox, self.__test_id)
+        os.chdir(self.__scripts_dir)
+
+        self.__environment = mock.patch.dict(os.environ,
+                                             {"USER" : "unittest",
+                                              "RGT_PATH_TO_SSPACE" : os.path.join(self.__sandbox, "scratch")})
+        self.__environment.start()
+        for var in ("RGT_INFLUX_URI", "RGT_SYSTEM_LOG_TAG", "RGT_SYSTEM_LOG_DIR",
+                    "RGT_STATUS_JOURNAL", "RGT_STATUS_JOURNAL_MAX_BYTES", "RGT_STATUS_INDEX",
+                    "RGT_STATUS_ROTATE_BYTES", "RGT_STATUS_ROTATE_DAYS",
+                    "RGT_EVENT_LEDGER", "RGT_EVENT_LEDGER_FSYNC", "RGT_EVENT_DISPATCH",
+                    "RGT_STATUS_WRITE_BACK", "RGT_INFLUX_TOKEN", "RGT_INFLUX_NO_SEND", "RGT_DISABLE_INFLUX",
+                    "RGT_INFLUX_OUTBOX", "RGT_INFLUX_OUTBOX_BACKOFF", "RGT_MACHINE_NAME"):
+            os.environ.pop(var, None)
+
+        self.__logger = make_status_file_logger(self.__sandbox, self.id())
+        self.__path_to_status_file = os.path.join(self.__status_dir, StatusFile.FILENAME)
+        return
+
+    def tearDown(self):
+        """ Removes the sandbox. """
+        os.chdir(self.__startingDirectory)
+        self.__environment.stop()
+        shutil.rmtree(self.__sandbox, ignore_errors=True)
+        return
+
+    def _new_status_file(self):
+        status_file = StatusFile(self.__logger, self.__path_to_status_file)
+        status_file.initialize_subtest("notag/unittest@2023-01-01T00:00:00.00", self.__test_id)
+        return status_file
+
+    def _read_record(self):
+        with open(self.__path_to_status_file, "r") as file_obj:
+            records = [line for line in file_obj if not StatusFile.ignore_line(line)]
+        self.assertEqual(len(records), 1)
+        return records[0]
+
+    def test_log_event_updates_record_in_place(self):
+        """Tests that logging results overwrites the columns of the fixed-width record."""
+        status_file = self._new_status_file()
+        size_before = os.path.getsize(self.__path_to_status_file)
+
+        with mock.patch.object(StatusFile, "_rewrite_record", side_effect=AssertionError("status file was rewritten")):
+            status_file.log_event(StatusFile.EVENT_BUILD_END, 0)
+            status_file.log_event(StatusFile.EVENT_SUBMIT_START, "1/1")
+            status_file.log_event(StatusFile.EVENT_SUBMIT_END, 0)
+            status_file.log_event(StatusFile.EVENT_JOB_QUEUED, "12345")
+            status_file.log_event(StatusFile.EVENT_CHECK_END, 0)
+
+        self.assertEqual(os.path.getsize(self.__path_to_status_file), size_before)
+        words = self._read_record().split()
+        self.assertEqual(words[2:], [self.__test_id, "1/1", "12345", "0", "0", "0"])
+        self.assertTrue(status_file.isTestFinished(self.__test_id))
+        self.assertTrue(status_file.didAllTestsPass())
+
+    def test_oversized_value_falls_back_to_rewrite(self):
+        """Tests that a value wider than its column is still recorded."""
+        status_file = self._new_status_file()
+        long_job_id = "9" * 30
+
+        status_file.log_event(StatusFile.EVENT_JOB_QUEUED, long_job_id)
+
+        words = self._read_record().split()
+        batch_col = StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_BATCH]
+        self.assertEqual(words[batch_col], long_job_id)
+        self.assertFalse(status_file.isTestFinished(self.__test_id))
+
+    def _log_complete_test(self, status_file):
+        status_file.log_event(StatusFile.EVENT_BUILD_END, 0)
+        status_file.log_event(StatusFile.EVENT_SUBMIT_START, "1/1")
+        status_file.log_event(StatusFile.EVENT_SUBMIT_END, 0)
+        status_file.log_event(StatusFile.EVENT_JOB_QUEUED, "12345")
+        status_file.log_event(StatusFile.EVENT_CHECK_END, 0)
+
+    def _read_table_records(self):
+        """Returns the records of the status file, without merging the journal."""
+        with open(self.__path_to_status_file, "r") as file_obj:
+            return [line for line in file_obj if not StatusFile.ignore_line(line)]
+
+    def test_journal_mode_merges_journal_with_status_file(self):
+        """Tests that in journal mode the readers see the records of the journal."""
+        os.environ["RGT_STATUS_JOURNAL"] = "1"
+        status_file = self._new_status_file()
+        self._log_complete_test(status_file)
+
+        self.assertEqual(self._read_table_records(), [])
+        self.assertTrue(os.path.exists(self.__path_to_status_file + StatusJournal.JOURNAL_SUFFIX))
+        self.assertEqual(status_file.getLastHarnessID(), self.__test_id)
+        self.assertTrue(status_file.isTestFinished(self.__test_id))
+        self.assertTrue(status_file.didAllTestsPass())
+
+        # Only the updates of records in the status file or its journal are journaled.
+        check_col = StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_CHECK]
+        journal_size = os.path.getsize(self.__path_to_status_file + StatusJournal.JOURNAL_SUFFIX)
+        other_status_file = StatusFile(self.__logger, self.__path_to_status_file)
+        self.assertFalse(other_status_file._update_record("1700000000.999999", {check_col : "1"}))
+        self.assertEqual(os.path.getsize(self.__path_to_status_file + StatusJournal.JOURNAL_SUFFIX), journal_size)
+        self.assertTrue(other_status_file._update_record(self.__test_id, {check_col : "0"}))
+
+        self.assertTrue(status_file.compact_status_journal())
+        self.assertFalse(StatusJournal(self.__path_to_status_file).exists())
+        words = self._read_record().split()
+        self.assertEqual(words[2:], [self.__test_id, "1/1", "12345", "0", "0", "0"])
+
+    def test_journal_compacts_when_full(self):
+        """Tests that the journal is compacted in the background once it reaches its size limit."""
+        os.environ["RGT_STATUS_JOURNAL"] = "1"
+        os.environ["RGT_STATUS_JOURNAL_MAX_BYTES"] = "1"
+        status_file = self._new_status_file()
+        self._log_complete_test(status_file)
+
+        for thread in threading.enumerate():
+            if thread.name == "status-journal-compaction":
+                thread.join()
+        status_file.compact_status_journal()
+
+        self.assertFalse(StatusJournal(self.__path_to_status_file).exists())
+        words = self._read_table_records()[0].split()
+        self.assertEqual(words[2:], [self.__test_id, "1/1", "12345", "0", "0", "0"])
+
+    def test_leftover_journal_is_folded_without_journal_mode(self):
+        """Tests that a journal left by a run in journal mode is folded in by a later run."""
+        os.environ["RGT_STATUS_JOURNAL"] = "1"
+        status_file = self._new_status_file()
+        status_file.log_event(StatusFile.EVENT_BUILD_END, 0)
+
+        del os.environ["RGT_STATUS_JOURNAL"]
+        status_file = StatusFile(self.__logger, self.__path_to_status_file, test_id=self.__test_id)
+        self.assertFalse(StatusJournal(self.__path_to_status_file).exists())
+        status_file.log_event(StatusFile.EVENT_SUBMIT_START, "1/1")
+
+        words = self._read_record().split()
+        self.assertEqual(words[2:6], [self.__test_id, "1/1", StatusFile.PLACE_HOLDER, "0"])
+
+    def test_index_follows_appends(self):
+        """Tests that the sidecar index is updated when records are appended."""
+        status_file = self._new_status_file()
+        self.assertTrue(os.path.exists(self.__path_to_status_file + StatusFileIndex.INDEX_SUFFIX))
+
+        index = StatusFileIndex(self.__path_to_status_file, StatusFile._record_key)
+        (offset, record) = index.lookup(self.__test_id)
+        with open(self.__path_to_status_file, "rb") as file_obj:
+            self.assertEqual(file_obj.read()[offset:], record)
+
+        self._log_complete_test(status_file)
+        self.assertTrue(status_file.isTestFinished(self.__test_id))
+        self.assertEqual(index.lookup("1700000001.000000"), (None, None))
+
+    def test_stale_index_is_rebuilt(self):
+        """Tests that a record moved by an edit of the status file is still found."""
+        status_file = self._new_status_file()
+        status_file.log_event(StatusFile.EVENT_BUILD_END, 0)
+
+        # Shift the records by inserting a comment line before them.
+        with open(self.__path_to_status_file, "r") as file_obj:
+            lines = file_obj.readlines()
+        with open(self.__path_to_status_file, "w") as file_obj:
+            file_obj.writelines(["# An edited status file\n"] + lines)
+
+        status_file.log_event(StatusFile.EVENT_SUBMIT_START, "1/1")
+        words = self._read_record().split()
+        self.assertEqual(words[2:6], [self.__test_id, "1/1", StatusFile.PLACE_HOLDER, "0"])
+        self.assertFalse(status_file.isTestFinished(self.__test_id))
+
+    def test_lookups_without_index(self):
+        """Tests that the status file is searched when the index is disabled."""
+        os.environ["RGT_STATUS_INDEX"] = "0"
+        status_file = self._new_status_file()
+        self._log_complete_test(status_file)
+
+        self.assertFalse(os.path.exists(self.__path_to_status_file + StatusFileIndex.INDEX_SUFFIX))
+        self.assertTrue(status_file.isTestFinished(self.__test_id))
+
+    def test_tail_records(self):
+        """Tests reading the last records of the status file backwards."""
+        status_file = StatusFile(self.__logger, self.__path_to_status_file)
+        self.assertIsNone(status_file.getLastHarnessID())
+        self.assertEqual(status_file.tail_records(3), [])
+
+        unique_ids = ["1700000000.{0:06d}".format(row) for row in range(5)]
+        for unique_id in unique_ids:
+            os.makedirs(os.path.join(self.__status_dir, unique_id), exist_ok=True)
+            status_file.initialize_subtest("notag/unittest@2023-01-01T00:00:00.00", unique_id)
+
+        self.assertEqual([record.split()[2] for record in status_file.tail_records(3)], unique_ids[2:])
+        self.assertEqual([record.split()[2] for record in status_file.tail_records(10)], unique_ids)
+        self.assertEqual(status_file.getLastHarnessID(), unique_ids[-1])
+
+    def _new_status_file_history(self, rows, completed):
+        """Initializes rows subtests in the status file, of which the first completed are completed."""
+        unique_ids = ["1700000000.{0:06d}".format(row) for row in range(rows)]
+        for (row, unique_id) in enumerate(unique_ids):
+            os.makedirs(os.path.join(self.__status_dir, unique_id), exist_ok=True)
+            status_file = StatusFile(self.__logger, self.__path_to_status_file)
+            status_file.initialize_subtest("notag/unittest@2023-01-01T00:00:00.00", unique_id)
+            if row < completed:
+                self._log_complete_test(StatusFile(self.__logger, self.__path_to_status_file, test_id=unique_id))
+        return unique_ids
+
+    def test_rotate_moves_completed_records_to_archive(self):
+        """Tests that rotation keeps the subtests in progress and the last record in the status file."""
+        unique_ids = self._new_status_file_history(6, 5)
+        self._log_complete_test(StatusFile(self.__logger, self.__path_to_status_file, test_id=unique_ids[-1]))
+        os.makedirs(os.path.join(self.__status_dir, "1700000000.999999"))
+        StatusFile(self.__logger, self.__path_to_status_file).initialize_subtest(
+            "notag/unittest@2023-01-01T00:00:00.00", "1700000000.999999")
+        unique_ids.append("1700000000.999999")
+
+        status_file = StatusFile(self.__logger, self.__path_to_status_file)
+        self.assertEqual(status_file.rotate(), 6)
+
+        self.assertEqual([record.split()[2] for record in self._read_table_records()], unique_ids[-1:])
+        archive = StatusFileArchive(self.__path_to_status_file)
+        self.assertEqual([line.split()[2] for line in archive.iter_lines()], unique_ids[:-1])
+        self.assertEqual(archive.failed_records(), 0)
+
+        self.assertEqual([record.split()[2] for record in status_file.tail_records(3)], unique_ids[-3:])
+        self.assertTrue(status_file.isTestFinished(unique_ids[0]))
+        self.assertFalse(status_file.isTestFinished(unique_ids[-1]))
+        self.assertFalse(status_file.didAllTestsPass())
+        (status, failed_jobs) = parse_status_file2(self.__path_to_status_file)
+        self.assertEqual(status["number_of_passed_tests"], 6)
+
+        # A subtest is not initialized again once its record is archived.
+        status_file.initialize_subtest("notag/unittest@2023-01-01T00:00:00.00", unique_ids[0])
+        self.assertEqual(len(self._read_table_records()), 1)
+
+    def test_new_subtests_skip_archive_lookup(self):
+        """Tests that the archive is not read for unique ids newer than its segments."""
+        unique_ids = self._new_status_file_history(4, 4)
+        status_file = StatusFile(self.__logger, self.__path_to_status_file)
+        self.assertEqual(status_file.rotate(), 3)
+
+        with mock.patch.object(StatusFileArchive, "iter_segment_lines", autospec=True,
+                               side_effect=StatusFileArchive.iter_segment_lines) as iter_segment_lines:
+            self.assertFalse(status_file._subtest_already_initialized("1700000000.999999"))
+            self.assertEqual(iter_segment_lines.call_count, 0)
+            self.assertTrue(status_file._subtest_already_initialized(unique_ids[0]))
+            self.assertEqual(iter_segment_lines.call_count, 1)
+
+    def test_rotate_if_needed(self):
+        """Tests the size and age limits of the status file."""
+        self._new_status_file_history(3, 2)
+        status_file = StatusFile(self.__logger, self.__path_to_status_file)
+        self.assertFalse(status_file.rotate_if_needed())
+
+        os.environ["RGT_STATUS_ROTATE_DAYS"] = "365000"
+        self.assertFalse(StatusFile(self.__logger, self.__path_to_status_file).rotate_if_needed())
+
+        os.environ["RGT_STATUS_ROTATE_BYTES"] = "1"
+        self.assertTrue(StatusFile(self.__logger, self.__path_to_status_file).rotate_if_needed())
+        self.assertEqual(len(self._read_table_records()), 1)
+        self.assertIsNotNone(StatusFileArchive(self.__path_to_status_file).last_rotation())
+
+    def test_interrupted_rotation_is_completed(self):
+        """Tests that the records of a pending archive segment are read once and removed by the next rotation."""
+        unique_ids = self._new_status_file_history(4, 4)
+        archive = StatusFileArchive(self.__path_to_status_file)
+        records = self._read_table_records()
+        archive.add_pending_segment(records[:2], {"records" : 2, "failed" : 0,
+                                                  "min_unique_id" : None, "max_unique_id" : None,
+                                                  "first_start_time" : None, "last_start_time" : None})
+
+        (status, failed_jobs) = parse_status_file2(self.__path_to_status_file)
+        self.assertEqual(status["number_of_tests"], 4)
+        status_file = StatusFile(self.__logger, self.__path_to_status_file)
+        self.assertEqual([record.split()[2] for record in status_file.tail_records(4)], unique_ids)
+
+        self.assertEqual(status_file.rotate(), 1)
+        self.assertIsNone(archive.pending_segment())
+        self.assertEqual([line.split()[2] for line in archive.iter_lines()], unique_ids[:3])
+        self.assertEqual([record.split()[2] for record in self._read_table_records()], unique_ids[3:])
+
+    def test_interrupted_rotation_keeps_truncated_lines(self):
+        """Tests that a truncated line of the status file does not stop the completion of a rotation."""
+        unique_ids = self._new_status_file_history(4, 4)
+        archive = StatusFileArchive(self.__path_to_status_file)
+        records = self._read_table_records()
+        archive.add_pending_segment(records[:2], {"records" : 2, "failed" : 0,
+                                                  "min_unique_id" : None, "max_unique_id" : None,
+                                                  "first_start_time" : None, "last_start_time" : None})
+        with open(self.__path_to_status_file, "a") as file_obj:
+            file_obj.write("truncated\n")
+
+        history = list(iter_status_file_history(self.__path_to_status_file))
+        self.assertEqual([line.split()[2] for line in history[:-1] if not StatusFile.ignore_line(line)], unique_ids)
+        self.assertEqual(history[-1], "truncated\n")
+
+        status_file = StatusFile(self.__logger, self.__path_to_status_file)
+        status_file.rotate()
+        self.assertIsNone(archive.pending_segment())
+        with open(self.__path_to_status_file, "r") as file_obj:
+            self.assertEqual(file_obj.readlines()[-1], "truncated\n")
+
+    def test_event_ledger_replaces_event_files(self):
+        """Tests that in ledger mode the events are read back as from the event files."""
+        test_status_dir = os.path.join(self.__status_dir, self.__test_id)
+        status_file = self._new_status_file()
+        status_file.log_event(StatusFile.EVENT_BUILD_START)
+        event_files = read_event_records(test_status_dir)
+
+        shutil.rmtree(test_status_dir)
+        os.makedirs(test_status_dir)
+        os.environ["RGT_EVENT_LEDGER"] = "1"
+        os.environ["RGT_EVENT_LEDGER_FSYNC"] = EventLedger.FSYNC_NEVER
+        status_file.log_event(StatusFile.EVENT_BUILD_START)
+        status_file.log_event(StatusFile.EVENT_BUILD_END, 0)
+
+        self.assertEqual([name for name in os.listdir(test_status_dir) if name.startswith("Event_")], [])
+        ledger_events = read_event_records(test_status_dir)
+        build_start = StatusFile.EVENT_DICT[StatusFile.EVENT_BUILD_START][0]
+        build_end = StatusFile.EVENT_DICT[StatusFile.EVENT_BUILD_END][0]
+        self.assertEqual(sorted(ledger_events), [build_start, build_end])
+
+        # The lines differ from those of the event files only by the event time.
+        without_time = lambda line : [word for word in line.split("\t")[1:] if not word.startswith("event_time=")]
+        self.assertEqual(without_time(ledger_events[build_start]), without_time(event_files[build_start]))
+        self.assertEqual(read_event_record(test_status_dir, build_end).split("\t")[1], "0")
+
+        # An interrupted append leaves an incomplete last line, which is skipped.
+        with open(os.path.join(test_status_dir, apptest_layout.test_event_ledger_filename), "a") as file_obj:
+            file_obj.write('{"event_filename" : "Event_190')
+        self.assertEqual(read_event_records(test_status_dir), ledger_events)
+
+    def test_status_info_cache_follows_files(self):
+        """Tests that the cached event information changes with the files of the test instance."""
+        path_to_job_status = os.path.join(self.__status_dir, self.__test_id, apptest_layout.job_status_filename)
+        job_status = lambda : dict(get_status_info(self.__test_id, "check", "end", "0",
+                                                   "2023-01-01T00:00:00", "Event_200_check_end.txt"))["job_status"]
+        metrics_before = _STATUS_INFO_CACHE.metrics()
+
+        self.assertEqual(job_status(), StatusFile.NO_VALUE)
+        with open(path_to_job_status, "w") as file_obj:
+            file_obj.write("1\n")
+        os.utime(path_to_job_status, (1, 1))
+        self.assertEqual(job_status(), "1")
+        self.assertEqual(job_status(), "1")
+
+        # A change that keeps the size and the modification time but not the inode.
+        with open(path_to_job_status + ".new", "w") as file_obj:
+            file_obj.write("0\n")
+        os.utime(path_to_job_status + ".new", (1, 1))
+        os.replace(path_to_job_status + ".new", path_to_job_status)
+        self.assertEqual(job_status(), "0")
+
+        metrics = _STATUS_INFO_CACHE.metrics()
+        self.assertEqual(metrics["events"] - metrics_before["events"], 4)
+        self.assertGreaterEqual(metrics["context_hits"] - metrics_before["context_hits"], 3)
+        self.assertGreaterEqual(metrics["file_hits"] - metrics_before["file_hits"], 1)
+
+    def test_async_event_dispatch(self):
+        """Tests that slow sinks do not delay log_event, and receive every event by close."""
+        os.environ["RGT_EVENT_DISPATCH"] = "async"
+        delivered = []
+        def slow_system_log(test_id, status_info):
+            time.sleep(0.2)
+            delivered.append(dict(status_info)["event_name"])
+
+        with mock.patch("libraries.status_file.write_system_log", side_effect=slow_system_log):
+            status_file = self._new_status_file()
+            start = time.monotonic()
+            self._log_complete_test(status_file)
+            self.assertLess(time.monotonic() - start, 0.2 * 5)
+
+            # The event files and the status file are written synchronously.
+            check_end = StatusFile.EVENT_DICT[StatusFile.EVENT_CHECK_END][0]
+            self.assertTrue(os.path.exists(os.path.join(self.__status_dir, self.__test_id, check_end)))
+            self.assertTrue(status_file.isTestFinished(self.__test_id))
+
+            status_file.close_event_dispatcher()
+
+        self.assertEqual(delivered, ["logging_start", "build_end", "submit_start", "submit_end", "job_queued", "check_end"])
+
+    def test_backups_of_unchanged_status_file_are_skipped(self):
+        """Tests the ring of backups of the status file."""
+        status_file = self._new_status_file()
+        manager = StatusFileBackupManager(self.__path_to_status_file, keep=3)
+
+        first_backup = manager.backup()
+        self.assertIsNotNone(first_backup)
+        self.assertIsNone(manager.backup())
+
+        with open(self.__path_to_status_file, "r") as file_obj:
+            original = file_obj.read()
+        status_file.log_event(StatusFile.EVENT_BUILD_END, 0)
+        second_backup = manager.backup()
+        self.assertIsNotNone(second_backup)
+
+        # Restored content is a hardlink to the backup of the same content.
+        with open(self.__path_to_status_file, "w") as file_obj:
+            file_obj.write(original)
+        third_backup = manager.backup()
+        self.assertEqual(os.stat(third_backup).st_ino, os.stat(first_backup).st_ino)
+
+        with open(third_backup, "r") as file_obj:
+            self.assertEqual(file_obj.read(), original)
+
+        # Only the newest three backups are kept.
+        status_file.log_event(StatusFile.EVENT_SUBMIT_START, "1/1")
+        fourth_backup = manager.backup()
+        self.assertEqual(manager.backups(), [second_backup, third_backup, fourth_backup])
+        self.assertFalse(os.path.exists(first_backup))
+
+    def test_write_back_model_looks_up_record_once(self):
+        """Tests that the events of a driver update the status file without looking up the record again."""
+        status_file = self._new_status_file()
+        with mock.patch.object(StatusFile, "_find_record_offset", autospec=True,
+                               side_effect=StatusFile._find_record_offset) as find_record_offset:
+            self._log_complete_test(status_file)
+            self.assertTrue(status_file.isTestFinished(self.__test_id))
+        self.assertEqual(find_record_offset.call_count, 1)
+
+        words = self._read_record().split()
+        self.assertEqual(words[2:], [self.__test_id, "1/1", "12345", "0", "0", "0"])
+
+    def test_write_back_model_detects_changed_status_file(self):
+        """Tests that the model writes back by unique id after another process moved its record."""
+        status_file = self._new_status_file()
+        status_file.log_event(StatusFile.EVENT_BUILD_END, 0)
+
+        # Another process inserts a record before it.
+        with open(self.__path_to_status_file, "r") as file_obj:
+            lines = file_obj.readlines()
+        other_record = StatusFile.format_record(["2023-01-01T00:00:00.000000", "notag/other",
+                                                 "1600000000.000000", "1/1", "1", "0", "0", "0"])
+        with open(self.__path_to_status_file + ".new", "w") as file_obj:
+            file_obj.writelines([line for line in lines if StatusFile.ignore_line(line)] + [other_record] +
+                                [line for line in lines if not StatusFile.ignore_line(line)])
+        os.replace(self.__path_to_status_file + ".new", self.__path_to_status_file)
+
+        status_file.log_event(StatusFile.EVENT_SUBMIT_START, "1/1")
+        status_file.log_event(StatusFile.EVENT_SUBMIT_END, 0)
+
+        records = self._read_table_records()
+        self.assertEqual(records[0], other_record)
+        self.assertEqual(records[1].split()[2:], [self.__test_id, "1/1", StatusFile.PLACE_HOLDER, "0", "0",
+                                                  StatusFile.PLACE_HOLDER])
+
+    def test_reverse_lines_across_blocks(self):
+        """Tests that lines spanning the blocks of the reverse reader are joined."""
+        self._new_status_file()
+        with open(self.__path_to_status_file, "rb") as file_obj:
+            lines = file_obj.read().split(b"\n")
+
+        for block_size in (1, 7, 64, 1 << 20):
+            self.assertEqual(list(_reverse_lines(self.__path_to_status_file, block_size=block_size)),
+                             list(reversed(lines)))
+
+class Test_status_file_lock(unittest.TestCase):
+    """ Tests for the locking of the status file by concurrent writers. """
+
+    NUMBER_OF_PROCESSES = 8
+    RECORDS_PER_PROCESS = 3
+    ROUNDS = 10
+
+    def setUp(self):
+        self.__sandbox = tempfile.mkdtemp(prefix="status_file_lock_unit_test_")
+        self.__path_to_status_file = os.path.join(self.__sandbox, StatusFile.FILENAME)
+        self.__environment = mock.patch.dict(os.environ, {"RGT_STATUS_LOCK_TIMEOUT" : "120"})
+        self.__environment.start()
+        return
+
+    def tearDown(self):
+        self.__environment.stop()
+        shutil.rmtree(self.__sandbox, ignore_errors=True)
+        return
+
+    def test_parallel_writers_do_not_lose_updates(self):
+        """Tests that the updates of parallel writer processes are all kept."""
+        unique_ids = [["{0}.{1}".format(1700000000 + process, record) for record in range(self.RECORDS_PER_PROCESS)]
+                      for process in range(self.NUMBER_OF_PROCESSES)]
+        with open(self.__path_to_status_file, "w") as file_obj:
+            file_obj.write(StatusFile.header)
+            for process_ids in unique_ids:
+                for unique_id in process_ids:
+                    file_obj.write(StatusFile.format_record(("2023-01-01T00:00:00", "notag/stress@2023-01-01T00:00:00.00",
+                                                             unique_id, "1/1", StatusFile.PLACE_HOLDER,
+                                                             "0", "0", StatusFile.PLACE_HOLDER)))
+
+        processes = [multiprocessing.Process(target=update_status_file_records,
+                                             args=(self.__path_to_status_file, process_ids, self.ROUNDS))
+                     for process_ids in unique_ids]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+
+        with open(self.__path_to_status_file, "r") as file_obj:
+            records = {line.split()[2] : line.split() for line in file_obj if not StatusFile.ignore_line(line)}
+
+        last_round = self.ROUNDS - 1
+        for process_ids in unique_ids:
+            for unique_id in process_ids:
+                self.assertEqual(records[unique_id][4], "batch_job_{0}_{1:020d}".format(unique_id, last_round))
+                self.assertEqual(records[unique_id][7], str(last_round))
+
+    def test_lock_wait_is_bounded(self):
+        """Tests that waiting for a held lock times out."""
+        with StatusFileLock(self.__path_to_status_file) as holder:
+            waiter = StatusFileLock(self.__path_to_status_file, timeout=0.05)
+            with self.assertRaises(StatusFileLockTimeoutError):
+                waiter.acquire()
+            self.assertEqual(waiter.metrics()["timeouts"], 1)
+
+            # A nested acquisition by the holder does not wait.
+            with holder.shared():
+                pass
+
+        waiter.acquire()
+        waiter.release()
+        metrics = waiter.metrics()
+        self.assertEqual(metrics["acquisitions"], 1)
+        self.assertGreaterEqual(metrics["hold_seconds_total"], 0.0)
+
+class Test_sqlite_status_file(unittest.TestCase):
+    """ Tests for the SQLite status file backend. """
+
+    def setUp(self):
+        """ Creates a sandbox app/test layout with a legacy status file and changes to its Scripts directory. """
+        self.__startingDirectory = os.getcwd()
+        self.__sandbox = tempfile.mkdtemp(prefix="sqlite_status_file_unit_test_")
+        self.__legacy_id = "1690000000.000001"
+        self.__test_id = "1700000000.123456"
+
+        (scripts_dir, status_dir) = make_status_file_sandbox(self.__sandbox, self.__test_id)
+        os.chdir(scripts_dir)
+
+        self.__environment = mock.patch.dict(os.environ,
+                                             {"USER" : "unittest",
+                                              "RGT_PATH_TO_SSPACE" : os.path.join(self.__sandbox, "scratch"),
+                                              "RGT_STATUS_BACKEND" : "sqlite"})
+        self.__environment.start()
+        for var in ("RGT_INFLUX_URI", "RGT_SYSTEM_LOG_TAG", "RGT_STATUS_JOURNAL", "RGT_STATUS_INDEX"):
+            os.environ.pop(var, None)
+
+        self.__logger = make_status_file_logger(self.__sandbox, self.id())
+        self.__path_to_status_file = os.path.join(status_dir, StatusFile.FILENAME)
+        with open(self.__path_to_status_file, "w") as file_obj:
+            file_obj.write(StatusFile.header)
+            file_obj.write(StatusFile.format_record(("2023-01-01T00:00:00", "notag/legacy@2023-01-01T00:00:00.00",
+                                                     self.__legacy_id, "1/1", "111", "0", "0", "0")))
+        return
+
+    def tearDown(self):
+        """ Removes the sandbox. """
+        os.chdir(self.__startingDirectory)
+        self.__environment.stop()
+        shutil.rmtree(self.__sandbox, ignore_errors=True)
+        return
+
+    def test_factory_selects_backend(self):
+        """Tests that RGT_STATUS_BACKEND selects the status file class."""
+        status_file = StatusFileFactory.create(path_to_status_file=self.__path_to_status_file, logger=self.__logger)
+        self.assertIsInstance(status_file, SQLiteStatusFile)
+
+        os.environ["RGT_STATUS_BACKEND"] = "unknown"
+        with self.assertRaises(InvalidStatusFileBackendError):
+            StatusFileFactory.create(path_to_status_file=self.__path_to_status_file, logger=self.__logger)
+
+    def test_records_are_kept_in_database(self):
+        """Tests the status of test instances kept in the database."""
+        status_file = StatusFileFactory.create(path_to_status_file=self.__path_to_status_file, logger=self.__logger)
+        self.assertTrue(os.path.exists(status_file.database_path))
+        self.assertTrue(status_file.isTestFinished(self.__legacy_id))
+
+        status_file.initialize_subtest("notag/unittest@2023-01-01T00:00:00.00", self.__test_id)
+        self.assertEqual(status_file.getLastHarnessID(), self.__test_id)
+        self.assertFalse(status_file.isTestFinished(self.__test_id))
+        self.assertFalse(status_file.didAllTestsPass())
+
+        status_file.log_event(StatusFile.EVENT_BUILD_END, 0)
+        status_file.log_event(StatusFile.EVENT_SUBMIT_START, "1/1")
+        status_file.log_event(StatusFile.EVENT_SUBMIT_END, 0)
+        status_file.log_event(StatusFile.EVENT_JOB_QUEUED, "12345")
+        status_file.log_event(StatusFile.EVENT_CHECK_END, 0)
+        self.assertTrue(status_file.isTestFinished(self.__test_id))
+        self.assertTrue(status_file.didAllTestsPass())
+
+        (status, failed_jobs) = parse_status_file2(self.__path_to_status_file)
+        self.assertEqual(status["number_of_passed_tests"], 2)
+
+    def test_export_status_file(self):
+        """Tests that the database is exported in the format of rgt_status.txt."""
+        status_file = StatusFileFactory.create(path_to_status_file=self.__path_to_status_file, logger=self.__logger)
+        status_file.initialize_subtest("notag/unittest@2023-01-01T00:00:00.00", self.__test_id)
+        status_file.export_status_file()
+
+        with open(self.__path_to_status_file, "r") as file_obj:
+            records = [line.split() for line in file_obj if not StatusFile.ignore_line(line)]
+        self.assertEqual([words[2] for words in records], [self.__legacy_id, self.__test_id])
+        self.assertEqual(records[1][3:], [StatusFile.PLACE_HOLDER] * 5)
+
+if __name__ == "__main__":
+    unittest.main()
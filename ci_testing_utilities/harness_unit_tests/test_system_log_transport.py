@@ -0,0 +1,68 @@
+#! /usr/bin/env python3
+""" Test class module for the system_log_transport module. """
+
+# System imports
+import os
+import shutil
+import socket
+import tempfile
+import unittest
+from unittest import mock
+
+# Local imports
+from libraries.status_file import write_system_log
+from libraries.system_log_transport import SyslogTransport
+from libraries.system_log_transport import file_transport
+from .test_status_file import make_status_file_sandbox
+
+class Test_system_log_transport(unittest.TestCase):
+    """ Tests for the transports of the events to the system log. """
+
+    def setUp(self):
+        """ Creates a sandbox app/test layout and changes to its Scripts directory. """
+        self.__startingDirectory = os.getcwd()
+        self.__sandbox = tempfile.mkdtemp(prefix="system_log_transport_unit_test_")
+        self.__test_id = "1700000000.123456"
+
+        (scripts_dir, status_dir) = make_status_file_sandbox(self.__sandbox, self.__test_id)
+        os.chdir(scripts_dir)
+
+        self.__environment = mock.patch.dict(os.environ, {"USER" : "unittest"})
+        self.__environment.start()
+        for var in ("RGT_SYSTEM_LOG_TAG", "RGT_SYSTEM_LOG_DIR"):
+            os.environ.pop(var, None)
+        return
+
+    def tearDown(self):
+        """ Removes the sandbox. """
+        os.chdir(self.__startingDirectory)
+        self.__environment.stop()
+        shutil.rmtree(self.__sandbox, ignore_errors=True)
+        return
+
+    def test_system_log_transports(self):
+        """Tests the syslog socket and the buffered files of write_system_log."""
+        address = os.path.join(self.__sandbox, "log.sock")
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        listener.bind(address)
+        listener.settimeout(10.0)
+        try:
+            SyslogTransport(address=address).send('event_name="build_start"')
+            self.assertRegex(listener.recv(4096).decode(),
+                             r'^<133>\w{3} [ \d]\d \d\d:\d\d:\d\d unittest: event_name="build_start"$')
+        finally:
+            listener.close()
+
+        system_log_dir = os.path.join(self.__sandbox, "system_log")
+        os.makedirs(system_log_dir)
+        os.environ["RGT_SYSTEM_LOG_DIR"] = system_log_dir
+        os.environ["RGT_SYSTEM_LOG_TAG"] = "unittest_tag"
+        write_system_log(self.__test_id, [["event_name", "build_start"], ["event_value", "0"]])
+        file_transport().flush()
+
+        log_path = os.path.join(system_log_dir, "HelloWorld_#_Test_16cores_#_" + self.__test_id + ".txt")
+        with open(log_path, "r") as file_obj:
+            self.assertEqual(file_obj.read(), 'event_name="build_start" event_value="0"\n')
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,640 @@
+#! /usr/bin/env python3
+## @package influx_stand_in
+#  A local stand-in for an InfluxDB v2 server, for the tests and benchmarks
+#  of the InfluxDB paths of the harness and its utilities.
+#
+#  InfluxStandIn is an HTTP/1.1 server in a thread of the process. It
+#  implements
+#
+#      POST /api/v2/write  Records the points of a body of line protocol,
+#                          gzip-compressed or not, in a SQLite database, in
+#                          memory by default.
+#      POST /api/v2/query  Runs a Flux query, as text (application/vnd.flux)
+#                          or JSON with a dialect, over the recorded points
+#                          and answers with the CSV of the result, annotated
+#                          if the dialect asks for annotations.
+#
+#  Only the part of Flux used by the utilities is understood: from(bucket:)
+#  followed by range(start:, stop:), filter(fn: (r) => ...) with ==, !=, <,
+#  <=, >, >=, and, or and not, first(), last(), limit(n:), pivot(rowKey:,
+#  columnKey:, valueColumn:) and group(columns:). Other queries are answered
+#  with 400, as InfluxDB answers invalid queries.
+#
+#  Every request is answered after latency seconds, and a fraction
+#  error_rate of them, or the next ones given to fail_next, fail with an
+#  error status instead of being processed.
+#
+#  The stand-in can also be run on its own, e.g. to point the utilities at
+#  it through harness_keys.py:
+#      python3 influx_stand_in.py --port 8086 --latency-ms 5 --error-rate 0.05
+
+# System imports
+import argparse
+import ast
+import csv
+import datetime
+import gzip
+import http.server
+import io
+import json
+import random
+import re
+import sqlite3
+import threading
+import time
+import urllib.parse
+
+class InfluxStandIn(http.server.ThreadingHTTPServer):
+    """A local HTTP/1.1 stand-in for an InfluxDB v2 server, serving from a thread of the process."""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, port=0, latency=0.0, error_rate=0.0, error_status=503, token=None,
+                 database=":memory:", annotations=(), seed=None):
+        """Constructor.
+
+        Parameters
+        ----------
+        port : int
+            The port on 127.0.0.1 to listen on, or 0 for any free port.
+
+        latency : float
+            The time in seconds taken to answer each request.
+
+        error_rate : float
+            The fraction of the requests that fail with error_status.
+
+        error_status : int
+            The status of the requests that fail.
+
+        token : str
+            The token the requests must be authorized with, or None to
+            accept any request.
+
+        database : str
+            The path of the SQLite database the points are recorded in, or
+            ":memory:".
+
+        annotations : list
+            The annotations of the CSV of the queries that do not ask for
+            any, among "datatype", "group" and "default".
+
+        seed : int
+            The seed of the choice of the requests that fail.
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.token = token
+        self.annotations = list(annotations)
+        self.__random = random.Random(seed)
+        self.__failures = []
+        self.__lock = threading.Lock()
+        self.__metrics = {'connections' : 0,
+                          'writes' : 0,
+                          'queries' : 0,
+                          'points' : 0,
+                          'bytes' : 0,
+                          'errors_injected' : 0,
+                          'rejected' : 0}
+        self.__connection = sqlite3.connect(database, check_same_thread=False)
+        with self.__connection:
+            self.__connection.execute('CREATE TABLE IF NOT EXISTS points (bucket TEXT, measurement TEXT, '
+                                      'tags TEXT, fields TEXT, time INTEGER)')
+            self.__connection.execute('CREATE INDEX IF NOT EXISTS points_by_time ON points (bucket, time)')
+        super().__init__(("127.0.0.1", port), _InfluxStandInHandler)
+        self.__thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.__thread.start()
+
+    ###################
+    # Public methods  #
+    ###################
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:{0}".format(self.server_address[1])
+
+    @property
+    def write_url(self):
+        """The URL of the writes to the bucket accept, as in RGT_INFLUX_URI."""
+        return self.url + "/api/v2/write?org=stand-in&bucket=accept&precision=ns"
+
+    @property
+    def query_url(self):
+        return self.url + "/api/v2/query?org=stand-in"
+
+    def fail_next(self, status, count=1):
+        """Makes the next count requests fail with status."""
+        with self.__lock:
+            self.__failures.extend([status] * count)
+
+    def metrics(self):
+        """Returns the numbers of connections, writes, queries, points recorded, bytes of line protocol, errors injected and requests rejected."""
+        with self.__lock:
+            return dict(self.__metrics)
+
+    def points(self, measurement=None, bucket="accept"):
+        """Returns the recorded points, as (measurement, tags, fields, timestamp) tuples in the order they were written."""
+        query = 'SELECT measurement, tags, fields, time FROM points WHERE bucket = ?'
+        parameters = (bucket,)
+        if measurement is not None:
+            query += ' AND measurement = ?'
+            parameters += (measurement,)
+        with self.__lock:
+            rows = self.__connection.execute(query + ' ORDER BY rowid', parameters).fetchall()
+        return [(row[0], json.loads(row[1]), json.loads(row[2]), row[3]) for row in rows]
+
+    def write(self, bucket, body, precision="ns"):
+        """Records the points of a body of line protocol and returns their number."""
+        points = parse_line_protocol(body, precision=precision)
+        rows = [(bucket, measurement, json.dumps(tags, sort_keys=True), json.dumps(fields), timestamp)
+                for (measurement, tags, fields, timestamp) in points]
+        with self.__lock:
+            with self.__connection:
+                self.__connection.executemany('INSERT INTO points VALUES (?, ?, ?, ?, ?)', rows)
+            self.__metrics['points'] += len(rows)
+            self.__metrics['bytes'] += len(body.encode())
+        return len(rows)
+
+    def query(self, flux, annotations=None):
+        """Returns the CSV of the result of a Flux query."""
+        annotations = self.annotations if annotations is None else annotations
+        return _write_csv(_run_flux(self, flux), annotations)
+
+    def select(self, bucket, start, stop):
+        """Returns the recorded points of a bucket with start <= timestamp < stop."""
+        with self.__lock:
+            rows = self.__connection.execute('SELECT measurement, tags, fields, time FROM points '
+                                             'WHERE bucket = ? AND time >= ? AND time < ? ORDER BY time, rowid',
+                                             (bucket, start, stop)).fetchall()
+        return [(row[0], json.loads(row[1]), json.loads(row[2]), row[3]) for row in rows]
+
+    def close(self):
+        self.shutdown()
+        self.server_close()
+        with self.__lock:
+            self.__connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _count(self, metric):
+        with self.__lock:
+            self.__metrics[metric] += 1
+
+    def _injected_error(self):
+        """Returns the status of the error injected in a request, or None."""
+        with self.__lock:
+            if self.__failures:
+                status = self.__failures.pop(0)
+            elif self.error_rate > 0 and self.__random.random() < self.error_rate:
+                status = self.error_status
+            else:
+                return None
+            self.__metrics['errors_injected'] += 1
+            return status
+
+class InfluxStandInQueryError(RuntimeError):
+    """Raised for a Flux query the stand-in cannot run."""
+    def __init__(self, message):
+        self.__message = message
+
+    @property
+    def message(self):
+        return self.__message
+
+    def __str__(self):
+        return self.__message
+
+class _InfluxStandInHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server._count('connections')
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.server.latency)
+
+        url = urllib.parse.urlsplit(self.path)
+        parameters = dict(urllib.parse.parse_qsl(url.query))
+        if url.path not in ("/api/v2/write", "/api/v2/query"):
+            return self.__reply(404, {"code" : "not found", "message" : "path not found"})
+        if self.server.token is not None and \
+                self.headers.get("Authorization") != "Token " + self.server.token:
+            self.server._count('rejected')
+            return self.__reply(401, {"code" : "unauthorized", "message" : "unauthorized access"})
+        status = self.server._injected_error()
+        if status is not None:
+            return self.__reply(status, {"code" : "unavailable", "message" : "error injected by the stand-in"})
+
+        try:
+            if self.headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            body = body.decode()
+            if url.path == "/api/v2/write":
+                self.server._count('writes')
+                self.server.write(parameters.get("bucket", "accept"), body,
+                                  precision=parameters.get("precision", "ns"))
+                return self.__reply(204)
+            self.server._count('queries')
+            annotations = None
+            if self.headers.get("Content-Type", "").startswith("application/json"):
+                request = json.loads(body)
+                body = request["query"]
+                annotations = request.get("dialect", {}).get("annotations", [])
+            self.__reply(200, self.server.query(body, annotations), "text/csv; charset=utf-8")
+        except (OSError, ValueError, KeyError, InfluxStandInQueryError) as e:
+            self.server._count('rejected')
+            self.__reply(400, {"code" : "invalid", "message" : str(e)})
+
+    def __reply(self, status, content=None, content_type="application/json; charset=utf-8"):
+        body = b''
+        if isinstance(content, dict):
+            body = json.dumps(content).encode()
+        elif content is not None:
+            body = content.encode()
+        self.send_response(status)
+        if body:
+            self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+#------------------------------------------------------------------------------
+# Line protocol
+#------------------------------------------------------------------------------
+
+_MEASUREMENT = re.compile(r'(?:[^\\, \r\n]|\\.)+')
+_KEY = re.compile(r'(?:[^\\,= \r\n]|\\.)+')
+_STRING_FIELD = re.compile(r'"((?:[^"\\]|\\.)*)"', re.DOTALL)
+_UNQUOTED_FIELD = re.compile(r'[^, \r\n]+')
+_FLOAT = re.compile(r'^[-+]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][-+]?[0-9]+)?$')
+_TIMESTAMP = re.compile(r'-?[0-9]+')
+_KEY_UNESCAPE = re.compile(r'\\([,= ])')
+_STRING_UNESCAPE = re.compile(r'\\(["\\])')
+
+_PRECISIONS = {'ns' : 1, 'us' : 1000, 'ms' : 1000000, 's' : 1000000000}
+
+def parse_line_protocol(body, precision="ns"):
+    """Returns the points of a body of line protocol, as (measurement, tags, fields, timestamp) tuples.
+
+    The timestamps are in nanoseconds; a point without one gets the current
+    time. Raises ValueError, with the number of the line, for a body that
+    is not valid line protocol.
+    """
+    if precision not in _PRECISIONS:
+        raise ValueError("invalid precision: {0}".format(precision))
+    points = []
+    pos = 0
+    end = len(body)
+    while pos < end:
+        if body[pos] in ' \t\r\n':
+            pos += 1
+            continue
+        if body[pos] == '#':
+            pos = body.find('\n', pos)
+            pos = end if pos < 0 else pos
+            continue
+        try:
+            (point, pos) = _parse_point(body, pos, end)
+        except ValueError as e:
+            raise ValueError("line {0}: {1}".format(body.count('\n', 0, pos) + 1, e))
+        (measurement, tags, fields, timestamp) = point
+        timestamp = time.time_ns() if timestamp is None else timestamp * _PRECISIONS[precision]
+        points.append((measurement, tags, fields, timestamp))
+    return points
+
+def _parse_point(body, pos, end):
+    m = _MEASUREMENT.match(body, pos)
+    if m is None:
+        raise ValueError("missing measurement")
+    measurement = _unescape_key(m.group())
+    pos = m.end()
+
+    tags = {}
+    while pos < end and body[pos] == ',':
+        (key, pos) = _parse_key(body, pos + 1)
+        m = _KEY.match(body, pos)
+        if m is None:
+            raise ValueError("missing tag value of {0}".format(key))
+        tags[key] = _unescape_key(m.group())
+        pos = m.end()
+
+    if pos >= end or body[pos] != ' ':
+        raise ValueError("missing fields")
+    fields = {}
+    while True:
+        (key, pos) = _parse_key(body, pos + 1)
+        if pos < end and body[pos] == '"':
+            m = _STRING_FIELD.match(body, pos)
+            if m is None:
+                raise ValueError("unterminated string of field {0}".format(key))
+            fields[key] = _STRING_UNESCAPE.sub(r'\1', m.group(1))
+        else:
+            m = _UNQUOTED_FIELD.match(body, pos)
+            if m is None:
+                raise ValueError("missing value of field {0}".format(key))
+            fields[key] = _field_value(m.group())
+        pos = m.end()
+        if pos >= end or body[pos] != ',':
+            break
+
+    timestamp = None
+    if pos < end and body[pos] == ' ':
+        m = _TIMESTAMP.match(body, pos + 1)
+        if m is None:
+            raise ValueError("invalid timestamp")
+        timestamp = int(m.group())
+        pos = m.end()
+    if pos < end and body[pos] not in '\r\n':
+        raise ValueError("unexpected {0!r} after the point".format(body[pos]))
+    return ((measurement, tags, fields, timestamp), pos)
+
+def _parse_key(body, pos):
+    m = _KEY.match(body, pos)
+    if m is None or m.end() >= len(body) or body[m.end()] != '=':
+        raise ValueError("invalid key at {0!r}".format(body[pos:pos + 20]))
+    return (_unescape_key(m.group()), m.end() + 1)
+
+def _unescape_key(key):
+    return _KEY_UNESCAPE.sub(r'\1', key) if '\\' in key else key
+
+def _field_value(text):
+    if text in ('t', 'T', 'true', 'True', 'TRUE'):
+        return True
+    elif text in ('f', 'F', 'false', 'False', 'FALSE'):
+        return False
+    elif text[-1] in 'iu' and _TIMESTAMP.fullmatch(text[:-1]):
+        return int(text[:-1])
+    elif _FLOAT.match(text):
+        return float(text)
+    raise ValueError("invalid field value {0}".format(text))
+
+#------------------------------------------------------------------------------
+# Flux
+#------------------------------------------------------------------------------
+
+_FROM = re.compile(r'^\s*from\s*\(\s*bucket\s*:\s*"([^"]*)"\s*\)\s*$')
+_STAGE = re.compile(r'^\s*(\w+)\s*\((.*)\)\s*$', re.DOTALL)
+_ARGUMENT = re.compile(r'(\w+)\s*:\s*(\[[^\]]*\]|"[^"]*"|\([^)]*\)\s*=>.*|[^,]+)', re.DOTALL)
+_DURATION = re.compile(r'([0-9]+)(ns|us|ms|s|m|h|d|w)')
+_DURATION_NS = {'ns' : 1, 'us' : 1000, 'ms' : 1000000, 's' : 1000000000, 'm' : 60000000000,
+                'h' : 3600000000000, 'd' : 86400000000000, 'w' : 604800000000000}
+_ROW_REFERENCE = re.compile(r'"(?:[^"\\]|\\.)*"|\br\s*\.\s*(\w+)|\br\s*\[\s*"([^"]+)"\s*\]')
+
+# The order of the columns of InfluxDB, followed by the other columns in
+# alphabetical order.
+_COLUMN_ORDER = ['_start', '_stop', '_time', '_value', '_field', '_measurement']
+_TIME_COLUMNS = ('_start', '_stop', '_time')
+
+class _Table:
+    def __init__(self, key_columns, rows=None):
+        self.key_columns = key_columns
+        self.rows = [] if rows is None else rows
+
+def _run_flux(stand_in, flux):
+    """Returns the tables of the result of a Flux query, sorted by group key."""
+    stages = flux.split('|>')
+    m = _FROM.match(stages[0])
+    if m is None:
+        raise InfluxStandInQueryError("the query must start with from(bucket: ...)")
+    bucket = m.group(1)
+    tables = None
+    for stage in stages[1:]:
+        m = _STAGE.match(stage)
+        if m is None:
+            raise InfluxStandInQueryError("invalid stage: {0}".format(stage.strip()))
+        (name, arguments) = (m.group(1), dict(_ARGUMENT.findall(m.group(2))))
+        if tables is None and name != 'range':
+            raise InfluxStandInQueryError("cannot submit unbounded read; add range() after from()")
+        if name == 'range':
+            tables = _range(stand_in, bucket, arguments)
+        elif name == 'filter':
+            predicate = _predicate(arguments.get('fn', ''))
+            tables = [_Table(table.key_columns, [row for row in table.rows if predicate(row)]) for table in tables]
+        elif name == 'first':
+            tables = [_Table(table.key_columns, [min(table.rows, key=lambda row : row['_time'])])
+                      for table in tables if table.rows]
+        elif name == 'last':
+            # The last row of the latest time, as the rows are in the order they were written.
+            tables = [_Table(table.key_columns, [max(reversed(table.rows), key=lambda row : row['_time'])])
+                      for table in tables if table.rows]
+        elif name == 'limit':
+            tables = [_Table(table.key_columns, table.rows[:int(arguments['n'])]) for table in tables]
+        elif name == 'pivot':
+            tables = _pivot(tables, json.loads(arguments['rowKey']), json.loads(arguments['columnKey']),
+                            json.loads(arguments['valueColumn']))
+        elif name == 'group':
+            tables = _group(tables, json.loads(arguments.get('columns', '[]')))
+        else:
+            raise InfluxStandInQueryError("{0}() is not supported by the stand-in".format(name))
+        tables = [table for table in tables if table.rows]
+    if tables is None:
+        raise InfluxStandInQueryError("cannot submit unbounded read; add range() after from()")
+    return sorted(tables, key=lambda table : [str(table.rows[0].get(column)) for column in table.key_columns])
+
+def _range(stand_in, bucket, arguments):
+    now = time.time_ns()
+    start = _flux_time(arguments['start'], now)
+    stop = _flux_time(arguments.get('stop', 'now()'), now)
+    tables = {}
+    for (measurement, tags, fields, timestamp) in stand_in.select(bucket, start, stop):
+        for (field, value) in fields.items():
+            row = {'_start' : start, '_stop' : stop, '_time' : timestamp, '_value' : value,
+                   '_field' : field, '_measurement' : measurement}
+            row.update(tags)
+            key_columns = ['_start', '_stop', '_field', '_measurement'] + sorted(tags)
+            key = tuple((column, row[column]) for column in key_columns)
+            if key not in tables:
+                tables[key] = _Table(key_columns)
+            tables[key].rows.append(row)
+    return list(tables.values())
+
+def _flux_time(text, now):
+    """Returns the time in nanoseconds of a Flux time, time in seconds since the epoch, duration from now or now()."""
+    text = text.strip()
+    if text == 'now()':
+        return now
+    elif _TIMESTAMP.fullmatch(text):
+        # Seconds since the epoch.
+        return int(text) * 1000000000
+    sign = -1 if text.startswith('-') else 1
+    durations = _DURATION.findall(text.lstrip('-'))
+    if durations and ''.join(count + unit for (count, unit) in durations) == text.lstrip('-'):
+        return now + sign * sum(int(count) * _DURATION_NS[unit] for (count, unit) in durations)
+    try:
+        when = datetime.datetime.fromisoformat(text[:-1] + '+00:00' if text.endswith('Z') else text)
+    except ValueError:
+        raise InfluxStandInQueryError("invalid time: {0}".format(text))
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=datetime.timezone.utc)
+    return int(when.replace(microsecond=0).timestamp()) * 1000000000 + when.microsecond * 1000
+
+def _predicate(function):
+    """Returns the Python function of the predicate of a Flux filter, e.g. (r) => r._field != "x" and r.app == "y"."""
+    (parameters, separator, expression) = function.partition('=>')
+    if not separator or parameters.strip() != '(r)':
+        raise InfluxStandInQueryError("invalid filter function: {0}".format(function))
+
+    def row_reference(m):
+        if m.group(1) is None and m.group(2) is None:
+            return m.group()
+        return 'r.get({0})'.format(json.dumps(m.group(1) or m.group(2)))
+
+    expression = _ROW_REFERENCE.sub(row_reference, expression.strip())
+    expression = re.sub(r'\btrue\b', 'True', re.sub(r'\bfalse\b', 'False', expression))
+    try:
+        tree = ast.parse(expression, mode='eval')
+    except SyntaxError:
+        raise InfluxStandInQueryError("invalid filter expression: {0}".format(expression))
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call):
+            if not (isinstance(node.func, ast.Attribute) and node.func.attr == 'get' and
+                    isinstance(node.func.value, ast.Name) and len(node.args) == 1 and
+                    isinstance(node.args[0], ast.Constant)):
+                raise InfluxStandInQueryError("unsupported call in filter: {0}".format(expression))
+        elif isinstance(node, ast.Name) and node.id != 'r':
+            raise InfluxStandInQueryError("unsupported name in filter: {0}".format(node.id))
+        elif isinstance(node, ast.Attribute) and node.attr != 'get':
+            raise InfluxStandInQueryError("unsupported attribute in filter: {0}".format(node.attr))
+        elif not isinstance(node, (ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not,
+                                   ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+                                   ast.Constant, ast.Attribute, ast.Name, ast.Load)):
+            raise InfluxStandInQueryError("unsupported filter expression: {0}".format(expression))
+    code = compile(tree, '<flux filter>', 'eval')
+
+    def predicate(row):
+        try:
+            return bool(eval(code, {'__builtins__' : {}}, {'r' : row}))
+        except TypeError:
+            # A comparison with a missing column or a value of another type.
+            return False
+    return predicate
+
+def _pivot(tables, row_key, column_key, value_column):
+    pivoted = {}
+    for table in tables:
+        key_columns = [column for column in table.key_columns
+                       if column not in column_key and column != value_column]
+        for row in table.rows:
+            group = tuple(row.get(column) for column in key_columns)
+            if group not in pivoted:
+                pivoted[group] = (_Table(key_columns), {})
+            (new_table, rows) = pivoted[group]
+            row_id = tuple(row.get(column) for column in row_key)
+            if row_id not in rows:
+                new_row = dict((column, row.get(column)) for column in key_columns + row_key)
+                rows[row_id] = new_row
+                new_table.rows.append(new_row)
+            rows[row_id]['_'.join(str(row.get(column)) for column in column_key)] = row.get(value_column)
+    return [new_table for (new_table, rows) in pivoted.values()]
+
+def _group(tables, columns):
+    grouped = {}
+    for table in tables:
+        for row in table.rows:
+            group = tuple(row.get(column) for column in columns)
+            if group not in grouped:
+                grouped[group] = _Table(list(columns))
+            grouped[group].rows.append(row)
+    return list(grouped.values())
+
+def _write_csv(tables, annotations):
+    """Returns the CSV of tables, with a header and the annotations for each run of tables with the same columns."""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    previous_columns = None
+    for (table_id, table) in enumerate(tables):
+        columns = set()
+        for row in table.rows:
+            columns.update(row)
+        columns = [column for column in _COLUMN_ORDER if column in columns] + \
+                  sorted(columns.difference(_COLUMN_ORDER))
+        if columns != previous_columns:
+            if previous_columns is not None:
+                output.write('\r\n')
+            if 'datatype' in annotations:
+                writer.writerow(['#datatype', 'string', 'long'] +
+                                [_datatype(column, table.rows) for column in columns])
+            if 'group' in annotations:
+                writer.writerow(['#group', 'false', 'false'] +
+                                ['true' if column in table.key_columns else 'false' for column in columns])
+            if 'default' in annotations:
+                writer.writerow(['#default', '_result', ''] + [''] * len(columns))
+            writer.writerow(['', 'result', 'table'] + columns)
+            previous_columns = columns
+        for row in table.rows:
+            writer.writerow(['', '_result', table_id] +
+                            [_csv_value(column, row.get(column)) for column in columns])
+    output.write('\r\n')
+    return output.getvalue()
+
+def _datatype(column, rows):
+    if column in _TIME_COLUMNS:
+        return 'dateTime:RFC3339'
+    values = [row[column] for row in rows if row.get(column) is not None]
+    if not values or isinstance(values[0], str):
+        return 'string'
+    elif isinstance(values[0], bool):
+        return 'boolean'
+    elif isinstance(values[0], int):
+        return 'long'
+    return 'double'
+
+def _csv_value(column, value):
+    if value is None:
+        return ''
+    elif column in _TIME_COLUMNS:
+        return rfc3339_nano(value)
+    elif isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+def rfc3339_nano(timestamp):
+    """Returns a time in nanoseconds as InfluxDB writes it in CSV, e.g. 2023-01-01T00:00:00.5Z."""
+    (seconds, nanoseconds) = divmod(timestamp, 1000000000)
+    text = datetime.datetime.fromtimestamp(seconds, datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+    if nanoseconds:
+        text += '.' + '{0:09d}'.format(nanoseconds).rstrip('0')
+    return text + 'Z'
+
+def parse_arguments():
+    my_parser = argparse.ArgumentParser(description="Run a local stand-in for an InfluxDB v2 server.")
+    my_parser.add_argument("--port", type=int, default=8086,
+                           help="The port on 127.0.0.1 to listen on.")
+    my_parser.add_argument("--latency-ms", type=float, default=0.0,
+                           help="The time in milliseconds taken to answer each request.")
+    my_parser.add_argument("--error-rate", type=float, default=0.0,
+                           help="The fraction of the requests that fail with --error-status.")
+    my_parser.add_argument("--error-status", type=int, default=503,
+                           help="The status of the requests that fail.")
+    my_parser.add_argument("--database", default=":memory:",
+                           help="The SQLite database the points are recorded in.")
+    return my_parser.parse_args()
+
+def main():
+    args = parse_arguments()
+    stand_in = InfluxStandIn(port=args.port, latency=args.latency_ms / 1000, error_rate=args.error_rate,
+                             error_status=args.error_status, database=args.database)
+    print("Writes: {0}".format(stand_in.write_url))
+    print("Queries: {0}".format(stand_in.query_url))
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(stand_in.metrics())
+        stand_in.close()
+
+if __name__ == "__main__":
+    main()
@@ -218,6 +218,16 @@ The parallel running of the harness is disabled, and this
 module constant will be removed.
 """
 
+# This section pertains to the jobs option.
+DEFAULT_INFLUX_LOG_JOBS=4
+"""
+int: The default number of test instances of a subtest logged at the same time in mode influx_log.
+
+The number is set by means of the command line arguments to the
+runtests.py command: --jobs <number_of_jobs>. It only affects the
+harness task influx_log.
+"""
+
 # This section pertains to the input file option.
 DEFAULT_INPUT_FILE='rgt.input'
 """
@@ -255,6 +265,33 @@ str: The default output option.
 #                                                    -
 #-----------------------------------------------------
 
+def positive_int(string):
+    """
+    Returns the int value of a command line argument that must be 1 or more.
+
+    Parameters
+    ----------
+    string : str
+        The command line argument.
+
+    Returns
+    -------
+    int
+        The value of the command line argument.
+
+    Raises
+    ------
+    argparse.ArgumentTypeError
+        If the command line argument is not an integer of 1 or more.
+    """
+    try:
+        value = int(string)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{string}'")
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be 1 or more: '{string}'")
+    return value
+
 def create_parser():
     """
     Returns an ArgumentParser object.
@@ -326,6 +363,12 @@ def create_parser():
                         default=False,
                         help="Separate output from build into build_out.stderr.txt and build_out.stdout.txt")
 
+    parser.add_argument("-j", "--jobs",
+                        required=False,
+                        default=DEFAULT_INFLUX_LOG_JOBS,
+                        type=positive_int,
+                        help="Number of test instances of a subtest logged at the same time in mode influx_log (default: %(default)s)")
+
     return parser
 
 def parse_commandline_argv(argv):
@@ -357,7 +400,8 @@ def parse_commandline_argv(argv):
                                                               stdout_stderr=Vargs.output,
                                                               runmode=Vargs.mode,
                                                               use_fireworks=Vargs.fireworks,
-                                                              separate_build_stdio=Vargs.separate_build_stdio)
+                                                              separate_build_stdio=Vargs.separate_build_stdio,
+                                                              jobs=Vargs.jobs)
     return harness_parsed_args
 
 def runtests(my_arg_string=None):
@@ -416,7 +460,8 @@ def runtests(my_arg_string=None):
                                   harness_arguments.loglevel,
                                   harness_arguments.stdout_stderr,
                                   harness_arguments.use_fireworks,
-                                  harness_arguments.separate_build_stdio)
+                                  harness_arguments.separate_build_stdio,
+                                  influx_log_jobs=harness_arguments.jobs)
 
     main_logger.info("Created an instance of the harness.")
     main_logger.info("Harness: " + str(rgt))
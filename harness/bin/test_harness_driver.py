@@ -33,6 +33,7 @@ from libraries.layout_of_apps_directory import get_path_to_logfile_from_scriptdi
 from libraries import rgt_utilities
 from libraries.config_file import rgt_config_file
 from libraries.status_file_factory import StatusFileFactory
+from libraries.status_file_backup import StatusFileBackupManager
 from libraries import status_file
 from libraries.rgt_loggers import rgt_logger_factory
 from machine_types.machine_factory import MachineFactory
@@ -107,7 +108,7 @@ def create_parser():
 
 
 def backup_status_file(test_status_dir):
-    """ Make a backup copy of master status file """
+    """ Make a backup copy of master status file, unless it is unchanged since the last backup """
     #
     # Set the name of the source file (i.e., the status file to backup).
     # status_dir = test_status_dir/.. (i.e., app/test/Status)
@@ -117,17 +118,9 @@ def backup_status_file(test_status_dir):
     src = os.path.join(status_dir, fname)
 
     #
-    # Set the name of the destination file (i.e., the backup file)
+    # Now copy the status file to the ring of backup files.
     #
-    currenttime = datetime.datetime.now().isoformat()
-    backup_filename = ".backup." + fname + "." + currenttime
-    dest = os.path.join(status_dir, backup_filename)
-
-    #
-    # Now copy the status file to the backup file.
-    #
-    if os.path.exists(src):
-        shutil.copyfile(src, dest)
+    StatusFileBackupManager(src).backup()
 
 def read_job_file(test_status_dir):
     """ Read test_status_dir/job_id.txt to get job id """
@@ -468,6 +461,10 @@ def test_harness_driver(argv=None):
     jstatus = StatusFileFactory.create(path_to_status_file=path_to_status_file,
                                        logger=sfile_logger)
 
+    # Move the records of completed subtests to the archive of the status
+    # file if it has reached its size or age limit.
+    jstatus.rotate_if_needed()
+
     # Initialize subtest entry 'unique_id' to status file.
     jstatus.initialize_subtest(launch_id, unique_id)
 
@@ -520,6 +517,11 @@ def test_harness_driver(argv=None):
         jstatus.log_event(status_file.StatusFile.EVENT_CHECK_END,
                           job_correctness)
 
+    jstatus.close_event_dispatcher()
+    jstatus.log_lock_metrics()
+    jstatus.log_status_info_cache_metrics()
+    jstatus.log_influx_client_metrics()
+
     return (build_exit_value + submit_exit_value + run_exit_value + check_exit_value)
 
 
@@ -13,6 +13,7 @@ import os
 import sys
 import copy
 import re
+import sqlite3
 from types import *
 
 try:
@@ -28,6 +29,15 @@ from libraries.status_file import parse_status_file
 from libraries.status_file import parse_status_file2
 from libraries.status_file import summarize_status_file
 from libraries.status_file import StatusFile
+from libraries.event_ledger import read_event_record
+from libraries.influx_client import influx_client
+from libraries.influx_client import influx_client_metrics
+from libraries.influx_client import InfluxCircuitOpenError
+from libraries.influx_outbox import InfluxOutbox
+from libraries.influx_outbox import influx_outbox
+from libraries.influx_backfill import InfluxBackfill
+from libraries.influx_index import influx_index
+from libraries.line_protocol import encode
 from libraries.repositories.common_repository_utility_functions import run_as_subprocess_command_return_exitstatus
 from libraries.repositories.common_repository_utility_functions import run_as_subprocess_command_return_stdout_stderr_exitstatus
 
@@ -110,11 +120,13 @@ class subtest(base_apptest, apptest_layout):
                 test_checkout_lock=None,
                 test_display_lock=None,
                 stdout_stderr=None,
-                separate_build_stdio=False):
+                separate_build_stdio=False,
+                influx_log_jobs=1):
         """
         :param list_of_string my_tasks: A list of the strings
                                         where each element is an application
                                         harness task to be preformed on this app/test
+        :param int influx_log_jobs: The number of test instances logged at the same time in mode influx_log
         """
 
         from libraries.regression_test import Harness
@@ -169,7 +181,7 @@ class subtest(base_apptest, apptest_layout):
                 self._stop_test()
 
             elif harness_task == Harness.influx_log:
-                self._influx_log_mode()
+                self._influx_log_mode(jobs=influx_log_jobs)
 
             elif harness_task == Harness.displaystatus:
                 if test_display_lock:
@@ -561,64 +573,72 @@ class subtest(base_apptest, apptest_layout):
         self.doInfoLogging(message)
 
     # Used when --mode influx_log is run after a harness run
-    def _influx_log_mode(self):
-        """ Logs available tests to InfluxDB, via --mode influx_log """
-        currentdir = os.getcwd()
-        self.logger.doInfoLogging(f"In {self.__name_of_current_function()}, cwd: {currentdir}")
+    def _influx_log_mode(self, jobs=1):
+        """ Logs available tests to InfluxDB, via --mode influx_log, processing jobs tests at a time """
         testdir = self.get_path_to_test()
-        os.chdir(testdir)
         # If Run_Archive exists, continue, else terminate because no tests have been run
-        if not os.path.exists(self.test_run_archive_dirname):
-            os.chdir(currentdir)
+        if not os.path.exists(os.path.join(testdir, self.test_run_archive_dirname)):
             self.logger.doWarningLogging(f"No harness runs found in {testdir}")
             return
-        os.chdir(self.test_run_archive_dirname)
-
-        # I don't need to worry about extraneous links, like `latest`, because there's no race conditions
-        for test_id in os.listdir('.'):
-            if not os.path.exists(f"./{test_id}/.influx_logged") and \
-                    not os.path.exists(f"./{test_id}/.influx_disabled") and \
-                    not os.path.islink(f"./{test_id}") \
-                    and self._machine_matches(test_id):
-                self.logger.doInfoLogging(f"Attempting to log {test_id}")
-                if self._log_to_influx(test_id, post_run=True):
-                    self.logger.doInfoLogging(f"Successfully logged {test_id}")
-                else:
-                    self.logger.doWarningLogging(f"Unable to log {test_id}")
-                if self._log_events_to_influx_post_run(test_id):
-                    self.logger.doInfoLogging(f"Successfully logged all events found for {test_id}")
-                else:
-                    self.logger.doWarningLogging(f"Unable to log all events for {test_id}")
-            elif os.path.islink(f"./{test_id}"):
-                self.logger.doInfoLogging(f"Ignoring link in influx_log_mode: {test_id}")
-            elif not self._machine_matches(test_id):
-                self.logger.doInfoLogging(f"Skipping test from another machine: {test_id}")
+        if 'RGT_DISABLE_INFLUX' in os.environ and str(os.environ['RGT_DISABLE_INFLUX']) == '1':
+            self.logger.doWarningLogging("InfluxDB logging is explicitly disabled with RGT_DISABLE_INFLUX=1")
+            for test_id in InfluxBackfill(self, jobs=jobs).mark_disabled():
+                self.logger.doInfoLogging(f"Creating .influx_disabled file in Run_Archive for {test_id}")
+            self.logger.doInfoLogging("If this was not intended, remove the .influx_disabled files and run the harness under mode 'influx_log'")
+            return
+        if not 'RGT_INFLUX_URI' in os.environ or not 'RGT_INFLUX_TOKEN' in os.environ:
+            self.logger.doWarningLogging("RGT_INFLUX_URI and RGT_INFLUX_TOKEN required in environment to use InfluxDB")
+            return
+
+        # Send what earlier harness runs left in the outbox first.
+        outbox = influx_outbox()
+        if outbox is not None:
+            headers = {'Authorization': "Token " + os.environ['RGT_INFLUX_TOKEN'],
+                       'Content-Type': "text/plain; charset=utf-8",
+                       'Accept': "application/json"}
+            flushed = outbox.flush(os.environ['RGT_INFLUX_URI'], headers, retries=InfluxOutbox.FLUSH_RETRIES)
+            if flushed:
+                self.logger.doInfoLogging(f"Flushed the InfluxDB outbox {outbox.path}")
+            elif flushed is False:
+                self.logger.doWarningLogging(f"Unable to flush the InfluxDB outbox {outbox.path}")
+
+        backfill_metrics = InfluxBackfill(self, jobs=jobs).run()
+        message = ("Logged {logged} of {instances} test instances to InfluxDB, {failed} failed, "
+                   "in {seconds:.1f} s ({instances_per_second:.1f} instances/s) with {jobs} jobs").format(jobs=jobs, **backfill_metrics)
+        self.logger.doInfoLogging(message)
+        print(f"{self.getNameOfApplication()}/{self.getNameOfSubtest()}: {message}")
 
-        os.chdir(currentdir)
+        metrics = influx_client_metrics()
+        if metrics is not None:
+            self.logger.doInfoLogging("InfluxDB client: {requests} requests, {failures} failures, "
+                                      "{skipped} skipped by the circuit breaker, breaker opened {breaker_opened} times, "
+                                      "breaker {breaker_state}, {write_bytes} bytes written as {write_bytes_sent} bytes".format(**metrics))
 
     def _machine_matches(self, test_id):
         """ Checks if RGT_MACHINE_NAME is the same as the test machine name """
         if not 'RGT_MACHINE_NAME' in os.environ:
             self.logger.doWarningLogging("RGT_MACHINE_NAME not found in environment. Skipping machine name check.")
             return False
-        log_start_status_file = f"{self.get_path_to_test()}/{self.test_status_dirname}/{test_id}/"
-        log_start_status_file += f"{StatusFile.EVENT_DICT[StatusFile.EVENT_LOGGING_START][0]}"
+        return self._machine_of_test_instance(test_id) == os.environ['RGT_MACHINE_NAME']
 
-        if not os.path.exists(f"{log_start_status_file}"):
-            self.logger.doErrorLogging(f"Couldn't find required file for checking machine name: {log_start_status_file}")
-            return False
-        with open(f"{log_start_status_file}", 'r') as log_fstr:
-            line = next(log_fstr)
-            line_splt = line.split()
-            for i in range(1, len(line_splt)):
-                # range of 1 skips timestamp
-                entry = line_splt[i]
-                if '=' in line:
-                    entry_splt = entry.split('=')
-                    if entry_splt[0] == 'machine' and \
-                            entry_splt[1] == os.environ['RGT_MACHINE_NAME']:
-                        return True
-        return False
+    def _machine_of_test_instance(self, test_id):
+        """ Returns the machine name in the logging start event of a test instance, or None if it is not found """
+        status_dir = f"{self.get_path_to_test()}/{self.test_status_dirname}/{test_id}"
+        log_start_event_file = StatusFile.EVENT_DICT[StatusFile.EVENT_LOGGING_START][0]
+
+        line = read_event_record(status_dir, log_start_event_file)
+        if line is None:
+            self.logger.doErrorLogging(f"Couldn't find required file for checking machine name: {status_dir}/{log_start_event_file}")
+            return None
+        line_splt = line.split()
+        for i in range(1, len(line_splt)):
+            # range of 1 skips timestamp
+            entry = line_splt[i]
+            if '=' in line:
+                entry_splt = entry.split('=')
+                if entry_splt[0] == 'machine':
+                    return entry_splt[1]
+        return None
 
     def _log_events_to_influx_post_run(self, test_id):
         """ Logs events to Influx when running in mode influx_log """
@@ -626,70 +646,75 @@ class subtest(base_apptest, apptest_layout):
 
         # StatusFile object to use to write the logs for each run
         logging_status_file = StatusFileFactory.create(self.get_path_to_status_file(), self.logger, test_id=test_id)
-
-        currentdir = os.getcwd()
-        self.logger.doInfoLogging(f"Current directory in apptest: {currentdir}")
-        # Can't use get_path_to_runarchive here, because the test ID may change without the apptest being reinitialized
-        scripts_dir = self.get_path_to_scripts()
-        os.chdir(scripts_dir)
-        self.logger.doInfoLogging(f"Starting post-run influxDB event logging in apptest: {os.getcwd()}")
-        files_found = 0
-        files_not_found = 0
+        self.logger.doInfoLogging(f"Starting post-run influxDB event logging in apptest for {test_id}")
 
         for e in StatusFile.EVENT_LIST:
             logging_status_file.post_event_to_influx(e)
 
-        os.chdir(currentdir)
         # if we make it to the end, return True
         return True
 
     # Logs a single test ID to InfluxDB (when run AFTER a harness run, this class doesn't hold a single test ID)
-    def _log_to_influx(self, influx_test_id, post_run=False):
-        """ Check if metrics.txt exists, is proper format, and log to influxDB. """
-        currentdir = os.getcwd()
-        self.logger.doInfoLogging(f"current directory in apptest: {currentdir}")
+    def _log_to_influx(self, influx_test_id, post_run=False, send=None):
+        """ Check if metrics.txt exists, is proper format, and log to influxDB.
+
+            If send is given, each record is passed to send(record), which returns
+            whether it succeeded, instead of being sent, and the test is not marked
+            as logged: the caller, e.g. InfluxBackfill, sends the records itself.
+        """
         # Can't use get_path_to_runarchive here, because the test ID may change without the apptest being reinitialized
         runarchive_dir = os.path.join(self.get_path_to_test(), self.test_run_archive_dirname, f"{influx_test_id}")
-        os.chdir(runarchive_dir)
-        self.logger.doInfoLogging(f"Starting influxDB logging in apptest: {os.getcwd()}")
+        self.logger.doInfoLogging(f"Starting influxDB logging in apptest: {runarchive_dir}")
 
         if 'RGT_DISABLE_INFLUX' in os.environ and str(os.environ['RGT_DISABLE_INFLUX']) == '1':
             self.logger.doWarningLogging("InfluxDB logging is explicitly disabled with RGT_DISABLE_INFLUX=1")
             self.logger.doInfoLogging("Creating .influx_disabled file in Run_Archive")
             self.logger.doInfoLogging("If this was not intended, remove the .influx_disabled file and run the harness under mode 'influx_log'")
-            os.mknod('.influx_disabled')
-            os.chdir(currentdir)
+            os.mknod(os.path.join(runarchive_dir, '.influx_disabled'))
             return False
         if not 'RGT_INFLUX_URI' in os.environ or not 'RGT_INFLUX_TOKEN' in os.environ:
             self.logger.doWarningLogging("RGT_INFLUX_URI and RGT_INFLUX_TOKEN required in environment to use InfluxDB")
-            os.chdir(currentdir)
             return False
 
         # Check if influx was disabled for this run
-        if os.path.exists('.influx_disabled'):
+        if os.path.exists(os.path.join(runarchive_dir, '.influx_disabled')):
             self.logger.doWarningLogging("This harness test explicitly disabled influx logging. If this is by mistake, remove the .influx_disabled file and run again")
             return False
         # Check if the .influx_logged file already exists - it shouldn't, but just in case
-        if os.path.exists('.influx_logged'):
+        if os.path.exists(os.path.join(runarchive_dir, '.influx_logged')):
             self.logger.doWarningLogging("The .influx_logged file already exists.")
             return False
 
+        outbox = influx_outbox() if send is None else None
+        sent_records = []
+
         def local_send_to_influx(influx_url, influx_event_record_string, headers):
             try:
                 if 'RGT_INFLUX_NO_SEND' in os.environ and os.environ['RGT_INFLUX_NO_SEND'] == '1':
                     print(f"RGT_INFLUX_NO_SEND is set, echoing: {influx_event_record_string}")
+                elif outbox is not None:
+                    # Sent with the other records of the test by the flush below.
+                    outbox.put(influx_event_record_string)
+                    self.logger.doInfoLogging(f"Queued {influx_event_record_string} in the InfluxDB outbox {outbox.path}")
+                    return True
                 elif not 'requests' in sys.modules:
                     self.logger.doWarningLogging(f"InfluxDB is currently disabled. Reason: 'requests' module was unable to load. Skipping InfluxDB message: {influx_event_record_string}. This can be logged after the run using the harness --mode influx_log or by POSTing this message to the InfluxDB server.")
                     return False
                 else:
-                    r = requests.post(influx_url, data=influx_event_record_string, headers=headers)
+                    r = influx_client().write(influx_url, influx_event_record_string, headers=headers)
                     if not int(r.status_code) < 400:
                         self.logger.doWarningLogging(f"Influx returned status code: {r.status_code}")
                         return False
                 self.logger.doInfoLogging(f"Successfully sent {influx_event_record_string} to {influx_url}")
+            except InfluxCircuitOpenError as e:
+                self.logger.doWarningLogging(f"{e.message} Request not sent: {influx_event_record_string}")
+                return False
             except requests.exceptions.ConnectionError as e:
                 self.logger.doWarningLogging(f"InfluxDB is not reachable. Request not sent: {influx_event_record_string}")
                 return False
+            except requests.exceptions.Timeout as e:
+                self.logger.doWarningLogging(f"InfluxDB did not respond in time. Request not completed: {influx_event_record_string}")
+                return False
             except Exception as e:
                 # TODO: add more graceful handling of unreachable influx servers
                 self.logger.doErrorLogging(f"Failed to send {influx_event_record_string} to {influx_url}:")
@@ -697,6 +722,14 @@ class subtest(base_apptest, apptest_layout):
                 return False
             return True
 
+        def log_record(influx_url, influx_event_record_string, headers):
+            if send is not None:
+                return send(influx_event_record_string)
+            if local_send_to_influx(influx_url, influx_event_record_string, headers):
+                sent_records.append(influx_event_record_string)
+                return True
+            return False
+
         influx_url = os.environ['RGT_INFLUX_URI']
         influx_token = os.environ['RGT_INFLUX_TOKEN']
 
@@ -734,7 +767,6 @@ class subtest(base_apptest, apptest_layout):
         for tag_name in StatusFile.INFLUX_TAGS:
             if not tag_name in tag_values:
                 self.logger.doErrorLogging(f"Influx key not found in tag_values: {tag_name}. Aborting metrics and node health logging for {influx_test_id}")
-                os.chdir(currentdir)
                 return False
 
         # if mode is post-run harness logging, get Unix timestamp so that the time in InfluxDB is accurate
@@ -743,14 +775,13 @@ class subtest(base_apptest, apptest_layout):
             run_timestamp = self._get_run_timestamp(influx_test_id)
             if run_timestamp < 0:
                 self.logger.doWarningLogging(f"Run Timestamp invalid for jobID {influx_test_id}: {run_timestamp}")
-                os.chdir(currentdir)
                 return False
 
         # This serves as the exit status
         failed_log_attempts = 0
         success_log_attempts = 0
 
-        metrics = self._get_metrics(influx_machine_name, influx_app, influx_test)
+        metrics = self._get_metrics(runarchive_dir, influx_machine_name, influx_app, influx_test)
 
         if len(metrics) == 0:
             self.logger.doWarningLogging(f"No metrics found to log to influxDB")
@@ -765,14 +796,11 @@ class subtest(base_apptest, apptest_layout):
                 self.logger.doWarningLogging(f"Invalid execution time for jobID {influx_test_id}.")
                 do_log_metric = False
     
-            tag_record_string = ','.join([f"{tag_name}={tag_values[tag_name]}" for tag_name in StatusFile.INFLUX_TAGS])
-            field_record_string = ','.join([f"{k}={v}" for k, v in metrics.items()])
-            influx_event_record_string = f'metrics,{tag_record_string} {field_record_string}'
+            tags = dict([(tag_name, tag_values[tag_name]) for tag_name in StatusFile.INFLUX_TAGS])
             # Add timestamp
-            if post_run:
-                influx_event_record_string += f" {run_timestamp}"
+            influx_event_record_string = encode('metrics', tags, metrics, run_timestamp if post_run else None)
             # If we've made it this far without do_log_metric set to False, then all our checking has completed 
-            if do_log_metric and local_send_to_influx(influx_url, influx_event_record_string, headers):
+            if do_log_metric and log_record(influx_url, influx_event_record_string, headers):
                 self.logger.doWarningLogging(f"Successfully logged metrics to Influx.")
                 success_log_attempts += 1
             elif do_log_metric:
@@ -781,7 +809,7 @@ class subtest(base_apptest, apptest_layout):
                 failed_log_attempts += 1
     
         # add node-based checking functionality
-        node_healths = self._get_node_health(influx_machine_name, influx_app, influx_test)
+        node_healths = self._get_node_health(runarchive_dir, influx_machine_name, influx_app, influx_test)
         self.logger.doInfoLogging(f"Found {len(node_healths)} nodes reported for node health")
         if len(node_healths) > 0:
             # find and read node location file -- json file
@@ -807,16 +835,17 @@ class subtest(base_apptest, apptest_layout):
                 if json_read_success:
                     # for each node found in the nodecheck.txt
                     for node_name in node_healths.keys():
-                        influx_event_record_string = f'node_health,machine={tag_values["machine"]},node={node_name},test={tag_values["test"]}'
+                        node_tags = {'machine': tag_values["machine"], 'node': node_name, 'test': tag_values["test"]}
                         # If RGT_IGNORE_NODE_LOCATION is set, then all nodes will be logged with tags machine, node, test only
                         if node_name in node_locations.keys():
                             # then it's a node location identifier
-                            for k in node_locations[node_name].keys():
-                                influx_event_record_string += f',{k}={node_locations[node_name][k]}'
-                        influx_event_record_string += f' status="{node_healths[node_name]["status"]}",message="{node_healths[node_name]["message"]}",test_id="{tag_values["test_id"]}"'
-                        if post_run and not str(run_timestamp) == '':
-                            influx_event_record_string += f' {run_timestamp}'
-                        if local_send_to_influx(influx_url, influx_event_record_string, headers):
+                            node_tags.update(node_locations[node_name])
+                        node_fields = {'status': node_healths[node_name]["status"],
+                                       'message': node_healths[node_name]["message"],
+                                       'test_id': str(tag_values["test_id"])}
+                        influx_event_record_string = encode('node_health', node_tags, node_fields,
+                                                            run_timestamp if post_run else None)
+                        if log_record(influx_url, influx_event_record_string, headers):
                             success_log_attempts += 1
                             self.logger.doWarningLogging(f"Successfully logged node health for {node_name} to Influx.")
                         else:
@@ -824,17 +853,23 @@ class subtest(base_apptest, apptest_layout):
                             self.logger.doWarningLogging(f"Logging node health to Influx failed.")
             elif 'RGT_NODE_LOCATION_FILE' in os.environ:
                 self.logger.doWarningLogging(f"Node location file path does not exist: {os.environ['RGT_NODE_LOCATION_FILE']}.")
-                self.logger.doWarningLogging(f"Skipping node health logging. To re-log, remove the .influx_logged file in Run_Archive and run in mode influx_log.")
+                self.logger.doWarningLogging(f"Skipping node health logging. To re-log, remove the .influx_logged file in Run_Archive and run in mode influx_log with RGT_INFLUX_INDEX=0.")
             else:
                 self.logger.doWarningLogging(f"RGT_NODE_LOCATION_FILE not in os.environ, skipping node health logging.")
 
 
-        # We're in Run_Archive. The Influx POST request has succeeded, as far as we know,
-        # so let's create a .influx_logged file
-        if failed_log_attempts == 0 and success_log_attempts > 0:
-            os.mknod('.influx_logged')
+        # The records queued in the outbox are kept until InfluxDB accepts them,
+        # so the test counts as logged even if this flush fails.
+        if outbox is not None and success_log_attempts > 0:
+            if outbox.flush(influx_url, headers) is False:
+                self.logger.doWarningLogging(f"InfluxDB outbox {outbox.path} not flushed. The records stay queued until a later flush.")
+
+        # The Influx POST request has succeeded, as far as we know,
+        # so let's create a .influx_logged file in Run_Archive
+        if send is None and failed_log_attempts == 0 and success_log_attempts > 0:
+            os.mknod(os.path.join(runarchive_dir, '.influx_logged'))
+            self.__record_influx_logged(influx_test_id, sent_records)
 
-        os.chdir(currentdir)
         # If >0 records have been sent, and no failed attempts, return True
         return (failed_log_attempts == 0 and success_log_attempts > 0)
 
@@ -850,39 +885,33 @@ class subtest(base_apptest, apptest_layout):
 
     def _get_run_timestamp(self, test_id):
         # Check for start event file and end event file
-        check_status_file = f"{self.get_path_to_test()}/{self.test_status_dirname}/{test_id}/"
-        check_status_file += f"{StatusFile.EVENT_DICT[StatusFile.EVENT_CHECK_END][0]}"
+        status_dir = f"{self.get_path_to_test()}/{self.test_status_dirname}/{test_id}"
+        check_event_file = StatusFile.EVENT_DICT[StatusFile.EVENT_CHECK_END][0]
 
-        if not os.path.exists(f"{check_status_file}"):
-            self.logger.doWarningLogging(f"Couldn't find required file for post-run time logging: {check_status_file}")
+        line = read_event_record(status_dir, check_event_file)
+        if line is None:
+            self.logger.doWarningLogging(f"Couldn't find required file for post-run time logging: {status_dir}/{check_event_file}")
             return -1
-        with open(f"{check_status_file}", 'r') as check_fstr:
-            line = next(check_fstr)
-            check_timestamp = line.split()[0]
-            # Convert to UTC
-            #dt_utc = datetime.strptime(check_timestamp, "%Y-%m-%dT%H:%M:%S.%f") \
-                #+ (datetime.utcnow() - datetime.now())
-            dt_utc = datetime.strptime(check_timestamp, "%Y-%m-%dT%H:%M:%S.%f")
-            ns_utc = int(datetime.timestamp(dt_utc)) * 1000 * 1000 * 1000
+        check_timestamp = line.split()[0]
+        # Convert to UTC
+        #dt_utc = datetime.strptime(check_timestamp, "%Y-%m-%dT%H:%M:%S.%f") \
+            #+ (datetime.utcnow() - datetime.now())
+        dt_utc = datetime.strptime(check_timestamp, "%Y-%m-%dT%H:%M:%S.%f")
+        ns_utc = int(datetime.timestamp(dt_utc)) * 1000 * 1000 * 1000
         return ns_utc
 
     def _get_time_diff_of_status_files(self, start_event_file, end_event_file, test_id):
         # Check for start event file and end event file
         status_dir = f"{self.get_path_to_test()}/{self.test_status_dirname}/{test_id}"
 
-        for targ in [ f"{status_dir}/{start_event_file}", \
-                        f"{status_dir}/{end_event_file}" ]:
-            if not os.path.exists(f"{targ}"):
-                self.logger.doWarningLogging(f"Couldn't find required file for time logging: {targ}")
+        lines = {}
+        for targ in [ start_event_file, end_event_file ]:
+            lines[targ] = read_event_record(status_dir, targ)
+            if lines[targ] is None:
+                self.logger.doWarningLogging(f"Couldn't find required file for time logging: {status_dir}/{targ}")
                 return -1
-        start_timestamp = ''
-        end_timestamp = ''
-        with open(f"{status_dir}/{start_event_file}", 'r') as start_fstr:
-            line = next(start_fstr)
-            start_timestamp = line.split()[0]
-        with open(f"{status_dir}/{end_event_file}", 'r') as end_fstr:
-            line = next(end_fstr)
-            end_timestamp = line.split()[0]
+        start_timestamp = lines[start_event_file].split()[0]
+        end_timestamp = lines[end_event_file].split()[0]
         if len(start_timestamp) <= 1 or len(end_timestamp) <= 1:
             print(f"Invalid start or end timestamp: {start_timestamp}, {end_timestamp}")
             return -1
@@ -893,8 +922,8 @@ class subtest(base_apptest, apptest_layout):
         diff = end_ts_dt - start_ts_dt
         return diff.total_seconds()   # diff in seconds
 
-    def _get_metrics(self, machine_name, app_name, test_name):
-        """ Parse the metrics.txt file for InfluxDB reporting """
+    def _get_metrics(self, run_archive_dir, machine_name, app_name, test_name):
+        """ Parse the metrics.txt file of the run archive directory for InfluxDB reporting """
         def is_numeric(s):
             """ Checks if an entry (RHS) is numeric """
             # Local function. s is assumed to be a whitespace-stripped string
@@ -908,10 +937,11 @@ class subtest(base_apptest, apptest_layout):
                 return False
 
         metrics = {}
-        if not os.path.isfile('metrics.txt'):
+        metrics_file = os.path.join(run_archive_dir, 'metrics.txt')
+        if not os.path.isfile(metrics_file):
             self.logger.doWarningLogging(f"File metrics.txt not found")
             return metrics
-        with open('metrics.txt', 'r') as metric_f:
+        with open(metrics_file, 'r') as metric_f:
             # Each line is in format "metric = value" (space around '=' optional)
             # All whitespace in metric name will be replaced with underscores
             for line in metric_f:
@@ -925,27 +955,27 @@ class subtest(base_apptest, apptest_layout):
                             self.logger.doWarningLogging(f"Skipping line with no metric name: {line.strip()}")
                             continue
                         metric_name = f"{app_name}-{test_name}-{line_splt[0]}"
-                        # if it's not numeric, replace spaces with underscores and wrap in quotes
+                        # if it's not numeric, replace spaces with underscores
                         line_splt[1] = line_splt[1].strip()
                         if len(line_splt[1]) == 0:
                             self.logger.doWarningLogging(f"Skipping metric with no value: {line_splt[0]}")
                             continue
                         # Handle string/integer metrics
                         if is_numeric(line_splt[1]):
-                            metrics[metric_name] = line_splt[1]
+                            metrics[metric_name] = int(line_splt[1]) if line_splt[1].lstrip('-').isdigit() else float(line_splt[1])
                         else:
-                            line_splt[1] = line_splt[1].replace(' ', '_')
-                            # Wrap strings in double quotes to send to Influx
-                            metrics[metric_name] = f'"{line_splt[1]}"'
+                            # Strings are quoted when the record is encoded
+                            metrics[metric_name] = line_splt[1].replace(' ', '_')
                     else:
                         self.logger.doWarningLogging(f"Found a line in metrics.txt with 0 or >1 equals signs:\n{line.strip()}")
         return metrics
 
-    def _get_node_health(self, machine_name, app_name, test_name):
-        """ Parse the nodecheck.txt file for InfluxDB reporting """
+    def _get_node_health(self, run_archive_dir, machine_name, app_name, test_name):
+        """ Parse the nodecheck.txt file of the run archive directory for InfluxDB reporting """
         node_healths = {}
         return_empty = False
-        if not os.path.isfile('nodecheck.txt'):
+        nodecheck_file = os.path.join(run_archive_dir, 'nodecheck.txt')
+        if not os.path.isfile(nodecheck_file):
             self.logger.doInfoLogging(f"File nodecheck.txt not found.")
             return node_healths
         self.logger.doInfoLogging("Processing file nodecheck.txt.")
@@ -956,7 +986,7 @@ class subtest(base_apptest, apptest_layout):
             'HW-FAIL': ['INCORRECT', 'HW-FAIL'],
             'PERF-FAIL': ['PERF', 'PERF-FAIL']
         }
-        with open('nodecheck.txt', 'r') as nodes_f:
+        with open(nodecheck_file, 'r') as nodes_f:
             # Each line is in format crusher012 FAILED <msg>
             # All whitespace in metric name will be replaced with underscores
             for line in nodes_f:
@@ -985,6 +1015,16 @@ class subtest(base_apptest, apptest_layout):
             return {}
         return node_healths
 
+    def __record_influx_logged(self, test_id, records):
+        """ Records a test instance and its records in the index of the test instances logged to InfluxDB """
+        try:
+            index = influx_index(self.get_path_to_influx_index())
+            if index is not None:
+                index.set_logged(self.getNameOfApplication(), self.getNameOfSubtest(), test_id, records)
+        except sqlite3.Error as e:
+            # The marker file is kept; the next --mode influx_log records it in the index.
+            self.logger.doWarningLogging(f"Unable to update the InfluxDB index {self.get_path_to_influx_index()}: {e}")
+
     def __name_of_current_function(self):
         classname = self.__class__.__name__
         functionname = sys._getframe(1).f_code.co_name
@@ -1014,13 +1054,15 @@ def do_application_tasks(launch_id,
                          app_test_list,
                          tasks,
                          stdout_stderr,
-                         separate_build_stdio=False):
+                         separate_build_stdio=False,
+                         influx_log_jobs=1):
     for app_test in app_test_list:
         print(f"Starting tasks for Application.Test: {app_test.getNameOfApplication()}.{app_test.getNameOfSubtest()}: {tasks}")
         app_test.doTasks(launchid=launch_id,
                          tasks=tasks,
                          stdout_stderr=stdout_stderr,
-                         separate_build_stdio=separate_build_stdio)
+                         separate_build_stdio=separate_build_stdio,
+                         influx_log_jobs=influx_log_jobs)
     return
 
 def wait_for_jobs_to_complete_in_queue(harness_config,
@@ -15,7 +15,8 @@ class HarnessParsedArguments:
                        runmode=None,
                        stdout_stderr=None,
                        use_fireworks=False,
-                       separate_build_stdio=False):
+                       separate_build_stdio=False,
+                       jobs=1):
 
         self.__inputfile = inputfile
         self.__loglevel = loglevel
@@ -24,6 +25,7 @@ class HarnessParsedArguments:
         self.__stdout_stderr = stdout_stderr
         self.__use_fireworks = use_fireworks
         self.__separate_build_stdio = separate_build_stdio
+        self.__jobs = jobs
 
         self.__verify_attributes()
 
@@ -68,6 +70,10 @@ class HarnessParsedArguments:
     def separate_build_stdio(self):
         return self.__separate_build_stdio
 
+    @property
+    def jobs(self):
+        return self.__jobs
+
     @property
     def effective_command_line(self):
         command_options = ("Effective command line: "
@@ -77,6 +83,7 @@ class HarnessParsedArguments:
                            " --loglevel {my_loglevel}"
                            " --output {my_output}"
                            " --separate-build-stdio"
+                           " --jobs {my_jobs}"
                            " --mode {my_runmode}")
 
         run_mode_args=" ".join(self.runmode) 
@@ -85,6 +92,7 @@ class HarnessParsedArguments:
                                      my_configfile = self.configfile,
                                      my_loglevel = self.loglevel,
                                      my_output = self.stdout_stderr,
+                                     my_jobs = self.jobs,
                                      my_runmode = run_mode_args)
 
         return efc
@@ -0,0 +1,201 @@
+#! /usr/bin/env python3
+"""
+-------------------------------------------------------------------------------
+File:   event_dispatcher.py
+National Center for Computational Sciences, Scientific Computing Group.
+Oak Ridge National Laboratory
+Copyright (C) 2023 Oak Ridge National Laboratory, UT-Battelle, LLC.
+-------------------------------------------------------------------------------
+"""
+
+import os
+import time
+import queue
+import atexit
+import threading
+
+class EventDispatcher:
+    """Delivers the events of a test instance to slow sinks in background threads.
+
+    Each sink, e.g. the system log or InfluxDB, has a bounded queue and a
+    worker thread that calls the delivery function of the sink for each
+    event, in the order the events were dispatched. When the queue of a
+    sink is full, dispatch waits for room rather than dropping the event.
+
+    The dispatcher is flushed and its workers are stopped by close, which is
+    also registered to run at exit. The time each event waited in the queue
+    and took to deliver is logged, and accumulated per sink in metrics().
+    """
+
+    # The default number of events that may wait in the queue of a sink.
+    DEFAULT_QUEUE_SIZE = 1024
+
+    def __init__(self, logger, queue_size=None):
+        """Constructor.
+
+        Parameters
+        ----------
+        logger : rgt_logger
+            The logger of the delivery times and failures.
+
+        queue_size : int
+            The maximum number of events waiting in the queue of a sink. The
+            default is RGT_EVENT_QUEUE_SIZE, or DEFAULT_QUEUE_SIZE if that is
+            not set.
+        """
+        if queue_size is None:
+            queue_size = int(os.environ.get('RGT_EVENT_QUEUE_SIZE', EventDispatcher.DEFAULT_QUEUE_SIZE))
+
+        self.__logger = logger
+        self.__queue_size = queue_size
+        self.__sinks = {}
+        self.__closed = False
+        atexit.register(self.close)
+
+    ###################
+    # Public methods  #
+    ###################
+
+    @staticmethod
+    def enabled():
+        """Indicates whether the events are delivered to the slow sinks in the background."""
+        return os.environ.get('RGT_EVENT_DISPATCH') == 'async'
+
+    def add_sink(self, name, deliver):
+        """Adds a sink and starts its worker.
+
+        Parameters
+        ----------
+        name : str
+            The name of the sink in the logs and metrics.
+
+        deliver : callable
+            Called by the worker with the arguments of each dispatched event.
+        """
+        sink = _EventSink(name, deliver, self.__queue_size, self.__logger)
+        self.__sinks[name] = sink
+        sink.start()
+
+    def dispatch(self, event_id, *args):
+        """Queues an event for all the sinks. The arguments are passed to their delivery functions."""
+        if self.__closed:
+            raise EventDispatcherClosedError(f"Event {event_id} dispatched after the dispatcher was closed.")
+        for sink in self.__sinks.values():
+            sink.put(event_id, args)
+
+    def flush(self):
+        """Waits until all the dispatched events have been delivered."""
+        for sink in self.__sinks.values():
+            sink.join()
+
+    def close(self):
+        """Flushes the sinks and stops their workers."""
+        if self.__closed:
+            return
+        self.__closed = True
+        for sink in self.__sinks.values():
+            sink.stop()
+        for sink in self.__sinks.values():
+            sink.wait()
+
+    def metrics(self):
+        """Returns the counts and times of the deliveries of each sink, by sink name."""
+        return dict((name, sink.metrics()) for (name, sink) in self.__sinks.items())
+
+class _EventSink:
+    """The queue and worker thread of a sink of an EventDispatcher."""
+
+    def __init__(self, name, deliver, queue_size, logger):
+        self.__name = name
+        self.__deliver = deliver
+        self.__logger = logger
+        self.__queue = queue.Queue(maxsize=queue_size)
+        self.__thread = threading.Thread(target=self.__run, name="event-sink-" + name, daemon=True)
+        self.__metrics_lock = threading.Lock()
+        self.__metrics = {'events' : 0,
+                          'failures' : 0,
+                          'queue_full' : 0,
+                          'wait_seconds_total' : 0.0,
+                          'wait_seconds_max' : 0.0,
+                          'deliver_seconds_total' : 0.0,
+                          'deliver_seconds_max' : 0.0}
+
+    def start(self):
+        self.__thread.start()
+
+    def put(self, event_id, args):
+        item = (event_id, args, time.monotonic())
+        try:
+            self.__queue.put_nowait(item)
+        except queue.Full:
+            with self.__metrics_lock:
+                self.__metrics['queue_full'] += 1
+            self.__queue.put(item)
+
+    def join(self):
+        self.__queue.join()
+
+    def stop(self):
+        # The worker exits when it reaches the None after the queued events.
+        self.__queue.put(None)
+
+    def wait(self):
+        self.__thread.join()
+
+    def metrics(self):
+        with self.__metrics_lock:
+            return dict(self.__metrics)
+
+    def __run(self):
+        while True:
+            item = self.__queue.get()
+            try:
+                if item is None:
+                    return
+                self.__deliver_event(*item)
+            finally:
+                self.__queue.task_done()
+
+    def __deliver_event(self, event_id, args, queued_at):
+        start = time.monotonic()
+        failed = False
+        try:
+            # post_event_to_influx reports a failure by returning False.
+            if self.__deliver(*args) is False:
+                failed = True
+                self.__logger.doWarningLogging(f"Warning: event {event_id} was not delivered to {self.__name}.")
+        except Exception as error:
+            failed = True
+            self.__logger.doWarningLogging(f"Warning: event {event_id} was not delivered to {self.__name}: {error}")
+        end = time.monotonic()
+
+        wait_seconds = start - queued_at
+        deliver_seconds = end - start
+        with self.__metrics_lock:
+            self.__metrics['events'] += 1
+            self.__metrics['failures'] += int(failed)
+            self.__metrics['wait_seconds_total'] += wait_seconds
+            self.__metrics['wait_seconds_max'] = max(self.__metrics['wait_seconds_max'], wait_seconds)
+            self.__metrics['deliver_seconds_total'] += deliver_seconds
+            self.__metrics['deliver_seconds_max'] = max(self.__metrics['deliver_seconds_max'], deliver_seconds)
+
+        self.__logger.doDebugLogging(f"Event {event_id} delivered to {self.__name}: "
+                                     f"queued {wait_seconds:.6f}s, delivered in {deliver_seconds:.6f}s")
+
+class EventDispatcherClosedError(RuntimeError):
+    """Exception raised when an event is dispatched after the dispatcher was closed."""
+    def __init__(self,message):
+        """The class constructor
+
+        Parameters
+        ----------
+        message : string
+            The error message for this exception.
+        """
+        super().__init__(message)
+        self._message = message
+
+    @property
+    def message(self):
+        """str: The error message."""
+        return self._message
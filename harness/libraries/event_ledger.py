@@ -0,0 +1,202 @@
+#! /usr/bin/env python3
+"""
+-------------------------------------------------------------------------------
+File:   event_ledger.py
+National Center for Computational Sciences, Scientific Computing Group.
+Oak Ridge National Laboratory
+Copyright (C) 2023 Oak Ridge National Laboratory, UT-Battelle, LLC.
+-------------------------------------------------------------------------------
+"""
+
+import os
+import re
+import abc
+import json
+
+from libraries.layout_of_apps_directory import apptest_layout
+
+class EventLedger:
+    """Append-only ledger of the events of a test instance.
+
+    By default every event of a test instance is written to its own file,
+    Status/<test_id>/Event_NNN_<name>.txt, through a temporary file and a
+    rename. With RGT_EVENT_LEDGER=1 the events are instead appended to the
+    single file Status/<test_id>/rgt_events.jsonl, one JSON object per line:
+
+        {"event_filename" : "Event_130_build_end.txt",
+         "event_time" : <ISO time>,
+         "event_value" : <str>,
+         "fields" : {<field> : <value>, ...}}
+
+    Each entry is written with a single append, so a crash can only leave
+    an incomplete last line, which the readers skip. RGT_EVENT_LEDGER_FSYNC
+    sets when the ledger is flushed to disk: "always" after every event
+    (the default), or "never".
+
+    The readers read_event_record and read_event_records return the events
+    of a test instance in the format of the event files, whichever format
+    they were written in.
+    """
+
+    FSYNC_ALWAYS = 'always'
+    FSYNC_NEVER = 'never'
+    FSYNC_POLICIES = (FSYNC_ALWAYS, FSYNC_NEVER)
+
+    def __init__(self, test_status_dir, fsync_policy=None):
+        """Constructor.
+
+        Parameters
+        ----------
+        test_status_dir : str
+            The fully qualified path to the Status/<test_id> directory of the
+            test instance.
+
+        fsync_policy : str
+            One of FSYNC_POLICIES. The default is RGT_EVENT_LEDGER_FSYNC, or
+            FSYNC_ALWAYS if that is not set.
+        """
+        if fsync_policy is None:
+            fsync_policy = os.environ.get('RGT_EVENT_LEDGER_FSYNC', EventLedger.FSYNC_ALWAYS)
+        if fsync_policy not in EventLedger.FSYNC_POLICIES:
+            raise InvalidEventLedgerFsyncPolicyError(fsync_policy)
+
+        self.__ledger_path = os.path.join(test_status_dir, apptest_layout.test_event_ledger_filename)
+        self.__fsync_policy = fsync_policy
+
+    ###################
+    # Public methods  #
+    ###################
+
+    @staticmethod
+    def enabled():
+        """Indicates whether the events are written to the ledger instead of event files."""
+        return os.environ.get('RGT_EVENT_LEDGER') == '1'
+
+    @property
+    def ledger_path(self):
+        return self.__ledger_path
+
+    def append(self, event_filename, event_time, event_value, status_info):
+        """Appends an event to the ledger.
+
+        Parameters
+        ----------
+        event_filename : str
+            The name of the event file the event would otherwise be written to.
+
+        event_time : str
+            The ISO time of the event.
+
+        event_value : str
+            The value of the event.
+
+        status_info : list
+            The [field, value] pairs of the event, see get_status_info.
+        """
+        entry = {'event_filename' : event_filename,
+                 'event_time' : event_time,
+                 'event_value' : event_value,
+                 'fields' : dict((field, value) for (field, value) in status_info)}
+        data = (json.dumps(entry) + '\n').encode()
+
+        fd = os.open(self.__ledger_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o664)
+        try:
+            os.write(fd, data)
+            if self.__fsync_policy == EventLedger.FSYNC_ALWAYS:
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def read_entries(self):
+        """Returns the complete entries of the ledger, oldest first."""
+        entries = []
+        try:
+            with open(self.__ledger_path, 'r') as file_obj:
+                for line in file_obj:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        # An incomplete line written by an interrupted append.
+                        continue
+        except FileNotFoundError:
+            pass
+        return entries
+
+#------------------------------------------------------------------------------
+
+def format_event_record(event_time, event_value, fields):
+    """Returns the line of an event file, tab-separated, for the event."""
+    event_record_string = event_time + '\t' + event_value
+    for (field, value) in fields:
+        event_record_string += '\t' + field + '=' + value
+    return event_record_string + '\n'
+
+def read_event_records(test_status_dir):
+    """Returns the lines of all the events of a test instance, by event filename.
+
+    The events are read from the event files Event_*.txt and from the event
+    ledger of the Status/<test_id> directory. The last entry of the ledger
+    for an event takes precedence.
+    """
+    records = {}
+    if not os.path.isdir(test_status_dir):
+        return records
+
+    for filename in os.listdir(test_status_dir):
+        path = os.path.join(test_status_dir, filename)
+        if re.search(r'^Event_.*\.txt$', filename) and os.path.isfile(path):
+            with open(path, 'r') as file_obj:
+                records[filename] = file_obj.read()
+
+    for entry in EventLedger(test_status_dir, fsync_policy=EventLedger.FSYNC_NEVER).read_entries():
+        records[entry['event_filename']] = format_event_record(entry['event_time'],
+                                                               entry['event_value'],
+                                                               entry['fields'].items())
+    return records
+
+def read_event_record(test_status_dir, event_filename):
+    """Returns the line of an event of a test instance, or None if the event did not occur.
+
+    The event file is read if it exists, otherwise the last entry of the
+    event in the ledger.
+    """
+    path = os.path.join(test_status_dir, event_filename)
+    if os.path.isfile(path):
+        with open(path, 'r') as file_obj:
+            return file_obj.read()
+
+    record = None
+    for entry in EventLedger(test_status_dir, fsync_policy=EventLedger.FSYNC_NEVER).read_entries():
+        if entry['event_filename'] == event_filename:
+            record = format_event_record(entry['event_time'], entry['event_value'], entry['fields'].items())
+    return record
+
+#------------------------------------------------------------------------------
+
+class EventLedgerError(Exception):
+    """Base class for exceptions of the EventLedger"""
+    def __init__(self):
+        pass
+
+    @property
+    @abc.abstractmethod
+    def message(self):
+        pass
+
+class InvalidEventLedgerFsyncPolicyError(EventLedgerError):
+    """Exception raised for an unknown fsync policy of the event ledger."""
+    def __init__(self,fsync_policy):
+        """The class constructor
+
+        Parameters
+        ----------
+        fsync_policy : string
+            The fsync policy that is not one of EventLedger.FSYNC_POLICIES.
+        """
+        self._message = (f"Invalid event ledger fsync policy '{fsync_policy}'. "
+                         f"Valid policies are {', '.join(EventLedger.FSYNC_POLICIES)}.")
+
+    @property
+    def message(self):
+        """str: The error message."""
+        return self._message
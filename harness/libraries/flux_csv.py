@@ -0,0 +1,116 @@
+#! /usr/bin/env python3
+"""
+-------------------------------------------------------------------------------
+File:   flux_csv.py
+National Center for Computational Sciences, Scientific Computing Group.
+Oak Ridge National Laboratory
+Copyright (C) 2023 Oak Ridge National Laboratory, UT-Battelle, LLC.
+-------------------------------------------------------------------------------
+"""
+
+import csv
+
+# The size of the chunks of a streamed response split in lines, e.g.
+# response.iter_lines(chunk_size=ITER_LINES_CHUNK_SIZE).
+ITER_LINES_CHUNK_SIZE = 1 << 16
+
+# The conversion of the values of the columns by their #datatype annotation.
+# The other types, e.g. string and dateTime:RFC3339, are kept as strings.
+_CONVERSIONS = {'long' : int,
+                'unsignedLong' : int,
+                'double' : float,
+                'boolean' : lambda value : value == 'true'}
+
+def read_flux_csv(lines):
+    """Yields the records of the CSV of the result of a Flux query, one at a time, e.g. from response.iter_lines().
+
+    The CSV is read as it arrives, so the memory used does not depend on the
+    size of the result. Each table of the result starts with a header row,
+    preceded by the annotation rows (#datatype, #group, #default) if they
+    were asked for, and is separated from the previous one by an empty line.
+    Values quoted over several lines are joined with newlines. A row shorter
+    than its header, e.g. the last row of a response cut short, is skipped.
+
+    Parameters
+    ----------
+    lines : iterable
+        The lines of the CSV, as str or UTF-8 bytes, without their line
+        endings.
+
+    Yields
+    ------
+    dict
+        The record of a row, by column name, with the result and table
+        columns. The values are converted to int, float or bool by the
+        #datatype annotation if there is one, and are strings otherwise;
+        empty values are replaced by the #default annotation if there is one.
+
+    Raises
+    ------
+    FluxQueryError
+        If the result is the error table of a query that failed.
+    """
+    header = None
+    datatypes = None
+    defaults = None
+    new_table = True
+    for row in csv.reader(_with_line_endings(lines)):
+        if not row or row == ['']:
+            new_table = True
+            continue
+        elif row[0].startswith('#'):
+            if row[0] == '#datatype':
+                datatypes = row
+            elif row[0] == '#default':
+                defaults = row
+            new_table = True
+            continue
+        elif new_table:
+            new_table = False
+            # requests.iter_lines yields an empty line when a \r\n line ending
+            # spans two chunks, which is not the end of a table: a row like the
+            # rows of the table before is read as one of them.
+            if _is_header(row) or header is None or len(row) != len(header):
+                header = row
+                if datatypes is not None and len(datatypes) != len(header):
+                    datatypes = None
+                if defaults is not None and len(defaults) != len(header):
+                    defaults = None
+                continue
+
+        if header[1:3] == ['error', 'reference']:
+            raise FluxQueryError(f"InfluxDB query failed: {row[1] if len(row) > 1 else row}")
+        if len(row) < len(header):
+            continue
+        record = {}
+        for index in range(1, len(header)):
+            value = row[index]
+            if value == '' and defaults is not None:
+                value = defaults[index]
+            if datatypes is not None and value != '' and datatypes[index] in _CONVERSIONS:
+                value = _CONVERSIONS[datatypes[index]](value)
+            record[header[index]] = value
+        yield record
+
+#------------------------------------------------------------------------------
+
+def _with_line_endings(lines):
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', errors='replace')
+        yield line + '\n'
+
+def _is_header(row):
+    return row[1:3] == ['result', 'table'] or row[1:3] == ['error', 'reference']
+
+class FluxQueryError(RuntimeError):
+    """Exception raised when the result of a Flux query is an error."""
+    def __init__(self, message):
+        self.__message = message
+
+    @property
+    def message(self):
+        return self.__message
+
+    def __str__(self):
+        return self.__message
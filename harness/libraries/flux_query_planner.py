@@ -0,0 +1,124 @@
+#! /usr/bin/env python3
+"""
+-------------------------------------------------------------------------------
+File:   flux_query_planner.py
+National Center for Computational Sciences, Scientific Computing Group.
+Oak Ridge National Laboratory
+Copyright (C) 2023 Oak Ridge National Laboratory, UT-Battelle, LLC.
+-------------------------------------------------------------------------------
+"""
+
+import time
+import datetime
+import concurrent.futures
+
+def plan_time_chunks(start, stop, chunk):
+    """Returns the time chunks that cover a time window, newest first.
+
+    Parameters
+    ----------
+    start : datetime.datetime
+        The start of the window.
+
+    stop : datetime.datetime
+        The end of the window.
+
+    chunk : datetime.timedelta
+        The length of the chunks; the oldest chunk may be shorter.
+
+    Returns
+    -------
+    list
+        The (start, stop) datetimes of the chunks, each starting where the
+        one before it, older, stops.
+    """
+    if chunk <= datetime.timedelta(0):
+        raise ValueError(f"The length of the time chunks must be positive: {chunk}")
+    chunks = []
+    chunk_stop = stop
+    while chunk_stop > start:
+        chunk_start = max(start, chunk_stop - chunk)
+        chunks.append((chunk_start, chunk_stop))
+        chunk_stop = chunk_start
+    return chunks
+
+def flux_time(moment):
+    """Returns a datetime as an RFC3339 time of a Flux query, in UTC; a naive datetime is in UTC."""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+def flux_range(start, stop):
+    """Returns the range() of a Flux query of the times from start to stop."""
+    return f'|> range(start: {flux_time(start)}, stop: {flux_time(stop)})'
+
+def rfc3339_key(time_str):
+    """Returns a key that sorts the RFC3339 UTC times of InfluxDB, e.g. the _time of a record, whatever the digits of their fractions of seconds."""
+    (seconds, dot, fraction) = time_str.rstrip('Z').partition('.')
+    return (seconds, fraction.ljust(9, '0'))
+
+def query_time_chunks(query, chunks, key, jobs=4, on_chunk=None):
+    """Runs a query over time chunks, jobs at a time, and yields the latest record of each key over all of them.
+
+    The records of a chunk are final once the chunks newer than it are done,
+    since a key with a record in a newer chunk has a later record there. The
+    records are yielded as soon as they are final, newest chunk first, so
+    their processing overlaps the queries of the older chunks.
+
+    Parameters
+    ----------
+    query : callable
+        Called with the (start, stop) of a chunk, and returns an iterable of
+        the records of the chunk, each a dict with a 'time' in RFC3339.
+
+    chunks : list
+        The (start, stop) of the chunks, newest first, as returned by
+        plan_time_chunks.
+
+    key : callable
+        Called with a record, and returns its key, e.g. its test ID.
+
+    jobs : int
+        The maximum number of queries running at the same time.
+
+    on_chunk : callable
+        Called with the (start, stop) of each chunk, its number of records
+        and the seconds its query took, as each query finishes.
+
+    Yields
+    ------
+    dict
+        The latest record of each key.
+    """
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        futures = dict((pool.submit(_query_chunk, query, chunk, key), index)
+                       for (index, chunk) in enumerate(chunks))
+        done = {}
+        seen = set()
+        next_index = 0
+        for future in concurrent.futures.as_completed(futures):
+            (latest, count, seconds) = future.result()
+            index = futures[future]
+            if on_chunk is not None:
+                on_chunk(chunks[index], count, seconds)
+            done[index] = latest
+            while next_index in done:
+                for (record_key, record) in done.pop(next_index).items():
+                    if record_key not in seen:
+                        seen.add(record_key)
+                        yield record
+                next_index += 1
+
+#------------------------------------------------------------------------------
+
+def _query_chunk(query, chunk, key):
+    """Returns the latest record of each key in a chunk, the number of records, and the seconds the query took."""
+    start = time.monotonic()
+    latest = {}
+    count = 0
+    for record in query(*chunk):
+        count += 1
+        record_key = key(record)
+        if record_key not in latest or rfc3339_key(record['time']) >= rfc3339_key(latest[record_key]['time']):
+            latest[record_key] = record
+    return (latest, count, time.monotonic() - start)
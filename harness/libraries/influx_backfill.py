@@ -0,0 +1,299 @@
+#! /usr/bin/env python3
+"""
+-------------------------------------------------------------------------------
+File:   influx_backfill.py
+National Center for Computational Sciences, Scientific Computing Group.
+Oak Ridge National Laboratory
+Copyright (C) 2023 Oak Ridge National Laboratory, UT-Battelle, LLC.
+-------------------------------------------------------------------------------
+"""
+
+import os
+import sys
+import time
+import threading
+import concurrent.futures
+
+try:
+    import requests
+except ImportError as e:
+    print("Import Warning: Could not import requests in current Python environment. Influx logging will be disabled.")
+
+from libraries.status_file import StatusFile
+from libraries.influx_client import influx_client
+from libraries.influx_client import InfluxCircuitOpenError
+from libraries.influx_outbox import InfluxOutbox
+from libraries.influx_outbox import influx_outbox
+from libraries.influx_index import InfluxIndex
+from libraries.influx_index import influx_index
+
+class InfluxBackfill:
+    """Logs to InfluxDB the test instances of a subtest not logged yet, for --mode influx_log.
+
+    The worklist is built once from the Run_Archive directory of the subtest,
+    with absolute paths: the links, the instances logged or disabled and the
+    instances of another machine are left out. The logged instances and the
+    machines are looked up in the InfluxIndex of the applications directory
+    with one query, so the marker files are only checked for the instances
+    not logged yet, and the event files only read for the instances of an
+    unknown machine. With RGT_INFLUX_INDEX=0 they are read for every
+    instance.
+    The instances are then processed by a pool of jobs threads. For each
+    instance the metrics, node health and event records are collected and
+    written in batches of at most max_batch_bytes bytes of line protocol,
+    instead of one POST per record. An instance is marked .influx_logged
+    when its metrics and node health records were made and every batch was
+    accepted by InfluxDB, or queued in the outbox if RGT_INFLUX_OUTBOX is
+    set.
+
+    The working directory of the process is not changed, so the threads do
+    not interfere with each other.
+    """
+
+    # The default maximum number of bytes of line protocol per POST.
+    DEFAULT_MAX_BATCH_BYTES = 1 << 20
+
+    INFLUX_LOGGED_FILENAME = InfluxIndex.LOGGED_MARKER_FILENAME
+    INFLUX_DISABLED_FILENAME = '.influx_disabled'
+
+    def __init__(self, subtest, jobs=1, max_batch_bytes=None):
+        """Constructor.
+
+        Parameters
+        ----------
+        subtest : subtest
+            The subtest whose test instances are logged.
+
+        jobs : int
+            The number of test instances processed at the same time.
+
+        max_batch_bytes : int
+            The maximum number of bytes of line protocol per POST. The default
+            is RGT_INFLUX_BACKFILL_BATCH_BYTES, or DEFAULT_MAX_BATCH_BYTES if
+            that is not set.
+        """
+        from libraries.status_file_factory import StatusFileFactory
+
+        if max_batch_bytes is None:
+            max_batch_bytes = int(os.environ.get('RGT_INFLUX_BACKFILL_BATCH_BYTES', InfluxBackfill.DEFAULT_MAX_BATCH_BYTES))
+
+        self.__subtest = subtest
+        self.__logger = subtest.logger
+        self.__jobs = max(1, jobs)
+        self.__max_batch_bytes = max(1, max_batch_bytes)
+        self.__run_archive_dir = os.path.join(subtest.get_path_to_test(), subtest.test_run_archive_dirname)
+        self.__app = subtest.getNameOfApplication()
+        self.__test = subtest.getNameOfSubtest()
+        self.__index = influx_index(subtest.get_path_to_influx_index())
+        # Makes the event records of all the test instances, so that the
+        # threads do not build a status file object per test instance.
+        self.__status_file = StatusFileFactory.create(subtest.get_path_to_status_file(), self.__logger)
+        self.__metrics_lock = threading.Lock()
+        self.__metrics = {'instances' : 0,
+                          'logged' : 0,
+                          'failed' : 0,
+                          'seconds' : 0.0}
+
+    ###################
+    # Public methods  #
+    ###################
+
+    @property
+    def jobs(self):
+        return self.__jobs
+
+    def worklist(self):
+        """Returns the IDs of the test instances to log, in the order of their names."""
+        if self.__index is None:
+            return self.__scan_worklist()
+
+        if not 'RGT_MACHINE_NAME' in os.environ:
+            self.__logger.doWarningLogging("RGT_MACHINE_NAME not found in environment. Skipping machine name check.")
+            return []
+        machine_name = os.environ['RGT_MACHINE_NAME']
+
+        migrated = self.__index.migrate(self.__app, self.__test, self.__run_archive_dir)
+        if migrated is not None:
+            self.__logger.doInfoLogging(f"Recorded {migrated} marker files of {self.__run_archive_dir} in the InfluxDB index {self.__index.path}")
+        instances = self.__index.instances(self.__app, self.__test)
+
+        test_ids = []
+        new_machines = {}
+        for test_id in sorted(os.listdir(self.__run_archive_dir)):
+            (machine, logged) = instances.get(test_id, (None, None))
+            if logged is not None:
+                continue
+            instance_dir = os.path.join(self.__run_archive_dir, test_id)
+            if os.path.islink(instance_dir):
+                self.__logger.doInfoLogging(f"Ignoring link in influx_log_mode: {test_id}")
+                continue
+            elif not os.path.isdir(instance_dir):
+                continue
+            elif os.path.exists(os.path.join(instance_dir, InfluxBackfill.INFLUX_DISABLED_FILENAME)):
+                continue
+            elif os.path.exists(os.path.join(instance_dir, InfluxBackfill.INFLUX_LOGGED_FILENAME)):
+                # Logged while the index could not be updated.
+                self.__index.set_logged(self.__app, self.__test, test_id)
+                continue
+            if machine is None:
+                machine = self.__subtest._machine_of_test_instance(test_id)
+                if machine is not None:
+                    new_machines[test_id] = machine
+            if machine != machine_name:
+                self.__logger.doInfoLogging(f"Skipping test from another machine: {test_id}")
+            else:
+                test_ids.append(test_id)
+        self.__index.set_machines(self.__app, self.__test, new_machines)
+        return test_ids
+
+    def run(self):
+        """Logs the test instances of the worklist and returns the metrics of the backfill.
+
+        Returns
+        -------
+        dict
+            The numbers of instances processed, logged and failed, the time in
+            seconds taken, and the instances processed per second.
+        """
+        start = time.monotonic()
+        test_ids = self.worklist()
+        self.__logger.doInfoLogging(f"Logging {len(test_ids)} test instances to InfluxDB with {self.__jobs} jobs")
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.__jobs) as executor:
+            for (test_id, logged) in zip(test_ids, executor.map(self.__log_instance, test_ids)):
+                if logged:
+                    self.__logger.doInfoLogging(f"Successfully logged {test_id}")
+                else:
+                    self.__logger.doWarningLogging(f"Unable to log {test_id}")
+
+        outbox = influx_outbox()
+        if outbox is not None and len(test_ids) > 0:
+            if outbox.flush(os.environ['RGT_INFLUX_URI'], self.__headers(), retries=InfluxOutbox.FLUSH_RETRIES) is False:
+                self.__logger.doWarningLogging(f"InfluxDB outbox {outbox.path} not flushed. The records stay queued until a later flush.")
+
+        with self.__metrics_lock:
+            self.__metrics['seconds'] = time.monotonic() - start
+        return self.metrics()
+
+    def mark_disabled(self):
+        """Marks the test instances of the worklist .influx_disabled, as with RGT_DISABLE_INFLUX=1, and returns their IDs.
+
+        A later --mode influx_log then leaves them out, until the
+        .influx_disabled files are removed.
+        """
+        test_ids = self.worklist()
+        for test_id in test_ids:
+            os.mknod(os.path.join(self.__run_archive_dir, test_id, InfluxBackfill.INFLUX_DISABLED_FILENAME))
+        return test_ids
+
+    def metrics(self):
+        """Returns the numbers of instances processed, logged and failed, the time in seconds and the instances per second."""
+        with self.__metrics_lock:
+            metrics = dict(self.__metrics)
+        metrics['instances_per_second'] = metrics['instances'] / metrics['seconds'] if metrics['seconds'] > 0 else 0.0
+        return metrics
+
+    ###################
+    # Private methods #
+    ###################
+
+    def __log_instance(self, test_id):
+        """Logs the records of a test instance and returns whether it is logged."""
+        records = []
+        def collect(record):
+            records.append(record)
+            return True
+
+        self.__logger.doInfoLogging(f"Attempting to log {test_id}")
+        try:
+            metrics_logged = self.__subtest._log_to_influx(test_id, post_run=True, send=collect)
+
+            for event_id in StatusFile.EVENT_LIST:
+                record = self.__status_file.influx_event_record(event_id, test_id=test_id)
+                if record is not None:
+                    records.append(record)
+
+            sent = self.__send(records)
+            logged = metrics_logged and sent
+            if logged:
+                os.mknod(os.path.join(self.__run_archive_dir, test_id, InfluxBackfill.INFLUX_LOGGED_FILENAME))
+                if self.__index is not None:
+                    self.__index.set_logged(self.__app, self.__test, test_id, records)
+        except Exception as e:
+            self.__logger.doErrorLogging(f"Failed to log {test_id} to InfluxDB: {e}")
+            logged = False
+
+        with self.__metrics_lock:
+            self.__metrics['instances'] += 1
+            self.__metrics['logged' if logged else 'failed'] += 1
+        return logged
+
+    def __scan_worklist(self):
+        """Returns the IDs of the test instances to log, from their marker files and event files."""
+        test_ids = []
+        for test_id in sorted(os.listdir(self.__run_archive_dir)):
+            instance_dir = os.path.join(self.__run_archive_dir, test_id)
+            if os.path.islink(instance_dir):
+                self.__logger.doInfoLogging(f"Ignoring link in influx_log_mode: {test_id}")
+            elif not os.path.isdir(instance_dir):
+                continue
+            elif os.path.exists(os.path.join(instance_dir, InfluxBackfill.INFLUX_LOGGED_FILENAME)) or \
+                    os.path.exists(os.path.join(instance_dir, InfluxBackfill.INFLUX_DISABLED_FILENAME)):
+                continue
+            elif not self.__subtest._machine_matches(test_id):
+                self.__logger.doInfoLogging(f"Skipping test from another machine: {test_id}")
+            else:
+                test_ids.append(test_id)
+        return test_ids
+
+    def __send(self, records):
+        """Writes the records in batches and returns whether every batch was accepted or queued."""
+        influx_url = os.environ['RGT_INFLUX_URI']
+        outbox = influx_outbox()
+        all_sent = True
+        for batch in self.__batches(records):
+            if 'RGT_INFLUX_NO_SEND' in os.environ and os.environ['RGT_INFLUX_NO_SEND'] == '1':
+                print(f"RGT_INFLUX_NO_SEND is set, echoing: {batch}")
+            elif outbox is not None:
+                # Sent by the flush at the end of the backfill.
+                outbox.put(batch)
+            elif not 'requests' in sys.modules:
+                self.__logger.doWarningLogging(f"InfluxDB is currently disabled. Reason: 'requests' module was unable to load.")
+                return False
+            else:
+                try:
+                    r = influx_client().write(influx_url, batch, headers=self.__headers())
+                except InfluxCircuitOpenError as e:
+                    self.__logger.doWarningLogging(f"{e.message} Request not sent.")
+                    return False
+                except requests.exceptions.ConnectionError as e:
+                    self.__logger.doWarningLogging(f"InfluxDB is not reachable. Request not sent.")
+                    return False
+                except requests.exceptions.Timeout as e:
+                    self.__logger.doWarningLogging(f"InfluxDB did not respond in time. Request not completed.")
+                    return False
+                if not 200 <= r.status_code < 300:
+                    self.__logger.doWarningLogging(f"Influx returned status code: {r.status_code} - {r.reason}")
+                    all_sent = False
+        return all_sent
+
+    def __batches(self, records):
+        """Yields the records joined in batches of at most max_batch_bytes bytes, or of one record if it is larger."""
+        batch = []
+        batch_bytes = 0
+        for record in records:
+            record_bytes = len(record.encode()) + 1
+            if batch and batch_bytes + record_bytes > self.__max_batch_bytes:
+                yield '\n'.join(batch)
+                batch = []
+                batch_bytes = 0
+            batch.append(record)
+            batch_bytes += record_bytes
+        if batch:
+            yield '\n'.join(batch)
+
+    @staticmethod
+    def __headers():
+        return {'Authorization': "Token " + os.environ['RGT_INFLUX_TOKEN'],
+                'Content-Type': "text/plain; charset=utf-8",
+                'Accept': "application/json"}
@@ -0,0 +1,197 @@
+#! /usr/bin/env python3
+"""
+-------------------------------------------------------------------------------
+File:   influx_batch_writer.py
+National Center for Computational Sciences, Scientific Computing Group.
+Oak Ridge National Laboratory
+Copyright (C) 2023 Oak Ridge National Laboratory, UT-Battelle, LLC.
+-------------------------------------------------------------------------------
+"""
+
+import time
+
+from libraries.influx_client import influx_client
+
+class InfluxBatchWriter:
+    """Writes lines of line protocol to InfluxDB in batches, e.g. the records rewritten by the utilities.
+
+    add queues a line, and sends the queued lines in one POST once there are
+    max_lines of them, or before the line would make them more than
+    max_bytes bytes. close sends the lines left.
+
+    A batch that failed without a response, or with a 408, 429 or 5xx
+    status, is sent again up to retries times, after a delay that doubles
+    with each attempt. A batch that InfluxDB rejects as malformed (another
+    4xx status) is not sent again. After each batch, progress is called with
+    a message of the records written so far and their rate in records per
+    second.
+
+    With dry_run, nothing is sent: progress is called with the lines and
+    bytes of each batch as it would be sent.
+    """
+
+    # The default maximum number of lines per POST, as recommended by
+    # InfluxDB, and the default maximum number of bytes.
+    DEFAULT_MAX_LINES = 5000
+    DEFAULT_MAX_BYTES = 1 << 20
+
+    # The default number of times a failed batch is sent again, and the delay
+    # in seconds before the first time.
+    DEFAULT_RETRIES = 3
+    DEFAULT_BACKOFF = 1.0
+
+    def __init__(self, url, headers=None, max_lines=None, max_bytes=None, retries=None, backoff=None,
+                 dry_run=False, progress=print):
+        """Constructor.
+
+        Parameters
+        ----------
+        url : str
+            The write URL of InfluxDB.
+
+        headers : dict
+            The headers of the POST requests, e.g. the Authorization token.
+
+        max_lines : int
+            The maximum number of lines per POST, or DEFAULT_MAX_LINES if
+            None.
+
+        max_bytes : int
+            The maximum number of bytes per POST, or DEFAULT_MAX_BYTES if
+            None. A single line longer than that is sent alone.
+
+        retries : int
+            The number of times a failed batch is sent again, or
+            DEFAULT_RETRIES if None.
+
+        backoff : float
+            The delay in seconds before a failed batch is first sent again,
+            or DEFAULT_BACKOFF if None.
+
+        dry_run : bool
+            Whether the batches are only reported, and not sent.
+
+        progress : callable
+            Called with a message after each batch, or None for no messages.
+        """
+        self.__url = url
+        self.__headers = headers
+        self.__max_lines = InfluxBatchWriter.DEFAULT_MAX_LINES if max_lines is None else max(1, int(max_lines))
+        self.__max_bytes = InfluxBatchWriter.DEFAULT_MAX_BYTES if max_bytes is None else max(1, int(max_bytes))
+        self.__retries = InfluxBatchWriter.DEFAULT_RETRIES if retries is None else max(0, int(retries))
+        self.__backoff = InfluxBatchWriter.DEFAULT_BACKOFF if backoff is None else float(backoff)
+        self.__dry_run = dry_run
+        self.__progress = progress
+        self.__batch = []
+        self.__batch_bytes = 0
+        self.__start = None
+        self.__metrics = {'records' : 0,
+                          'batches' : 0,
+                          'bytes' : 0,
+                          'failed_records' : 0,
+                          'failed_batches' : 0,
+                          'retries' : 0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    ###################
+    # Public methods  #
+    ###################
+
+    @property
+    def dry_run(self):
+        return self.__dry_run
+
+    def add(self, line):
+        """Queues a line of line protocol, sending the batch first if the line would not fit in it."""
+        data = line.encode() if isinstance(line, str) else line
+        if self.__start is None:
+            self.__start = time.monotonic()
+        if self.__batch and self.__batch_bytes + 1 + len(data) > self.__max_bytes:
+            self.flush()
+        self.__batch.append(data)
+        self.__batch_bytes += len(data) + (1 if len(self.__batch) > 1 else 0)
+        if len(self.__batch) >= self.__max_lines:
+            self.flush()
+
+    def flush(self):
+        """Sends the queued lines in one batch; returns True if they were written, or there were none."""
+        if not self.__batch:
+            return True
+        batch = self.__batch
+        body = b'\n'.join(batch)
+        self.__batch = []
+        self.__batch_bytes = 0
+
+        self.__metrics['batches'] += 1
+        if self.__dry_run:
+            self.__metrics['records'] += len(batch)
+            self.__metrics['bytes'] += len(body)
+            self.__report(f"Dry run: batch {self.__metrics['batches']} of {len(batch)} records, {len(body)} bytes, not sent.")
+            return True
+
+        (written, reason) = self.__post(body)
+        if written:
+            self.__metrics['records'] += len(batch)
+            self.__metrics['bytes'] += len(body)
+            self.__report(f"Batch {self.__metrics['batches']}: {len(batch)} records, {len(body)} bytes written.")
+        else:
+            self.__metrics['failed_records'] += len(batch)
+            self.__metrics['failed_batches'] += 1
+            self.__report(f"Batch {self.__metrics['batches']}: {len(batch)} records not written. {reason}")
+        return written
+
+    def close(self):
+        """Sends the lines left and reports the totals; returns True if no batch failed."""
+        self.flush()
+        if self.__metrics['batches'] > 0:
+            if self.__dry_run:
+                self.__report(f"Dry run: {self.__metrics['records']} records in {self.__metrics['batches']} batches "
+                              f"of at most {self.__max_lines} lines and {self.__max_bytes} bytes, not sent.")
+            else:
+                self.__report(f"Done: {self.__metrics['records']} records written, "
+                              f"{self.__metrics['failed_records']} failed.")
+        return self.__metrics['failed_batches'] == 0
+
+    def metrics(self):
+        """Returns the counts of records, batches and bytes written, failed records and batches, retries, and seconds since the first line."""
+        metrics = dict(self.__metrics)
+        metrics['seconds'] = 0.0 if self.__start is None else time.monotonic() - self.__start
+        return metrics
+
+    ###################
+    # Private methods #
+    ###################
+
+    def __post(self, body):
+        """Posts a batch, retrying failures; returns (written, reason)."""
+        delay = self.__backoff
+        for attempt in range(self.__retries + 1):
+            if attempt > 0:
+                self.__metrics['retries'] += 1
+                time.sleep(delay)
+                delay *= 2
+            try:
+                r = influx_client().write(self.__url, body, headers=self.__headers)
+            except Exception as e:
+                reason = f"InfluxDB is not reachable: {e}"
+                continue
+            if 200 <= r.status_code < 300:
+                return (True, '')
+            reason = f"InfluxDB returned status code {r.status_code}: {r.text}"
+            if 400 <= r.status_code < 500 and r.status_code not in (408, 429):
+                # Malformed, sending it again would not help.
+                break
+        return (False, reason)
+
+    def __report(self, message):
+        if self.__progress is None:
+            return
+        seconds = 0.0 if self.__start is None else time.monotonic() - self.__start
+        rate = self.__metrics['records'] / seconds if seconds > 0 else 0.0
+        self.__progress(f"{message} {self.__metrics['records']} records in {seconds:.1f} s ({rate:.0f} records/s).")
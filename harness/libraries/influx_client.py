@@ -0,0 +1,285 @@
+#! /usr/bin/env python3
+"""
+-------------------------------------------------------------------------------
+File:   influx_client.py
+National Center for Computational Sciences, Scientific Computing Group.
+Oak Ridge National Laboratory
+Copyright (C) 2023 Oak Ridge National Laboratory, UT-Battelle, LLC.
+-------------------------------------------------------------------------------
+"""
+
+import os
+import gzip
+import time
+import atexit
+import threading
+
+try:
+    import requests
+    import requests.adapters
+except ImportError as e:
+    print("Import Warning: Could not import requests in current Python environment. Influx logging will be disabled.")
+
+class InfluxClient:
+    """Sends the HTTP requests of the harness to InfluxDB over kept-alive connections.
+
+    All requests go through one requests.Session, whose connection pool keeps
+    up to pool_size connections open per InfluxDB server, so that a write or
+    query reuses the TCP (and TLS) connection of an earlier one instead of
+    opening a new one. The session may be used by several threads.
+
+    Every request has a connect timeout and a read timeout, so a hung server
+    fails the request instead of blocking the harness. The requests go
+    through a circuit breaker: after breaker_failures consecutive failures
+    (no response, or a 5xx or 429 status) the breaker opens, and requests
+    fail at once with InfluxCircuitOpenError, without being sent, for
+    breaker_cooldown seconds. Then the breaker is half-open: the next
+    request is sent, and closes the breaker if it succeeds or opens it
+    again if it fails. The state of the breaker and the counts of requests,
+    failures and skipped requests are returned by metrics().
+
+    Writes of line protocol (write) are sent with Content-Encoding: gzip
+    if compression is enabled and the body has at least gzip_min_bytes
+    bytes. Smaller bodies gain too little to be worth the CPU time.
+    """
+
+    # The default number of connections kept open per server.
+    DEFAULT_POOL_SIZE = 10
+
+    # The default timeouts in seconds for connecting and for each read.
+    DEFAULT_CONNECT_TIMEOUT = 5.0
+    DEFAULT_READ_TIMEOUT = 30.0
+
+    # The default number of consecutive failures opening the circuit
+    # breaker, and the default time in seconds it stays open.
+    DEFAULT_BREAKER_FAILURES = 5
+    DEFAULT_BREAKER_COOLDOWN = 60.0
+
+    # The default size in bytes from which the bodies of writes are
+    # compressed, and the gzip compression level.
+    DEFAULT_GZIP_MIN_BYTES = 1024
+    GZIP_LEVEL = 1
+
+    BREAKER_CLOSED = 'closed'
+    BREAKER_OPEN = 'open'
+    BREAKER_HALF_OPEN = 'half-open'
+
+    def __init__(self, pool_size=None, connect_timeout=None, read_timeout=None,
+                 breaker_failures=None, breaker_cooldown=None, gzip_writes=None, gzip_min_bytes=None):
+        """Constructor.
+
+        Parameters
+        ----------
+        pool_size : int
+            The maximum number of connections kept open per server. The
+            default is RGT_INFLUX_POOL_SIZE, or DEFAULT_POOL_SIZE if that is
+            not set.
+
+        connect_timeout : float
+            The timeout in seconds for connecting to the server. The default
+            is RGT_INFLUX_CONNECT_TIMEOUT, or DEFAULT_CONNECT_TIMEOUT if that
+            is not set.
+
+        read_timeout : float
+            The timeout in seconds for each read of the response. The default
+            is RGT_INFLUX_READ_TIMEOUT, or DEFAULT_READ_TIMEOUT if that is not
+            set.
+
+        breaker_failures : int
+            The number of consecutive failures opening the circuit breaker.
+            The default is RGT_INFLUX_BREAKER_FAILURES, or
+            DEFAULT_BREAKER_FAILURES if that is not set.
+
+        breaker_cooldown : float
+            The time in seconds the circuit breaker stays open. The default is
+            RGT_INFLUX_BREAKER_COOLDOWN, or DEFAULT_BREAKER_COOLDOWN if that is
+            not set.
+
+        gzip_writes : bool
+            Whether the bodies of writes are compressed. The default is
+            whether RGT_INFLUX_GZIP is 1.
+
+        gzip_min_bytes : int
+            The size in bytes from which the bodies of writes are compressed.
+            The default is RGT_INFLUX_GZIP_MIN_BYTES, or
+            DEFAULT_GZIP_MIN_BYTES if that is not set.
+        """
+        if pool_size is None:
+            pool_size = int(os.environ.get('RGT_INFLUX_POOL_SIZE', InfluxClient.DEFAULT_POOL_SIZE))
+        if connect_timeout is None:
+            connect_timeout = float(os.environ.get('RGT_INFLUX_CONNECT_TIMEOUT', InfluxClient.DEFAULT_CONNECT_TIMEOUT))
+        if read_timeout is None:
+            read_timeout = float(os.environ.get('RGT_INFLUX_READ_TIMEOUT', InfluxClient.DEFAULT_READ_TIMEOUT))
+        if breaker_failures is None:
+            breaker_failures = int(os.environ.get('RGT_INFLUX_BREAKER_FAILURES', InfluxClient.DEFAULT_BREAKER_FAILURES))
+        if breaker_cooldown is None:
+            breaker_cooldown = float(os.environ.get('RGT_INFLUX_BREAKER_COOLDOWN', InfluxClient.DEFAULT_BREAKER_COOLDOWN))
+        if gzip_writes is None:
+            gzip_writes = os.environ.get('RGT_INFLUX_GZIP') == '1'
+        if gzip_min_bytes is None:
+            gzip_min_bytes = int(os.environ.get('RGT_INFLUX_GZIP_MIN_BYTES', InfluxClient.DEFAULT_GZIP_MIN_BYTES))
+
+        self.__pool_size = max(1, pool_size)
+        self.__timeout = (connect_timeout, read_timeout)
+        self.__breaker_failures = max(1, breaker_failures)
+        self.__breaker_cooldown = breaker_cooldown
+        self.__gzip_writes = gzip_writes
+        self.__gzip_min_bytes = gzip_min_bytes
+        self.__breaker_lock = threading.Lock()
+        self.__breaker_state = InfluxClient.BREAKER_CLOSED
+        self.__opened_at = None
+        self.__consecutive_failures = 0
+        self.__metrics = {'requests' : 0,
+                          'failures' : 0,
+                          'skipped' : 0,
+                          'breaker_opened' : 0,
+                          'write_bytes' : 0,
+                          'write_bytes_sent' : 0}
+        self.__session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=self.__pool_size,
+                                                pool_maxsize=self.__pool_size)
+        self.__session.mount('http://', adapter)
+        self.__session.mount('https://', adapter)
+
+    ###################
+    # Public methods  #
+    ###################
+
+    @property
+    def pool_size(self):
+        return self.__pool_size
+
+    def post(self, url, data=None, headers=None, params=None, stream=False, timeout=None):
+        """Sends a POST request, e.g. a write of line protocol or a Flux query, and returns the requests.Response.
+
+        Raises InfluxCircuitOpenError without sending the request while the
+        circuit breaker is open. timeout, a (connect, read) tuple in seconds,
+        overrides the timeouts of the client. With stream, the body of the
+        response is read as it is iterated, e.g. with flux_csv.read_flux_csv.
+        """
+        return self.__request('POST', url, data=data, headers=headers, params=params, stream=stream, timeout=timeout)
+
+    def write(self, url, data, headers=None, timeout=None):
+        """Posts line protocol to the write URL of InfluxDB, compressed with gzip if enabled, and returns the requests.Response.
+
+        Raises InfluxCircuitOpenError as post does.
+        """
+        body = data.encode() if isinstance(data, str) else data
+        encoded = self.encode_write(body)
+        if encoded is not body:
+            headers = dict(headers or {})
+            headers['Content-Encoding'] = 'gzip'
+        with self.__breaker_lock:
+            self.__metrics['write_bytes'] += len(body)
+            self.__metrics['write_bytes_sent'] += len(encoded)
+        return self.post(url, data=encoded, headers=headers, timeout=timeout)
+
+    def encode_write(self, body):
+        """Returns the body of a write as sent: body compressed with gzip, or body itself if it is not compressed."""
+        if not self.__gzip_writes or len(body) < self.__gzip_min_bytes:
+            return body
+        return gzip.compress(body, compresslevel=InfluxClient.GZIP_LEVEL, mtime=0)
+
+    def get(self, url, headers=None, params=None, stream=False, timeout=None):
+        """Sends a GET request, e.g. an InfluxQL query, and returns the requests.Response.
+
+        Raises InfluxCircuitOpenError as post does.
+        """
+        return self.__request('GET', url, headers=headers, params=params, stream=stream, timeout=timeout)
+
+    def breaker_state(self):
+        """Returns the state of the circuit breaker: BREAKER_CLOSED, BREAKER_OPEN or BREAKER_HALF_OPEN."""
+        with self.__breaker_lock:
+            self.__update_breaker_state()
+            return self.__breaker_state
+
+    def metrics(self):
+        """Returns the counts of requests, failures, requests skipped by the breaker, its openings and state, and bytes written."""
+        with self.__breaker_lock:
+            self.__update_breaker_state()
+            metrics = dict(self.__metrics)
+            metrics['breaker_state'] = self.__breaker_state
+        return metrics
+
+    def close(self):
+        """Closes the connections of the pool."""
+        self.__session.close()
+
+    ###################
+    # Private methods #
+    ###################
+
+    def __request(self, method, url, timeout=None, **kwargs):
+        with self.__breaker_lock:
+            self.__update_breaker_state()
+            if self.__breaker_state == InfluxClient.BREAKER_OPEN:
+                self.__metrics['skipped'] += 1
+                raise InfluxCircuitOpenError(f"InfluxDB request to {url} skipped: the circuit breaker is open after "
+                                             f"{self.__consecutive_failures} consecutive failures.")
+            self.__metrics['requests'] += 1
+
+        try:
+            r = self.__session.request(method, url, timeout=self.__timeout if timeout is None else timeout, **kwargs)
+        except requests.exceptions.RequestException:
+            self.__record_result(False)
+            raise
+        self.__record_result(r.status_code < 500 and r.status_code != 429)
+        return r
+
+    def __record_result(self, succeeded):
+        with self.__breaker_lock:
+            if succeeded:
+                self.__consecutive_failures = 0
+                self.__breaker_state = InfluxClient.BREAKER_CLOSED
+                return
+            self.__metrics['failures'] += 1
+            self.__consecutive_failures += 1
+            if self.__breaker_state == InfluxClient.BREAKER_HALF_OPEN or \
+                    self.__consecutive_failures >= self.__breaker_failures:
+                if self.__breaker_state != InfluxClient.BREAKER_OPEN:
+                    self.__metrics['breaker_opened'] += 1
+                self.__breaker_state = InfluxClient.BREAKER_OPEN
+                self.__opened_at = time.monotonic()
+
+    def __update_breaker_state(self):
+        """Makes an open breaker half-open once its cooldown has passed. Called with the breaker lock held."""
+        if self.__breaker_state == InfluxClient.BREAKER_OPEN and \
+                time.monotonic() - self.__opened_at >= self.__breaker_cooldown:
+            self.__breaker_state = InfluxClient.BREAKER_HALF_OPEN
+
+class InfluxCircuitOpenError(RuntimeError):
+    """Exception raised when a request is skipped because the circuit breaker of the InfluxClient is open."""
+    def __init__(self,message):
+        """The class constructor
+
+        Parameters
+        ----------
+        message : string
+            The error message for this exception.
+        """
+        super().__init__(message)
+        self._message = message
+
+    @property
+    def message(self):
+        """str: The error message."""
+        return self._message
+
+#------------------------------------------------------------------------------
+
+_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+
+def influx_client():
+    """Returns the InfluxClient of the process."""
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            _CLIENT = InfluxClient()
+            atexit.register(_CLIENT.close)
+        return _CLIENT
+
+def influx_client_metrics():
+    """Returns the metrics of the InfluxClient of the process, or None if it has not been used."""
+    with _CLIENT_LOCK:
+        return None if _CLIENT is None else _CLIENT.metrics()
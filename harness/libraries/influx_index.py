@@ -0,0 +1,168 @@
+#! /usr/bin/env python3
+"""
+-------------------------------------------------------------------------------
+File:   influx_index.py
+National Center for Computational Sciences, Scientific Computing Group.
+Oak Ridge National Laboratory
+Copyright (C) 2023 Oak Ridge National Laboratory, UT-Battelle, LLC.
+-------------------------------------------------------------------------------
+"""
+
+import os
+import time
+import sqlite3
+import threading
+import contextlib
+
+class InfluxIndex:
+    """The index of the test instances of an applications directory (Path_to_tests) logged to InfluxDB.
+
+    The index is a SQLite database, in WAL mode so that the harness
+    processes of the tests can update it concurrently. Its table
+    instances has a row per test instance, keyed by app, test and test_id,
+    with the machine of the test instance, once known, and the time it was
+    logged, or NULL if it is not logged yet. The table measurements has, for
+    each logged test instance and measurement, the number of records sent
+    and the first and last timestamps of the records.
+
+    The index replaces the scan of the .influx_logged marker files of every
+    test instance by --mode influx_log. The markers are still written. The
+    first time the test instances of a subtest are looked up, migrate
+    records the test instances with a marker as logged.
+    """
+
+    # The marker file of a logged test instance in its Run_Archive directory.
+    LOGGED_MARKER_FILENAME = '.influx_logged'
+
+    def __init__(self, path):
+        """Constructor.
+
+        Parameters
+        ----------
+        path : str
+            The path of the index database. It is created if needed.
+        """
+        self.__path = path
+        with _connect(path) as connection:
+            connection.execute('PRAGMA journal_mode=WAL')
+            with connection:
+                connection.execute('CREATE TABLE IF NOT EXISTS instances (app TEXT, test TEXT, test_id TEXT, '
+                                   'machine TEXT, logged REAL, PRIMARY KEY (app, test, test_id))')
+                connection.execute('CREATE TABLE IF NOT EXISTS measurements (app TEXT, test TEXT, test_id TEXT, '
+                                   'measurement TEXT, records INTEGER, first_time INTEGER, last_time INTEGER, '
+                                   'PRIMARY KEY (app, test, test_id, measurement))')
+                connection.execute('CREATE TABLE IF NOT EXISTS migrations (app TEXT, test TEXT, migrated REAL, '
+                                   'PRIMARY KEY (app, test))')
+
+    ###################
+    # Public methods  #
+    ###################
+
+    @property
+    def path(self):
+        return self.__path
+
+    def instances(self, app, test):
+        """Returns a dict of the (machine, logged) of the test instances of a subtest in the index, by test_id.
+
+        machine is None if it is not known, and logged is the time the test
+        instance was logged, in seconds since the epoch, or None.
+        """
+        with _connect(self.__path) as connection:
+            rows = connection.execute('SELECT test_id, machine, logged FROM instances WHERE app = ? AND test = ?',
+                                      (app, test)).fetchall()
+        return dict((test_id, (machine, logged)) for (test_id, machine, logged) in rows)
+
+    def migrate(self, app, test, run_archive_dir):
+        """Records the test instances of a subtest with a marker file as logged, the first time it is called.
+
+        Parameters
+        ----------
+        app : str
+            The name of the application.
+
+        test : str
+            The name of the subtest.
+
+        run_archive_dir : str
+            The Run_Archive directory of the subtest.
+
+        Returns
+        -------
+        int
+            The number of markers recorded, or None if the subtest was already migrated.
+        """
+        with _connect(self.__path) as connection:
+            if connection.execute('SELECT 1 FROM migrations WHERE app = ? AND test = ?', (app, test)).fetchone():
+                return None
+
+        logged = []
+        if os.path.isdir(run_archive_dir):
+            logged = [test_id for test_id in os.listdir(run_archive_dir)
+                      if os.path.exists(os.path.join(run_archive_dir, test_id, InfluxIndex.LOGGED_MARKER_FILENAME))]
+
+        now = time.time()
+        with _connect(self.__path) as connection:
+            with connection:
+                connection.executemany(_SET_LOGGED, [(app, test, test_id, now) for test_id in logged])
+                connection.execute('INSERT OR IGNORE INTO migrations (app, test, migrated) VALUES (?, ?, ?)',
+                                   (app, test, now))
+        return len(logged)
+
+    def set_machines(self, app, test, machines):
+        """Records the machines of test instances of a subtest, given as a dict of machine names by test_id."""
+        with _connect(self.__path) as connection:
+            with connection:
+                connection.executemany('INSERT INTO instances (app, test, test_id, machine) VALUES (?, ?, ?, ?) '
+                                       'ON CONFLICT (app, test, test_id) DO UPDATE SET machine = excluded.machine',
+                                       [(app, test, test_id, machine) for (test_id, machine) in machines.items()])
+
+    def set_logged(self, app, test, test_id, records=()):
+        """Records a test instance as logged, with the measurements and timestamps of its records of line protocol."""
+        measurements = {}
+        for record in records:
+            measurement = record.split(' ', 1)[0].split(',', 1)[0]
+            timestamp = record.rsplit(' ', 1)[-1]
+            timestamp = int(timestamp) if timestamp.isdigit() else None
+            (count, first_time, last_time) = measurements.get(measurement, (0, None, None))
+            if timestamp is not None:
+                first_time = timestamp if first_time is None else min(first_time, timestamp)
+                last_time = timestamp if last_time is None else max(last_time, timestamp)
+            measurements[measurement] = (count + 1, first_time, last_time)
+
+        with _connect(self.__path) as connection:
+            with connection:
+                connection.execute(_SET_LOGGED, (app, test, test_id, time.time()))
+                connection.executemany('INSERT OR REPLACE INTO measurements (app, test, test_id, measurement, '
+                                       'records, first_time, last_time) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                       [(app, test, test_id, measurement) + values
+                                        for (measurement, values) in measurements.items()])
+
+    def measurements(self, app, test, test_id):
+        """Returns a dict of the (records, first_time, last_time) of the measurements logged for a test instance."""
+        with _connect(self.__path) as connection:
+            rows = connection.execute('SELECT measurement, records, first_time, last_time FROM measurements '
+                                      'WHERE app = ? AND test = ? AND test_id = ?', (app, test, test_id)).fetchall()
+        return dict((row[0], tuple(row[1:])) for row in rows)
+
+#------------------------------------------------------------------------------
+
+_SET_LOGGED = ('INSERT INTO instances (app, test, test_id, logged) VALUES (?, ?, ?, ?) '
+               'ON CONFLICT (app, test, test_id) DO UPDATE SET logged = excluded.logged')
+
+def _connect(database_path):
+    connection = sqlite3.connect(database_path, timeout=60.0)
+    connection.execute('PRAGMA synchronous=NORMAL')
+    return contextlib.closing(connection)
+
+_INDEXES = {}
+_INDEXES_LOCK = threading.Lock()
+
+def influx_index(path):
+    """Returns the InfluxIndex of the database path, or None if the index is disabled with RGT_INFLUX_INDEX=0."""
+    if os.environ.get('RGT_INFLUX_INDEX') == '0':
+        return None
+    with _INDEXES_LOCK:
+        if path not in _INDEXES:
+            _INDEXES[path] = InfluxIndex(path)
+        return _INDEXES[path]
@@ -0,0 +1,286 @@
+#! /usr/bin/env python3
+"""
+-------------------------------------------------------------------------------
+File:   influx_outbox.py
+National Center for Computational Sciences, Scientific Computing Group.
+Oak Ridge National Laboratory
+Copyright (C) 2023 Oak Ridge National Laboratory, UT-Battelle, LLC.
+-------------------------------------------------------------------------------
+"""
+
+import os
+import sys
+import time
+import atexit
+import fcntl
+import shutil
+import threading
+
+from libraries.influx_client import influx_client
+
+class InfluxOutbox:
+    """A directory of line-protocol records waiting to be written to InfluxDB.
+
+    Each entry of the outbox is a file of one or more lines of line protocol,
+    named so that the entries sort in the order they were put. An entry is
+    written to a hidden temporary file, flushed to disk and renamed into the
+    outbox, so a flusher never sees a partial entry.
+
+    flush sends the entries, oldest first, in batches of at most
+    max_batch_bytes bytes per POST, and removes the entries of a batch only
+    after InfluxDB answered it with a 2xx status. A batch that InfluxDB
+    rejects as malformed (400, 413 or 422) is resent one entry per POST, and
+    the rejected entries are moved to the subdirectory rejected/ so they do
+    not hold back the others. Otherwise, e.g. for an expired token (401), a
+    missing permission (403) or a wrong bucket (404), the flush stops at the
+    failed batch, keeping its entries, and is retried after a delay that
+    doubles with each consecutive failure.
+
+    Flushers of several processes are serialized by an fcntl.flock lock on
+    the file .flush.lock of the outbox; a flush finding the lock taken
+    returns at once, leaving the entries to the flusher that holds it.
+    """
+
+    ENTRY_SUFFIX = '.lp'
+    FLUSH_LOCK_FILENAME = '.flush.lock'
+    REJECTED_DIRNAME = 'rejected'
+
+    # The statuses of InfluxDB for a batch with a malformed entry.
+    REJECTED_STATUSES = (400, 413, 422)
+
+    # The default maximum number of bytes of line protocol per POST.
+    DEFAULT_MAX_BATCH_BYTES = 1 << 20
+
+    # The default delay in seconds before a flush is retried after a
+    # failure, and its upper bound.
+    DEFAULT_BACKOFF = 1.0
+    MAX_BACKOFF = 300.0
+
+    # The number of times the flush of --mode influx_log is retried.
+    FLUSH_RETRIES = 5
+
+    def __init__(self, path, max_batch_bytes=None, backoff=None):
+        """Constructor.
+
+        Parameters
+        ----------
+        path : str
+            The path of the outbox directory. It is created if needed.
+
+        max_batch_bytes : int
+            The maximum number of bytes of line protocol per POST. The default
+            is RGT_INFLUX_OUTBOX_BATCH_BYTES, or DEFAULT_MAX_BATCH_BYTES if
+            that is not set.
+
+        backoff : float
+            The delay in seconds before a flush is retried after a first
+            failure. The default is RGT_INFLUX_OUTBOX_BACKOFF, or
+            DEFAULT_BACKOFF if that is not set.
+        """
+        if max_batch_bytes is None:
+            max_batch_bytes = int(os.environ.get('RGT_INFLUX_OUTBOX_BATCH_BYTES', InfluxOutbox.DEFAULT_MAX_BATCH_BYTES))
+        if backoff is None:
+            backoff = float(os.environ.get('RGT_INFLUX_OUTBOX_BACKOFF', InfluxOutbox.DEFAULT_BACKOFF))
+
+        self.__path = path
+        self.__max_batch_bytes = max(1, max_batch_bytes)
+        self.__backoff = backoff
+        self.__delay = backoff
+        self.__next_attempt = 0.0
+        self.__thread_lock = threading.Lock()
+        self.__flush_lock = threading.Lock()
+        self.__count = 0
+        self.__exit_flush = None
+        os.makedirs(path, exist_ok=True)
+
+    ###################
+    # Public methods  #
+    ###################
+
+    @property
+    def path(self):
+        return self.__path
+
+    def put(self, lines):
+        """Adds an entry of one or more lines of line protocol to the outbox.
+
+        Returns
+        -------
+        str
+            The path of the entry.
+        """
+        with self.__thread_lock:
+            self.__count += 1
+            filename = '{0:020d}-{1}-{2}-{3:06d}{4}'.format(time.time_ns(), os.uname().nodename, os.getpid(),
+                                                           self.__count, InfluxOutbox.ENTRY_SUFFIX)
+        data = lines if lines.endswith('\n') else lines + '\n'
+
+        entry_path = os.path.join(self.__path, filename)
+        path_partial = os.path.join(self.__path, '.' + filename + '.partial')
+        with open(path_partial, 'w') as file_obj:
+            file_obj.write(data)
+            file_obj.flush()
+            os.fsync(file_obj.fileno())
+        os.replace(path_partial, entry_path)
+        return entry_path
+
+    def entries(self):
+        """Returns the paths of the entries in the outbox, oldest first."""
+        return [os.path.join(self.__path, filename) for filename in sorted(os.listdir(self.__path))
+                if filename.endswith(InfluxOutbox.ENTRY_SUFFIX) and not filename.startswith('.')]
+
+    def flush(self, url, headers, retries=0):
+        """Sends the entries of the outbox to InfluxDB.
+
+        Parameters
+        ----------
+        url : str
+            The write URL of InfluxDB, e.g. RGT_INFLUX_URI.
+
+        headers : dict
+            The headers of the POST requests.
+
+        retries : int
+            The number of times a failed flush is retried, after waiting for
+            the backoff delay. With 0, the flush is skipped while the delay
+            after the last failure has not passed.
+
+        Returns
+        -------
+        bool
+            True if the outbox is empty after the flush, False if it is not,
+            or None if another process was flushing it.
+        """
+        if 'requests' not in sys.modules:
+            return False
+
+        with self.__flush_lock:
+            for attempt in range(retries + 1):
+                wait = self.__next_attempt - time.monotonic()
+                if wait > 0:
+                    if retries == 0:
+                        return False
+                    time.sleep(wait)
+
+                flushed = self.__flush_entries(url, headers)
+                if flushed is None:
+                    # Another process is flushing the outbox.
+                    return None
+                if flushed:
+                    self.__delay = self.__backoff
+                    self.__next_attempt = 0.0
+                    return True
+
+                self.__next_attempt = time.monotonic() + self.__delay
+                self.__delay = min(2 * self.__delay, InfluxOutbox.MAX_BACKOFF)
+            return False
+
+    def flush_at_exit(self, url, headers):
+        """Flushes the outbox once when the process exits, e.g. after the events of a harness run were put.
+
+        The url and headers of the last call are used.
+        """
+        with self.__thread_lock:
+            if self.__exit_flush is None:
+                atexit.register(self.__flush_at_exit)
+            self.__exit_flush = (url, headers)
+
+    ###################
+    # Private methods #
+    ###################
+
+    def __flush_at_exit(self):
+        (url, headers) = self.__exit_flush
+        try:
+            self.flush(url, headers)
+        except OSError:
+            # The outbox was removed; there is nothing left to send.
+            pass
+
+    def __flush_entries(self, url, headers):
+        """Sends the entries in batches; returns whether all were sent, or None if the lock is taken."""
+        lock_obj = open(os.path.join(self.__path, InfluxOutbox.FLUSH_LOCK_FILENAME), 'a')
+        try:
+            try:
+                fcntl.flock(lock_obj.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return None
+
+            for batch in self.__batches(self.entries()):
+                status_code = self.__post(url, headers, batch)
+                if status_code is not None and 200 <= status_code < 300:
+                    InfluxOutbox.__remove_entries([path for (path, data) in batch])
+                elif InfluxOutbox.__is_rejected(status_code):
+                    for (path, data) in batch:
+                        status_code = self.__post(url, headers, [(path, data)])
+                        if status_code is not None and 200 <= status_code < 300:
+                            InfluxOutbox.__remove_entries([path])
+                        elif InfluxOutbox.__is_rejected(status_code):
+                            self.__reject_entry(path)
+                        else:
+                            return False
+                else:
+                    return False
+            return True
+        finally:
+            lock_obj.close()
+
+    def __batches(self, entry_paths):
+        """Yields lists of (path, data) of the entries, of at most max_batch_bytes bytes each."""
+        batch = []
+        batch_bytes = 0
+        for path in entry_paths:
+            try:
+                with open(path, 'rb') as file_obj:
+                    data = file_obj.read()
+            except FileNotFoundError:
+                # Sent by another flusher.
+                continue
+            if batch and batch_bytes + len(data) > self.__max_batch_bytes:
+                yield batch
+                batch = []
+                batch_bytes = 0
+            batch.append((path, data))
+            batch_bytes += len(data)
+        if batch:
+            yield batch
+
+    def __post(self, url, headers, batch):
+        """Posts the lines of the entries of batch and returns the status code, or None if no response came."""
+        try:
+            r = influx_client().write(url, b''.join(data for (path, data) in batch), headers=headers)
+        except Exception:
+            return None
+        return r.status_code
+
+    def __reject_entry(self, path):
+        rejected_dir = os.path.join(self.__path, InfluxOutbox.REJECTED_DIRNAME)
+        os.makedirs(rejected_dir, exist_ok=True)
+        shutil.move(path, os.path.join(rejected_dir, os.path.basename(path)))
+
+    @staticmethod
+    def __is_rejected(status_code):
+        return status_code in InfluxOutbox.REJECTED_STATUSES
+
+    @staticmethod
+    def __remove_entries(paths):
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+#------------------------------------------------------------------------------
+
+_OUTBOXES = {}
+_OUTBOXES_LOCK = threading.Lock()
+
+def influx_outbox():
+    """Returns the InfluxOutbox of the directory RGT_INFLUX_OUTBOX, or None if that is not set."""
+    path = os.environ.get('RGT_INFLUX_OUTBOX')
+    if not path:
+        return None
+    with _OUTBOXES_LOCK:
+        if path not in _OUTBOXES:
+            _OUTBOXES[path] = InfluxOutbox(path)
+        return _OUTBOXES[path]
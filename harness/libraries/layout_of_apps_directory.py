@@ -31,6 +31,9 @@ class apptest_layout:
     test_kill_filename = '.kill_test'
     test_rc_filename = '.testrc'
     test_status_filename = 'rgt_status.txt'
+    test_status_db_filename = 'rgt_status.db'
+    test_event_ledger_filename = 'rgt_events.jsonl'
+    influx_index_filename = '.rgt_influx_index.db'
     test_summary_filename = 'rgt_summary.txt'
     job_status_filename = 'job_status.txt'
     job_id_filename = 'job_id.txt'
@@ -78,6 +81,7 @@ class apptest_layout:
         'job_id_file'     : os.path.join("${pdir}", "${app}", "${test}", test_status_dirname, "${id}", job_id_filename),
         'job_status_file' : os.path.join("${pdir}", "${app}", "${test}", test_status_dirname, "${id}", job_status_filename),
         'status_file'     : os.path.join("${pdir}", "${app}", "${test}", test_status_dirname, test_status_filename),
+        'influx_index'    : os.path.join("${pdir}", influx_index_filename),
         'logfile_dir'     : os.path.join("${pdir}", "${app}", "${test}", test_run_archive_dirname, "${id}",test_logfile_dirname),
         'logfile'         : os.path.join("${pdir}", "${app}", "${test}", test_run_archive_dirname, "${id}",test_logfile_dirname,app_logger_filename),
         'status_logfile'  : os.path.join("${pdir}", "${app}", "${test}", test_run_archive_dirname, "${id}",test_logfile_dirname,status_logger_filename)
@@ -326,6 +330,11 @@ class apptest_layout:
     def get_path_to_status_file(self):
         return self.__apptest_layout['status_file']
 
+    # Returns the path to the index of the test instances logged to InfluxDB,
+    # shared by the tests of the applications root directory.
+    def get_path_to_influx_index(self):
+        return self.__apptest_layout['influx_index']
+
     # Returns the path to the job status file.
     def get_path_to_job_status_file(self):
         return self.__apptest_layout['job_status_file']
@@ -0,0 +1,132 @@
+#! /usr/bin/env python3
+"""
+-------------------------------------------------------------------------------
+File:   line_protocol.py
+National Center for Computational Sciences, Scientific Computing Group.
+Oak Ridge National Laboratory
+Copyright (C) 2023 Oak Ridge National Laboratory, UT-Battelle, LLC.
+-------------------------------------------------------------------------------
+"""
+
+import datetime
+
+# The escaping of the InfluxDB line protocol, as translation tables for
+# str.translate. Commas and spaces are escaped in measurements; commas,
+# equals signs and spaces in tag keys, tag values and field keys; and double
+# quotes and backslashes in string field values. Newlines cannot be escaped
+# outside of string field values, so they are replaced with spaces there.
+# str.translate looks up every character in the table, so the strings are
+# only translated if they have a character to escape, which is rare.
+MEASUREMENT_ESCAPES = str.maketrans({',' : '\\,', ' ' : '\\ ', '\n' : '\\ '})
+KEY_ESCAPES = str.maketrans({',' : '\\,', '=' : '\\=', ' ' : '\\ ', '\n' : '\\ '})
+STRING_FIELD_ESCAPES = str.maketrans({'"' : '\\"', '\\' : '\\\\'})
+
+def escape_measurement(name):
+    """Returns a measurement name escaped for the line protocol."""
+    name = str(name)
+    if ',' in name or ' ' in name or '\n' in name:
+        return name.translate(MEASUREMENT_ESCAPES)
+    return name
+
+def escape_key(key):
+    """Returns a tag key, tag value or field key escaped for the line protocol."""
+    key = str(key)
+    if ',' in key or '=' in key or ' ' in key or '\n' in key:
+        return key.translate(KEY_ESCAPES)
+    return key
+
+def escape_string_field(value):
+    """Returns a string field value escaped and quoted for the line protocol."""
+    value = str(value)
+    if '"' in value or '\\' in value:
+        return '"' + value.translate(STRING_FIELD_ESCAPES) + '"'
+    return '"' + value + '"'
+
+def format_field_value(value):
+    """Returns a field value formatted for the line protocol.
+
+    Booleans are written as true or false, and other numbers without a type
+    suffix, so that InfluxDB stores integers as floats, as the harness always
+    has. Any other value is written as a string.
+    """
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    elif isinstance(value, (int, float)):
+        return repr(value)
+    return escape_string_field(value)
+
+def timestamp_ns(event_time):
+    """Returns the time in nanoseconds since the epoch of an ISO 8601 time, e.g. the time of an event.
+
+    A time without a UTC offset is in local time, as the harness writes the
+    times of the events. The nanoseconds are computed with integers, so the
+    microseconds of the time are exact.
+
+    Parameters
+    ----------
+    event_time : str or datetime.datetime
+        The time, in a format read by datetime.fromisoformat, or a trailing Z
+        for UTC.
+
+    Returns
+    -------
+    int
+        The timestamp in nanoseconds.
+    """
+    if not isinstance(event_time, datetime.datetime):
+        event_time = event_time.strip()
+        if event_time.endswith('Z'):
+            event_time = event_time[:-1] + '+00:00'
+        event_time = datetime.datetime.fromisoformat(event_time)
+    seconds = int(event_time.replace(microsecond=0).timestamp())
+    return seconds * 1000000000 + event_time.microsecond * 1000
+
+def encode(measurement, tags, fields, timestamp=None):
+    """Returns the line of the line protocol of a point.
+
+    Parameters
+    ----------
+    measurement : str
+        The name of the measurement.
+
+    tags : dict
+        The tag values by tag key, in the order they are written.
+
+    fields : dict
+        The field values by field key, formatted with format_field_value.
+        There must be at least one field.
+
+    timestamp : int
+        The timestamp of the point in nanoseconds, or None to let InfluxDB
+        use the time the point is written.
+
+    Returns
+    -------
+    str
+        The line, without a trailing newline.
+    """
+    line = escape_measurement(measurement)
+    for (key, value) in tags.items():
+        line += ',' + escape_key(key) + '=' + escape_key(value)
+    line += ' ' + ','.join([escape_key(key) + '=' +
+                            (escape_string_field(value) if type(value) is str else format_field_value(value))
+                            for (key, value) in fields.items()])
+    if timestamp is not None and timestamp != '':
+        line += ' ' + str(timestamp)
+    return line
+
+def encode_many(points):
+    """Returns the lines of the line protocol of points, joined with newlines for one write.
+
+    Parameters
+    ----------
+    points : iterable
+        The points, as tuples of the arguments of encode: (measurement, tags,
+        fields) or (measurement, tags, fields, timestamp).
+
+    Returns
+    -------
+    str
+        The lines, without a trailing newline.
+    """
+    return '\n'.join([encode(*point) for point in points])
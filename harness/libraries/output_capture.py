@@ -0,0 +1,86 @@
+#! /usr/bin/env python3
+"""
+-------------------------------------------------------------------------------
+File:   output_capture.py
+National Center for Computational Sciences, Scientific Computing Group.
+Oak Ridge National Laboratory
+Copyright (C) 2023 Oak Ridge National Laboratory, UT-Battelle, LLC.
+-------------------------------------------------------------------------------
+"""
+
+import os
+
+# The marker between the head and the tail of an excerpt. {0} is the number
+# of bytes left out.
+OMITTED_MARKER = '\n[... {0} bytes omitted ...]\n'
+
+def read_output_tail(path, max_bytes, head_bytes=0):
+    """Returns an excerpt of at most max_bytes bytes of the end of a text file, e.g. the output of a build.
+
+    Only the excerpt is read from the file: the file is read from max_bytes
+    bytes before its end, so the memory used does not depend on the size of
+    the file. The excerpt starts at the first complete UTF-8 character, and
+    bytes that are not valid UTF-8 are replaced. Line endings are translated
+    to '\\n' as in a file opened in text mode.
+
+    Parameters
+    ----------
+    path : str
+        The path of the file.
+
+    max_bytes : int
+        The maximum number of bytes of the file in the excerpt.
+
+    head_bytes : int
+        If the file has more than max_bytes bytes, the excerpt is the first
+        head_bytes bytes of the file and its last max_bytes - head_bytes
+        bytes, separated by OMITTED_MARKER. By default the excerpt is only
+        the end of the file.
+
+    Returns
+    -------
+    str
+        The excerpt.
+    """
+    with open(path, 'rb') as file_obj:
+        size = os.fstat(file_obj.fileno()).st_size
+        if size <= max_bytes:
+            return _decode(file_obj.read(max_bytes))
+
+        head_bytes = max(0, min(head_bytes, max_bytes))
+        head = b''
+        if head_bytes > 0:
+            head = _trim_incomplete_character(file_obj.read(head_bytes))
+
+        tail_bytes = max_bytes - head_bytes
+        file_obj.seek(size - tail_bytes)
+        tail = _skip_continuation_bytes(file_obj.read(tail_bytes))
+
+    if head_bytes == 0:
+        return _decode(tail)
+    return _decode(head) + OMITTED_MARKER.format(size - len(head) - len(tail)) + _decode(tail)
+
+def _decode(data):
+    return data.decode('utf-8', errors='replace').replace('\r\n', '\n').replace('\r', '\n')
+
+def _skip_continuation_bytes(data):
+    """Drops the UTF-8 continuation bytes of a character cut at the start of data."""
+    start = 0
+    while start < min(3, len(data)) and (data[start] & 0xC0) == 0x80:
+        start += 1
+    return data[start:]
+
+def _trim_incomplete_character(data):
+    """Drops the bytes of a UTF-8 character cut at the end of data."""
+    for back in range(1, min(4, len(data)) + 1):
+        byte = data[-back]
+        if (byte & 0xC0) == 0x80:
+            # A continuation byte: the lead byte is further back.
+            continue
+        if byte >= 0xC0:
+            # The lead byte of a character of 2, 3 or 4 bytes.
+            length = 2 if byte < 0xE0 else 3 if byte < 0xF0 else 4
+            if back < length:
+                return data[:-back]
+        return data
+    return data
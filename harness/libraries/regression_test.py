@@ -47,7 +47,8 @@ class Harness:
                  log_level,
                  stdout_stderr,
                  use_fireworks,
-                 separate_build_stdio):
+                 separate_build_stdio,
+                 influx_log_jobs=1):
         self.__config = config
         self.__tests = rgt_input_file.get_tests()
         self.__tasks = rgt_input_file.get_harness_tasks()
@@ -60,6 +61,7 @@ class Harness:
         self.__num_workers = 1
         self.__use_fireworks = use_fireworks
         self.__separate_build_stdio = separate_build_stdio
+        self.__influx_log_jobs = influx_log_jobs
         self.__formAppTests()
 
         currenttime = time.localtime()
@@ -276,7 +278,8 @@ class Harness:
                                          self.__app_subtests[appname],
                                          self.__tasks,
                                          self.__stdout_stderr,
-                                         self.__separate_build_stdio)
+                                         self.__separate_build_stdio,
+                                         self.__influx_log_jobs)
                 future_to_appname[future] = appname
 
             # Log when all job tasks are initiated.
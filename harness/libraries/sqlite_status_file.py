@@ -0,0 +1,193 @@
+#! /usr/bin/env python3
+"""
+-------------------------------------------------------------------------------
+File:   sqlite_status_file.py
+National Center for Computational Sciences, Scientific Computing Group.
+Oak Ridge National Laboratory
+Copyright (C) 2023 Oak Ridge National Laboratory, UT-Battelle, LLC.
+-------------------------------------------------------------------------------
+"""
+
+import os
+import sqlite3
+import contextlib
+
+from libraries.layout_of_apps_directory import apptest_layout
+from libraries.status_file import StatusFile
+from libraries.status_file import read_status_file_lines
+
+class SQLiteStatusFile(StatusFile):
+    """StatusFile that keeps the test instance records in a SQLite database.
+
+    The records of a test are kept in the database rgt_status.db, next to
+    the status file rgt_status.txt of the test, in WAL mode so that the
+    drivers of a test can update their records concurrently. The events are
+    logged exactly as with StatusFile. The records of an existing status file
+    are imported when the database is created, and export_status_file writes
+    the records back in the format of rgt_status.txt.
+    """
+
+    # The database column of each status file column, in the order of
+    # StatusFile.STATUS_COLUMNS.
+    DATABASE_COLUMNS = ('start_time', 'launch_id', 'unique_id', 'run_count',
+                        'batch_job_id', 'build_status', 'submit_status', 'check_status')
+
+    def __init__(self,logger,path_to_status_file,test_id=None):
+        """Constructor.
+
+        Parameters
+        ----------
+        path_to_status_file : str
+            The fully qualified path to the subtest status file. The
+            database is created in the same directory.
+
+        """
+        self.__database_path = status_database_path(path_to_status_file)
+        super().__init__(logger, path_to_status_file, test_id=test_id)
+
+    ###################
+    # Public methods  #
+    ###################
+
+    @property
+    def database_path(self):
+        return self.__database_path
+
+    def tail_records(self, n):
+        """Returns the last n records of the status database, in the format of rgt_status.txt."""
+        return tail_status_database_records(self.status_file_path, n)
+
+    def didAllTestsPass(self):
+        """Checks if all tests have passed.
+
+        Returns
+        -------
+        bool
+            True if all tests have 0's for build, submit, and correct results.
+        """
+        with _connect(self.__database_path) as connection:
+            row = connection.execute('SELECT COUNT(*) FROM test_instances '
+                                     'WHERE build_status IS NOT ? OR submit_status IS NOT ? '
+                                     'OR check_status IS NOT ?',
+                                     (StatusFile.PASS, StatusFile.PASS, StatusFile.PASS)).fetchone()
+        return row[0] == 0
+
+    def export_status_file(self, path_to_text_file=None):
+        """Writes the records in the format of rgt_status.txt.
+
+        Parameters
+        ----------
+        path_to_text_file : str
+            The path of the file to write. The default is the status file
+            rgt_status.txt of the test.
+        """
+        if path_to_text_file is None:
+            path_to_text_file = self.status_file_path
+
+        lines = read_status_database_lines(self.status_file_path)
+
+        path_partial = path_to_text_file + '.partial.' + str(os.getpid())
+        with open(path_partial, 'w') as file_obj:
+            file_obj.writelines(lines)
+        os.replace(path_partial, path_to_text_file)
+
+    ###################
+    # Private methods #
+    ###################
+
+    def _create_status_file(self, path_to_status_file):
+        """Create the status database for this app/test if it doesn't exist."""
+        super()._create_status_file(path_to_status_file)
+
+        # The records of the status file are imported by the process that
+        # creates the database, and are read before the database exists.
+        new_database = not os.path.exists(self.__database_path)
+        legacy_lines = read_status_file_lines(path_to_status_file) if new_database else []
+
+        with _connect(self.__database_path) as connection:
+            connection.execute('PRAGMA journal_mode=WAL')
+            with connection:
+                connection.execute('CREATE TABLE IF NOT EXISTS test_instances ({0})'.format(
+                                   ', '.join(column + ' TEXT' for column in SQLiteStatusFile.DATABASE_COLUMNS)))
+                connection.execute('CREATE UNIQUE INDEX IF NOT EXISTS test_instances_unique_id '
+                                   'ON test_instances (unique_id)')
+                connection.execute('CREATE INDEX IF NOT EXISTS test_instances_start_time '
+                                   'ON test_instances (start_time)')
+
+                records = [line.split() for line in legacy_lines if not StatusFile.ignore_line(line)]
+                records = [words for words in records if len(words) == len(SQLiteStatusFile.DATABASE_COLUMNS)]
+                connection.executemany(_INSERT_RECORD, records)
+
+    def _add_record(self, words):
+        """Adds a record with the column values words to the status database."""
+        with _connect(self.__database_path) as connection:
+            with connection:
+                connection.execute(_INSERT_RECORD, tuple(words))
+
+    def _update_record(self, unique_id, updates):
+        """Sets columns of the record of unique_id.
+
+        Returns
+        -------
+        bool
+            True if a record for unique_id was found.
+        """
+        assignments = ', '.join(SQLiteStatusFile.DATABASE_COLUMNS[column] + ' = ?' for column in updates)
+        with _connect(self.__database_path) as connection:
+            with connection:
+                cursor = connection.execute('UPDATE test_instances SET ' + assignments + ' WHERE unique_id = ?',
+                                            tuple(updates.values()) + (unique_id,))
+        return cursor.rowcount > 0
+
+    def _subtest_already_initialized(self, unique_id):
+        return self._get_harness_id_record(unique_id) is not None
+
+    def _get_harness_id_record(self, harness_id):
+        with _connect(self.__database_path) as connection:
+            row = connection.execute(_SELECT_RECORDS + ' WHERE unique_id = ?', (harness_id,)).fetchone()
+        return None if row is None else StatusFile.format_record(row)
+
+#------------------------------------------------------------------------------
+
+_INSERT_RECORD = 'INSERT OR IGNORE INTO test_instances ({0}) VALUES ({1})'.format(
+                 ', '.join(SQLiteStatusFile.DATABASE_COLUMNS),
+                 ', '.join('?' for column in SQLiteStatusFile.DATABASE_COLUMNS))
+
+_SELECT_RECORDS = 'SELECT {0} FROM test_instances'.format(', '.join(SQLiteStatusFile.DATABASE_COLUMNS))
+
+def _connect(database_path):
+    connection = sqlite3.connect(database_path, timeout=60.0)
+    connection.execute('PRAGMA synchronous=NORMAL')
+    return contextlib.closing(connection)
+
+def status_database_path(path_to_status_file):
+    """Returns the path of the status database of a status file."""
+    return os.path.join(os.path.dirname(path_to_status_file), apptest_layout.test_status_db_filename)
+
+def read_status_database_lines(path_to_status_file):
+    """Returns the records of the status database in the format of rgt_status.txt.
+
+    If the test has no status database then None is returned.
+    """
+    database_path = status_database_path(path_to_status_file)
+    if not os.path.exists(database_path):
+        return None
+
+    with _connect(database_path) as connection:
+        rows = connection.execute(_SELECT_RECORDS + ' ORDER BY rowid').fetchall()
+
+    return StatusFile.header.splitlines(keepends=True) + [StatusFile.format_record(row) for row in rows]
+
+def tail_status_database_records(path_to_status_file, n):
+    """Returns the last n records of the status database in the format of rgt_status.txt.
+
+    If the test has no status database then None is returned.
+    """
+    database_path = status_database_path(path_to_status_file)
+    if not os.path.exists(database_path):
+        return None
+
+    with _connect(database_path) as connection:
+        rows = connection.execute(_SELECT_RECORDS + ' ORDER BY rowid DESC LIMIT ?', (n,)).fetchall()
+
+    return [StatusFile.format_record(row) for row in reversed(rows)]
@@ -17,6 +17,8 @@ import sqlite3
 
 #from libraries import input_files
 from libraries.status_file import StatusFile
+from libraries.event_ledger import read_event_records
+from libraries.layout_of_apps_directory import apptest_layout
 
 #------------------------------------------------------------------------------
 
@@ -92,9 +94,7 @@ class StatusDatabase:
                 self.__event_data[app][test][test_id] = {}
 
                 test_id_dir = os.path.join(status_dir, test_id)
-                event_filenames = [f for f in os.listdir(test_id_dir) if
-                                   os.path.isfile(os.path.join(test_id_dir, f))
-                                   and re.search(r'^Event_.*\.txt$', f)]
+                event_records = read_event_records(test_id_dir)
 
                 #---For every field of every event in the test instance,
                 #---collect the values it can take.
@@ -103,11 +103,7 @@ class StatusDatabase:
 
                 #---Process events that were recorded for this test instance.
 
-                for event_filename in event_filenames:
-
-                    file_ = open(os.path.join(test_id_dir, event_filename), 'r')
-                    line = file_.read()
-                    file_.close()
+                for event_filename, line in event_records.items():
 
                     line = re.sub('\n', '', line)
                     f_vs = [f_v.split('=') for f_v in line.split('\t')
@@ -18,7 +18,8 @@ import pprint
 import abc
 import urllib
 import glob
-import dateutil.parser
+import mmap
+import sqlite3
 import subprocess
 
 try:
@@ -28,6 +29,34 @@ except ImportError as e:
 
 
 from libraries.layout_of_apps_directory import apptest_layout
+from libraries.status_journal import StatusJournal
+from libraries.status_file_index import StatusFileIndex
+from libraries.status_file_lock import StatusFileLock
+from libraries.influx_client import influx_client
+from libraries.influx_client import influx_client_metrics
+from libraries.influx_client import InfluxCircuitOpenError
+from libraries.influx_outbox import influx_outbox
+from libraries.output_capture import read_output_tail
+from libraries.line_protocol import encode
+from libraries.line_protocol import timestamp_ns
+from libraries.status_file_archive import StatusFileArchive
+from libraries.event_ledger import EventLedger
+from libraries.event_ledger import format_event_record
+from libraries.event_ledger import read_event_record
+from libraries.status_info_cache import StatusInfoCache
+from libraries.status_file_model import StatusFileModel
+from libraries.event_dispatcher import EventDispatcher
+from libraries.system_log_transport import syslog_transport
+from libraries.system_log_transport import file_transport
+
+def _fixed_width_columns(line_format):
+    """Returns the (offset, width) of each column of a fixed-width record format."""
+    columns = []
+    offset = 0
+    for width in re.findall(r'%-(\d+)s', line_format):
+        columns.append((offset, int(width)))
+        offset += int(width) + 1
+    return tuple(columns)
 
 class StatusFile:
     """Perform operations pertaining to logging the status of jobs."""
@@ -71,6 +100,11 @@ class StatusFile:
     header += spaces_header
     header += hashes_header
 
+    # The byte offset and width of each column within a record. Every record
+    # written with __LINE_FORMAT has the same length, so a column of a record
+    # can be overwritten in place once the offset of the record is known.
+    __COLUMN_LAYOUT = _fixed_width_columns(__LINE_FORMAT)
+
     # Name of the input file.
     FILENAME = apptest_layout.test_status_filename
     """str: The filename of the subtest status file."""
@@ -161,6 +195,10 @@ class StatusFile:
 
     NO_VALUE = '[NO_VALUE]'
 
+    # The maximum number of bytes of output in the output_txt field of the
+    # InfluxDB events.
+    OUTPUT_TXT_MAX_BYTES = 65534
+
     #---Influx key identifiers.
     INFLUX_TAGS = [
                 'test_id',
@@ -220,6 +258,22 @@ class StatusFile:
     PASS = "0"
     FAIL = "1"
     PLACE_HOLDER = r"***"
+
+    # The status file column updated by each mode of __status_file_add_result.
+    RESULT_MODE_COLUMNS = {"Add_Job_ID" : STATUS_COLUMN_BATCH,
+                           "Add_Build_Result" : STATUS_COLUMN_BUILD,
+                           "Add_Run_Count" : STATUS_COLUMN_COUNT,
+                           "Add_Submit_Result" : STATUS_COLUMN_SUBMIT,
+                           "Add_Run_Result" : STATUS_COLUMN_CHECK,
+                           "Add_Binary_Running" : STATUS_COLUMN_CHECK,
+                           "Add_Run_Aborning" : STATUS_COLUMN_CHECK}
+    # The status file backends, selected with RGT_STATUS_BACKEND.
+    BACKEND_TEXT = 'text'
+    BACKEND_SQLITE = 'sqlite'
+
+    # The default size in bytes of the status file journal that
+    # triggers a compaction.
+    JOURNAL_MAX_BYTES = 262144
     #-----------------------------------------------------
     #                                                    -
     # End of section for standard values of the          -
@@ -294,6 +348,42 @@ class StatusFile:
 
         return result
 
+    @staticmethod
+    def _record_key(line):
+        """Returns the unique id of a status file line (bytes), or None if the line is not a record."""
+        words = line.split()
+        unique_col = StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_UNIQUE]
+        if len(words) > unique_col and not words[0].startswith(StatusFile.COMMENT_LINE_INDICATOR.encode()):
+            return words[unique_col]
+        return None
+
+    @staticmethod
+    def _record_is_finished(words):
+        """Indicates whether the record with the column values words is of a completed subtest."""
+
+        # If batch column, build column, submit column, or check column equals StatusFile.PLACE_HOLDER
+        # then we are not finished. The test is still in progress.
+        batch_col = StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_BATCH]
+        if words[batch_col:].count(StatusFile.PLACE_HOLDER) >= 1:
+            return False
+
+        # The check column must indicate that the test is no longer pending and not in progress.
+        check_col = StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_CHECK]
+        check_val = int(words[check_col])
+        return (check_val  > int(StatusFile.CHECK_RESULTS["Pending"]) and
+                check_val != int(StatusFile.CHECK_RESULTS["In progress"]))
+
+    @staticmethod
+    def _record_passed(words):
+        """Indicates whether the record with the column values words has 0's for build, submit, and correct results."""
+        build_col = StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_BUILD]
+        return words[build_col:].count(StatusFile.PASS) == 3
+
+    @classmethod
+    def format_record(cls, words):
+        """Returns the fixed-width status file line for the column values in words."""
+        return cls.__LINE_FORMAT % tuple(words)
+
     @classmethod
     def validate_mode(cls,mode):
         """Validates that we are using a valid mode."""
@@ -323,8 +413,53 @@ class StatusFile:
         # The first task is set the path to status file.
         self.__status_file_path = path_to_status_file
 
+        # The advisory lock serializing the updates of the status file by
+        # the harness processes of the test.
+        self.__lock = StatusFileLock(path_to_status_file)
+
         # The second task is to create the status file.
-        self.__create_status_file(path_to_status_file)
+        self._create_status_file(path_to_status_file)
+
+        # In journal mode the changes to the status file are appended to a
+        # journal that is compacted back into the status file.
+        self.__journal = StatusJournal(path_to_status_file)
+        self.__journal_mode = (os.environ.get('RGT_STATUS_JOURNAL') == '1')
+        self.__journal_max_bytes = int(os.environ.get('RGT_STATUS_JOURNAL_MAX_BYTES',
+                                                      StatusFile.JOURNAL_MAX_BYTES))
+        # The unique ids of the records known to be in the status file or
+        # its journal, so that each is looked up once in journal mode.
+        self.__journal_record_ids = set()
+
+        # The sidecar index of the offsets of the records, unless disabled.
+        if os.environ.get('RGT_STATUS_INDEX') == '0':
+            self.__index = None
+        else:
+            self.__index = StatusFileIndex(path_to_status_file, StatusFile._record_key)
+
+        # The records rotated out of the status file, and the size in bytes
+        # and age in days of the status file that trigger a rotation.
+        self.__archive = StatusFileArchive(path_to_status_file)
+        self.__rotate_bytes = int(os.environ.get('RGT_STATUS_ROTATE_BYTES', 0))
+        self.__rotate_days = float(os.environ.get('RGT_STATUS_ROTATE_DAYS', 0))
+
+        # A journal left behind by a run in journal mode must be folded in
+        # before the status file is updated in place.
+        if not self.__journal_mode and self.__journal.exists():
+            self.compact_status_journal()
+
+        # Unless disabled, the records updated by this process are kept in
+        # memory and written back to the status file at the end of each event.
+        self.__model = None
+        if not self.__journal_mode and os.environ.get('RGT_STATUS_WRITE_BACK') != '0':
+            self.__model = StatusFileModel()
+
+        # With asynchronous event dispatch the events are sent to the system
+        # log and to InfluxDB by background workers.
+        self.__dispatcher = None
+        if EventDispatcher.enabled():
+            self.__dispatcher = EventDispatcher(logger)
+            self.__dispatcher.add_sink('system_log', StatusFile.__deliver_to_system_log)
+            self.__dispatcher.add_sink('influx', self.__deliver_to_influx)
 
     ###################
     # Public methods  #
@@ -362,8 +497,9 @@ class StatusFile:
         str
             The harness id of the latest entry in the subtest status file.
         """
-        with open(self.__status_file_path, "r") as file_obj:
-            records = file_obj.readlines()
+        records = self.tail_records(1)
+        if not records:
+            return None
 
         line = records[-1]
         words = line.rstrip().split()
@@ -374,6 +510,26 @@ class StatusFile:
             subtest_harness_id = None
         return subtest_harness_id
 
+    def tail_records(self, n):
+        """Returns the last n records of the subtest status file.
+
+        The status file is read backwards from its end, so the time taken
+        does not grow with the number of records in the file.
+
+        Parameters
+        ----------
+        n : int
+            The number of records to return.
+
+        Returns
+        -------
+        list of str
+            The last n records (or fewer, if the status file has fewer), in
+            the order of the status file.
+        """
+        with self.__lock.shared():
+            return tail_status_file_records(self.__status_file_path, n)
+
     def log_event(self, event_id, event_value=NO_VALUE):
         """
             Log the occurrence of a harness event.
@@ -425,30 +581,14 @@ class StatusFile:
         """
         # Get the corresponding record from the status file that
         # lists the test results for subtest_harness_id.
-        record = self.__get_harness_id_record(subtest_harness_id)
+        record = self._get_harness_id_record(subtest_harness_id)
 
         if record == None:
             test_finished = False
         else:
             # Strip line/record of all leading and trailing whitespace.
             record = record.strip()
-
-            # If batch column, build column, submit column, or check column equals StatusFile.PLACE_HOLDER
-            # then we are not finished. The test is still in progress.
-            words = record.split()
-            batch_col = StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_BATCH]
-            tmp_words = words[batch_col:]
-            if tmp_words.count(StatusFile.PLACE_HOLDER) >= 1:
-                test_finished = False
-            else:
-                # The check column must indicate that the test is no longer pending and not in progress.
-                check_col = StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_CHECK]
-                check_val = int(words[check_col])
-                if (check_val  > int(StatusFile.CHECK_RESULTS["Pending"]) and
-                    check_val != int(StatusFile.CHECK_RESULTS["In progress"])):
-                    test_finished = True
-                else:
-                    test_finished = False
+            test_finished = StatusFile._record_is_finished(record.split())
 
         return test_finished
 
@@ -459,31 +599,78 @@ class StatusFile:
             Supplying status_info_dict will bypass the step of loading in entries to a dict
         """
         self.__logger.doInfoLogging(f"Posting event: {event_id} with test id: {self.__test_id} to Influx")
+        influx_event_record_string = self.influx_event_record(event_id, status_info_dict=status_info_dict)
+        if influx_event_record_string is None:
+            return False
+
+        # Write event to InfluxDB
+        if 'RGT_INFLUX_URI' in os.environ and 'RGT_INFLUX_TOKEN' in os.environ:
+            if 'RGT_DISABLE_INFLUX' in os.environ and str(os.environ['RGT_DISABLE_INFLUX']) == '1':
+                self.__logger.doWarningLogging("InfluxDB logging is explicitly disabled with RGT_DISABLE_INFLUX=1")
+            else:
+                influx_url = os.environ['RGT_INFLUX_URI']
+                influx_token = os.environ['RGT_INFLUX_TOKEN']
+        
+                self.__logger.doInfoLogging(f"Logging event to influx: {influx_event_record_string}")
+                headers = {'Authorization': "Token " + influx_token, 'Content-Type': "text/plain; charset=utf-8", 'Accept': "application/json"}
+
+                outbox = influx_outbox()
+                try:
+                    if 'RGT_INFLUX_NO_SEND' in os.environ and os.environ['RGT_INFLUX_NO_SEND'] == '1':
+                        print(f"RGT_INFLUX_NO_SEND is set, echoing: {influx_event_record_string}")
+                    elif outbox is not None:
+                        # The events of the process are sent together when it exits.
+                        outbox.put(influx_event_record_string)
+                        outbox.flush_at_exit(influx_url, headers)
+                        self.__logger.doInfoLogging(f"Queued the event in the InfluxDB outbox {outbox.path}: {influx_event_record_string}")
+                    elif not 'requests' in sys.modules:
+                        self.__logger.doWarningLogging(f"InfluxDB is currently disabled. Reason: 'requests' module was unable to load. Skipping InfluxDB message: {influx_event_record_string}. This can be logged after the run using the harness --mode influx_log or by POSTing this message to the InfluxDB server.")
+                    else:
+                        r = influx_client().write(influx_url, influx_event_record_string, headers=headers)
+                        if r.status_code == 200 or r.status_code == 204:
+                            self.__logger.doInfoLogging(f"Logged to InfluxDB successfully ({r.status_code}, {r.reason}): {influx_event_record_string}")
+                        else:
+                            self.__logger.doInfoLogging(f"Failed to post request. Response: {r.status_code} - {r.reason}")
+                except InfluxCircuitOpenError as e:
+                    self.__logger.doWarningLogging(f"{e.message} Request not sent: {influx_event_record_string}")
+                except requests.exceptions.ConnectionError as e:
+                    self.__logger.doWarningLogging(f"InfluxDB is not reachable. Request not sent: {influx_event_record_string}")
+                except requests.exceptions.Timeout as e:
+                    self.__logger.doWarningLogging(f"InfluxDB did not respond in time. Request not completed: {influx_event_record_string}")
+                except Exception as e:
+                    # TODO: add more graceful handling of unreachable influx servers
+                    self.__logger.doErrorLogging(f"An error occurred {e}")
+
+    def influx_event_record(self, event_id, status_info_dict=None, test_id=None):
+        """
+            Returns the line-protocol record of the event for InfluxDB, or None if it cannot be made.
+            Takes the fields from the event file of the test instance unless status_info_dict is supplied,
+            as post_event_to_influx. test_id selects the test instance, the one of this object by default,
+            so that one object makes the records of many test instances.
+        """
+        if test_id is None:
+            test_id = self.__test_id
         if status_info_dict == None:
             self.__logger.doInfoLogging(f"Reading fields from status file")
             # then load the contents of the status file into a dict
             event_filename = StatusFile.EVENT_DICT[event_id][0]
-            dir_head = os.path.split(os.getcwd())[0]
-            file_path = os.path.join(dir_head, apptest_layout.test_status_dirname, str(self.__test_id),
-                                 event_filename)
-            if not os.path.exists(file_path):
+            test_status_dir = os.path.join(os.path.dirname(self.__status_file_path), str(test_id))
+            file_path = os.path.join(test_status_dir, event_filename)
+            event_record = read_event_record(test_status_dir, event_filename)
+            if event_record is None:
                 self.__logger.doWarningLogging(f"Couldn't find status file to log to Influx: {file_path}. Returning.")
-                return False
+                return None
             status_info_dict = {}
-            with open(file_path, 'r') as cur_status_file:
-                line = cur_status_file.readline()
-                line = line.split('\t')
-                self.__logger.doInfoLogging(f"Got line: {line} from status file: {cur_status_file}")
-                # Exclude entry 0 (timestamp) - iso-formatted
-                status_info_dict['event_time'] = line[0]
-                status_info_dict['event_value'] = line[1]
-                status_info_dict['test_id'] = self.__test_id
-                for index in range(2, len(line)):
-                    key, value = line[index].split('=')
-                    # In the case of test_instance, there is a comma-separated list which conflicts with Influx
-                    if ',' in value:
-                        value = f'"{value}"'
-                    status_info_dict[key] = value
+            line = event_record.splitlines()[0]
+            line = line.split('\t')
+            self.__logger.doInfoLogging(f"Got line: {line} from status file: {file_path}")
+            # Exclude entry 0 (timestamp) - iso-formatted
+            status_info_dict['event_time'] = line[0]
+            status_info_dict['event_value'] = line[1]
+            status_info_dict['test_id'] = test_id
+            for index in range(2, len(line)):
+                key, value = line[index].split('=')
+                status_info_dict[key] = value
 
         self.__logger.doInfoLogging(f"Finished initializing event information")
         if not 'machine' in status_info_dict:
@@ -492,20 +679,20 @@ class StatusFile:
             self.__logger.doInfoLogging("For compatibility, falling back to os.environ[RGT_MACHINE_NAME]")
             if not 'RGT_MACHINE_NAME' in os.environ:
                 self.__logger.doErrorLogging("RGT_MACHINE_NAME not found in os.environ")
-                return False
+                return None
             status_info_dict['machine'] = os.environ['RGT_MACHINE_NAME']
         # Initialize the tags for record string
-        influx_event_record_string = 'events'
+        tags = {}
         for tag_name in StatusFile.INFLUX_TAGS:
             if not tag_name in status_info_dict:
                 self.__logger.doErrorLogging(f"Influx key not found in status_info_dict: {tag_name}. Aborting.")
-                return False
-            influx_event_record_string += f',{tag_name}={status_info_dict[tag_name]}'
-        # Remove the 'test_instance' key, since it contains comma-separated values
+                return None
+            tags[tag_name] = status_info_dict[tag_name]
+        # Replace the commas of the 'test_instance' key, since it contains comma-separated values
         if 'test_instance' in status_info_dict.keys():
             status_info_dict['test_instance'] = status_info_dict['test_instance'].replace(',', '-')
         # Add fields to influx record string
-        nkeys = 0
+        fields = {}
         for field_name in StatusFile.INFLUX_FIELDS:
             if field_name == 'output_txt':
                 continue
@@ -514,94 +701,33 @@ class StatusFile:
                 if not (field_name == 'comment' or field_name == 'reason'):
                     self.__logger.doWarningLogging(f"Couldn't find field to append in influx event string: {field_name}. Setting to NOVALUE")
                 status_info_dict[field_name] = StatusFile.NO_VALUE
-            if nkeys > 0:
-                influx_event_record_string += ','
-            else:
-                influx_event_record_string += ' '
-            influx_event_record_string += f'{field_name}="{status_info_dict[field_name]}"'
-            nkeys += 1
-        event_time_unix = dateutil.parser.parse(status_info_dict['event_time']).strftime('%s%f') + "000"
+            fields[field_name] = str(status_info_dict[field_name])
+        event_time_ns = timestamp_ns(status_info_dict['event_time'])
 
         # Add handling for pasting outputs to influxdb
+        fields['output_txt'] = StatusFile.NO_VALUE
         if status_info_dict['event_name'] == "build_end":
             file_name = status_info_dict['run_archive'] + "/build_directory/" + "output_build.txt"
             self.__logger.doInfoLogging(f"Using {file_name} for build output for Influx")
             if os.path.exists(file_name):
-                with open(file_name, "r") as f:
-                    output = f.read()
-                    # Truncate to 64 kb
-                    output = output[-65534:].replace('"', '\\"')
-                    influx_event_record_string += ",output_txt=\"" + output + "\""
-            else:
-                influx_event_record_string += ",output_txt=\"" + StatusFile.NO_VALUE  + "\""
+                fields['output_txt'] = StatusFile.__read_output_txt(file_name)
         elif status_info_dict['event_name'] == "submit_end":
             file_name = status_info_dict['run_archive'] + "/" + "submit.err"
             self.__logger.doInfoLogging(f"Using {file_name} for submit errors for Influx")
             if os.path.exists(file_name):
-                with open(file_name, "r") as f:
-                    output = f.read()
-                    # Truncate to 64 kb
-                    output = output[-65534:].replace('"', '\\"')
-                    influx_event_record_string += ",output_txt=\"" + output + "\""
-            else:
-                influx_event_record_string += ",output_txt=\"" + StatusFile.NO_VALUE  + "\""
+                fields['output_txt'] = StatusFile.__read_output_txt(file_name)
         elif status_info_dict['event_name'] == "binary_execute_end":
-            found_job_file = False
             for file_name in glob.glob(status_info_dict['run_archive'] + "/*.o" + status_info_dict['job_id']):
                 self.__logger.doInfoLogging(f"Using {file_name} for job output for Influx")
                 if os.path.exists(file_name):
-                    found_job_file = True
-                    with open(file_name, "r") as f:
-                        output = f.read()
-                        # Truncate to 64 kb
-                        output = output[-65534:].replace('"', '\\"')
-                        influx_event_record_string += ",output_txt=\"" + output + "\""
-            if not found_job_file:
-                influx_event_record_string += ",output_txt=\"" + StatusFile.NO_VALUE  + "\""
+                    fields['output_txt'] = StatusFile.__read_output_txt(file_name)
         elif status_info_dict['event_name'] == "check_end":
             file_name = status_info_dict['run_archive'] + "/" + "output_check.txt"
             self.__logger.doInfoLogging(f"Using {file_name} for check output for Influx")
             if os.path.exists(file_name):
-                with open(file_name, "r") as f:
-                    output = f.read()
-                    # Truncate to 64 kb
-                    output = output[-65534:].replace('"', '\\"')
-                    influx_event_record_string += ",output_txt=\"" + output + "\""
-            else:
-                influx_event_record_string += ",output_txt=\"" + StatusFile.NO_VALUE  + "\""
-        else:
-            influx_event_record_string += ",output_txt=\"" + StatusFile.NO_VALUE  + "\""
-
-        influx_event_record_string += f" {str(event_time_unix)}"
-
-        # Write event to InfluxDB
-        if 'RGT_INFLUX_URI' in os.environ and 'RGT_INFLUX_TOKEN' in os.environ:
-            if 'RGT_DISABLE_INFLUX' in os.environ and str(os.environ['RGT_DISABLE_INFLUX']) == '1':
-                self.__logger.doWarningLogging("InfluxDB logging is explicitly disabled with RGT_DISABLE_INFLUX=1")
-            else:
-                influx_url = os.environ['RGT_INFLUX_URI']
-                influx_token = os.environ['RGT_INFLUX_TOKEN']
-        
-                self.__logger.doInfoLogging(f"Logging event to influx: {influx_event_record_string}")
-                headers = {'Authorization': "Token " + influx_token, 'Content-Type': "text/plain; charset=utf-8", 'Accept': "application/json"}
-
-                try:
-                    if 'RGT_INFLUX_NO_SEND' in os.environ and os.environ['RGT_INFLUX_NO_SEND'] == '1':
-                        print(f"RGT_INFLUX_NO_SEND is set, echoing: {influx_event_record_string}")
-                    elif not 'requests' in sys.modules:
-                        self.__logger.doWarningLogging(f"InfluxDB is currently disabled. Reason: 'requests' module was unable to load. Skipping InfluxDB message: {influx_event_record_string}. This can be logged after the run using the harness --mode influx_log or by POSTing this message to the InfluxDB server.")
-                    else:
-                        r = requests.post(influx_url, data=influx_event_record_string, headers=headers)
-                        if r.status_code == 200 or r.status_code == 204:
-                            self.__logger.doInfoLogging(f"Logged to InfluxDB successfully ({r.status_code}, {r.reason}): {influx_event_record_string}")
-                        else:
-                            self.__logger.doInfoLogging(f"Failed to post request. Response: {r.status_code} - {r.reason}")
-                except requests.exceptions.ConnectionError as e:
-                    self.__logger.doWarningLogging(f"InfluxDB is not reachable. Request not sent: {influx_event_record_string}")
-                except Exception as e:
-                    # TODO: add more graceful handling of unreachable influx servers
-                    self.__logger.doErrorLogging(f"An error occurred {e}")
+                fields['output_txt'] = StatusFile.__read_output_txt(file_name)
 
+        return encode('events', tags, fields, event_time_ns)
 
     def didAllTestsPass(self):
         """ Checks if all tests have passed.
@@ -615,53 +741,178 @@ class StatusFile:
         """
         ret_value = True
 
-        with open(self.__status_file_path, 'r') as status_file_obj:
-            records = status_file_obj.readlines()
-
-        verify_test_passed = lambda a_list : True if a_list.count(StatusFile.PASS) == 3 else False
-
-        build_col = StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_BUILD]
+        records = self.__read_records()
 
         for index, line in enumerate(records):
             if self.ignore_line(line):
                 continue
 
             words = line.rstrip().split()
-            tmp_words = words[build_col:]
 
-            ret_value = ret_value and verify_test_passed(tmp_words)
+            ret_value = ret_value and StatusFile._record_passed(words)
+
+        # The records rotated out of the status file are counted in the archive manifest.
+        if self.__archive.failed_records() > 0:
+            ret_value = False
 
         return ret_value
 
+    def log_lock_metrics(self):
+        """Logs the time spent waiting for and holding the status file lock."""
+        metrics = self.__lock.metrics()
+        if metrics['acquisitions'] == 0:
+            return
+        message = ("Status file lock {lock}: {acquisitions} acquisitions, {contended} contended, "
+                   "wait {wait_seconds_total:.6f}s total / {wait_seconds_max:.6f}s max, "
+                   "hold {hold_seconds_total:.6f}s total / {hold_seconds_max:.6f}s max")
+        self.__logger.doInfoLogging(message.format(lock=self.__lock.lock_path, **metrics))
+
+    def close_event_dispatcher(self):
+        """Waits for the events to be delivered to the system log and InfluxDB, and logs the delivery times.
+
+        Does nothing unless the events are dispatched asynchronously.
+        """
+        if self.__dispatcher is None:
+            return
+        self.__dispatcher.close()
+        message = ("Event sink {sink}: {events} events, {failures} failures, {queue_full} waits for a full queue, "
+                   "queued {wait_seconds_total:.6f}s total / {wait_seconds_max:.6f}s max, "
+                   "delivered in {deliver_seconds_total:.6f}s total / {deliver_seconds_max:.6f}s max")
+        for (sink, metrics) in self.__dispatcher.metrics().items():
+            self.__logger.doInfoLogging(message.format(sink=sink, **metrics))
+
+    def log_status_info_cache_metrics(self):
+        """Logs the hits of the cache of the test instance information of the events."""
+        metrics = _STATUS_INFO_CACHE.metrics()
+        if metrics['events'] == 0:
+            return
+        message = ("Event status info cache: {events} events, {context_hits} context hits / {context_misses} misses, "
+                   "{file_hits} file hits / {file_reads} reads, saved {seconds_saved:.6f}s total / "
+                   "{seconds_saved_per_event:.6f}s per event")
+        self.__logger.doInfoLogging(message.format(seconds_saved_per_event=metrics['seconds_saved'] / metrics['events'],
+                                                   **metrics))
+
+    def log_influx_client_metrics(self):
+        """Logs the requests to InfluxDB, and the state and skipped requests of its circuit breaker."""
+        metrics = influx_client_metrics()
+        if metrics is None:
+            return
+        message = ("InfluxDB client: {requests} requests, {failures} failures, {skipped} skipped by the circuit breaker, "
+                   "breaker opened {breaker_opened} times, breaker {breaker_state}, "
+                   "{write_bytes} bytes written as {write_bytes_sent} bytes")
+        self.__logger.doInfoLogging(message.format(**metrics))
+
+    def rotate_if_needed(self):
+        """Rotates the status file if it has reached its size or age limit.
+
+        The limits are set with RGT_STATUS_ROTATE_BYTES and RGT_STATUS_ROTATE_DAYS.
+        The age of the status file is the time since its last rotation, or
+        since the start of its first record if it was never rotated.
+
+        Returns
+        -------
+        bool
+            True if the status file was rotated.
+        """
+        rotate = False
+        if self.__rotate_bytes > 0 and os.path.getsize(self.__status_file_path) >= self.__rotate_bytes:
+            rotate = True
+        elif self.__rotate_days > 0:
+            last_rotation = self.__archive.last_rotation()
+            if last_rotation is None:
+                last_rotation = self.__first_record_start_time()
+            if last_rotation is not None:
+                rotate = (datetime.datetime.now() - last_rotation >= datetime.timedelta(days=self.__rotate_days))
+
+        if rotate:
+            self.rotate()
+        return rotate
+
+    def rotate(self):
+        """Moves the records of completed subtests to a new compressed segment of the archive.
+
+        The records of subtests in progress, and the last record, stay in the
+        status file, so that the harness only ever updates the status file.
+
+        Returns
+        -------
+        int
+            The number of records moved to the archive.
+        """
+        # Results still in the journal must be in the records that are moved.
+        if self.__journal.exists():
+            self.compact_status_journal()
+            if self.__journal.exists():
+                self.__logger.doWarningLogging("Warning: the status file journal is being compacted. "
+                                               "Not rotating the status file.")
+                return 0
+
+        with self.__lock:
+            self.__remove_pending_segment_records()
+
+            with open(self.__status_file_path, 'r') as status_file_obj:
+                lines = status_file_obj.readlines()
+
+            record_indices = [index for (index, line) in enumerate(lines) if not StatusFile.ignore_line(line)]
+            last_record_index = record_indices[-1] if record_indices else None
+
+            kept_lines = []
+            moved_lines = []
+            for (index, line) in enumerate(lines):
+                words = line.split()
+                if (index != last_record_index and not StatusFile.ignore_line(line) and
+                    len(words) == len(StatusFile.STATUS_COLUMNS) and _is_finished_record(words)):
+                    moved_lines.append(line)
+                else:
+                    kept_lines.append(line)
+
+            if moved_lines:
+                self.__archive.add_pending_segment(moved_lines, _archive_segment_summary(moved_lines))
+                self.__replace_status_file(kept_lines)
+                self.__archive.commit_pending_segment()
+            self.__archive.record_rotation()
+
+        if moved_lines:
+            self.__logger.doInfoLogging(f"Rotated {len(moved_lines)} records of {self.__status_file_path} "
+                                        f"to {self.__archive.archive_dir}")
+        return len(moved_lines)
+
+    def compact_status_journal(self):
+        """Folds the status file journal into the status file.
+
+        Returns
+        -------
+        bool
+            False if another process is already compacting the journal.
+        """
+        return self.__journal.compact(self.__fold_journal)
+
     ###################
     # Private methods #
     ###################
     def _subtest_already_initialized(self, unique_id):
-        found_instance = False
+        return self._get_harness_id_record(unique_id) is not None
 
-        with open(self.__status_file_path, 'r') as status_file_obj:
-            records = status_file_obj.readlines()
-
-        unique_col = StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_UNIQUE]
-
-        for index, line in enumerate(records):
-            words = line.rstrip().split()
-
-            if self.ignore_line(line):
-                continue
+    def _get_harness_id_record(self, harness_id):
+        record = self.__get_status_file_record(harness_id)
+        if record is None:
+            record = self.__find_archived_record(harness_id)
+        return record
 
-            if len(words) > unique_col:
-                test_id = words[unique_col]
-                if test_id == unique_id:
-                    found_instance = True
-                    break
+    def __get_status_file_record(self, harness_id):
+        if self.__model is not None:
+            row = self.__model.row(harness_id)
+            if (row is not None and not self.__model.dirty_rows() and
+                self.__model.is_current(os.stat(self.__status_file_path))):
+                return StatusFile.format_record(row[1])
 
-        return found_instance
+        if not self.__journal.exists():
+            with self.__lock.shared():
+                (offset, record) = self._find_record_offset(harness_id)
+            return None if record is None else record.decode()
 
-    def __get_harness_id_record(self, harness_id):
         record = None
-        with open(self.__status_file_path, 'r') as status_file_obj:
-            records = status_file_obj.readlines()
+        records = self.__read_records()
 
         unique_col = StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_UNIQUE]
 
@@ -678,8 +929,7 @@ class StatusFile:
         return record
 
     def __get_all_harness_id(self):
-        with open(self.__status_file_path, 'r') as status_file_obj:
-            records = status_file_obj.readlines()
+        records = self.__read_records()
 
         unique_col = StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_UNIQUE]
 
@@ -712,39 +962,51 @@ class StatusFile:
         status_info = get_status_info(self.__test_id, event_type,
                                       event_subtype, event_value,
                                       event_time, event_filename)
-        event_record_string = event_time + '\t' + event_value
+        event_record_string = format_event_record(event_time, event_value, status_info)
         status_info_dict = {}
         for key_value in status_info:
-            event_record_string += '\t' + key_value[0] + '=' + key_value[1]
             # Remap into an easier to use format
             status_info_dict[key_value[0]] = key_value[1]
-        event_record_string += '\n'
-
-        # Write a temporary file with the event info, then
-        # (atomically) rename it to the permanent file,
-        # to avoid possibility of a partially completed file.
 
         dir_head = os.path.split(os.getcwd())[0]
-        file_path = os.path.join(dir_head, apptest_layout.test_status_dirname, str(self.__test_id),
-                                 event_filename)
-        if os.path.exists(file_path):
-            self.__logger.doWarningLogging('Warning: event log file already exists. ' + file_path)
-
-        file_path_partial = os.path.join(dir_head, apptest_layout.test_status_dirname,
-                                         str(self.__test_id),
-                                         'partial.' + event_filename)
-
-        file_ = open(file_path_partial, 'w')
-        file_.write(event_record_string)
-        file_.close()
-
-        # THE FOLLOWING CREATES THE OFFICIAL MASTER INDICATOR DENOTING
-        # THAT THE EVENT OCCURRED.
-        os.rename(file_path_partial, file_path)
-
-        # Put the same event data on the system log.
+        test_status_dir = os.path.join(dir_head, apptest_layout.test_status_dirname, str(self.__test_id))
 
-        write_system_log(self.__test_id, status_info)
+        if EventLedger.enabled():
+            # THE FOLLOWING APPENDS THE OFFICIAL MASTER INDICATOR DENOTING
+            # THAT THE EVENT OCCURRED TO THE EVENT LEDGER.
+            EventLedger(test_status_dir).append(event_filename, event_time, event_value, status_info)
+        else:
+            # Write a temporary file with the event info, then
+            # (atomically) rename it to the permanent file,
+            # to avoid possibility of a partially completed file.
+
+            file_path = os.path.join(test_status_dir, event_filename)
+            if os.path.exists(file_path):
+                self.__logger.doWarningLogging('Warning: event log file already exists. ' + file_path)
+
+            file_path_partial = os.path.join(test_status_dir, 'partial.' + event_filename)
+
+            file_ = open(file_path_partial, 'w')
+            file_.write(event_record_string)
+            if self.__dispatcher is not None:
+                # The event file is the only record of the event that is
+                # certain to be complete when log_event returns.
+                file_.flush()
+                os.fsync(file_.fileno())
+            file_.close()
+
+            # THE FOLLOWING CREATES THE OFFICIAL MASTER INDICATOR DENOTING
+            # THAT THE EVENT OCCURRED.
+            os.rename(file_path_partial, file_path)
+
+        # Put the same event data on the system log, and post it to InfluxDB
+        # after the status file is updated, in the background with
+        # asynchronous event dispatch.
+
+        if self.__dispatcher is not None:
+            self.__dispatcher.dispatch(event_id, event_id, self.__test_id, status_info, status_info_dict)
+        else:
+            write_system_log(self.__test_id, status_info)
 
         # Update the status file appropriately.
         if event_id == StatusFile.EVENT_BUILD_END:
@@ -762,13 +1024,31 @@ class StatusFile:
         elif event_id == StatusFile.EVENT_CHECK_END:
             self.__status_file_add_result(event_value, mode="Add_Run_Result")
 
-        self.post_event_to_influx(event_id, status_info_dict=status_info_dict)
+        if self.__model is not None:
+            self.__flush_status_file_model()
+
+        if self.__dispatcher is None:
+            self.post_event_to_influx(event_id, status_info_dict=status_info_dict)
 
         return event_time
 
+    @staticmethod
+    def __deliver_to_system_log(event_id, test_id, status_info, status_info_dict):
+        write_system_log(test_id, status_info)
+
+    def __deliver_to_influx(self, event_id, test_id, status_info, status_info_dict):
+        return self.post_event_to_influx(event_id, status_info_dict=status_info_dict)
+
+    @staticmethod
+    def __read_output_txt(file_name):
+        """Returns the last OUTPUT_TXT_MAX_BYTES bytes of an output file, or its head and tail if
+        RGT_INFLUX_OUTPUT_HEAD_BYTES is set, without reading the rest of the file."""
+        head_bytes = int(os.environ.get('RGT_INFLUX_OUTPUT_HEAD_BYTES', 0))
+        return read_output_tail(file_name, StatusFile.OUTPUT_TXT_MAX_BYTES, head_bytes=head_bytes)
+
     #----------
 
-    def __create_status_file(self,path_to_status_file):
+    def _create_status_file(self,path_to_status_file):
         """Create the status file for this app/test if it doesn't exist."""
         if not os.path.exists(path_to_status_file):
             with open(self.__status_file_path, "w") as file_obj :
@@ -779,70 +1059,241 @@ class StatusFile:
     def __status_file_add_result(self, event_value, mode):
         """Update the status file to reflect a new event."""
 
-        #---Read the status file.
-        status_file = open(self.__status_file_path, 'r')
-        records = status_file.readlines()
-        status_file.close()
-        #event_time = datetime.datetime.now().isoformat()
+        column = StatusFile.RESULT_MODE_COLUMNS[mode]
+        updates = {StatusFile.STATUS_COLUMNS[column] : event_value}
 
-        for index, line in enumerate(records):
+        found_record = self._update_record(self.__test_id, updates)
 
-            # Get the uid for this run instance
+        if found_record and mode in ('Add_Binary_Running', 'Add_Run_Aborning'):
+            dir_head = os.path.split(os.getcwd())[0]
+            path2 = os.path.join(dir_head, apptest_layout.test_status_dirname, self.__test_id,
+                                 apptest_layout.job_status_filename)
+            with open(path2, 'w') as file_obj2:
+                file_obj2.write(event_value)
 
-            words = line.rstrip().split()
+    def _update_record(self, unique_id, updates):
+        """Sets columns of the record of unique_id.
 
-            if len(words) < len(StatusFile.STATUS_COLUMNS):
-                continue
+        Parameters
+        ----------
+        unique_id : str
+            The unique id of the record to update.
 
-            test_id = words[StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_UNIQUE]]
+        updates : dict
+            Maps the column index (see STATUS_COLUMNS) to the new column value.
 
-            if test_id != self.__test_id:
-                continue
+        Returns
+        -------
+        bool
+            True if a record for unique_id was found.
+        """
+        if self.__journal_mode:
+            # The record may still be in the journal, which the lookup merges.
+            if unique_id not in self.__journal_record_ids:
+                if self.__get_status_file_record(unique_id) is None:
+                    return False
+                self.__journal_record_ids.add(unique_id)
+            journal_size = self.__journal.append_update(unique_id, updates)
+            self.__compact_journal_if_full(journal_size)
+            return True
+
+        if self.__model is not None:
+            if self.__update_status_file_model(unique_id, updates):
+                return True
+            # Earlier updates of the record must reach the status file first.
+            self.__flush_status_file_model()
+
+        # Overwrite the column of the record in place when we can, otherwise
+        # fall back to rewriting the whole status file.
+        with self.__lock:
+            return (self._update_record_in_place(unique_id, updates) or
+                    self._rewrite_record(unique_id, updates))
+
+    def _update_record_in_place(self, unique_id, updates):
+        """Overwrites columns of the record of unique_id without rewriting the status file.
+
+        Parameters
+        ----------
+        unique_id : str
+            The unique id of the record to update.
+
+        updates : dict
+            Maps the column index (see STATUS_COLUMNS) to the new column value.
+
+        Returns
+        -------
+        bool
+            True if the record was updated in place. False if the record was not
+            found, is not a fixed-width record, or a new value does not fit in its
+            column. The caller must then fall back to _rewrite_record.
+        """
+        if not StatusFile.__fit_columns(updates):
+            return False
+
+        (offset, record) = self._find_record_offset(unique_id)
+        if record is None or StatusFile.__fixed_width_words(record) is None:
+            return False
+
+        self.__write_columns(offset, updates)
+        return True
+
+    @staticmethod
+    def __fixed_width_words(record):
+        """Returns the column values of the record (bytes), or None if it is not a fixed-width record.
+
+        Only a record that is exactly reproduced by the line format, with no
+        value wider than its column, has its columns at the expected offsets.
+        """
+        words = record.decode().split()
+        if len(words) != len(StatusFile.STATUS_COLUMNS):
+            return None
+        if StatusFile.format_record(words).encode() != record:
+            return None
+        for (word, (column_offset, column_width)) in zip(words, StatusFile.__COLUMN_LAYOUT):
+            if len(word) > column_width:
+                return None
+        return words
 
-            if mode == 'Add_Job_ID':
-                batch_col = StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_BATCH]
-                words[batch_col] = event_value
+    @staticmethod
+    def __fit_columns(updates):
+        """Indicates whether the new column values fit in their columns."""
+        for (column, value) in updates.items():
+            if len(value.split()) != 1 or len(value) > StatusFile.__COLUMN_LAYOUT[column][1]:
+                return False
+        return True
+
+    def __write_columns(self, offset, updates):
+        """Overwrites columns of the fixed-width record at byte offset."""
+        with open(self.__status_file_path, 'r+b') as status_file_obj:
+            fd = status_file_obj.fileno()
+            for (column, value) in updates.items():
+                (column_offset, column_width) = StatusFile.__COLUMN_LAYOUT[column]
+                os.pwrite(fd, value.ljust(column_width).encode(), offset + column_offset)
+
+    def __update_status_file_model(self, unique_id, updates):
+        """Sets columns of the record of unique_id in the in-memory model.
+
+        The record is loaded into the model on its first update.
+
+        Returns
+        -------
+        bool
+            True if the record was updated in the model. False if the record
+            was not found, is not a fixed-width record, or a new value does not
+            fit in its column. The caller must then update the status file.
+        """
+        if not StatusFile.__fit_columns(updates):
+            return False
+
+        if self.__model.row(unique_id) is None:
+            # The offsets of the loaded records must stay valid, so the
+            # records are written back before the status file is read.
+            self.__flush_status_file_model()
+            with self.__lock.shared():
+                stat_result = os.stat(self.__status_file_path)
+                (offset, record) = self._find_record_offset(unique_id)
+            if record is None or StatusFile.__fixed_width_words(record) is None:
+                return False
+            if not self.__model.is_current(stat_result):
+                self.__model.clear()
+                self.__model.set_current(stat_result)
+            self.__model.add_row(unique_id, offset, StatusFile.__fixed_width_words(record))
 
-            if mode == 'Add_Build_Result':
-                build_col = StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_BUILD]
-                words[build_col] = event_value
+        self.__model.update(unique_id, updates)
+        return True
 
-            if mode == 'Add_Run_Count':
-                count_col = StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_COUNT]
-                words[count_col] = event_value
+    def __flush_status_file_model(self):
+        """Writes the dirty columns of the in-memory model to the status file.
 
-            if mode == 'Add_Submit_Result':
-                submit_col = StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_SUBMIT]
-                words[submit_col] = event_value
+        If the status file changed since the model last read or wrote it, the
+        records are looked up again, and the model is reloaded on the next update.
+        """
+        dirty_rows = self.__model.dirty_rows()
+        if not dirty_rows:
+            return
+
+        with self.__lock:
+            if self.__model.is_current(os.stat(self.__status_file_path)):
+                for (unique_id, offset, updates) in dirty_rows:
+                    self.__write_columns(offset, updates)
+                self.__model.set_current(os.stat(self.__status_file_path))
+                self.__model.mark_clean()
+            else:
+                self.__model.clear()
+                for (unique_id, offset, updates) in dirty_rows:
+                    if not (self._update_record_in_place(unique_id, updates) or
+                            self._rewrite_record(unique_id, updates)):
+                        self.__logger.doWarningLogging(f"Warning: the record of {unique_id} "
+                                                       f"is no longer in {self.__status_file_path}")
+
+    def _find_record_offset(self, unique_id):
+        """Returns the byte offset and bytes of the record of unique_id.
+
+        The record is looked up in the sidecar index, or searched for in
+        the status file if the index is disabled or cannot be used. If there
+        is no such record then (None, None) is returned.
+        """
+        if self.__index is not None:
+            try:
+                return self.__index.lookup(unique_id)
+            except sqlite3.Error as error:
+                self.__logger.doWarningLogging(f"Warning: could not use the status file index "
+                                               f"{self.__index.index_path}: {error}")
+        return self.__search_record_offset(unique_id)
+
+    def __search_record_offset(self, unique_id):
+        """Returns the byte offset and bytes of the record of unique_id by searching the status file."""
+        unique_id = unique_id.encode()
+
+        if os.path.getsize(self.__status_file_path) == 0:
+            return (None, None)
+
+        # Search the mapped file for the unique id, then check that the
+        # match is the unique id column of a record.
+        with open(self.__status_file_path, 'rb') as status_file_obj:
+            with mmap.mmap(status_file_obj.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+                position = mapped_file.find(unique_id)
+                while position != -1:
+                    offset = mapped_file.rfind(b'\n', 0, position) + 1
+                    end = mapped_file.find(b'\n', position)
+                    line = mapped_file[offset:] if end == -1 else mapped_file[offset:end + 1]
+                    if StatusFile._record_key(line) == unique_id:
+                        return (offset, line)
+                    position = mapped_file.find(unique_id, position + len(unique_id))
+
+        return (None, None)
+
+    def _rewrite_record(self, unique_id, updates):
+        """Updates columns of the record of unique_id by rewriting the status file.
+
+        Returns
+        -------
+        bool
+            True if a record for unique_id was found.
+        """
+
+        #---Read the status file.
+        with open(self.__status_file_path, 'r') as status_file:
+            records = status_file.readlines()
+
+        found_record = False
+        for index, line in enumerate(records):
 
-            if mode == 'Add_Run_Result':
-                check_col = StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_CHECK]
-                words[check_col] = event_value
+            # Get the uid for this run instance
 
-            if mode == 'Add_Binary_Running':
-                binary_running_value = event_value
+            words = line.rstrip().split()
 
-                check_col = StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_CHECK]
-                words[check_col] = binary_running_value
+            if len(words) < len(StatusFile.STATUS_COLUMNS):
+                continue
 
-                dir_head = os.path.split(os.getcwd())[0]
-                path2 = os.path.join(dir_head, apptest_layout.test_status_dirname, test_id,
-                                     apptest_layout.job_status_filename)
-                file_obj2 = open(path2, 'w')
-                file_obj2.write(binary_running_value)
-                file_obj2.close()
+            test_id = words[StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_UNIQUE]]
 
-            if mode == 'Add_Run_Aborning':
-                aborning_run_value = event_value
-                check_col = StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_CHECK]
-                words[check_col] = aborning_run_value
+            if test_id != unique_id:
+                continue
 
-                dir_head = os.path.split(os.getcwd())[0]
-                path2 = os.path.join(dir_head, apptest_layout.test_status_dirname, test_id,
-                                     apptest_layout.job_status_filename)
-                file_obj2 = open(path2, 'w')
-                file_obj2.write(aborning_run_value)
-                file_obj2.close()
+            found_record = True
+            for (column, value) in updates.items():
+                words[column] = value
 
             records[index] = StatusFile.__LINE_FORMAT % (
                 words[StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_START]],
@@ -855,40 +1306,393 @@ class StatusFile:
                 words[StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_CHECK]])
 
         #---Update the status file.
-        status_file = open(self.__status_file_path, 'w')
-        status_file.writelines(records)
-        status_file.close()
+        if found_record:
+            self.__replace_status_file(records)
+
+        return found_record
 
     #----------
 
     def __status_file_add_test_instance(self, event_time, launch_id, unique_id):
         """Start new line in master status file for app/test."""
 
-        with open(self.__status_file_path, "a") as file_obj:
-            format_ = StatusFile.__LINE_FORMAT % (
-                event_time, launch_id, unique_id, StatusFile.PLACE_HOLDER,
-                StatusFile.PLACE_HOLDER, StatusFile.PLACE_HOLDER,
-                StatusFile.PLACE_HOLDER, StatusFile.PLACE_HOLDER)
-            file_obj.write(format_)
+        words = (event_time, launch_id, unique_id, StatusFile.PLACE_HOLDER,
+                 StatusFile.PLACE_HOLDER, StatusFile.PLACE_HOLDER,
+                 StatusFile.PLACE_HOLDER, StatusFile.PLACE_HOLDER)
+        self._add_record(words)
+
+    def _add_record(self, words):
+        """Adds a record with the column values words to the status file."""
+        if self.__journal_mode:
+            journal_size = self.__journal.append_record(words)
+            self.__journal_record_ids.add(words[StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_UNIQUE]])
+            self.__compact_journal_if_full(journal_size)
+            return
+
+        with self.__lock:
+            # Appending does not move the records loaded in the model.
+            model_is_current = (self.__model is not None and
+                                self.__model.is_current(os.stat(self.__status_file_path)))
+
+            with open(self.__status_file_path, "a") as file_obj:
+                file_obj.write(StatusFile.format_record(words))
+
+            if model_is_current:
+                self.__model.set_current(os.stat(self.__status_file_path))
+
+            if self.__index is not None:
+                try:
+                    self.__index.update()
+                except sqlite3.Error as error:
+                    self.__logger.doWarningLogging(f"Warning: could not update the status file index "
+                                                   f"{self.__index.index_path}: {error}")
+
+    #----------
+
+    def __compact_journal_if_full(self, journal_size):
+        if journal_size >= self.__journal_max_bytes:
+            self.__journal.compact_in_background(self.__fold_journal)
+
+    def __fold_journal(self, entries):
+        """Rewrites the status file with the journal entries applied."""
+        with self.__lock:
+            with open(self.__status_file_path, 'r') as status_file_obj:
+                records = status_file_obj.readlines()
+
+            self.__replace_status_file(_merge_journal_entries(records, entries))
+
+    def __replace_status_file(self, records):
+        """Atomically replaces the status file with the lines in records."""
+        path_partial = self.__status_file_path + '.partial.' + str(os.getpid())
+        with open(path_partial, 'w') as status_file_obj:
+            status_file_obj.writelines(records)
+        os.replace(path_partial, self.__status_file_path)
+
+        # The offsets of the records may have changed.
+        if self.__index is not None:
+            self.__index.invalidate()
+
+    def __remove_pending_segment_records(self):
+        """Completes a rotation that was interrupted after writing its segment."""
+        pending_segment = self.__archive.pending_segment()
+        if pending_segment is None:
+            return
+
+        unique_col = StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_UNIQUE]
+        archived_ids = set()
+        for line in self.__archive.iter_segment_lines(pending_segment):
+            words = line.split()
+            if len(words) == len(StatusFile.STATUS_COLUMNS):
+                archived_ids.add(words[unique_col])
+
+        with open(self.__status_file_path, 'r') as status_file_obj:
+            lines = status_file_obj.readlines()
+        kept_lines = []
+        for line in lines:
+            words = line.split()
+            if (StatusFile.ignore_line(line) or len(words) != len(StatusFile.STATUS_COLUMNS) or
+                words[unique_col] not in archived_ids):
+                kept_lines.append(line)
+        if len(kept_lines) != len(lines):
+            self.__replace_status_file(kept_lines)
+        self.__archive.commit_pending_segment()
+
+    def __first_record_start_time(self):
+        """Returns the datetime of the start of the first record of the status file, or None."""
+        start_col = StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_START]
+        with open(self.__status_file_path, 'r') as status_file_obj:
+            for line in status_file_obj:
+                if not StatusFile.ignore_line(line):
+                    try:
+                        return datetime.datetime.fromisoformat(line.split()[start_col])
+                    except ValueError:
+                        return None
+        return None
+
+    def __find_archived_record(self, unique_id):
+        # The unique ids of new subtests are newer than every archived one.
+        if not self.__archive.exists() or self.__archive.is_newer_than_segments(unique_id):
+            return None
+        unique_col = StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_UNIQUE]
+        return self.__archive.find_record(unique_id, unique_col)
+
+    def __read_records(self):
+        with self.__lock.shared():
+            return read_status_file_lines(self.__status_file_path)
+
+#------------------------------------------------------------------------------
+
+def read_status_file_lines(path_to_status_file):
+    """Returns the lines of the status file, merged with its journal if there is one.
+
+    With the SQLite status backend the lines are exported from the status
+    database of the test, if it exists.
+    """
+    if os.environ.get('RGT_STATUS_BACKEND') == StatusFile.BACKEND_SQLITE:
+        from libraries.sqlite_status_file import read_status_database_lines
+        lines = read_status_database_lines(path_to_status_file)
+        if lines is not None:
+            return lines
+
+    # The journal is read first, see StatusJournal.read_entries.
+    entries = StatusJournal(path_to_status_file).read_entries()
+
+    with open(path_to_status_file, 'r') as file_obj:
+        lines = file_obj.readlines()
+
+    if entries:
+        lines = _merge_journal_entries(lines, entries)
+    return lines
+
+def iter_status_file_history(path_to_status_file):
+    """Yields the lines of the archive of the status file, then the lines of the status file.
+
+    The records of a pending segment of the archive that are still in the
+    status file are yielded only once.
+    """
+    unique_col = StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_UNIQUE]
+
+    archive = StatusFileArchive(path_to_status_file)
+    pending_ids = set()
+    if archive.exists():
+        for segment in archive.segments():
+            for line in archive.iter_segment_lines(segment):
+                words = line.split()
+                if segment['pending'] and len(words) == len(StatusFile.STATUS_COLUMNS):
+                    pending_ids.add(words[unique_col])
+                yield line
+
+    for line in read_status_file_lines(path_to_status_file):
+        words = line.split()
+        if (pending_ids and not StatusFile.ignore_line(line) and len(words) == len(StatusFile.STATUS_COLUMNS) and
+            words[unique_col] in pending_ids):
+            continue
+        yield line
+
+def tail_status_file_records(path_to_status_file, n):
+    """Returns the last n records of the status file, in the order of the file.
+
+    The status file is read backwards block by block from its end. If the
+    status file has a journal then the records are taken from the merged
+    lines instead. If the status file has fewer than n records then the
+    rest are taken from the newest segments of its archive.
+    """
+    if os.environ.get('RGT_STATUS_BACKEND') == StatusFile.BACKEND_SQLITE:
+        from libraries.sqlite_status_file import tail_status_database_records
+        records = tail_status_database_records(path_to_status_file, n)
+        if records is not None:
+            return records
+
+    if StatusJournal(path_to_status_file).exists():
+        records = [line for line in read_status_file_lines(path_to_status_file)
+                   if not StatusFile.ignore_line(line)]
+        records = records[-n:] if n > 0 else []
+    else:
+        records = []
+        for line in _reverse_lines(path_to_status_file):
+            if len(records) >= n:
+                break
+            line = line.decode() + '\n'
+            if not StatusFile.ignore_line(line):
+                records.append(line)
+        records.reverse()
+
+    if len(records) < n:
+        records = _tail_archived_records(path_to_status_file, n - len(records), records) + records
+    return records
+
+def _tail_archived_records(path_to_status_file, n, newer_records):
+    """Returns the last n archived records that are not in newer_records."""
+    archive = StatusFileArchive(path_to_status_file)
+    if not archive.exists():
+        return []
+
+    unique_col = StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_UNIQUE]
+    seen_ids = {words[unique_col] for words in map(str.split, newer_records)
+                if len(words) == len(StatusFile.STATUS_COLUMNS)}
+
+    records = []
+    for segment in reversed(archive.segments()):
+        segment_records = [line for line in archive.iter_segment_lines(segment)
+                           if len(line.split()) != len(StatusFile.STATUS_COLUMNS) or
+                           line.split()[unique_col] not in seen_ids]
+        records = segment_records[-(n - len(records)):] + records
+        if len(records) >= n:
+            break
+    return records
+
+def _is_finished_record(words):
+    """Indicates whether the record is of a completed subtest. Malformed records are not."""
+    try:
+        return StatusFile._record_is_finished(words)
+    except ValueError:
+        return False
+
+def _archive_segment_summary(lines):
+    """Returns the manifest entries summarizing the record lines of an archive segment."""
+    start_col = StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_START]
+    unique_col = StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_UNIQUE]
+
+    records = [line.split() for line in lines]
+    unique_ids = []
+    for words in records:
+        try:
+            unique_ids.append(float(words[unique_col]))
+        except ValueError:
+            # A unique id that is not a number cannot be bounded.
+            unique_ids = None
+            break
+
+    return {'records' : len(records),
+            'failed' : sum(1 for words in records if not StatusFile._record_passed(words)),
+            'min_unique_id' : min(unique_ids) if unique_ids else None,
+            'max_unique_id' : max(unique_ids) if unique_ids else None,
+            'first_start_time' : records[0][start_col] if records else None,
+            'last_start_time' : records[-1][start_col] if records else None}
+
+def _reverse_lines(path, block_size=65536):
+    """Yields the lines (bytes, without newline) of the file at path from the last to the first."""
+    with open(path, 'rb') as file_obj:
+        position = file_obj.seek(0, os.SEEK_END)
+        partial_line = b''
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            file_obj.seek(position)
+            lines = (file_obj.read(read_size) + partial_line).split(b'\n')
+
+            # The first line of the block may continue in the previous block.
+            partial_line = lines.pop(0)
+            for line in reversed(lines):
+                yield line
+        yield partial_line
+
+def _merge_journal_entries(lines, entries):
+    """Returns the status file lines with the journal entries applied."""
+    unique_col = StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_UNIQUE]
+
+    lines = list(lines)
+    record_index = {}
+    for index, line in enumerate(lines):
+        if StatusFile.ignore_line(line):
+            continue
+        words = line.split()
+        if len(words) > unique_col:
+            record_index[words[unique_col]] = index
+
+    for entry in entries:
+        if entry[0] == StatusJournal.ENTRY_ADD:
+            words = entry[1]
+            if words[unique_col] not in record_index:
+                record_index[words[unique_col]] = len(lines)
+                lines.append(StatusFile.format_record(words))
+        elif entry[0] == StatusJournal.ENTRY_SET:
+            index = record_index.get(entry[1])
+            if index is None:
+                continue
+            words = lines[index].split()
+            if len(words) != len(StatusFile.STATUS_COLUMNS):
+                continue
+            for (column, value) in entry[2]:
+                words[column] = value
+            lines[index] = StatusFile.format_record(words)
+
+    return lines
 
 #------------------------------------------------------------------------------
 
 def get_status_info(test_id, event_type, event_subtype,
                     event_value, event_time, event_filename):
-    """Create a data structure with verbose info for an event."""
+    """Create a data structure with verbose info for an event.
+
+    The information on the test instance, and the check_alias, job_id and
+    job_status files it reports, are kept in _STATUS_INFO_CACHE across the
+    events of the test instance.
+    """
 
     no_value = StatusFile.NO_VALUE
 
     #---Set up dicts to capture info.
 
-    test_instance_info = {}
+    cwd = os.getcwd()
+    context_key = (test_id, cwd) + tuple(os.environ.get(var) for var in _STATUS_INFO_ENVIRONMENT)
+    (test_instance_info, run_archive_all, dir_status_this_test) = _STATUS_INFO_CACHE.context(
+        context_key, lambda : _get_test_instance_info(test_id, cwd))
     event_info = {}
 
+    #---
+
+    event_info['event_name'] = event_type + '_' + event_subtype
+    event_info['event_type'] = event_type
+    event_info['event_subtype'] = event_subtype
+    event_info['event_time'] = event_time
+    event_info['event_filename'] = event_filename
+    event_info['event_value'] = (
+        str(event_value) if event_value else no_value)
+
+    event_info['runtag'] = test_instance_info['rgt_system_log_tag']
+
+    file_check_alias = os.path.join(run_archive_all, test_id, 'check_alias.txt')
+    check_alias_ = _STATUS_INFO_CACHE.file_value(file_check_alias,
+                                                 lambda contents : contents.split('\n')[0])
+    event_info['check_alias'] = no_value if check_alias_ is None else check_alias_
+
+    file_job_id = os.path.join(dir_status_this_test, apptest_layout.job_id_filename)
+    job_id_ = _STATUS_INFO_CACHE.file_value(file_job_id,
+                                            lambda contents : re.sub(' ', '', contents.split('\n')[0]))
+    event_info['job_id'] = no_value if job_id_ is None else job_id_
+
+    file_job_status = os.path.join(dir_status_this_test, apptest_layout.job_status_filename)
+    job_status_ = _STATUS_INFO_CACHE.file_value(file_job_status,
+                                                lambda contents : re.sub(' ', '', contents.split('\n')[0]))
+    event_info['job_status'] = no_value if job_status_ is None else job_status_
+
+    #---Construct status_info.
+
+    status_info = []
+
+    #---NOTE: order matters here.  It is assumed (by Splunk) that
+    #---all items strictly after test_instance will be invariant
+    #---across all events for a given test instance.
+    assert StatusFile.FIELDS_PER_TEST_INSTANCE[-1] == 'test_instance'
+
+    for field in StatusFile.FIELDS_PER_TEST_INSTANCE:
+        status_info.append([field, test_instance_info[field]])
+
+    for field in StatusFile.FIELDS_PER_EVENT:
+        status_info.append([field, event_info[field]])
+
+    for field in StatusFile.FIELDS_SPLUNK_SPECIAL:
+        #---Something extra to help Splunk:
+        status_info.append([event_info['event_name']+'_'+field,
+                            event_info[field]])
+
+    return status_info
+
+#------------------------------------------------------------------------------
+
+# The environment variables that _get_test_instance_info reads.
+_STATUS_INFO_ENVIRONMENT = ('USER', 'RGT_PATH_TO_SSPACE', 'RGT_MACHINE_NAME', 'RGT_PROJECT_ID',
+                            'RGT_ACCT_ID', 'PATH_TO_RGT_PACKAGE', 'RGT_SYSTEM_LOG_TAG')
+
+_STATUS_INFO_CACHE = StatusInfoCache()
+
+def _get_test_instance_info(test_id, cwd):
+    """Returns the information on a test instance that is the same for all its events.
+
+    The run archive directory of the test, and the Status directory of the
+    test instance, are returned with it.
+    """
+
+    no_value = StatusFile.NO_VALUE
+
+    test_instance_info = {}
+
     #---Construct fields to be used for log entry.
 
     test_instance_info['user'] = os.environ['USER']
     test_instance_info['hostname'] = socket.gethostname()
-    test_instance_info['cwd'] = os.getcwd()
+    test_instance_info['cwd'] = cwd
 
     (dir_head1, dir_scripts) = os.path.split(test_instance_info['cwd'])
     assert dir_scripts == apptest_layout.test_scripts_dirname, (
@@ -939,73 +1743,19 @@ def get_status_info(test_id, event_type, event_subtype,
         os.environ['RGT_SYSTEM_LOG_TAG']
         if 'RGT_SYSTEM_LOG_TAG' in os.environ else no_value)
 
-    #---
-
-    event_info['event_name'] = event_type + '_' + event_subtype
-    event_info['event_type'] = event_type
-    event_info['event_subtype'] = event_subtype
-    event_info['event_time'] = event_time
-    event_info['event_filename'] = event_filename
-    event_info['event_value'] = (
-        str(event_value) if event_value else no_value)
-
-    event_info['runtag'] = test_instance_info['rgt_system_log_tag']
-
-    file_check_alias = os.path.join(run_archive_all, test_id, 'check_alias.txt')
-    if os.path.exists(file_check_alias):
-        file_ = open(file_check_alias, 'r')
-        check_alias_ = file_.read()
-        file_.close()
-        event_info['check_alias'] = check_alias_.split('\n')[0]
-    else:
-        event_info['check_alias'] = no_value
-
-    file_job_id = os.path.join(dir_status_this_test, apptest_layout.job_id_filename)
-    if os.path.exists(file_job_id):
-        file_ = open(file_job_id, 'r')
-        job_id_ = file_.read()
-        file_.close()
-        event_info['job_id'] = re.sub(' ', '', job_id_.split('\n')[0])
-    else:
-        event_info['job_id'] = no_value
-
-    file_job_status = os.path.join(dir_status_this_test, apptest_layout.job_status_filename)
-    if os.path.exists(file_job_status):
-        file_ = open(file_job_status, 'r')
-        job_status_ = file_.read()
-        file_.close()
-        event_info['job_status'] = re.sub(' ', '', job_status_.split('\n')[0])
-    else:
-        event_info['job_status'] = no_value
-
-    #---Construct status_info.
-
-    status_info = []
-
-    #---NOTE: order matters here.  It is assumed (by Splunk) that
-    #---all items strictly after test_instance will be invariant
-    #---across all events for a given test instance.
-    assert StatusFile.FIELDS_PER_TEST_INSTANCE[-1] == 'test_instance'
-
-    for field in StatusFile.FIELDS_PER_TEST_INSTANCE:
-        status_info.append([field, test_instance_info[field]])
-
-    for field in StatusFile.FIELDS_PER_EVENT:
-        status_info.append([field, event_info[field]])
-
-    for field in StatusFile.FIELDS_SPLUNK_SPECIAL:
-        #---Something extra to help Splunk:
-        status_info.append([event_info['event_name']+'_'+field,
-                            event_info[field]])
-
-    return status_info
+    return (test_instance_info, run_archive_all, dir_status_this_test)
 
 #------------------------------------------------------------------------------
 
 def write_system_log(test_id, status_info):
-    """Write a system log entry for an event."""
+    """Write a system log entry for an event.
 
-    #---Use Unix logger command unless (valid) directory requested.
+    The entry is sent to syslog through the socket of the process-wide
+    SyslogTransport, or appended to a file under RGT_SYSTEM_LOG_DIR through
+    the buffered BufferedFileTransport.
+    """
+
+    #---Use syslog unless (valid) directory requested.
 
     rgt_system_log_dir = (os.environ['RGT_SYSTEM_LOG_DIR']
         if 'RGT_SYSTEM_LOG_DIR' in os.environ else '')
@@ -1024,9 +1774,7 @@ def write_system_log(test_id, status_info):
 
     #---Construct log string.
 
-    #TODO: make quote a function ...
-
-    quote = '\\"' if is_using_unix_logger else '"'
+    quote = '"'
 
     log_string = ''
 
@@ -1038,7 +1786,7 @@ def write_system_log(test_id, status_info):
     #---Write log.
 
     if is_using_unix_logger:
-        os.system('logger -p local0.notice "' + log_string + '"')
+        syslog_transport().send(log_string)
 
     else:
         dir_head1 = os.path.split(os.getcwd())[0]
@@ -1051,9 +1799,7 @@ def write_system_log(test_id, status_info):
                     '.txt')
         log_path = os.path.join(rgt_system_log_dir, log_file)
 
-        file_ = open(log_path, 'a')
-        file_.write(log_string + '\n')
-        file_.close()
+        file_transport().write(log_path, log_string)
 
 #------------------------------------------------------------------------------
 
@@ -1078,9 +1824,7 @@ def parse_status_file(path_to_status_file, startdate, enddate,
     else:
         return shash
 
-    sfile_obj = open(path_to_status_file, 'r')
-    sfile_lines = sfile_obj.readlines()
-    sfile_obj.close()
+    sfile_lines = iter_status_file_history(path_to_status_file)
 
     start_col  = StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_START]
     batch_col  = StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_BATCH]
@@ -1145,9 +1889,7 @@ def parse_status_file2(path_to_status_file):
     if not os.path.exists(path_to_status_file):
         return shash
 
-    sfile_obj = open(path_to_status_file, 'r')
-    sfile_lines = sfile_obj.readlines()
-    sfile_obj.close()
+    sfile_lines = iter_status_file_history(path_to_status_file)
 
     build_col  = StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_BUILD]
     submit_col = StatusFile.STATUS_COLUMNS[StatusFile.STATUS_COLUMN_SUBMIT]
@@ -1190,9 +1932,7 @@ def parse_status_file2(path_to_status_file):
 def summarize_status_file(path_to_status_file, startdate, enddate,
                           mycomputer_with_events_record):
     """Parse, collect summary info from rgt_status.txt."""
-    sfile_obj = open(path_to_status_file, 'r')
-    sfile_lines = sfile_obj.readlines()
-    sfile_obj.close()
+    sfile_lines = iter_status_file_history(path_to_status_file)
 
     number_of_tests = 0
     number_of_passed_tests = 0
@@ -1333,6 +2073,23 @@ class InvalidStatusFileModeError(StatusFileError):
         """str: The error message."""
         return self._message
 
+class InvalidStatusFileBackendError(StatusFileError):
+    """Exception raised for an unknown status file backend."""
+    def __init__(self,message):
+        """The class constructor
+
+        Parameters
+        ----------
+        message : string
+            The error message for this exception.
+        """
+        self._message = message
+
+    @property
+    def message(self):
+        """str: The error message."""
+        return self._message
+
 class StatusFileMissingError(StatusFileError):
     """Exception raised for missing status file."""
     def __init__(self,message):
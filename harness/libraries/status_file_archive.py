@@ -0,0 +1,197 @@
+#! /usr/bin/env python3
+"""
+-------------------------------------------------------------------------------
+File:   status_file_archive.py
+National Center for Computational Sciences, Scientific Computing Group.
+Oak Ridge National Laboratory
+Copyright (C) 2023 Oak Ridge National Laboratory, UT-Battelle, LLC.
+-------------------------------------------------------------------------------
+"""
+
+import os
+import gzip
+import json
+import datetime
+
+class StatusFileArchive:
+    """Compressed segments of the records rotated out of a subtest status file.
+
+    The archive of rgt_status.txt is the directory rgt_status.txt.archive
+    next to it. Each rotation writes the records it moves out of the status
+    file to a new gzip segment, segment_NNNNNN.txt.gz, and describes it in
+    the manifest manifest.json:
+
+        {"last_rotation" : <ISO time of the last rotation>,
+         "segments" : [{"file" : "segment_000001.txt.gz",
+                        "records" : <number of records>,
+                        "failed" : <number of records that did not pass>,
+                        "min_unique_id" : <float or null>,
+                        "max_unique_id" : <float or null>,
+                        "first_start_time" : <str>,
+                        "last_start_time" : <str>,
+                        "rotated_at" : <ISO time>,
+                        "pending" : <bool>}, ...]}
+
+    A segment is added as pending, before its records are removed from the
+    status file, and is committed afterwards. The records of a pending segment
+    may therefore still be in the status file: readers skip them there, and the
+    next rotation removes them before committing the segment.
+    """
+
+    ARCHIVE_SUFFIX = '.archive'
+    MANIFEST_FILENAME = 'manifest.json'
+    SEGMENT_FILENAME_FORMAT = 'segment_{0:06d}.txt.gz'
+
+    def __init__(self, path_to_status_file):
+        """Constructor.
+
+        Parameters
+        ----------
+        path_to_status_file : str
+            The fully qualified path to the subtest status file.
+        """
+        self.__archive_dir = path_to_status_file + StatusFileArchive.ARCHIVE_SUFFIX
+        self.__manifest_path = os.path.join(self.__archive_dir, StatusFileArchive.MANIFEST_FILENAME)
+
+    ###################
+    # Public methods  #
+    ###################
+
+    @property
+    def archive_dir(self):
+        return self.__archive_dir
+
+    def exists(self):
+        return os.path.exists(self.__manifest_path)
+
+    def manifest(self):
+        """Returns the manifest of the archive. An archive without segments has an empty manifest."""
+        try:
+            with open(self.__manifest_path, 'r') as file_obj:
+                return json.load(file_obj)
+        except FileNotFoundError:
+            return {'last_rotation' : None, 'segments' : []}
+
+    def segments(self):
+        return self.manifest()['segments']
+
+    def pending_segment(self):
+        """Returns the manifest entry of the pending segment, or None."""
+        segments = self.segments()
+        if segments and segments[-1]['pending']:
+            return segments[-1]
+        return None
+
+    def last_rotation(self):
+        """Returns the datetime of the last rotation, or None if there was none."""
+        last_rotation = self.manifest()['last_rotation']
+        return None if last_rotation is None else datetime.datetime.fromisoformat(last_rotation)
+
+    def failed_records(self):
+        """Returns the number of archived records that did not pass."""
+        return sum(segment['failed'] for segment in self.segments())
+
+    def add_pending_segment(self, lines, summary):
+        """Writes the record lines to a new segment and adds it to the manifest as pending.
+
+        Parameters
+        ----------
+        lines : list of str
+            The record lines of the segment.
+
+        summary : dict
+            The entries "records", "failed", "min_unique_id", "max_unique_id",
+            "first_start_time" and "last_start_time" of the segment in the
+            manifest.
+        """
+        os.makedirs(self.__archive_dir, exist_ok=True)
+
+        manifest = self.manifest()
+        filename = StatusFileArchive.SEGMENT_FILENAME_FORMAT.format(len(manifest['segments']) + 1)
+        path = os.path.join(self.__archive_dir, filename)
+
+        path_partial = path + '.partial'
+        with gzip.open(path_partial, 'wt') as file_obj:
+            file_obj.writelines(lines)
+        os.replace(path_partial, path)
+
+        segment = dict(summary)
+        segment['file'] = filename
+        segment['rotated_at'] = datetime.datetime.now().isoformat()
+        segment['pending'] = True
+        manifest['segments'].append(segment)
+        self.__write_manifest(manifest)
+
+    def commit_pending_segment(self):
+        manifest = self.manifest()
+        if manifest['segments']:
+            manifest['segments'][-1]['pending'] = False
+        self.__write_manifest(manifest)
+
+    def record_rotation(self):
+        """Records the time of a rotation in the manifest, even if it moved no records."""
+        manifest = self.manifest()
+        manifest['last_rotation'] = datetime.datetime.now().isoformat()
+        self.__write_manifest(manifest)
+
+    def iter_segment_lines(self, segment):
+        """Yields the record lines of a segment of the manifest."""
+        with gzip.open(os.path.join(self.__archive_dir, segment['file']), 'rt') as file_obj:
+            for line in file_obj:
+                yield line
+
+    def iter_lines(self):
+        """Yields the record lines of all the segments, oldest first."""
+        for segment in self.segments():
+            for line in self.iter_segment_lines(segment):
+                yield line
+
+    def is_newer_than_segments(self, unique_id):
+        """Indicates whether unique_id is a number larger than the unique ids of every segment.
+
+        A segment whose unique ids are not bounded, see __may_contain, may
+        contain any unique id.
+        """
+        try:
+            value = float(unique_id)
+        except ValueError:
+            return False
+        for segment in self.segments():
+            if segment['max_unique_id'] is None or value <= segment['max_unique_id']:
+                return False
+        return True
+
+    def find_record(self, unique_id, unique_col):
+        """Returns the archived record line of unique_id, or None.
+
+        Segments whose range of unique ids does not contain unique_id are
+        not read.
+        """
+        for segment in self.segments():
+            if not StatusFileArchive.__may_contain(segment, unique_id):
+                continue
+            for line in self.iter_segment_lines(segment):
+                words = line.split()
+                if len(words) > unique_col and words[unique_col] == unique_id:
+                    return line
+        return None
+
+    ###################
+    # Private methods #
+    ###################
+
+    def __write_manifest(self, manifest):
+        path_partial = self.__manifest_path + '.partial'
+        with open(path_partial, 'w') as file_obj:
+            json.dump(manifest, file_obj, indent=1)
+        os.replace(path_partial, self.__manifest_path)
+
+    @staticmethod
+    def __may_contain(segment, unique_id):
+        if segment['min_unique_id'] is None or segment['max_unique_id'] is None:
+            return True
+        try:
+            value = float(unique_id)
+        except ValueError:
+            return True
+        return segment['min_unique_id'] <= value <= segment['max_unique_id']
@@ -0,0 +1,157 @@
+#! /usr/bin/env python3
+"""
+-------------------------------------------------------------------------------
+File:   status_file_backup.py
+National Center for Computational Sciences, Scientific Computing Group.
+Oak Ridge National Laboratory
+Copyright (C) 2023 Oak Ridge National Laboratory, UT-Battelle, LLC.
+-------------------------------------------------------------------------------
+"""
+
+import os
+import json
+import errno
+import fcntl
+import shutil
+import hashlib
+import datetime
+
+from libraries.status_file_lock import StatusFileLock
+
+class StatusFileBackupManager:
+    """Keeps a bounded ring of backups of a subtest status file.
+
+    The backups are the files .backup.rgt_status.txt.<ISO time> next to the
+    status file. A backup is made only if the content of the status file
+    differs from the newest backup, and only the newest keep backups are
+    kept. The SHA-256 digests of the backups are kept in the state file
+    .backup.rgt_status.txt.json:
+
+        {"backups" : [{"file" : <backup filename>, "sha256" : <hex digest>}, ...]}
+
+    oldest first. A backup is a reflink of the status file where the file
+    system supports it, and otherwise a copy. A backup with the same content
+    as an older backup of the ring is a hardlink to it, since backups are
+    never modified.
+    """
+
+    BACKUP_PREFIX = '.backup.'
+    STATE_SUFFIX = '.json'
+
+    # The default number of backups kept.
+    DEFAULT_KEEP = 10
+
+    # ioctl request of Linux cloning a file into another (FICLONE).
+    FICLONE = 0x40049409
+
+    def __init__(self, path_to_status_file, keep=None):
+        """Constructor.
+
+        Parameters
+        ----------
+        path_to_status_file : str
+            The fully qualified path to the subtest status file.
+
+        keep : int
+            The number of backups kept. The default is RGT_STATUS_BACKUP_KEEP,
+            or DEFAULT_KEEP if that is not set.
+        """
+        if keep is None:
+            keep = int(os.environ.get('RGT_STATUS_BACKUP_KEEP', StatusFileBackupManager.DEFAULT_KEEP))
+
+        (self.__status_dir, filename) = os.path.split(path_to_status_file)
+        self.__status_file_path = path_to_status_file
+        self.__backup_prefix = StatusFileBackupManager.BACKUP_PREFIX + filename + '.'
+        self.__state_path = os.path.join(self.__status_dir, StatusFileBackupManager.BACKUP_PREFIX + filename +
+                                         StatusFileBackupManager.STATE_SUFFIX)
+        self.__keep = max(1, keep)
+        self.__lock = StatusFileLock(path_to_status_file)
+
+    ###################
+    # Public methods  #
+    ###################
+
+    def backup(self):
+        """Backs up the status file unless the newest backup has the same content.
+
+        Returns
+        -------
+        str
+            The path of the new backup, or None if no backup was made.
+        """
+        if not os.path.exists(self.__status_file_path):
+            return None
+
+        with self.__lock:
+            digest = StatusFileBackupManager.__sha256(self.__status_file_path)
+            backups = self.__read_state()
+            if backups and backups[-1]['sha256'] == digest:
+                return None
+
+            backup_filename = self.__backup_prefix + datetime.datetime.now().isoformat()
+            backup_path = os.path.join(self.__status_dir, backup_filename)
+
+            identical = [entry for entry in backups if entry['sha256'] == digest]
+            linked = False
+            if identical:
+                try:
+                    os.link(os.path.join(self.__status_dir, identical[-1]['file']), backup_path)
+                    linked = True
+                except OSError:
+                    # The file system does not support hardlinks.
+                    pass
+            if not linked:
+                StatusFileBackupManager.__clone_or_copy(self.__status_file_path, backup_path)
+
+            backups.append({'file' : backup_filename, 'sha256' : digest})
+            for entry in backups[:-self.__keep]:
+                try:
+                    os.remove(os.path.join(self.__status_dir, entry['file']))
+                except FileNotFoundError:
+                    pass
+            self.__write_state(backups[-self.__keep:])
+
+        return backup_path
+
+    def backups(self):
+        """Returns the paths of the backups in the ring, oldest first."""
+        return [os.path.join(self.__status_dir, entry['file']) for entry in self.__read_state()]
+
+    ###################
+    # Private methods #
+    ###################
+
+    def __read_state(self):
+        """Returns the entries of the backups that still exist."""
+        try:
+            with open(self.__state_path, 'r') as file_obj:
+                backups = json.load(file_obj)['backups']
+        except (FileNotFoundError, ValueError, KeyError):
+            return []
+        return [entry for entry in backups if os.path.exists(os.path.join(self.__status_dir, entry['file']))]
+
+    def __write_state(self, backups):
+        path_partial = self.__state_path + '.partial'
+        with open(path_partial, 'w') as file_obj:
+            json.dump({'backups' : backups}, file_obj, indent=1)
+        os.replace(path_partial, self.__state_path)
+
+    @staticmethod
+    def __sha256(path):
+        digest = hashlib.sha256()
+        with open(path, 'rb') as file_obj:
+            for block in iter(lambda : file_obj.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def __clone_or_copy(src, dest):
+        """Makes dest a reflink of src if the file system supports it, and otherwise a copy."""
+        with open(src, 'rb') as src_obj, open(dest, 'wb') as dest_obj:
+            try:
+                fcntl.ioctl(dest_obj.fileno(), StatusFileBackupManager.FICLONE, src_obj.fileno())
+                return
+            except OSError as error:
+                if error.errno not in (errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL, errno.ENOSYS):
+                    raise
+            shutil.copyfileobj(src_obj, dest_obj)
@@ -2,10 +2,13 @@
 """The factory class creating StatusFile objects."""
 
 # Python imports
+import os
 import sys
 
 # Harness imports
 from libraries.status_file import StatusFile
+from libraries.status_file import InvalidStatusFileBackendError
+from libraries.sqlite_status_file import SQLiteStatusFile
 
 class StatusFileFactory:
     """This is the factory class of StatusFile objects."""
@@ -21,7 +24,10 @@ class StatusFileFactory:
 
         Notes
         -----
-        This factory method is called if we are creating a StatusFile object
+        This factory method is called if we are creating a StatusFile object.
+        The backend is selected with the environment variable RGT_STATUS_BACKEND:
+        "text" (the default) for rgt_status.txt, or "sqlite" for a SQLite
+        database next to it.
 
         Parameters
         ----------
@@ -32,9 +38,19 @@ class StatusFileFactory:
         -------
         StatusFile
         """
-        a_status_file = StatusFile(logger=logger,
-                                   path_to_status_file=path_to_status_file,
-                                   test_id=test_id)
+        backend = os.environ.get('RGT_STATUS_BACKEND', StatusFile.BACKEND_TEXT)
+
+        if backend == StatusFile.BACKEND_TEXT:
+            status_file_class = StatusFile
+        elif backend == StatusFile.BACKEND_SQLITE:
+            status_file_class = SQLiteStatusFile
+        else:
+            message = f"Unknown status file backend RGT_STATUS_BACKEND={backend}."
+            raise InvalidStatusFileBackendError(message)
+
+        a_status_file = status_file_class(logger=logger,
+                                          path_to_status_file=path_to_status_file,
+                                          test_id=test_id)
 
         return a_status_file
 
@@ -0,0 +1,172 @@
+#! /usr/bin/env python3
+"""
+-------------------------------------------------------------------------------
+File:   status_file_index.py
+National Center for Computational Sciences, Scientific Computing Group.
+Oak Ridge National Laboratory
+Copyright (C) 2023 Oak Ridge National Laboratory, UT-Battelle, LLC.
+-------------------------------------------------------------------------------
+"""
+
+import os
+import sqlite3
+import contextlib
+
+class StatusFileIndex:
+    """Sidecar index of the byte offsets of the records of a subtest status file.
+
+    The index is the SQLite database rgt_status.txt.index next to the status
+    file. It maps each unique id to the byte offset of its record, and keeps
+    the size, modification time and inode of the status file it was built
+    from. Before every lookup the index is validated against the status file:
+
+        * The file is unchanged: the index is used as is.
+        * Only the modification time changed: the records were updated in
+          place, so the offsets are still valid.
+        * The file grew and the indexed part still ends on a record
+          boundary: records were appended, and only the new tail is indexed.
+        * Otherwise (the file shrank, was replaced, or was never indexed):
+          the index is rebuilt.
+
+    A record found through the index is always read back and its unique id
+    checked, and the index is rebuilt if it does not match. Writers that
+    rewrite the status file must call invalidate().
+    """
+
+    INDEX_SUFFIX = '.index'
+
+    def __init__(self, path_to_status_file, record_key):
+        """Constructor.
+
+        Parameters
+        ----------
+        path_to_status_file : str
+            The fully qualified path to the subtest status file.
+
+        record_key : callable
+            Called as record_key(line) with a line (bytes) of the status file.
+            Returns the unique id (bytes) of the record, or None if the line is
+            not a record.
+        """
+        self.__path_to_status_file = path_to_status_file
+        self.__index_path = path_to_status_file + StatusFileIndex.INDEX_SUFFIX
+        self.__record_key = record_key
+
+    ###################
+    # Public methods  #
+    ###################
+
+    @property
+    def index_path(self):
+        return self.__index_path
+
+    def lookup(self, unique_id):
+        """Returns the byte offset and bytes of the record of unique_id.
+
+        If there is no such record then (None, None) is returned.
+        """
+        unique_id = unique_id.encode()
+
+        with self.__connect() as connection:
+            self.__refresh(connection)
+            (offset, line) = self.__read_indexed_record(connection, unique_id)
+            if offset is not None and line is None:
+                # The record is not at its indexed offset.
+                self.__rebuild(connection, os.stat(self.__path_to_status_file))
+                (offset, line) = self.__read_indexed_record(connection, unique_id)
+
+        if line is None:
+            return (None, None)
+        return (offset, line)
+
+    def update(self):
+        """Brings the index up to date with the status file."""
+        with self.__connect() as connection:
+            self.__refresh(connection)
+
+    def invalidate(self):
+        """Discards the index. The next lookup rebuilds it."""
+        try:
+            os.remove(self.__index_path)
+        except FileNotFoundError:
+            pass
+
+    ###################
+    # Private methods #
+    ###################
+
+    def __connect(self):
+        connection = sqlite3.connect(self.__index_path, timeout=60.0)
+        connection.execute('CREATE TABLE IF NOT EXISTS records '
+                           '(unique_id BLOB PRIMARY KEY, offset INTEGER) WITHOUT ROWID')
+        connection.execute('CREATE TABLE IF NOT EXISTS status_file '
+                           '(id INTEGER PRIMARY KEY CHECK (id = 0), '
+                           'size INTEGER, mtime_ns INTEGER, inode INTEGER)')
+        return contextlib.closing(connection)
+
+    def __refresh(self, connection):
+        stat = os.stat(self.__path_to_status_file)
+        row = connection.execute('SELECT size, mtime_ns, inode FROM status_file').fetchone()
+
+        if row is None or stat.st_ino != row[2] or stat.st_size < row[0]:
+            self.__rebuild(connection, stat)
+        elif stat.st_size > row[0]:
+            if self.__ends_on_record_boundary(row[0]):
+                self.__index_records(connection, row[0], stat)
+            else:
+                self.__rebuild(connection, stat)
+        elif stat.st_mtime_ns != row[1]:
+            self.__save_status_file_stat(connection, stat.st_size, stat)
+
+    def __rebuild(self, connection, stat):
+        connection.execute('DELETE FROM records')
+        self.__index_records(connection, 0, stat)
+
+    def __index_records(self, connection, start, stat):
+        """Indexes the complete records of the status file from byte start onwards."""
+        records = []
+        offset = start
+        with open(self.__path_to_status_file, 'rb') as status_file_obj:
+            status_file_obj.seek(start)
+            for line in status_file_obj:
+                if not line.endswith(b'\n'):
+                    break
+                key = self.__record_key(line)
+                if key is not None:
+                    records.append((key, offset))
+                offset += len(line)
+
+        # The first record of a unique id wins, as in a scan of the file.
+        connection.executemany('INSERT OR IGNORE INTO records (unique_id, offset) VALUES (?, ?)', records)
+        self.__save_status_file_stat(connection, offset, stat)
+
+    def __save_status_file_stat(self, connection, size, stat):
+        connection.execute('INSERT OR REPLACE INTO status_file (id, size, mtime_ns, inode) VALUES (0, ?, ?, ?)',
+                           (size, stat.st_mtime_ns, stat.st_ino))
+        connection.commit()
+
+    def __ends_on_record_boundary(self, size):
+        if size == 0:
+            return True
+        with open(self.__path_to_status_file, 'rb') as status_file_obj:
+            status_file_obj.seek(size - 1)
+            return status_file_obj.read(1) == b'\n'
+
+    def __read_indexed_record(self, connection, unique_id):
+        """Returns (offset, line) of the indexed record of unique_id.
+
+        (None, None) is returned if unique_id is not indexed, and (offset, None)
+        if the line at the indexed offset is not the record of unique_id.
+        """
+        row = connection.execute('SELECT offset FROM records WHERE unique_id = ?', (unique_id,)).fetchone()
+        if row is None:
+            return (None, None)
+
+        offset = row[0]
+        with open(self.__path_to_status_file, 'rb') as status_file_obj:
+            status_file_obj.seek(offset)
+            line = status_file_obj.readline()
+
+        if self.__record_key(line) != unique_id:
+            return (offset, None)
+        return (offset, line)
@@ -0,0 +1,204 @@
+#! /usr/bin/env python3
+"""
+-------------------------------------------------------------------------------
+File:   status_file_lock.py
+National Center for Computational Sciences, Scientific Computing Group.
+Oak Ridge National Laboratory
+Copyright (C) 2023 Oak Ridge National Laboratory, UT-Battelle, LLC.
+-------------------------------------------------------------------------------
+"""
+
+import os
+import time
+import fcntl
+import random
+import threading
+
+class StatusFileLock:
+    """Advisory lock serializing the updates of a subtest status file.
+
+    The lock is an fcntl.flock lock on the file rgt_status.txt.lock next to
+    the status file, so it is shared by all the harness processes of a test
+    (the driver on the login node, the check in the batch job, ...). Writers
+    take the lock exclusively and readers take it shared.
+
+    The lock is reentrant: while a thread holds it, a nested acquisition by
+    the same thread only increments a count. Other threads of the process
+    wait for it as for any other process.
+
+    Acquiring the lock polls with exponential backoff and gives up with
+    StatusFileLockTimeoutError after the timeout. The time spent waiting for
+    and holding the lock is accumulated in metrics().
+    """
+
+    LOCK_SUFFIX = '.lock'
+
+    # The default timeout in seconds for acquiring the lock.
+    DEFAULT_TIMEOUT = 300.0
+
+    # The bounds in seconds of the backoff between attempts to take the lock.
+    MIN_BACKOFF = 0.001
+    MAX_BACKOFF = 0.1
+
+    def __init__(self, path_to_status_file, timeout=None):
+        """Constructor.
+
+        Parameters
+        ----------
+        path_to_status_file : str
+            The fully qualified path to the subtest status file.
+
+        timeout : float
+            The maximum time in seconds to wait for the lock. The default is
+            RGT_STATUS_LOCK_TIMEOUT, or DEFAULT_TIMEOUT if that is not set.
+        """
+        if timeout is None:
+            timeout = float(os.environ.get('RGT_STATUS_LOCK_TIMEOUT', StatusFileLock.DEFAULT_TIMEOUT))
+
+        self.__lock_path = path_to_status_file + StatusFileLock.LOCK_SUFFIX
+        self.__timeout = timeout
+        self.__thread_lock = threading.RLock()
+        self.__lock_obj = None
+        self.__depth = 0
+        self.__acquired_at = None
+        self.__metrics = {'acquisitions' : 0,
+                          'contended' : 0,
+                          'timeouts' : 0,
+                          'wait_seconds_total' : 0.0,
+                          'wait_seconds_max' : 0.0,
+                          'hold_seconds_total' : 0.0,
+                          'hold_seconds_max' : 0.0}
+
+    ###################
+    # Special methods #
+    ###################
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+        return False
+
+    ###################
+    # Public methods  #
+    ###################
+
+    @property
+    def lock_path(self):
+        return self.__lock_path
+
+    def shared(self):
+        """Returns a context manager that holds the lock shared, for readers."""
+        return _SharedStatusFileLock(self)
+
+    def acquire(self, shared=False):
+        """Acquires the lock, exclusively unless shared is True.
+
+        A nested acquisition keeps the mode of the outermost one.
+        """
+        start = time.monotonic()
+        if not self.__thread_lock.acquire(timeout=self.__timeout):
+            self.__timed_out(start)
+
+        if self.__depth > 0:
+            self.__depth += 1
+            return
+
+        try:
+            self.__take_file_lock(fcntl.LOCK_SH if shared else fcntl.LOCK_EX, start)
+        except BaseException:
+            self.__thread_lock.release()
+            raise
+
+        self.__depth = 1
+
+    def release(self):
+        """Releases the lock."""
+        self.__depth -= 1
+        if self.__depth == 0:
+            hold_seconds = time.monotonic() - self.__acquired_at
+            self.__metrics['hold_seconds_total'] += hold_seconds
+            self.__metrics['hold_seconds_max'] = max(self.__metrics['hold_seconds_max'], hold_seconds)
+
+            fcntl.flock(self.__lock_obj.fileno(), fcntl.LOCK_UN)
+            self.__lock_obj.close()
+            self.__lock_obj = None
+        self.__thread_lock.release()
+
+    def metrics(self):
+        """Returns a copy of the wait and hold time metrics of the lock."""
+        with self.__thread_lock:
+            return dict(self.__metrics)
+
+    ###################
+    # Private methods #
+    ###################
+
+    def __take_file_lock(self, operation, start):
+        deadline = start + self.__timeout
+        backoff = StatusFileLock.MIN_BACKOFF
+        contended = False
+
+        lock_obj = open(self.__lock_path, 'a')
+        while True:
+            try:
+                fcntl.flock(lock_obj.fileno(), operation | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                contended = True
+                now = time.monotonic()
+                if now >= deadline:
+                    lock_obj.close()
+                    self.__timed_out(start)
+                # Randomize the backoff so that waiting processes do not retry in lockstep.
+                time.sleep(min(backoff * random.uniform(0.5, 1.0), deadline - now))
+                backoff = min(2.0 * backoff, StatusFileLock.MAX_BACKOFF)
+
+        self.__lock_obj = lock_obj
+        self.__acquired_at = time.monotonic()
+
+        wait_seconds = self.__acquired_at - start
+        self.__metrics['acquisitions'] += 1
+        self.__metrics['contended'] += int(contended)
+        self.__metrics['wait_seconds_total'] += wait_seconds
+        self.__metrics['wait_seconds_max'] = max(self.__metrics['wait_seconds_max'], wait_seconds)
+
+    def __timed_out(self, start):
+        self.__metrics['timeouts'] += 1
+        message = (f"Could not lock {self.__lock_path} within {self.__timeout} seconds "
+                   f"(waited {time.monotonic() - start:.3f} seconds).")
+        raise StatusFileLockTimeoutError(message)
+
+class _SharedStatusFileLock:
+    """Context manager holding a StatusFileLock shared."""
+
+    def __init__(self, status_file_lock):
+        self.__status_file_lock = status_file_lock
+
+    def __enter__(self):
+        self.__status_file_lock.acquire(shared=True)
+        return self.__status_file_lock
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.__status_file_lock.release()
+        return False
+
+class StatusFileLockTimeoutError(TimeoutError):
+    """Exception raised when the status file lock cannot be acquired in time."""
+    def __init__(self,message):
+        """The class constructor
+
+        Parameters
+        ----------
+        message : string
+            The error message for this exception.
+        """
+        super().__init__(message)
+        self._message = message
+
+    @property
+    def message(self):
+        """str: The error message."""
+        return self._message
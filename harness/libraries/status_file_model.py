@@ -0,0 +1,83 @@
+#! /usr/bin/env python3
+"""
+-------------------------------------------------------------------------------
+File:   status_file_model.py
+National Center for Computational Sciences, Scientific Computing Group.
+Oak Ridge National Laboratory
+Copyright (C) 2023 Oak Ridge National Laboratory, UT-Battelle, LLC.
+-------------------------------------------------------------------------------
+"""
+
+class StatusFileModel:
+    """In-memory copy of the status file records that a harness process updates.
+
+    A record is loaded into the model, with its byte offset in the status
+    file, the first time it is updated. Updates change the columns of the
+    record in memory and mark them dirty; the owner of the model writes the
+    dirty columns to the status file at the end of each event and marks
+    them clean.
+
+    The model remembers the inode, size and modification time of the status
+    file when it was last read or written (its signature). While the status
+    file still has that signature, the offsets and columns in the model are
+    those of the file. Otherwise the status file was replaced, appended to or
+    updated by another process, and the model must be reloaded.
+    """
+
+    def __init__(self):
+        self.__signature = None
+        self.__rows = {}
+
+    ###################
+    # Public methods  #
+    ###################
+
+    @staticmethod
+    def signature_of(stat_result):
+        return (stat_result.st_ino, stat_result.st_size, stat_result.st_mtime_ns)
+
+    def is_current(self, stat_result):
+        """Indicates whether the status file is unchanged since the model last read or wrote it."""
+        return self.__signature is not None and self.__signature == StatusFileModel.signature_of(stat_result)
+
+    def set_current(self, stat_result):
+        """Records the signature of the status file after the model read or wrote it."""
+        self.__signature = StatusFileModel.signature_of(stat_result)
+
+    def add_row(self, unique_id, offset, words):
+        """Loads the record of unique_id at byte offset with the column values words."""
+        self.__rows[unique_id] = _StatusFileModelRow(offset, list(words))
+
+    def row(self, unique_id):
+        """Returns the (offset, words) of the record of unique_id, or None if it is not loaded."""
+        row = self.__rows.get(unique_id)
+        return None if row is None else (row.offset, list(row.words))
+
+    def update(self, unique_id, updates):
+        """Sets columns of the loaded record of unique_id and marks them dirty."""
+        row = self.__rows[unique_id]
+        for (column, value) in updates.items():
+            row.words[column] = value
+            row.dirty.add(column)
+
+    def dirty_rows(self):
+        """Returns (unique_id, offset, {column : value}) for each record with dirty columns."""
+        return [(unique_id, row.offset, dict((column, row.words[column]) for column in sorted(row.dirty)))
+                for (unique_id, row) in self.__rows.items() if row.dirty]
+
+    def mark_clean(self):
+        for row in self.__rows.values():
+            row.dirty.clear()
+
+    def clear(self):
+        """Unloads all the records. Dirty columns are discarded."""
+        self.__rows.clear()
+        self.__signature = None
+
+class _StatusFileModelRow:
+    """A record of a StatusFileModel."""
+
+    def __init__(self, offset, words):
+        self.offset = offset
+        self.words = words
+        self.dirty = set()
@@ -0,0 +1,133 @@
+#! /usr/bin/env python3
+"""
+-------------------------------------------------------------------------------
+File:   status_info_cache.py
+National Center for Computational Sciences, Scientific Computing Group.
+Oak Ridge National Laboratory
+Copyright (C) 2023 Oak Ridge National Laboratory, UT-Battelle, LLC.
+-------------------------------------------------------------------------------
+"""
+
+import os
+import time
+import threading
+
+class StatusInfoCache:
+    """Cache of the test instance information that get_status_info adds to every event.
+
+    The information that does not change during a harness launch (the host
+    name, the directories of the test instance, the harness environment
+    variables, ...) is kept per key, see context. The small files of a test
+    instance that the events report (check_alias.txt, job_id.txt and
+    job_status.txt) are kept per path and are read again only when their
+    modification time, size or inode changes, see file_value.
+
+    A file modified within RACY_SECONDS of being read is not cached, since a
+    later change in the same clock tick of the file system would not change
+    its modification time.
+
+    The time the cache saved is estimated from the time of the lookups that
+    missed, and is accumulated with the hit and miss counts in metrics().
+    """
+
+    RACY_SECONDS = 2.0
+
+    def __init__(self):
+        self.__thread_lock = threading.Lock()
+        self.__contexts = {}
+        self.__files = {}
+        self.__metrics = {'events' : 0,
+                          'context_hits' : 0,
+                          'context_misses' : 0,
+                          'file_hits' : 0,
+                          'file_reads' : 0,
+                          'seconds_saved' : 0.0}
+
+    ###################
+    # Public methods  #
+    ###################
+
+    def context(self, key, build):
+        """Returns the test instance information for key, calling build() on the first lookup.
+
+        Each call counts as one event in metrics().
+
+        Parameters
+        ----------
+        key : tuple
+            The test instance and the values of everything build() depends on.
+
+        build : callable
+            Returns the information for key.
+        """
+        with self.__thread_lock:
+            self.__metrics['events'] += 1
+            cached = self.__contexts.get(key)
+            if cached is not None:
+                (value, seconds) = cached
+                self.__metrics['context_hits'] += 1
+                self.__metrics['seconds_saved'] += seconds
+                return value
+
+        start = time.perf_counter()
+        value = build()
+        seconds = time.perf_counter() - start
+
+        with self.__thread_lock:
+            self.__contexts[key] = (value, seconds)
+            self.__metrics['context_misses'] += 1
+        return value
+
+    def file_value(self, path, parse):
+        """Returns parse() of the contents of the file at path, or None if it does not exist.
+
+        Parameters
+        ----------
+        path : str
+            The path of the file.
+
+        parse : callable
+            Returns the value of the file from its contents.
+        """
+        start = time.perf_counter()
+        try:
+            stat_result = os.stat(path)
+        except FileNotFoundError:
+            with self.__thread_lock:
+                self.__files.pop(path, None)
+            return None
+        signature = (stat_result.st_mtime_ns, stat_result.st_size, stat_result.st_ino)
+
+        with self.__thread_lock:
+            cached = self.__files.get(path)
+            if cached is not None and cached[0] == signature:
+                (signature, value, seconds) = cached
+                self.__metrics['file_hits'] += 1
+                self.__metrics['seconds_saved'] += max(0.0, seconds - (time.perf_counter() - start))
+                return value
+
+        try:
+            with open(path, 'r') as file_obj:
+                value = parse(file_obj.read())
+        except FileNotFoundError:
+            return None
+        seconds = time.perf_counter() - start
+
+        with self.__thread_lock:
+            self.__metrics['file_reads'] += 1
+            if time.time() - stat_result.st_mtime > StatusInfoCache.RACY_SECONDS:
+                self.__files[path] = (signature, value, seconds)
+            else:
+                self.__files.pop(path, None)
+        return value
+
+    def metrics(self):
+        """Returns a copy of the hit and miss counts and of the estimated seconds saved."""
+        with self.__thread_lock:
+            return dict(self.__metrics)
+
+    def clear(self):
+        """Removes all the cached information."""
+        with self.__thread_lock:
+            self.__contexts.clear()
+            self.__files.clear()
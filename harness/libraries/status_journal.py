@@ -0,0 +1,188 @@
+#! /usr/bin/env python3
+"""
+-------------------------------------------------------------------------------
+File:   status_journal.py
+National Center for Computational Sciences, Scientific Computing Group.
+Oak Ridge National Laboratory
+Copyright (C) 2023 Oak Ridge National Laboratory, UT-Battelle, LLC.
+-------------------------------------------------------------------------------
+"""
+
+import os
+import json
+import fcntl
+import threading
+
+class StatusJournal:
+    """Append-only journal of the changes to a subtest status file.
+
+    In journal mode the status file rgt_status.txt is not rewritten for every
+    event. Instead each change is appended to the journal file
+    rgt_status.txt.journal as one JSON entry per line:
+
+        ["add", [<the column values of a new record>]]
+        ["set", <unique id>, [[<column index>, <value>], ...]]
+
+    Compaction folds the journal back into the status file. The journal is
+    first renamed to rgt_status.txt.journal.compacting, so that new entries
+    go to a fresh journal while the compaction is running, and the compacting
+    file is removed once the status file has been replaced. Readers merge the
+    status file with the compacting file and then the journal. Both kinds of
+    entries are idempotent, so a reader that sees an entry both in the status
+    file and in a journal file still gets the right record.
+    """
+
+    JOURNAL_SUFFIX = '.journal'
+    COMPACTING_SUFFIX = '.journal.compacting'
+    LOCK_SUFFIX = '.journal.lock'
+
+    ENTRY_ADD = 'add'
+    ENTRY_SET = 'set'
+
+    def __init__(self, path_to_status_file):
+        """Constructor.
+
+        Parameters
+        ----------
+        path_to_status_file : str
+            The fully qualified path to the subtest status file.
+        """
+        self.__path_to_status_file = path_to_status_file
+        self.__journal_path = path_to_status_file + StatusJournal.JOURNAL_SUFFIX
+        self.__compacting_path = path_to_status_file + StatusJournal.COMPACTING_SUFFIX
+        self.__lock_path = path_to_status_file + StatusJournal.LOCK_SUFFIX
+        self.__compaction_thread = None
+
+    ###################
+    # Public methods  #
+    ###################
+
+    @property
+    def journal_path(self):
+        return self.__journal_path
+
+    def exists(self):
+        """Returns True if there are journal entries not yet folded into the status file."""
+        return os.path.exists(self.__journal_path) or os.path.exists(self.__compacting_path)
+
+    def append_record(self, words):
+        """Appends a new status file record and returns the size of the journal."""
+        return self.__append([StatusJournal.ENTRY_ADD, list(words)])
+
+    def append_update(self, unique_id, updates):
+        """Appends new column values for the record of unique_id.
+
+        Parameters
+        ----------
+        unique_id : str
+            The unique id of the record to update.
+
+        updates : dict
+            Maps the column index to the new column value.
+
+        Returns
+        -------
+        int
+            The size in bytes of the journal after the append.
+        """
+        return self.__append([StatusJournal.ENTRY_SET, unique_id,
+                              [[column, value] for (column, value) in updates.items()]])
+
+    def read_entries(self):
+        """Returns the journal entries, oldest first.
+
+        The journal is read before the compacting file. A compaction that
+        renames the journal in between then only makes us read the same
+        entries twice, never miss them.
+        """
+        journal_entries = StatusJournal.__read_entry_file(self.__journal_path)
+        compacting_entries = StatusJournal.__read_entry_file(self.__compacting_path)
+        return compacting_entries + journal_entries
+
+    def compact(self, fold):
+        """Folds the journal into the status file.
+
+        Parameters
+        ----------
+        fold : callable
+            Called as fold(entries) with the entries to fold. It must replace
+            the status file atomically (e.g., write a temporary file and
+            rename it).
+
+        Returns
+        -------
+        bool
+            False if another process is compacting the journal, True otherwise.
+        """
+        with open(self.__lock_path, 'a') as lock_obj:
+            try:
+                fcntl.flock(lock_obj.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+
+            try:
+                # A compacting file left by an interrupted compaction is folded
+                # again before the journal is moved aside.
+                if not os.path.exists(self.__compacting_path):
+                    try:
+                        os.rename(self.__journal_path, self.__compacting_path)
+                    except FileNotFoundError:
+                        return True
+
+                entries = StatusJournal.__read_entry_file(self.__compacting_path)
+                if entries:
+                    fold(entries)
+                os.remove(self.__compacting_path)
+            finally:
+                fcntl.flock(lock_obj.fileno(), fcntl.LOCK_UN)
+
+        return True
+
+    def compact_in_background(self, fold):
+        """Starts compacting the journal in a thread unless a compaction is already running.
+
+        The thread is not a daemon thread, so the interpreter waits for the
+        compaction to finish before exiting.
+        """
+        if self.__compaction_thread is not None and self.__compaction_thread.is_alive():
+            return
+        self.__compaction_thread = threading.Thread(target=self.compact, args=(fold,),
+                                                    name="status-journal-compaction")
+        self.__compaction_thread.start()
+
+    def wait_for_compaction(self):
+        """Waits for a compaction started by compact_in_background to finish."""
+        if self.__compaction_thread is not None:
+            self.__compaction_thread.join()
+            self.__compaction_thread = None
+
+    ###################
+    # Private methods #
+    ###################
+
+    def __append(self, entry):
+        # One write on a descriptor opened with O_APPEND, so that the entries
+        # of concurrent writers are not interleaved.
+        line = (json.dumps(entry) + '\n').encode()
+        fd = os.open(self.__journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o664)
+        try:
+            os.write(fd, line)
+            return os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def __read_entry_file(path):
+        try:
+            with open(path, 'r') as file_obj:
+                lines = file_obj.readlines()
+        except FileNotFoundError:
+            return []
+
+        entries = []
+        for line in lines:
+            # A line without its newline is an append that was cut short.
+            if not line.endswith('\n'):
+                break
+            entries.append(json.loads(line))
+        return entries
@@ -0,0 +1,204 @@
+#! /usr/bin/env python3
+"""
+-------------------------------------------------------------------------------
+File:   system_log_transport.py
+National Center for Computational Sciences, Scientific Computing Group.
+Oak Ridge National Laboratory
+Copyright (C) 2023 Oak Ridge National Laboratory, UT-Battelle, LLC.
+-------------------------------------------------------------------------------
+"""
+
+import os
+import time
+import atexit
+import socket
+import threading
+import subprocess
+
+class SyslogTransport:
+    """Sends system log entries to the local syslog daemon over a persistent socket.
+
+    The entries are sent to the Unix socket /dev/log with the facility and
+    priority of the command `logger -p local0.notice`, and the tag `logger`
+    uses, the user name. The socket is opened on the first entry and
+    reopened once if sending fails, e.g. after a restart of the daemon. If
+    the socket cannot be opened then the entries are sent with the logger
+    command instead.
+    """
+
+    DEFAULT_ADDRESS = '/dev/log'
+
+    # local0.notice
+    PRIORITY = 16 * 8 + 5
+
+    def __init__(self, address=None):
+        """Constructor.
+
+        Parameters
+        ----------
+        address : str
+            The path of the Unix socket of the syslog daemon. The default is
+            DEFAULT_ADDRESS.
+        """
+        self.__address = SyslogTransport.DEFAULT_ADDRESS if address is None else address
+        self.__tag = os.environ.get('USER', 'rgt')
+        self.__thread_lock = threading.Lock()
+        self.__socket = None
+        self.__socket_type = None
+
+    ###################
+    # Public methods  #
+    ###################
+
+    def send(self, log_string):
+        """Sends a system log entry."""
+        now = time.localtime()
+        timestamp = '{0} {1:2d} {2}'.format(time.strftime('%b', now), now.tm_mday, time.strftime('%H:%M:%S', now))
+        message = '<{0}>{1} {2}: {3}'.format(SyslogTransport.PRIORITY, timestamp, self.__tag, log_string)
+        data = message.encode()
+        with self.__thread_lock:
+            for attempt in range(2):
+                try:
+                    if self.__socket is None:
+                        self.__connect()
+                    if self.__socket_type == socket.SOCK_STREAM:
+                        self.__socket.sendall(data + b'\0')
+                    else:
+                        self.__socket.send(data)
+                    return
+                except OSError:
+                    self.__close_socket()
+
+        # The syslog daemon is not reachable through its socket.
+        subprocess.run(['logger', '-p', 'local0.notice', log_string],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def close(self):
+        with self.__thread_lock:
+            self.__close_socket()
+
+    ###################
+    # Private methods #
+    ###################
+
+    def __connect(self):
+        # The socket of the syslog daemon is a datagram socket on most
+        # systems and a stream socket on some.
+        for socket_type in (socket.SOCK_DGRAM, socket.SOCK_STREAM):
+            sock = socket.socket(socket.AF_UNIX, socket_type)
+            try:
+                sock.connect(self.__address)
+            except OSError:
+                sock.close()
+                if socket_type == socket.SOCK_STREAM:
+                    raise
+                continue
+            self.__socket = sock
+            self.__socket_type = socket_type
+            return
+
+    def __close_socket(self):
+        if self.__socket is not None:
+            self.__socket.close()
+        self.__socket = None
+        self.__socket_type = None
+
+class BufferedFileTransport:
+    """Appends system log entries to files under RGT_SYSTEM_LOG_DIR through buffered, open files.
+
+    The files stay open across entries, and are flushed when an entry is
+    written more than flush_interval seconds after the last flush, and when
+    the transport is flushed or closed, which happens at exit. Entries
+    written after the transport is closed are appended to their file
+    directly.
+    """
+
+    # The default maximum time in seconds an entry stays in the buffer
+    # while further entries are written.
+    DEFAULT_FLUSH_INTERVAL = 1.0
+
+    # The maximum number of files kept open.
+    MAX_OPEN_FILES = 16
+
+    def __init__(self, flush_interval=None):
+        """Constructor.
+
+        Parameters
+        ----------
+        flush_interval : float
+            The default is RGT_SYSTEM_LOG_FLUSH_SECONDS, or
+            DEFAULT_FLUSH_INTERVAL if that is not set.
+        """
+        if flush_interval is None:
+            flush_interval = float(os.environ.get('RGT_SYSTEM_LOG_FLUSH_SECONDS',
+                                                  BufferedFileTransport.DEFAULT_FLUSH_INTERVAL))
+        self.__flush_interval = flush_interval
+        self.__thread_lock = threading.Lock()
+        self.__files = {}
+        self.__last_flush = time.monotonic()
+        self.__closed = False
+
+    ###################
+    # Public methods  #
+    ###################
+
+    def write(self, log_path, log_string):
+        """Appends a system log entry, a line, to the file at log_path."""
+        with self.__thread_lock:
+            if self.__closed:
+                with open(log_path, 'a') as file_obj:
+                    file_obj.write(log_string + '\n')
+                return
+
+            file_obj = self.__files.get(log_path)
+            if file_obj is None:
+                if len(self.__files) >= BufferedFileTransport.MAX_OPEN_FILES:
+                    # Close the file opened first.
+                    self.__files.pop(next(iter(self.__files))).close()
+                file_obj = open(log_path, 'a')
+                self.__files[log_path] = file_obj
+            file_obj.write(log_string + '\n')
+
+            if time.monotonic() - self.__last_flush >= self.__flush_interval:
+                self.__flush_files()
+
+    def flush(self):
+        with self.__thread_lock:
+            self.__flush_files()
+
+    def close(self):
+        with self.__thread_lock:
+            for file_obj in self.__files.values():
+                file_obj.close()
+            self.__files.clear()
+            self.__closed = True
+
+    ###################
+    # Private methods #
+    ###################
+
+    def __flush_files(self):
+        for file_obj in self.__files.values():
+            file_obj.flush()
+        self.__last_flush = time.monotonic()
+
+#------------------------------------------------------------------------------
+
+_TRANSPORTS = {}
+_TRANSPORTS_LOCK = threading.Lock()
+
+def syslog_transport():
+    """Returns the SyslogTransport of the process."""
+    return _get_transport('syslog', SyslogTransport)
+
+def file_transport():
+    """Returns the BufferedFileTransport of the process."""
+    return _get_transport('file', BufferedFileTransport)
+
+def _get_transport(name, transport_class):
+    with _TRANSPORTS_LOCK:
+        if name not in _TRANSPORTS:
+            transport = transport_class()
+            atexit.register(transport.close)
+            _TRANSPORTS[name] = transport
+        return _TRANSPORTS[name]
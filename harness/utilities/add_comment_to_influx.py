@@ -26,6 +26,21 @@ try:
 except:
     raise ImportError('Could not import status_file.py. Please make sure the olcf_harness module is loaded.')
 
+try:
+    from influx_client import influx_client
+except:
+    raise ImportError('Could not import influx_client.py. Please make sure the olcf_harness module is loaded.')
+
+try:
+    from influx_batch_writer import InfluxBatchWriter
+except:
+    raise ImportError('Could not import influx_batch_writer.py. Please make sure the olcf_harness module is loaded.')
+
+try:
+    from line_protocol import encode
+except:
+    raise ImportError('Could not import line_protocol.py. Please make sure the olcf_harness module is loaded.')
+
 
 
 # Initialize argparse ##########################################################
@@ -33,6 +48,8 @@ parser = argparse.ArgumentParser(description="Updates harness run in InfluxDB wi
 parser.add_argument('--testid', '-t', type=str, action='store', required=True, help="Specifies the harness test id to update jobs for.")
 parser.add_argument('--message', '-m', type=str, action='store', required=True, help="Comment to add to the record.")
 parser.add_argument('--db', type=str, required=True, action='store', help="InfluxDB instance name to log to.")
+parser.add_argument('--dry-run', action='store_true', help="When set, prints the records to send to Influx and the batches they would be sent in, but does not send them.")
+parser.add_argument('--retries', type=int, default=InfluxBatchWriter.DEFAULT_RETRIES, action='store', help=f"Number of times a failed request to InfluxDB is sent again. Default: {InfluxBatchWriter.DEFAULT_RETRIES}.")
 parser.add_argument('--event', type=str, action='store', choices=['logging_start', 'build_start', 'build_end', 'submit_start', \
                         'submit_end', 'job_queued', 'binary_execute_start', 'binary_execute_end', 'check_start', 'check_end'], \
                         help="Specifies the harness event to add the comment to.")
@@ -106,7 +123,7 @@ def query_influx():
     print(query)
     url = f"{get_influx_uri}&db=accept&q={urllib.parse.quote(query)}"
     try:
-        r = requests.get(url, headers=headers, params={'q': 'requests+language:python'})
+        r = influx_client().get(url, headers=headers, params={'q': 'requests+language:python'})
     except requests.exceptions.ConnectionError as e:
         print("InfluxDB is not reachable. Request not sent.")
         print(str(e))
@@ -140,12 +157,6 @@ def query_influx():
 
 def post_update_to_influx(d):
     """ POSTs updated event to Influx """
-    headers = {
-        'Authorization': "Token " + influx_token,
-        'Content-Type': "application/octet-stream",
-        'Accept': "application/json"
-    }
-        #'Content-Type': "text/plain; charset=utf-8",
     try:
         log_time = datetime.datetime.strptime(d['time'], "%Y-%m-%dT%H:%M:%S.%fZ") - datetime.timedelta(hours=4)
     except ValueError as e:
@@ -158,28 +169,19 @@ def post_update_to_influx(d):
 
     log_ns = int(datetime.datetime.timestamp(log_time) * 1000 * 1000) * 1000
 
-    tagline = ','.join([f"{fld}={d[fld]}" for fld in tags])
-    fieldline = ','.join([f"{fld}=\"{d[fld]}\"" for fld in fields])
-    influx_event_record_string = f'events,{tagline} {fieldline} {str(log_ns)}'
-    try:
-        r = requests.post(post_influx_uri, data=influx_event_record_string, headers=headers)
-        if int(r.status_code) < 400:
-            print(f"Successfully updated {d['test_id']} with {influx_event_record_string}.")
-            return True
-        else:
-            print(f"Influx returned status code: {r.status_code} in response to data: {influx_event_record_string}")
-            print(r.text)
-            return False
-    except requests.exceptions.ConnectionError as e:
-        print(f"InfluxDB is not reachable. Request not sent: {influx_event_record_string}")
-        os.chdir(currentdir)
-        return False
-    except Exception as e:
-        # TODO: add more graceful handling of unreachable influx servers
-        print(f"Failed to send {influx_event_record_string} to {influx_url}:")
-        print(e)
-        os.chdir(currentdir)
-        return False
+    tag_values = {fld: d[fld] for fld in tags}
+    # All fields are re-posted as strings, as they were read
+    field_values = {fld: str(d[fld]) for fld in fields}
+    influx_event_record_string = encode('events', tag_values, field_values, log_ns)
+    print(f"Updating {d['test_id']} with {influx_event_record_string}.")
+    influx_writer.add(influx_event_record_string)
+
+headers = {
+    'Authorization': "Token " + influx_token,
+    'Content-Type': "application/octet-stream",
+    'Accept': "application/json"
+}
+influx_writer = InfluxBatchWriter(post_influx_uri, headers=headers, retries=args.retries, dry_run=args.dry_run)
 
 data = query_influx()
 
@@ -193,4 +195,6 @@ else:
 
 post_update_to_influx(data)
 
+if not influx_writer.close():
+    sys.exit(1)
 sys.exit(0)
@@ -30,12 +30,31 @@ try:
 except:
     raise ImportError('Could not import status_file.py. Please make sure the olcf_harness module is loaded.')
 
+try:
+    from influx_client import influx_client
+except:
+    raise ImportError('Could not import influx_client.py. Please make sure the olcf_harness module is loaded.')
+
+try:
+    from influx_batch_writer import InfluxBatchWriter
+except:
+    raise ImportError('Could not import influx_batch_writer.py. Please make sure the olcf_harness module is loaded.')
+
+try:
+    from line_protocol import encode
+except:
+    raise ImportError('Could not import line_protocol.py. Please make sure the olcf_harness module is loaded.')
+
 
 # Initialize argparse ##########################################################
 parser = argparse.ArgumentParser(description="Updates harness run in InfluxDB with a new machine name")
 parser.add_argument('--testid', '-t', type=str, action='store', required=True, help="Specifies the harness test ID to update machine for.")
 parser.add_argument('--newmachine', '-m', type=str, action='store', required=True, help="New machine to assign to the harness test.")
 parser.add_argument('--db', type=str, required=True, action='store', help="InfluxDB instance name to log to.")
+parser.add_argument('--dry-run', action='store_true', help="When set, prints the records to send to Influx and the batches they would be sent in, but does not send them.")
+parser.add_argument('--batch-lines', type=int, default=InfluxBatchWriter.DEFAULT_MAX_LINES, action='store', help=f"Maximum number of records per request to InfluxDB. Default: {InfluxBatchWriter.DEFAULT_MAX_LINES}.")
+parser.add_argument('--batch-bytes', type=int, default=InfluxBatchWriter.DEFAULT_MAX_BYTES, action='store', help=f"Maximum number of bytes per request to InfluxDB. Default: {InfluxBatchWriter.DEFAULT_MAX_BYTES}.")
+parser.add_argument('--retries', type=int, default=InfluxBatchWriter.DEFAULT_RETRIES, action='store', help=f"Number of times a failed request to InfluxDB is sent again. Default: {InfluxBatchWriter.DEFAULT_RETRIES}.")
 ################################################################################
 
 # Global URIs and Tokens #######################################################
@@ -101,7 +120,7 @@ def query_influx():
     }
     url = f"{get_influx_uri}&db=accept&q={urllib.parse.quote(query)}"
     try:
-        r = requests.get(url, headers=headers, params={'q': 'requests+language:python'})
+        r = influx_client().get(url, headers=headers, params={'q': 'requests+language:python'})
     except requests.exceptions.ConnectionError as e:
         print("InfluxDB is not reachable. Request not sent.")
         print(str(e))
@@ -133,12 +152,6 @@ def query_influx():
 
 def post_update_to_influx(d):
     """ POSTs updated event to Influx """
-    headers = {
-        'Authorization': "Token " + influx_token,
-        'Content-Type': "application/octet-stream",
-        'Accept': "application/json"
-    }
-        #'Content-Type': "text/plain; charset=utf-8",
     # This is provided in UTC -- convert to EST
     try:
         log_time = datetime.datetime.strptime(d['time'], "%Y-%m-%dT%H:%M:%S.%fZ") - datetime.timedelta(hours=4)
@@ -151,28 +164,20 @@ def post_update_to_influx(d):
     # microsecond timing max precision
     log_ns = int(datetime.datetime.timestamp(log_time) * 1000 * 1000) * 1000
 
-    tagline = ','.join([f"{fld}={d[fld]}" for fld in tags])
-    fieldline = ','.join([f"{fld}=\"{d[fld]}\"" for fld in fields])
-    influx_event_record_string = f'events,{tagline} {fieldline} {str(log_ns)}'
-    try:
-        r = requests.post(post_influx_uri, data=influx_event_record_string, headers=headers)
-        if int(r.status_code) < 400:
-            print(f"Successfully updated {d['test_id']} with {influx_event_record_string}.")
-            return True
-        else:
-            print(f"Influx returned status code: {r.status_code} in response to data: {influx_event_record_string}")
-            print(r.text)
-            return False
-    except requests.exceptions.ConnectionError as e:
-        print(f"InfluxDB is not reachable. Request not sent: {influx_event_record_string}")
-        os.chdir(currentdir)
-        return False
-    except Exception as e:
-        # TODO: add more graceful handling of unreachable influx servers
-        print(f"Failed to send {influx_event_record_string} to {influx_url}:")
-        print(e)
-        os.chdir(currentdir)
-        return False
+    tag_values = {fld: d[fld] for fld in tags}
+    # All fields are re-posted as strings, as they were read
+    field_values = {fld: str(d[fld]) for fld in fields}
+    influx_event_record_string = encode('events', tag_values, field_values, log_ns)
+    print(f"Updating {d['test_id']} with {influx_event_record_string}.")
+    influx_writer.add(influx_event_record_string)
+
+headers = {
+    'Authorization': "Token " + influx_token,
+    'Content-Type': "application/octet-stream",
+    'Accept': "application/json"
+}
+influx_writer = InfluxBatchWriter(post_influx_uri, headers=headers, max_lines=args.batch_lines,
+                                  max_bytes=args.batch_bytes, retries=args.retries, dry_run=args.dry_run)
 
 data = query_influx()
 
@@ -190,4 +195,6 @@ for d in data:
         d['machine'] = args.newmachine
     post_update_to_influx(d)
 
+if not influx_writer.close():
+    sys.exit(1)
 sys.exit(0)
@@ -20,7 +20,6 @@
 ################################################################################
 
 import argparse
-from datetime import datetime
 import requests
 import re
 from harness_keys import influx_keys
@@ -40,6 +39,17 @@ try:
     from harness_keys import influx_keys
 except:
     raise ImportError('Could not import harness_keys.py. Please make sure that you have a file named harness_keys.py in the search path. This is how this script reads information to query InfluxDB.')
+
+try:
+    from influx_client import influx_client
+except:
+    raise ImportError('Could not import influx_client.py. Please make sure the olcf_harness module is loaded.')
+
+try:
+    from line_protocol import encode
+    from line_protocol import timestamp_ns
+except:
+    raise ImportError('Could not import line_protocol.py. Please make sure the olcf_harness module is loaded.')
 ################################################################################
 
 # Parse command-line arguments #################################################
@@ -106,48 +116,40 @@ if not ret[0]:
 ################################################################################
 
 # Format check for time ########################################################
-timestamp_ns = -1
+log_time_ns = None
 if args.time:
-    detected_time_fmt = False
-    for fmt in ["%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%dT%H:%M:%S.%f", "%Y-%m-%dT%H:%M:%S.%fZ"]:
-        try:
-            log_time = datetime.strptime(args.time, fmt)
-            timestamp_ns = int(datetime.timestamp(log_time) * 1000 * 1000) * 1000
-            detected_time_fmt = True
-            print(f"Found time in format of {fmt}")
-            break
-        except Exception as e:
-            pass
+    try:
+        log_time_ns = timestamp_ns(args.time)
+    except ValueError as e:
+        print(f"Invalid time: {args.time}. Expected format: YYYY-MM-DDTHH:MM:SS[.MS][Z]")
+        exit(1)
 ################################################################################
 
-# Format check for time ########################################################
+# Format keys & values #########################################################
 number_regex = re.compile('^([0-9]*\.)?[0-9]+(e[+-]?[0-9]+)?$')
-values_formatted = []
+tags = dict([key.split('=') for key in args.keys.split(',')])
+fields = {}
 for val in args.values.split(','):
     # We know it's properly formatted already
     val_splt = val.split('=')
     # We know quotes are balanced - if the starting quote is there, so is end
-    if not val_splt[1].startswith('"'):
-        if not number_regex.match(val_splt[1]):
-            val_splt[1] = '"' + val_splt[1] + '"'
-        # else, it's a valid decimal number
-    elif val_splt[1].startswith('"') and number_regex.match(val_splt[1][1:-1]):
-        # If it's a number, un-quote it (otherwise InfluxDB thinks it's a str)
+    if val_splt[1].startswith('"'):
         val_splt[1] = val_splt[1][1:-1]
-    values_formatted.append(f'{val_splt[0]}={val_splt[1]}')
+    # If it's a number, send it as a number (otherwise InfluxDB thinks it's a str)
+    if number_regex.match(val_splt[1]):
+        fields[val_splt[0]] = float(val_splt[1])
+    else:
+        fields[val_splt[0]] = val_splt[1]
 
 ################################################################################
 
 # Package & send ###############################################################
-influx_post_str = f"{args.table_name},{args.keys}"
-influx_post_str += f" {','.join(values_formatted)}"
-if args.time:
-    influx_post_str += f" {timestamp_ns}"
+influx_post_str = encode(args.table_name, tags, fields, log_time_ns)
 try:
     if args.nosend:
         print(f"NOSEND set: {influx_post_str}")
         exit(0)
-    r = requests.post(post_influx_uri, data=influx_post_str, headers=headers)
+    r = influx_client().write(post_influx_uri, influx_post_str, headers=headers)
     if int(r.status_code) < 400:
         print(f"Successfully sent {influx_post_str} to {post_influx_uri}")
     else:
@@ -159,6 +161,6 @@ except requests.exceptions.ConnectionError as e:
     print("InfluxDB is not reachable. Request not sent.")
     exit(1)
 except Exception as e:
-    print(f"Failed to send {influx_event_record_string} to {self.influx_url}:")
+    print(f"Failed to send {influx_post_str} to {post_influx_uri}: {e}")
 exit(2)
 ################################################################################
@@ -19,13 +19,34 @@ import subprocess
 import urllib.parse
 from datetime import datetime, timedelta
 import argparse
-import csv
 
 try:
     from status_file import StatusFile
 except:
     raise ImportError('Could not import status_file.py. Please make sure the olcf_harness module is loaded.')
 
+try:
+    from influx_client import influx_client
+except:
+    raise ImportError('Could not import influx_client.py. Please make sure the olcf_harness module is loaded.')
+
+try:
+    from flux_csv import FluxQueryError
+    from flux_csv import ITER_LINES_CHUNK_SIZE
+    from flux_csv import read_flux_csv
+except:
+    raise ImportError('Could not import flux_csv.py. Please make sure the olcf_harness module is loaded.')
+
+try:
+    from influx_batch_writer import InfluxBatchWriter
+except:
+    raise ImportError('Could not import influx_batch_writer.py. Please make sure the olcf_harness module is loaded.')
+
+try:
+    from line_protocol import encode
+except:
+    raise ImportError('Could not import line_protocol.py. Please make sure the olcf_harness module is loaded.')
+
 
 # Initialize argparse ##########################################################
 parser = argparse.ArgumentParser(description="Updates harness runs in InfluxDB with SLURM data")
@@ -39,7 +60,10 @@ parser.add_argument('--test', type=str, action='store', help="Specifies the test
 parser.add_argument('--runtag', type=str, action='store', help="Specifies the runtag to update jobs for.")
 parser.add_argument('--db', type=str, default='dev', action='store', help="InfluxDB instance name to log to. Default: dev")
 parser.add_argument('--verbosity', '-v', default=0, type=int, action='store', help="Verbosity level for stdout printing.")
-parser.add_argument('--dry-run', action='store_true', help="When set, prints messages to send to Influx, but does not send them.")
+parser.add_argument('--dry-run', action='store_true', help="When set, prints messages to send to Influx and the batches they would be sent in, but does not send them.")
+parser.add_argument('--batch-lines', type=int, default=InfluxBatchWriter.DEFAULT_MAX_LINES, action='store', help=f"Maximum number of records per request to InfluxDB. Default: {InfluxBatchWriter.DEFAULT_MAX_LINES}.")
+parser.add_argument('--batch-bytes', type=int, default=InfluxBatchWriter.DEFAULT_MAX_BYTES, action='store', help=f"Maximum number of bytes per request to InfluxDB. Default: {InfluxBatchWriter.DEFAULT_MAX_BYTES}.")
+parser.add_argument('--retries', type=int, default=InfluxBatchWriter.DEFAULT_RETRIES, action='store', help=f"Number of times a failed request to InfluxDB is sent again. Default: {InfluxBatchWriter.DEFAULT_RETRIES}.")
 parser.add_argument('--message', type=str, action='store', help="Specify a message to post in the 'comment' field of the new InfluxDB record.")
 parser.add_argument('--new-check-status', type=int, default=4, action='store', help="Integer exit code to post with the check_end status. Default: 4.")
 parser.add_argument('-y', action='store_true', help="USE WITH CAUTION: when set, bypasses the 'Are you sure?' message.")
@@ -151,7 +175,7 @@ def check_data(entry):
 
 def query_influx():
     """
-        Send the query to get all jobs matching criteria
+        Send the query to get all jobs matching criteria, and yield them as the response is read
     """
     headers = {
         'Authorization': "Token " + influx_token,
@@ -161,7 +185,7 @@ def query_influx():
     url = f"{get_influx_uri}"
     print_debug(2, f"Running: {event_query} on {url}")
     try:
-        r = requests.post(url, headers=headers, data=event_query)
+        r = influx_client().post(url, headers=headers, data=event_query, stream=True)
         if int(r.status_code) >= 400:
             print_debug(0, f"Influx request failed, status_code = {r.status_code}, text = {r.text}, reason = {r.reason}.")
             exit(1)
@@ -173,31 +197,32 @@ def query_influx():
         print_debug(0, f"Failed to send to {url}:")
         print_debug(0, str(e))
         exit(2)
-    rdc = r.content.decode('utf-8')
-    resp = list(csv.reader(rdc.splitlines(), delimiter=','))
-    # each entry in series is a record
-    col_names = resp[0]
-    # Let's do the work of transforming this into a list of dicts
-    ret_data = []
-    for entry_index in range(1, len(resp)):
-        data_tmp = {}
-        if len(resp[entry_index]) < len(col_names):
-            print_debug(2, f"Length too short. Skipping row: {resp[entry_index]}.")
-            continue
-        # First column is useless
-        for c_index in range(1, len(col_names)):
-            # Ignore result, table & rename time
-            if col_names[c_index] == "_time":
-                data_tmp["time"] = resp[entry_index][c_index]
-            elif not (col_names[c_index] == "result" or col_names[c_index] == "table" or col_names[c_index].startswith('_')):
-                data_tmp[col_names[c_index]] = resp[entry_index][c_index]
-        should_add, reason = check_data(data_tmp)
-        if should_add:
-            ret_data.append(data_tmp)
-        else:
-            jobid = data_tmp['test_id'] if 'test_id' in data_tmp else 'unknown'
-            print_debug(2, f"Skipping test_id {jobid}. Reason: {reason}")
-    return ret_data
+    # The CSV is parsed as it is streamed, so the response of a long time range
+    # is never held in memory at once
+    try:
+        for record in read_flux_csv(r.iter_lines(chunk_size=ITER_LINES_CHUNK_SIZE)):
+            data_tmp = {}
+            for column, value in record.items():
+                # Ignore result, table & rename time
+                if column == "_time":
+                    data_tmp["time"] = value
+                elif not (column == "result" or column == "table" or column.startswith('_')):
+                    data_tmp[column] = value
+            should_add, reason = check_data(data_tmp)
+            if should_add:
+                yield data_tmp
+            else:
+                jobid = data_tmp['test_id'] if 'test_id' in data_tmp else 'unknown'
+                print_debug(2, f"Skipping test_id {jobid}. Reason: {reason}")
+    except FluxQueryError as e:
+        print_debug(0, e.message)
+        exit(2)
+    except requests.exceptions.RequestException as e:
+        print_debug(0, f"Failed to read the response of {url}:")
+        print_debug(0, str(e))
+        exit(2)
+    finally:
+        r.close()
 
 def post_update_to_influx(d):
     """ POSTs updated event to Influx """
@@ -217,11 +242,6 @@ def post_update_to_influx(d):
     # Set new check status
     d['event_value'] = args.new_check_status
 
-    headers = {
-        'Authorization': "Token " + influx_token,
-        'Content-Type': "application/octet-stream",
-        'Accept': "application/json"
-    }
     try:
         log_time = datetime.strptime(d['time'], "%Y-%m-%dT%H:%M:%S.%fZ") - timedelta(hours=5)
     except ValueError as e:
@@ -232,37 +252,33 @@ def post_update_to_influx(d):
             raise ValueError(e)
     log_ns = round(datetime.timestamp(log_time) * 1000 * 1000) * 1000
 
-    influx_event_record_string = f"events,{','.join([f'{t}={d[t]}' for t in StatusFile.INFLUX_TAGS])} "
-    quote = '"'
-    influx_event_record_string += f"{','.join([f'{t}={quote}{d[t]}{quote}' for t in d if (not t == 'time') and (not t in StatusFile.INFLUX_TAGS)])}"
-    influx_event_record_string += f' {str(log_ns)}'
-    try:
-        if not args.dry_run:
-            r = requests.post(post_influx_uri, data=influx_event_record_string, headers=headers)
-            if int(r.status_code) < 400:
-                print_debug(1, f"Successfully updated {d['test_id']} with {influx_event_record_string}.")
-                return True
-            else:
-                print_debug(0, f"Influx returned status code: {r.status_code} in response to data: {influx_event_record_string}")
-                print_debug(1, r.text)
-                return False
-        else:
-            print_debug(0, f"Dry run set. Message: {influx_event_record_string}")
-    except requests.exceptions.ConnectionError as e:
-        print_debug(0, f"InfluxDB is not reachable. Request not sent: {influx_event_record_string}")
-        return False
-    except Exception as e:
-        # TODO: add more graceful handling of unreachable influx servers
-        print_debug(0, f"Failed to send {influx_event_record_string} to {influx_url}:")
-        print_debug(1, e)
-        return False
+    tags = {t: d[t] for t in StatusFile.INFLUX_TAGS}
+    # All fields are re-posted as strings, as they were read
+    fields = {t: str(d[t]) for t in d if (not t == 'time') and (not t in StatusFile.INFLUX_TAGS)}
+    influx_event_record_string = encode('events', tags, fields, log_ns)
+    print_debug(1, f"Updating {d['test_id']} with {influx_event_record_string}")
+    influx_writer.add(influx_event_record_string)
 
-data = query_influx()
+headers = {
+    'Authorization': "Token " + influx_token,
+    'Content-Type': "application/octet-stream",
+    'Accept': "application/json"
+}
+influx_writer = InfluxBatchWriter(post_influx_uri, headers=headers, max_lines=args.batch_lines,
+                                  max_bytes=args.batch_bytes, retries=args.retries, dry_run=args.dry_run,
+                                  progress=lambda msg: print_debug(0, msg))
 
-print(f"Found {len(data)} total jobs to update")
+data = query_influx()
+if not args.y:
+    # The answers to the prompts would hold the response of the query open,
+    # so all the entries are read before the first prompt
+    data = list(data)
+    print(f"Found {len(data)} total jobs to update")
+num_found = 0
 num_updated = 0
 
 for entry in data:
+    num_found += 1
     do_update = 'y'
     if not args.y:
         do_update = input(f"Found test_id={entry['test_id']},job_id={entry['job_id']}. Update this entry? [y/n]: ")
@@ -272,5 +288,11 @@ for entry in data:
     else:
         print_debug(1, f"Skipping {entry['test_id']}")
 
-print_debug(0, f"{num_updated} entries sent to InfluxDB.")
+if not influx_writer.close():
+    print_debug(0, f"Found {num_found} total jobs to update. Some of the {num_updated} entries could not be sent to InfluxDB.")
+    exit(1)
+elif args.dry_run:
+    print_debug(0, f"Found {num_found} total jobs to update. Dry run set, {num_updated} entries not sent to InfluxDB.")
+else:
+    print_debug(0, f"Found {num_found} total jobs to update. {num_updated} entries sent to InfluxDB.")
 exit(0)
@@ -18,15 +18,41 @@ import os
 import requests
 import subprocess
 import urllib.parse
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import argparse
-import csv
+import time
+import concurrent.futures
 
 try:
     from status_file import StatusFile
 except:
     raise ImportError('Could not import status_file.py. Please make sure the olcf_harness module is loaded.')
 
+try:
+    from influx_client import influx_client
+except:
+    raise ImportError('Could not import influx_client.py. Please make sure the olcf_harness module is loaded.')
+
+try:
+    from flux_csv import FluxQueryError
+    from flux_csv import ITER_LINES_CHUNK_SIZE
+    from flux_csv import read_flux_csv
+except:
+    raise ImportError('Could not import flux_csv.py. Please make sure the olcf_harness module is loaded.')
+
+try:
+    from line_protocol import encode
+    from line_protocol import timestamp_ns
+except:
+    raise ImportError('Could not import line_protocol.py. Please make sure the olcf_harness module is loaded.')
+
+try:
+    from flux_query_planner import flux_range
+    from flux_query_planner import plan_time_chunks
+    from flux_query_planner import query_time_chunks
+except:
+    raise ImportError('Could not import flux_query_planner.py. Please make sure the olcf_harness module is loaded.')
+
 
 # Initialize argparse ##########################################################
 parser = argparse.ArgumentParser(description="Updates harness runs in InfluxDB with SLURM data")
@@ -42,6 +68,8 @@ parser.add_argument('--db', type=str, default='dev', action='store', help="Influ
 parser.add_argument('--verbosity', '-v', default=0, type=int, action='store', help="InfluxDB instance name to log to.")
 parser.add_argument('--dry-run', action='store_true', help="When set, prints messages to send to Influx, but does not send them.")
 parser.add_argument('--force', '-f', action='store_true', help="When set, prints messages to send to Influx, but does not send them.")
+parser.add_argument('--chunk-time', default='1d', type=str, action='store', help="Length of the time chunks the InfluxDB query is split in (ex: 6h, 1d). Default: 1d.")
+parser.add_argument('--jobs', '-j', default=4, type=int, action='store', help="Number of InfluxDB queries, and of sacct lookups, run at the same time. Default: 4.")
 ################################################################################
 
 # Global URIs and Tokens #######################################################
@@ -90,22 +118,26 @@ if args.starttime:
 if args.endtime:
     # Check format
     check_time_format(args.endtime)
-if not (args.time.endswith('d') or args.time.endswith('h')):
-    print(f"Unrecognized time parameter: {args.time[0]}.")
-    print(f"This program allows hours or days to be specified as '1h' or '1d' for one hour or day, respectively.")
-    exit(1)
+for time_arg in [args.time, args.chunk_time]:
+    if not (time_arg.endswith('d') or time_arg.endswith('h')) or not time_arg[:-1].isdigit() or int(time_arg[:-1]) == 0:
+        print(f"Unrecognized time parameter: {time_arg}.")
+        print(f"This program allows hours or days to be specified as '1h' or '1d' for one hour or day, respectively.")
+        exit(1)
 
-flux_time_str = ''
-# Build range() line for flux query
+def parse_duration(s):
+    if s.endswith('d'):
+        return timedelta(days=int(s[:-1]))
+    return timedelta(hours=int(s[:-1]))
+
+# Build the time window of the query, which is split in chunks of --chunk-time
+window_stop = datetime.now(timezone.utc)
+if args.endtime:
+    window_stop = datetime.strptime(args.endtime, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
 if args.starttime:
-    # Then we use 'from: <timestamp>'
-    flux_time_str = f'|> range(start: {args.starttime}'
-    if args.endtime:
-        flux_time_str += f', stop: {args.endtime}'
-    flux_time_str += ')'
+    window_start = datetime.strptime(args.starttime, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
 else:
-    # Then we use --time
-    flux_time_str = f'|> range(start: -{args.time})'
+    window_start = window_stop - parse_duration(args.time)
+time_chunks = plan_time_chunks(window_start, window_stop, parse_duration(args.chunk_time))
 
 ################################################################################
 
@@ -121,13 +153,19 @@ if args.runtag:
 def wrap_in_quotes(s):
     return f'"{s}"'
 
+# Gets the last event of each test in a time chunk
 # Excludes the output_txt field, since that's not important here
-running_query = f'from(bucket: "accept") {flux_time_str} \
+def make_running_query(flux_time_str):
+    return f'from(bucket: "accept") {flux_time_str} \
 |> filter(fn: (r) => r._measurement == "events" and {machine_app_test_filter} and r._field != "output_txt") \
 |> last() \
-|> pivot(rowKey: ["test_id", "machine", "_time"], columnKey: ["_field"], valueColumn: "_value") \
-|> filter(fn: (r) => r.event_name == "job_queued" or (r.event_name != "check_end" and (r.event_value == "0" or r.event_value == "[NO_VALUE]"))) \
-|> group()'
+|> pivot(rowKey: ["test_id", "machine", "_time"], columnKey: ["_field"], valueColumn: "_value")'
+
+def is_running(entry):
+    """ Whether the last event of a test is of a test still running """
+    if entry.get('event_name') == 'job_queued':
+        return True
+    return entry.get('event_name') != 'check_end' and entry.get('event_value') in ['0', '[NO_VALUE]']
 
 required_entries = [t for t in StatusFile.INFLUX_TAGS]
 required_entries.extend(['job_id', 'user'])
@@ -147,6 +185,8 @@ job_state_codes = {
     'success': ['COMPLETED'],
     'pending': ['PENDING', 'RUNNING']
 }
+# Number of job IDs per sacct call
+sacct_batch_size = 100
 ################################################################################
 
 def print_debug(lvl, msg):
@@ -172,10 +212,11 @@ def check_data(entry):
     # End checks
     return [True, '']
 
-def query_influx_running():
+def query_influx_running(start, stop):
     """
-        Send the query to get all running jobs
+        Send the query to get the last event of all jobs in a time chunk, and yield them as the response is read
     """
+    running_query = make_running_query(flux_range(start, stop))
     headers = {
         'Authorization': "Token " + influx_token,
         'Content-type': 'application/vnd.flux',
@@ -184,7 +225,7 @@ def query_influx_running():
     url = f"{get_influx_uri}"
     print_debug(2, f"Running: {running_query} on {url}")
     try:
-        r = requests.post(url, headers=headers, data=running_query)
+        r = influx_client().post(url, headers=headers, data=running_query, stream=True)
         if int(r.status_code) >= 400:
             print_debug(0, f"Influx request failed, status_code = {r.status_code}, text = {r.text}, reason = {r.reason}.")
             exit(1)
@@ -196,31 +237,27 @@ def query_influx_running():
         print_debug(0, f"Failed to send to {url}:")
         print_debug(0, str(e))
         exit(2)
-    rdc = r.content.decode('utf-8')
-    resp = list(csv.reader(rdc.splitlines(), delimiter=','))
-    # each entry in series is a record
-    col_names = resp[0]
-    # Let's do the work of transforming this into a list of dicts
-    ret_data = []
-    for entry_index in range(1, len(resp)):
-        data_tmp = {}
-        if len(resp[entry_index]) < len(col_names):
-            print_debug(3, f"Length too short. Skipping row: {resp[entry_index]}.")
-            continue
-        # First column is useless
-        for c_index in range(1, len(col_names)):
-            # Ignore result, table & rename time
-            if col_names[c_index] == "_time":
-                data_tmp["time"] = resp[entry_index][c_index]
-            elif not (col_names[c_index] == "result" or col_names[c_index] == "table"):
-                data_tmp[col_names[c_index]] = resp[entry_index][c_index]
-        should_add, reason = check_data(data_tmp)
-        if should_add:
-            ret_data.append(data_tmp)
-        else:
-            jobid = data_tmp['test_id'] if 'test_id' in data_tmp else 'unknown'
-            print_debug(2, f"Skipping test_id {jobid}. Reason: {reason}")
-    return ret_data
+    # The CSV is parsed as it is streamed, so the response of a long time range
+    # is never held in memory at once
+    try:
+        for record in read_flux_csv(r.iter_lines(chunk_size=ITER_LINES_CHUNK_SIZE)):
+            data_tmp = {}
+            for column, value in record.items():
+                # Ignore result, table & rename time
+                if column == "_time":
+                    data_tmp["time"] = value
+                elif not (column == "result" or column == "table"):
+                    data_tmp[column] = value
+            yield data_tmp
+    except FluxQueryError as e:
+        print_debug(0, e.message)
+        exit(2)
+    except requests.exceptions.RequestException as e:
+        print_debug(0, f"Failed to read the response of {url}:")
+        print_debug(0, str(e))
+        exit(2)
+    finally:
+        r.close()
 
 def post_update_to_influx(d, state_code):
     """ POSTs updated event to Influx """
@@ -234,17 +271,15 @@ def post_update_to_influx(d, state_code):
     }
         #'Content-Type': "text/plain; charset=utf-8",
     if not 'timestamp' in d.keys():
-        d['timestamp'] = datetime.datetime.now().isoformat()
-    log_time = datetime.strptime(d['timestamp'], "%Y-%m-%dT%H:%M:%S")
-    log_ns = int(datetime.timestamp(log_time) * 1000 * 1000) * 1000
-
-    influx_event_record_string = f"events,{','.join([f'{t}={d[t]}' for t in StatusFile.INFLUX_TAGS])} "
-    quote = '"'
-    influx_event_record_string += f"{','.join([f'{t}={quote}{d[t]}{quote}' for t in d if (not t == 'timestamp') and (not t in StatusFile.INFLUX_TAGS)])}"
-    influx_event_record_string += f' {str(log_ns)}'
+        d['timestamp'] = datetime.now().isoformat()
+    log_ns = timestamp_ns(d['timestamp'])
+
+    tags = dict([(t, d[t]) for t in StatusFile.INFLUX_TAGS])
+    fields = dict([(t, str(d[t])) for t in d if (not t == 'timestamp') and (not t in StatusFile.INFLUX_TAGS)])
+    influx_event_record_string = encode('events', tags, fields, log_ns)
     try:
         if not args.dry_run:
-            r = requests.post(post_influx_uri, data=influx_event_record_string, headers=headers)
+            r = influx_client().write(post_influx_uri, influx_event_record_string, headers=headers)
             if int(r.status_code) < 400:
                 print_debug(2, f"Successfully updated {d['test_id']} with {influx_event_record_string}.")
                 return True
@@ -259,7 +294,7 @@ def post_update_to_influx(d, state_code):
         return False
     except Exception as e:
         # TODO: add more graceful handling of unreachable influx servers
-        print_debug(0, f"Failed to send {influx_event_record_string} to {influx_url}:")
+        print_debug(0, f"Failed to send {influx_event_record_string} to {post_influx_uri}:")
         print_debug(1, e)
         return False
 
@@ -272,7 +307,7 @@ def check_job_status(slurm_jobid_lst):
     result = {}  # a dictionary of dictionaries
     low_limit = 0
     high_limit = 0
-    batch_size = 100
+    batch_size = sacct_batch_size
     node_failed_jobids = []
     print_debug(2, f"Querying sacct with {len(slurm_jobid_lst)} jobs in batches of up to {batch_size}")
     # Batched into batches of 100
@@ -280,8 +315,9 @@ def check_job_status(slurm_jobid_lst):
         high_limit = min(low_limit + batch_size, len(slurm_jobid_lst))
         sacct_format = 'JobID,Elapsed,Start,End,State%40,ExitCode,Reason%100,Comment%100'
         cmd=f"sacct -j {','.join(slurm_jobid_lst[low_limit:high_limit])} --format {sacct_format} -X"
-        os.system(f'{cmd} 2>&1 > slurm.jobs.tmp.txt')
-        with open(f'slurm.jobs.tmp.txt', 'r') as f:
+        # Read from a pipe rather than a file, since lookups run at the same time
+        with subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE, universal_newlines=True) as proc:
+            f = proc.stdout
             line = f.readline()
             labels = line.split()
             comment_line = f.readline()   # line of dashes
@@ -312,7 +348,6 @@ def check_job_status(slurm_jobid_lst):
                     print_debug(2, f"Found jobid in node failure list: {fields['jobid']}")
                     fields['node-failed'] = True
                 result[fields['jobid']] = fields
-        os.remove(f"slurm.jobs.tmp.txt")
         low_limit = high_limit  # prepare for next iteration
     return result
 
@@ -329,12 +364,53 @@ def get_user_from_id(user_id):
     return user_name
 
 
-data = query_influx_running()
-# This is safe, since each entry has already been checked for slurm_jobid
-slurm_job_ids = [ e['job_id'] for e in data ]
+def report_chunk(chunk, count, seconds):
+    print_debug(2, f"Queried {chunk[0].isoformat()} to {chunk[1].isoformat()}: {count} records in {seconds:.2f} s")
+
+# The time chunks are queried --jobs at a time. The last event of a test is
+# known once the chunks newer than its own are done, and the sacct lookups of
+# the running jobs start in batches as they are known, behind the queries.
+start_time = time.monotonic()
+data = []
+slurm_job_ids = []
+sacct_futures = []
+sacct_seconds = []
+
+def timed_check_job_status(slurm_jobid_lst):
+    sacct_start = time.monotonic()
+    result = check_job_status(slurm_jobid_lst)
+    sacct_seconds.append(time.monotonic() - sacct_start)
+    return result
 
-# A job ID will have a field named `node-failed` = True if it survived a node failure via --no-kill
-slurm_data = check_job_status(slurm_job_ids)
+with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, args.jobs)) as sacct_pool:
+    num_tests = 0
+    for entry in query_time_chunks(query_influx_running, time_chunks, lambda e: (e.get('test_id'), e.get('machine')),
+                                   jobs=args.jobs, on_chunk=report_chunk):
+        num_tests += 1
+        if not is_running(entry):
+            continue
+        should_add, reason = check_data(entry)
+        if not should_add:
+            jobid = entry['test_id'] if 'test_id' in entry else 'unknown'
+            print_debug(2, f"Skipping test_id {jobid}. Reason: {reason}")
+            continue
+        data.append(entry)
+        # This is safe, since each entry has already been checked for slurm_jobid
+        slurm_job_ids.append(entry['job_id'])
+        if len(slurm_job_ids) >= sacct_batch_size:
+            sacct_futures.append(sacct_pool.submit(timed_check_job_status, slurm_job_ids))
+            slurm_job_ids = []
+    query_end_time = time.monotonic()
+    print_debug(0, f"Queried InfluxDB in {len(time_chunks)} chunks of {args.chunk_time}, {args.jobs} at a time: {query_end_time - start_time:.2f} s. Found {len(data)} running jobs of {num_tests} tests.")
+    if len(slurm_job_ids) > 0:
+        sacct_futures.append(sacct_pool.submit(timed_check_job_status, slurm_job_ids))
+
+    # A job ID will have a field named `node-failed` = True if it survived a node failure via --no-kill
+    slurm_data = {}
+    for future in sacct_futures:
+        slurm_data.update(future.result())
+sacct_end_time = time.monotonic()
+print_debug(0, f"Looked up {len(data)} jobs with sacct in {len(sacct_futures)} batches: {sum(sacct_seconds):.2f} s, done {sacct_end_time - query_end_time:.2f} s after the queries.")
 
 skipped = 0
 
@@ -411,5 +487,6 @@ for entry in data:
         skipped += 1
 
 
+print_debug(0, f"Updated InfluxDB: {time.monotonic() - sacct_end_time:.2f} s. Total: {time.monotonic() - start_time:.2f} s.")
 print_debug(0, f"{len(data) - skipped} entries sent to InfluxDB. {skipped} skipped.")
 exit(0)